@@ -3,7 +3,7 @@ Routes d'administration
 Gestion des utilisateurs, paramètres système, etc.
 """
 
-from fastapi import APIRouter, Depends, Form, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from sqlmodel import Session, select
 
@@ -16,7 +16,9 @@ from app.core.permissions import PermissionManager
 from app.db.session import get_session
 from app.models.user import User
 from app.services.activity_service import ActivityService
+from app.services.image_variant_service import ImageVariantService
 from app.services.system_settings_service import SystemSettingsService
+from app.services.upload_service import UploadService
 from app.templates import get_template_context, templates
 
 logger = get_logger(__name__)
@@ -314,6 +316,7 @@ async def get_user(
 async def upload_user_photo(
     user_id: int,
     request: Request,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     current_user: User = Depends(require_roles("admin")),
 ):
@@ -322,8 +325,6 @@ async def upload_user_photo(
         from datetime import datetime
         from pathlib import Path
 
-        import aiofiles
-
         user = session.get(User, user_id)
         if not user:
             return JSONResponse(status_code=404, content={"success": False, "message": "Utilisateur non trouvé"})
@@ -345,13 +346,6 @@ async def upload_user_photo(
                 content={"success": False, "message": "Format non supporté (JPG, PNG, GIF, WEBP uniquement)"},
             )
 
-        # Vérifier la taille (2MB max pour les photos de profil)
-        content = await photo_file.read()
-        if len(content) > 2 * 1024 * 1024:
-            return JSONResponse(
-                status_code=400, content={"success": False, "message": "Fichier trop volumineux (max 2MB)"}
-            )
-
         # Générer un nom de fichier unique
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         new_filename = f"profile_{user_id}_{timestamp}{file_ext}"
@@ -360,16 +354,18 @@ async def upload_user_photo(
         profiles_dir = path_config.UPLOADS_DIR / "profiles"
         profiles_dir.mkdir(parents=True, exist_ok=True)
 
-        # Sauvegarder le fichier
+        # Sauvegarder le fichier en flux (2MB max pour les photos de profil)
         file_path = profiles_dir / new_filename
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(content)
+        try:
+            await UploadService.enregistrer(photo_file, file_path, session=session, max_octets=2 * 1024 * 1024)
+        except HTTPException:
+            return JSONResponse(
+                status_code=400, content={"success": False, "message": "Fichier trop volumineux (max 2MB)"}
+            )
 
-        # Supprimer l'ancienne photo si elle existe
+        # Supprimer l'ancienne photo et ses variantes
         if user.profile_picture:
-            old_path = path_config.UPLOADS_DIR / user.profile_picture
-            if old_path.exists():
-                old_path.unlink()
+            ImageVariantService.supprimer(path_config.UPLOADS_DIR / user.profile_picture)
 
         # Mettre à jour l'utilisateur
         relative_path = f"profiles/{new_filename}"
@@ -377,6 +373,9 @@ async def upload_user_photo(
         session.add(user)
         session.commit()
 
+        # Variantes avatar / navbar / pdf générées après l'envoi de la réponse
+        background_tasks.add_task(ImageVariantService.generer, file_path, "photo")
+
         # Logger l'activité
         ActivityService.log_activity(
             db_session=session,
@@ -472,14 +471,15 @@ async def update_system_settings(
 
 @router.post("/settings/upload-logo", name="upload_logo_api")
 async def upload_logo(
-    request: Request, session: Session = Depends(get_session), current_user: User = Depends(require_roles("admin"))
+    request: Request,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_roles("admin")),
 ):
     """Upload d'un nouveau logo"""
     try:
         from pathlib import Path
 
-        import aiofiles
-
         # Récupérer le fichier
         form = await request.form()
         logo_file = form.get("logo")
@@ -504,7 +504,13 @@ async def upload_logo(
         logo_dir.mkdir(parents=True, exist_ok=True)
         file_path = logo_dir / new_filename
 
-        # Supprimer TOUS les anciens logos (logo.png, logo.jpg, etc.)
+        # Recevoir le nouveau fichier avant de toucher aux anciens logos
+        try:
+            recu = await UploadService.recevoir(logo_file, logo_dir, session=session)
+        except HTTPException as e:
+            return JSONResponse(status_code=400, content={"success": False, "message": e.detail})
+
+        # Supprimer TOUS les anciens logos et leurs variantes (logo.png, logo.navbar.webp, etc.)
         for old_logo in logo_dir.glob("logo.*"):
             try:
                 old_logo.unlink()
@@ -512,10 +518,8 @@ async def upload_logo(
             except Exception as e:
                 logger.warning(f"⚠️ Impossible de supprimer l'ancien logo {old_logo.name}: {e}")
 
-        # Lire et écrire le nouveau fichier
-        content = await logo_file.read()
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(content)
+        recu.deplacer(file_path)
+        background_tasks.add_task(ImageVariantService.generer, file_path, "logo")
 
         # Mettre à jour les paramètres
         logo_relative_path = f"images/{new_filename}"
@@ -546,14 +550,15 @@ async def upload_logo(
 
 @router.post("/settings/upload-minister", name="upload_minister_photo_api")
 async def upload_minister_photo(
-    request: Request, session: Session = Depends(get_session), current_user: User = Depends(require_roles("admin"))
+    request: Request,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_roles("admin")),
 ):
     """Upload de la photo du ministre"""
     try:
         from pathlib import Path
 
-        import aiofiles
-
         form = await request.form()
         photo_file = form.get("photo")
 
@@ -572,19 +577,20 @@ async def upload_minister_photo(
         minister_dir.mkdir(parents=True, exist_ok=True)
         file_path = minister_dir / f"minister_photo{file_ext}"
 
-        # Supprimer les anciennes photos du ministre
+        try:
+            recu = await UploadService.recevoir(photo_file, minister_dir, session=session, max_octets=3 * 1024 * 1024)
+        except HTTPException:
+            return JSONResponse(status_code=400, content={"success": False, "message": "Fichier trop volumineux (max 3MB)"})
+
+        # Supprimer les anciennes photos du ministre et leurs variantes
         for old_photo in minister_dir.glob("minister_photo.*"):
             try:
                 old_photo.unlink()
             except Exception as exc:
                 logger.warning(f"⚠️ Impossible de supprimer l'ancienne photo du ministre {old_photo.name}: {exc}")
 
-        content = await photo_file.read()
-        if len(content) > 3 * 1024 * 1024:
-            return JSONResponse(status_code=400, content={"success": False, "message": "Fichier trop volumineux (max 3MB)"})
-
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(content)
+        recu.deplacer(file_path)
+        background_tasks.add_task(ImageVariantService.generer, file_path, "photo")
 
         relative_path = f"images/{file_path.name}"
         SystemSettingsService.update_settings(
@@ -5,21 +5,22 @@ Endpoints pour la gestion budgétaire et les conférences budgétaires
 
 import io
 import re
+import time
 from collections import defaultdict
 from datetime import date, datetime
 from decimal import Decimal
 from io import BytesIO
 from pathlib import Path
 
-import pandas as pd
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, StreamingResponse
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from sqlmodel import Session, delete, func, select
 
 from app.api.v1.endpoints.auth import get_current_user
+from app.core.lazy import lazy_import
 from app.core.logging_config import get_logger
+from app.core.metrics import enregistrer_import
 from app.core.permission_decorators import require_data_access, require_module_dep
 from app.db.session import get_session
 from app.models.user import User
@@ -42,13 +43,20 @@ from app.models.budget import (
 from app.models.personnel import Direction, Programme
 from app.models.user import User
 from app.services.activity_service import ActivityService
+from app.services.blob_store_service import BlobStoreService
+from app.services.fiche_pdf_service import FichePdfService
 from app.services.fiche_technique_service import FicheTechniqueService
+from app.services.sigobe_cube_service import SigobeCubeService
 from app.services.sigobe_service import SigobeService
+from app.services.upload_service import UploadService
 from app.templates import get_template_context, templates
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+# Chargés au premier import Excel/SIGOBE, pas au démarrage des workers
+pd = lazy_import("pandas")
+
 
 # ============================================
 # DASHBOARD BUDGÉTAIRE
@@ -129,14 +137,12 @@ def budget_home(
             engagements_total = float(kpi_global.engagements_total or 0)
             mandats_emis_total = float(kpi_global.mandats_total or 0)
 
-            # Récupérer les totaux détaillés depuis SigobeExecution
-            executions_sigobe = session.exec(
-                select(SigobeExecution).where(SigobeExecution.chargement_id == dernier_chargement.id)
-            ).all()
+            # Récupérer les totaux détaillés depuis le cube pré-agrégé
+            totaux_cube = SigobeCubeService.totaux_chargement(session, dernier_chargement.id)
 
-            mandats_vises_total = sum(float(e.mandats_vise_cf or 0) for e in executions_sigobe)
-            mandats_pec_total = sum(float(e.mandats_pec or 0) for e in executions_sigobe)
-            disponible_eng_total = sum(float(e.disponible_eng or 0) for e in executions_sigobe)
+            mandats_vises_total = totaux_cube["mandats_vise_cf"]
+            mandats_pec_total = totaux_cube["mandats_pec"]
+            disponible_eng_total = totaux_cube["disponible_eng"]
 
             # Calculer les taux selon vos formules DAX
             # _Tx_Eng : DIVIDE(Engagements, Budget_Actuel)
@@ -229,19 +235,17 @@ def budget_home(
             ).first()
 
             if kpi_global_n1:
-                # Récupérer les données brutes de N-1 pour appliquer les MÊMES formules que N
-                executions_sigobe_n1 = session.exec(
-                    select(SigobeExecution).where(SigobeExecution.chargement_id == chargement_n1.id)
-                ).all()
+                # Récupérer les totaux N-1 (cube) pour appliquer les MÊMES formules que N
+                totaux_cube_n1 = SigobeCubeService.totaux_chargement(session, chargement_n1.id)
 
                 budget_actuel_n1 = float(kpi_global_n1.budget_actuel_total or 0)
                 budget_vote_n1 = float(kpi_global_n1.budget_vote_total or 0)
                 engagements_n1 = float(kpi_global_n1.engagements_total or 0)
                 mandats_emis_n1 = float(kpi_global_n1.mandats_total or 0)
 
-                mandats_vises_n1 = sum(float(e.mandats_vise_cf or 0) for e in executions_sigobe_n1)
-                mandats_pec_n1 = sum(float(e.mandats_pec or 0) for e in executions_sigobe_n1)
-                disponible_eng_n1 = sum(float(e.disponible_eng or 0) for e in executions_sigobe_n1)
+                mandats_vises_n1 = totaux_cube_n1["mandats_vise_cf"]
+                mandats_pec_n1 = totaux_cube_n1["mandats_pec"]
+                disponible_eng_n1 = totaux_cube_n1["disponible_eng"]
 
                 # Calculer les taux N-1 avec les MÊMES formules que N
                 budg_select_n1 = budget_actuel_n1 or budget_vote_n1
@@ -837,28 +841,20 @@ async def api_upload_document(
     if not fiche:
         raise HTTPException(404, "Fiche non trouvée")
 
-    # Créer le dossier avec path_config
     from app.core.path_config import path_config
 
-    relative_path = f"budget/fiches/{fiche_id}/{fichier.filename}"
-    docs_dir = path_config.UPLOADS_DIR / "budget" / "fiches" / str(fiche_id)
-    docs_dir.mkdir(parents=True, exist_ok=True)
-
-    # Sauvegarder le fichier
-    file_path = docs_dir / fichier.filename
-    content = await fichier.read()
-
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Recevoir le fichier en flux et le ranger dans le magasin dédupliqué
+    blob = await BlobStoreService.enregistrer(fichier, session)
 
     # Enregistrer en BDD avec URL générée correctement
-    file_url = path_config.get_file_url("uploads", relative_path)
+    file_url = path_config.get_file_url("uploads", blob.chemin)
     doc = DocumentBudget(
         fiche_technique_id=fiche_id,
         type_document=description or "Document général",
         nom_fichier=fichier.filename,
         file_path=file_url,
-        taille_octets=len(content),
+        taille_octets=blob.taille,
+        sha256=blob.sha256,
         uploaded_by_user_id=current_user.id,
     )
 
@@ -881,8 +877,8 @@ def api_download_document_fiche(
     if not doc or doc.fiche_technique_id != fiche_id:
         raise HTTPException(404, "Document non trouvé")
 
-    file_path = Path(f"app{doc.file_path}")
-    if not file_path.exists():
+    file_path = BlobStoreService.chemin_contenu(doc.sha256, session) if doc.sha256 else Path(f"app{doc.file_path}")
+    if not file_path or not file_path.exists():
         raise HTTPException(404, "Fichier physique non trouvé")
 
     return FileResponse(path=file_path, filename=doc.nom_fichier, media_type="application/octet-stream")
@@ -901,11 +897,14 @@ def api_delete_document_fiche(
         raise HTTPException(404, "Document non trouvé")
 
     try:
-        # Supprimer le fichier physique
-        file_path = Path(f"app{doc.file_path}")
-        if file_path.exists():
-            file_path.unlink()
-            logger.info(f"📎 Fichier supprimé : {doc.nom_fichier}")
+        # Libérer le blob partagé (purgé par le cron sans référence) ou supprimer l'ancien fichier
+        if doc.sha256:
+            BlobStoreService.liberer(doc.sha256, session)
+        else:
+            file_path = Path(f"app{doc.file_path}")
+            if file_path.exists():
+                file_path.unlink()
+                logger.info(f"📎 Fichier supprimé : {doc.nom_fichier}")
 
         # Supprimer de la BDD
         session.delete(doc)
@@ -2074,6 +2073,9 @@ async def api_telecharger_template_fiche(annee: int = 2025, current_user: User =
     Télécharger un modèle Excel vierge pour créer une fiche technique
     """
     try:
+        from openpyxl import Workbook
+        from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
         # Créer un classeur Excel
         wb = Workbook()
         ws = wb.active
@@ -3619,133 +3621,11 @@ async def _analyser_fiche_pdf(
 ):
     """
     Analyser un fichier PDF de fiche technique et extraire la structure hiérarchique
+    L'extraction (pool de processus) s'exécute hors de la boucle d'événements
     """
     try:
-        from io import BytesIO
-
-        import PyPDF2
-    except ImportError:
-        raise HTTPException(
-            500,
-            "❌ PyPDF2 n'est pas installé.\n\n"
-            "💡 Installez-le avec : uv add pypdf2\n\n"
-            "📥 Ou utilisez le modèle Excel pour plus de fiabilité.",
-        )
-
-    try:
-        # Extraire le texte du PDF
-        pdf_reader = PyPDF2.PdfReader(BytesIO(content))
-
-        logger.info(f"📄 PDF chargé : {len(pdf_reader.pages)} page(s)")
-
-        # Extraire tout le texte
-        full_text = ""
-        for page_num, page in enumerate(pdf_reader.pages):
-            text = page.extract_text()
-            full_text += text + "\n"
-            logger.debug(f"  📄 Page {page_num + 1} : {len(text)} caractères")
-
-        if not full_text.strip():
-            raise HTTPException(
-                400, "❌ Impossible d'extraire le texte du PDF. Le fichier est peut-être scanné ou protégé."
-            )
-
-        logger.info(f"✅ Texte extrait : {len(full_text)} caractères")
-
-        # Créer un DataFrame à partir du texte parsé
-        df_data = []
-        lignes_texte = full_text.split("\n")
-
-        current_nature = None
-        current_action = None
-        current_service = None
-        current_activite = None
-
-        for ligne_idx, ligne in enumerate(lignes_texte):
-            ligne = ligne.strip()
-            if not ligne:
-                continue
-
-            # Détecter les natures de dépenses
-            if ligne.upper() in ["BIENS ET SERVICES", "PERSONNEL", "INVESTISSEMENT", "INVESTISSEMENTS", "TRANSFERTS"]:
-                current_nature = ligne.upper()
-                df_data.append({"type": "nature", "nature": current_nature, "libelle": ligne, "montants": {}})
-                logger.debug(f"📌 Nature : {current_nature}")
-                continue
-
-            # Détecter les actions (avec pattern flexible)
-            if any(ligne.startswith(p) for p in ["Action :", "- Action :", "ACTION :"]):
-                action_libelle = ligne.replace("Action :", "").replace("- Action :", "").replace("ACTION :", "").strip()
-                current_action = action_libelle
-                df_data.append(
-                    {
-                        "type": "action",
-                        "nature": current_nature,
-                        "libelle": action_libelle,
-                        "montants": _extraire_montants_ligne(ligne),
-                    }
-                )
-                logger.debug(f"  → Action : {action_libelle[:50]}")
-                continue
-
-            # Détecter les services
-            if any(ligne.startswith(p) for p in ["Service Bénéficiaire :", "- Service Bénéficiaire :", "SERVICE :"]):
-                service_libelle = (
-                    ligne.replace("Service Bénéficiaire :", "")
-                    .replace("- Service Bénéficiaire :", "")
-                    .replace("SERVICE :", "")
-                    .strip()
-                )
-                current_service = service_libelle
-                df_data.append(
-                    {
-                        "type": "service",
-                        "nature": current_nature,
-                        "action": current_action,
-                        "libelle": service_libelle,
-                        "montants": {},
-                    }
-                )
-                logger.debug(f"    → Service : {service_libelle[:50]}")
-                continue
-
-            # Détecter les activités
-            if any(ligne.startswith(p) for p in ["Activité :", "- Activité :", "ACTIVITÉ :", "ACTIVITE :"]):
-                activite_libelle = (
-                    ligne.replace("Activité :", "")
-                    .replace("- Activité :", "")
-                    .replace("ACTIVITÉ :", "")
-                    .replace("ACTIVITE :", "")
-                    .strip()
-                )
-                current_activite = activite_libelle
-                df_data.append(
-                    {
-                        "type": "activite",
-                        "nature": current_nature,
-                        "action": current_action,
-                        "service": current_service,
-                        "libelle": activite_libelle,
-                        "montants": _extraire_montants_ligne(ligne),
-                    }
-                )
-                logger.debug(f"      → Activité : {activite_libelle[:50]}")
-                continue
-
-            # Détecter les lignes budgétaires (commence par un numéro de compte)
-            if ligne and ligne[0].isdigit() and len(ligne) > 5:
-                df_data.append(
-                    {
-                        "type": "ligne",
-                        "nature": current_nature,
-                        "action": current_action,
-                        "service": current_service,
-                        "activite": current_activite,
-                        "libelle": ligne,
-                        "montants": _extraire_montants_ligne(ligne),
-                    }
-                )
-                logger.debug(f"        → Ligne : {ligne[:50]}")
+        extraction = await run_in_threadpool(FichePdfService.analyser_pdf, content)
+        df_data = extraction["elements"]
 
         logger.info(f"✅ {len(df_data)} éléments extraits du PDF")
 
@@ -3804,6 +3684,11 @@ async def _analyser_fiche_pdf(
             "lignes_count": result["lignes_count"],
             "budget_total": float(budget_total),
             "errors": result.get("errors", []),
+            "extraction": {
+                "nb_pages": extraction["nb_pages"],
+                "duree_ms": extraction["duree_ms"],
+                "pages": extraction["pages"],
+            },
         }
 
     except HTTPException:
@@ -3813,42 +3698,6 @@ async def _analyser_fiche_pdf(
         raise HTTPException(500, f"Erreur lors de l'analyse du PDF : {e!s}")
 
 
-def _extraire_montants_ligne(ligne: str) -> dict:
-    """
-    Extraire les montants d'une ligne de texte PDF
-    Recherche des nombres (avec ou sans séparateurs)
-    """
-    import re
-
-    # Pattern pour trouver les nombres (avec espaces, virgules, points)
-    pattern = r"[\d\s,\.]+(?=\s|$)"
-    montants_trouves = re.findall(pattern, ligne)
-
-    montants = {}
-    colonnes = [
-        "budget_vote_n",
-        "budget_actuel_n",
-        "enveloppe_n_plus_1",
-        "complement_solicite",
-        "budget_souhaite",
-        "engagement_etat",
-        "autre_complement",
-        "projet_budget_n_plus_1",
-    ]
-
-    for idx, montant_str in enumerate(montants_trouves):
-        if idx < len(colonnes):
-            try:
-                # Nettoyer le montant
-                montant_clean = montant_str.replace(" ", "").replace(",", "").replace(".", "")
-                if montant_clean.isdigit():
-                    montants[colonnes[idx]] = Decimal(montant_clean)
-            except:
-                pass
-
-    return montants
-
-
 def _creer_structure_depuis_pdf_data(df_data: list, fiche_id: int, session: Session) -> dict:
     """
     Créer la structure hiérarchique depuis les données extraites du PDF
@@ -4210,9 +4059,6 @@ async def api_create_ligne(
         # Gérer l'upload des documents
         documents_count = 0
         if documents and len(documents) > 0 and documents[0].filename:
-            docs_dir = Path(f"uploads/budget/lignes/{ligne.id}")
-            docs_dir.mkdir(parents=True, exist_ok=True)
-
             for doc in documents:
                 if doc.filename:
                     # Renommer le fichier selon le format : CodeAction_CodeActivité_CodeLigne_NomOriginal.ext
@@ -4220,12 +4066,8 @@ async def api_create_ligne(
                     original_name = Path(doc.filename).stem
                     new_filename = f"{action.code}_{activite.code}_{code}_{original_name}{file_ext}"
 
-                    # Sauvegarder le fichier
-                    file_path = docs_dir / new_filename
-                    content = await doc.read()
-
-                    with open(file_path, "wb") as f:
-                        f.write(content)
+                    # Ranger le contenu dans le magasin dédupliqué (écriture en flux)
+                    blob = await BlobStoreService.enregistrer(doc, session)
 
                     # Enregistrer les métadonnées en base
                     doc_meta = DocumentLigneBudgetaire(
@@ -4233,9 +4075,10 @@ async def api_create_ligne(
                         fiche_technique_id=activite.fiche_technique_id,
                         nom_fichier_original=doc.filename,
                         nom_fichier_stocke=new_filename,
-                        chemin_fichier=str(file_path),
+                        chemin_fichier=blob.chemin,
                         type_fichier=file_ext,
-                        taille_octets=len(content),
+                        taille_octets=blob.taille,
+                        sha256=blob.sha256,
                         code_action=action.code,
                         code_activite=activite.code,
                         code_ligne=code,
@@ -4259,6 +4102,9 @@ async def api_create_ligne(
             "documents_count": documents_count,
             "message": f"Ligne budgétaire créée avec {documents_count} document(s)",
         }
+    except HTTPException:
+        session.rollback()
+        raise
     except Exception as e:
         session.rollback()
         logger.error(f"❌ Erreur création ligne: {e}")
@@ -4548,14 +4394,17 @@ def api_delete_ligne(
         ).all()
 
         for doc in documents:
-            # Supprimer le fichier physique
-            try:
-                file_path = Path(doc.chemin_fichier)
-                if file_path.exists():
-                    file_path.unlink()
-                    logger.info(f"📎 Fichier supprimé : {doc.nom_fichier_stocke}")
-            except Exception as e:
-                logger.warning(f"⚠️ Impossible de supprimer le fichier {doc.chemin_fichier}: {e}")
+            # Libérer le blob partagé ou supprimer l'ancien fichier physique
+            if doc.sha256:
+                BlobStoreService.liberer(doc.sha256, session)
+            else:
+                try:
+                    file_path = Path(doc.chemin_fichier)
+                    if file_path.exists():
+                        file_path.unlink()
+                        logger.info(f"📎 Fichier supprimé : {doc.nom_fichier_stocke}")
+                except Exception as e:
+                    logger.warning(f"⚠️ Impossible de supprimer le fichier {doc.chemin_fichier}: {e}")
 
             # Supprimer la métadonnée
             session.delete(doc)
@@ -4607,7 +4456,10 @@ def api_get_documents_ligne(
                 "nom_stocke": doc.nom_fichier_stocke,
                 "type": doc.type_fichier,
                 "taille": doc.taille_octets,
-                "url": path_config.get_file_url("uploads", f"budget/lignes/{ligne_id}/{doc.nom_fichier_stocke}"),
+                "url": path_config.get_file_url(
+                    "uploads",
+                    doc.chemin_fichier if doc.sha256 else f"budget/lignes/{ligne_id}/{doc.nom_fichier_stocke}",
+                ),
                 "uploaded_at": doc.uploaded_at.isoformat(),
             }
             for doc in documents
@@ -4633,9 +4485,6 @@ async def api_add_documents_ligne(
         service = session.get(ServiceBeneficiaire, activite.service_beneficiaire_id)
         action = session.get(ActionBudgetaire, service.action_id)
 
-        docs_dir = Path(f"uploads/budget/lignes/{ligne_id}")
-        docs_dir.mkdir(parents=True, exist_ok=True)
-
         documents_count = 0
         for doc in documents:
             if doc.filename:
@@ -4644,12 +4493,8 @@ async def api_add_documents_ligne(
                 original_name = Path(doc.filename).stem
                 new_filename = f"{action.code}_{activite.code}_{ligne.code}_{original_name}{file_ext}"
 
-                # Sauvegarder le fichier
-                file_path = docs_dir / new_filename
-                content = await doc.read()
-
-                with open(file_path, "wb") as f:
-                    f.write(content)
+                # Ranger le contenu dans le magasin dédupliqué (écriture en flux)
+                blob = await BlobStoreService.enregistrer(doc, session)
 
                 # Enregistrer les métadonnées
                 doc_meta = DocumentLigneBudgetaire(
@@ -4657,9 +4502,10 @@ async def api_add_documents_ligne(
                     fiche_technique_id=ligne.fiche_technique_id,
                     nom_fichier_original=doc.filename,
                     nom_fichier_stocke=new_filename,
-                    chemin_fichier=str(file_path),
+                    chemin_fichier=blob.chemin,
                     type_fichier=file_ext,
-                    taille_octets=len(content),
+                    taille_octets=blob.taille,
+                    sha256=blob.sha256,
                     code_action=action.code,
                     code_activite=activite.code,
                     code_ligne=ligne.code,
@@ -4677,6 +4523,9 @@ async def api_add_documents_ligne(
             "documents_count": documents_count,
             "message": f"{documents_count} document(s) ajouté(s) avec succès",
         }
+    except HTTPException:
+        session.rollback()
+        raise
     except Exception as e:
         session.rollback()
         logger.error(f"❌ Erreur ajout documents: {e}")
@@ -4696,11 +4545,14 @@ def api_delete_document_ligne(
         raise HTTPException(404, "Document non trouvé")
 
     try:
-        # Supprimer le fichier physique
-        file_path = Path(doc.chemin_fichier)
-        if file_path.exists():
-            file_path.unlink()
-            logger.info(f"📎 Fichier supprimé : {doc.nom_fichier_stocke}")
+        # Libérer le blob partagé ou supprimer l'ancien fichier physique
+        if doc.sha256:
+            BlobStoreService.liberer(doc.sha256, session)
+        else:
+            file_path = Path(doc.chemin_fichier)
+            if file_path.exists():
+                file_path.unlink()
+                logger.info(f"📎 Fichier supprimé : {doc.nom_fichier_stocke}")
 
         # Supprimer la métadonnée
         session.delete(doc)
@@ -4826,7 +4678,7 @@ def parse_date_flexible(value) -> date | None:
     return None
 
 
-def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
+def standardize_column_names(df: "pd.DataFrame") -> "pd.DataFrame":
     """
     Renomme automatiquement les colonnes financières
     Inspiré de fxTableStandardName_AutoMapping
@@ -5003,6 +4855,9 @@ async def api_telecharger_template_sigobe(current_user: User = Depends(get_curre
     Télécharger un modèle Excel vierge pour les données SIGOBE
     """
     try:
+        from openpyxl import Workbook
+        from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
         # Créer un classeur Excel
         wb = Workbook()
         ws = wb.active
@@ -6081,11 +5936,21 @@ async def api_sigobe_upload(
     Parser suivant SCRUPULEUSEMENT la logique fxInspectTable PowerQuery (étapes A→O)
     """
     try:
-        content = await fichier.read()
-        excel_file = BytesIO(content)
+        from app.core.path_config import path_config
 
-        # Parser le fichier SIGOBE avec le service
-        Result, Metadatafile, ColsToKeep = SigobeService.parse_fichier_excel(excel_file, annee, trimestre)
+        relative_path = f"sigobe/{annee}/{fichier.filename}"
+        upload_dir = path_config.UPLOADS_DIR / "sigobe" / str(annee)
+
+        # Recevoir le fichier en flux dans un fichier temporaire du dossier cible
+        recu = await UploadService.recevoir(fichier, upload_dir, session=session)
+
+        # Parser le fichier SIGOBE avec le service (depuis le disque)
+        debut_import = time.perf_counter()
+        try:
+            Result, Metadatafile, ColsToKeep = SigobeService.parse_fichier_excel(recu.chemin, annee, trimestre)
+        except BaseException:
+            recu.supprimer()
+            raise
 
         logger.info(f"✅ Parsing réussi : {len(Result)} lignes à importer")
 
@@ -6095,16 +5960,8 @@ async def api_sigobe_upload(
         else:
             periode_libelle = f"Annuel {annee}"
 
-        # Sauvegarder le fichier physiquement (SEULEMENT si parsing OK)
-        from app.core.path_config import path_config
-
-        relative_path = f"sigobe/{annee}/{fichier.filename}"
-        upload_dir = path_config.UPLOADS_DIR / "sigobe" / str(annee)
-        upload_dir.mkdir(parents=True, exist_ok=True)
-
-        file_path = upload_dir / fichier.filename
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # Ranger le fichier à sa place définitive (SEULEMENT si parsing OK)
+        file_path = recu.deplacer(upload_dir / fichier.filename)
 
         logger.info(f"📁 Fichier sauvegardé : {file_path}")
 
@@ -6117,7 +5974,7 @@ async def api_sigobe_upload(
             trimestre=trimestre,
             periode_libelle=periode_libelle,
             nom_fichier=fichier.filename,
-            taille_octets=len(content),
+            taille_octets=recu.taille,
             chemin_fichier=file_url,
             uploaded_by_user_id=current_user.id,
             statut="En cours",
@@ -6229,6 +6086,7 @@ async def api_sigobe_upload(
         logger.info(
             f"✅ Import terminé : {nb_lignes} lignes, {len(programmes_set)} programmes, {len(actions_set)} actions"
         )
+        enregistrer_import("sigobe", nb_lignes, time.perf_counter() - debut_import)
 
         # 13. Calculer les KPIs
         try:
@@ -6236,6 +6094,13 @@ async def api_sigobe_upload(
         except Exception as e:
             logger.error(f"❌ Erreur calcul KPIs : {e}")
 
+        # 14. Alimenter le cube analytique pluriannuel
+        try:
+            SigobeCubeService.rafraichir_chargement(chargement.id, session)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"❌ Erreur alimentation cube SIGOBE : {e}")
+
         # Log activité
         ActivityService.log_user_activity(
             session=session,
@@ -6413,6 +6278,9 @@ def api_delete_sigobe(
         # Supprimer les KPIs
         session.exec(delete(SigobeKpi).where(SigobeKpi.chargement_id == chargement_id))
 
+        # Retirer les faits du cube analytique
+        SigobeCubeService.supprimer_chargement(chargement_id, session)
+
         # Supprimer les exécutions
         session.exec(delete(SigobeExecution).where(SigobeExecution.chargement_id == chargement_id))
 
@@ -6497,6 +6365,8 @@ async def api_update_sigobe_execution(
         session.add(execution)
         session.commit()
 
+        SigobeCubeService.rafraichir_chargement(execution.chargement_id, session)
+
         logger.info(f"✅ Ligne SIGOBE {execution_id} modifiée par {current_user.email}")
 
         # Log activité
@@ -6529,10 +6399,13 @@ def api_delete_sigobe_execution(
 
     try:
         tache_libelle = execution.taches or execution.activites or execution.actions or "ligne"
+        chargement_id = execution.chargement_id
 
         session.delete(execution)
         session.commit()
 
+        SigobeCubeService.rafraichir_chargement(chargement_id, session)
+
         logger.info(f"✅ Ligne SIGOBE {execution_id} supprimée par {current_user.email}")
 
         # Log activité
@@ -6850,3 +6723,89 @@ def api_get_kpis_sigobe(
             for kpi in kpis
         ],
     }
+
+
+# ============================================
+# SIGOBE - CUBE ANALYTIQUE PLURIANNUEL
+# ============================================
+
+
+@router.get("/api/sigobe/analytics/tendances", name="api_sigobe_tendances")
+def api_sigobe_tendances(
+    annee_debut: int | None = None,
+    annee_fin: int | None = None,
+    trimestre: int | None = None,
+    par_trimestre: bool = False,
+    programme: str | None = None,
+    action: str | None = None,
+    type_depense: str | None = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Séries temporelles pluriannuelles (par année ou par trimestre) lues dans le cube pré-agrégé
+    Filtres optionnels sur programme / action / type de dépense
+    """
+    points = SigobeCubeService.tendances(
+        session,
+        annee_debut=annee_debut,
+        annee_fin=annee_fin,
+        trimestre=trimestre,
+        par_trimestre=par_trimestre,
+        programme=programme,
+        action=action,
+        type_depense=type_depense,
+    )
+    return {"ok": True, "points": points}
+
+
+@router.get("/api/sigobe/analytics/drill-down", name="api_sigobe_drill_down")
+def api_sigobe_drill_down(
+    annee: int,
+    niveau: str = "programme",
+    trimestre: int | None = None,
+    programme: str | None = None,
+    action: str | None = None,
+    type_depense: str | None = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Ventilation d'une période par programme, action ou type de dépense"""
+    try:
+        lignes = SigobeCubeService.drill_down(
+            session,
+            annee=annee,
+            niveau=niveau,
+            trimestre=trimestre,
+            programme=programme,
+            action=action,
+            type_depense=type_depense,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    return {"ok": True, "annee": annee, "trimestre": trimestre, "niveau": niveau, "lignes": lignes}
+
+
+@router.get("/api/sigobe/analytics/comparaison", name="api_sigobe_comparaison")
+def api_sigobe_comparaison(
+    annee: int,
+    trimestre: int | None = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Comparaison N / N-1 des montants et taux d'une période"""
+    return {"ok": True, **SigobeCubeService.comparer(session, annee, trimestre)}
+
+
+@router.post("/api/sigobe/analytics/reconstruire", name="api_sigobe_reconstruire_cube")
+def api_sigobe_reconstruire_cube(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Reconstruit le cube analytique à partir de tous les chargements (admin)"""
+    if not current_user.is_admin:
+        raise HTTPException(403, "Action réservée aux administrateurs")
+
+    resultat = SigobeCubeService.reconstruire(session)
+    return {"ok": True, **resultat}
@@ -2,9 +2,20 @@
 Endpoints API pour la gestion des fichiers
 """
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Request, UploadFile, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
 from fastapi import File as FastAPIFile
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from sqlmodel import Session
 
 from app.api.v1.endpoints.auth import get_current_user
@@ -21,7 +32,7 @@ from app.schemas.file import (
     FileUploadMetadata,
 )
 from app.services.activity_service import ActivityService
-from app.services.excel_processor import ExcelProcessorService
+from app.services.excel_processor import APERCU_NB_LIGNES, ExcelProcessorService
 from app.services.file_service import FileService
 from app.templates import get_template_context, templates
 
@@ -44,6 +55,14 @@ def process_file_background(file_id: int, file_path: str, file_type: str, metada
             # Mettre en traitement
             FileService.update_file_status(session, file_id, FileStatus.PROCESSING)
 
+            # Construire l'aperçu une fois pour toutes (servi ensuite depuis le cache)
+            db_file = FileService.get_file_by_id(session, file_id)
+            if db_file and db_file.sha256:
+                try:
+                    ExcelProcessorService.obtenir_apercu(file_path, db_file.sha256)
+                except Exception as e:
+                    logger.warning(f"⚠️ Aperçu non généré pour le fichier {file_id}: {e}")
+
             # Traiter le fichier
             success, rows_processed, rows_failed, error_msg, processed_data = ExcelProcessorService.process_file(
                 file_path, file_type, metadata
@@ -129,17 +148,8 @@ async def upload_file(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Seuls les fichiers Excel (.xlsx, .xls) sont acceptés"
         )
 
-    # Valider la taille (max 50 MB)
+    # Taille max (50 MB) : vérifiée pendant l'écriture en flux, avec la limite système
     MAX_SIZE = 50 * 1024 * 1024  # 50 MB
-    content = await file.read()
-    if len(content) > MAX_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Le fichier est trop volumineux (max {MAX_SIZE / (1024 * 1024)} MB)",
-        )
-
-    # Réinitialiser le curseur du fichier
-    await file.seek(0)
 
     # Préparer les métadonnées
     metadata = {
@@ -158,7 +168,7 @@ async def upload_file(
 
     # Sauvegarder le fichier
     try:
-        db_file = await FileService.save_file(session, file, metadata, current_user.id)
+        db_file = await FileService.save_file(session, file, metadata, current_user.id, max_octets=MAX_SIZE)
 
         # Lancer le traitement en arrière-plan
         background_tasks.add_task(process_file_background, db_file.id, db_file.file_path, db_file.file_type, metadata)
@@ -183,6 +193,8 @@ async def upload_file(
         logger.info(f"✅ Fichier uploadé: ID={db_file.id}, User={current_user.email}")
         return db_file
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Erreur upload fichier: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur lors de l'upload: {e!s}")
@@ -366,29 +378,52 @@ def delete_file(file_id: int, session: Session = Depends(get_session), current_u
     return None
 
 
+@router.get("/statistics", response_model=FileStatistics, name="files_statistics")
 @router.get("/get_statistics", response_model=FileStatistics, name="get_statistics")
 def get_statistics(session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
     """
-    Récupère les statistiques des fichiers
+    Récupère les statistiques des fichiers (agrégats SQL, cache court)
     """
     stats = FileService.get_statistics(session)
     return stats
 
 
+@router.get("/{file_id}/preview", name="file_preview")
 @router.get("/preview_file/{file_id}", name="preview_file")
 def preview_file(
     file_id: int,
-    nrows: int = 10,
+    request: Request,
+    nrows: int = Query(10, ge=1, le=APERCU_NB_LIGNES),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Récupère un aperçu d'un fichier Excel
+
+    L'aperçu est construit une fois par contenu (JSON en cache nommé par l'empreinte)
+    et servi avec un ETag : un client à jour reçoit 304 sans relecture.
     """
     db_file = FileService.get_file_by_id(session, file_id)
     if not db_file:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fichier non trouvé")
 
-    preview = ExcelProcessorService.get_file_preview(db_file.file_path, nrows)
+    try:
+        sha256 = FileService.ensure_sha256(session, db_file)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fichier physique non trouvé")
+
+    etag = f'"{sha256[:32]}-{nrows}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        apercu = ExcelProcessorService.obtenir_apercu(db_file.file_path, sha256)
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de la prévisualisation: {e}")
+        return JSONResponse({"file_id": file_id, "filename": db_file.original_filename, "preview": {"error": str(e)}})
 
-    return {"file_id": file_id, "filename": db_file.original_filename, "preview": preview}
+    preview = {**apercu, "rows": apercu["rows"][:nrows], "preview_rows": min(nrows, len(apercu["rows"]))}
+    return JSONResponse(
+        {"file_id": file_id, "filename": db_file.original_filename, "preview": preview}, headers=headers
+    )
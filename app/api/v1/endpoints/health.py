@@ -1,4 +1,10 @@
-from fastapi import APIRouter
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from app.core import metrics
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -17,4 +23,22 @@ def health():
         "version": "1.0.0"
     }
 
-    
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """
+    Métriques au format texte Prometheus (requêtes, latences, pools, tâches, imports)
+
+    Endpoint asynchrone : il reste disponible quand le pool de threads est saturé,
+    et le relevé du pool de threads se fait depuis la boucle d'événements.
+
+    Quel que soit le worker qui répond, les métriques sont agrégées sur tous les workers
+    du serveur (compteurs et histogrammes additionnés, jauges étiquetées par `worker`),
+    y compris celles des tâches planifiées exécutées par le seul worker leader.
+    """
+    if settings.METRICS_TOKEN:
+        autorisation = request.headers.get("Authorization", "")
+        if not secrets.compare_digest(autorisation, f"Bearer {settings.METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Jeton de métriques invalide")
+
+    return Response(content=metrics.partage.exposer(), media_type=metrics.CONTENT_TYPE)
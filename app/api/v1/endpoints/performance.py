@@ -10,8 +10,8 @@ from pathlib import Path
 from uuid import uuid4
 from typing import Any
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, UploadFile, File as FastAPIFile
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Query, Request, UploadFile, File as FastAPIFile
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from sqlmodel import Session, select
 
 from app.api.v1.endpoints.auth import require_roles, get_current_user
@@ -28,9 +28,10 @@ from app.models.performance import (
 from app.services.activity_service import ActivityService
 from app.core.path_config import path_config
 from app.services.performance_service import PerformanceService
-from app.services.engagement_letter_service import EngagementLetterGenerator
-from app.services.performance_engagement_letter_service import PerformanceEngagementLetterGenerator
-from app.services.report_generator import ReportGenerator
+from app.services.engagement_letter_batch_service import EngagementLetterBatchService
+from app.services.image_variant_service import ImageVariantService
+from app.services.report_export_service import FORMATS_EXPORT, ReportExportService
+from app.services.upload_service import UploadService
 
 logger = get_logger(__name__)
 
@@ -58,8 +59,11 @@ def performance_home(
         return RedirectResponse(url=request.url_for("access_denied").include_query_params(module="performance"), status_code=302)
     
     try:
+        # Les générateurs PDF (ReportLab) sont chargés à la première consultation, pas au démarrage
         from sqlmodel import func
 
+        from app.services.engagement_letter_service import EngagementLetterGenerator
+        from app.services.performance_engagement_letter_service import PerformanceEngagementLetterGenerator
         from app.templates import get_template_context, templates
 
         # Calculer les vrais KPIs depuis la base de données
@@ -246,6 +250,8 @@ def generate_lettre_engagement_pdf(
 ):
     """Génère la couverture de la lettre d'engagement opérationnel."""
     try:
+        from app.services.engagement_letter_service import EngagementLetterGenerator
+
         data: dict[str, Any] = {}
 
         def optional_param(param: str, target_key: str, transform=None) -> None:
@@ -287,6 +293,42 @@ def generate_lettre_engagement_pdf(
         raise HTTPException(status_code=500, detail="Erreur lors de la génération de la lettre d'engagement")
 
 
+@router.get(
+    "/lettres-engagement/lot.zip",
+    response_class=StreamingResponse,
+    name="performance_lettres_engagement_lot",
+)
+def generate_lettres_engagement_lot(
+    request: Request,
+    annee: int = Query(..., ge=2000, le=2100),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Génère les lettres d'engagement de tous les programmes/BOP d'une année dans une archive ZIP."""
+    donnees_communes: dict[str, Any] = {}
+    for param, target_key in (
+        ("pays", "pays"),
+        ("devise", "devise"),
+        ("ville", "ville_signature"),
+        ("date", "date_signature"),
+        ("logo_path", "logo_path"),
+    ):
+        value = request.query_params.get(param)
+        if value:
+            donnees_communes[target_key] = value
+
+    try:
+        zip_buffer = EngagementLetterBatchService.generer_zip(db, annee, donnees_communes)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except Exception as exc:
+        logger.exception("Erreur génération des lettres d'engagement par lot: %s", exc)
+        raise HTTPException(status_code=500, detail="Erreur lors de la génération des lettres d'engagement")
+
+    headers = {"Content-Disposition": f"attachment; filename=lettres_engagement_{annee}.zip"}
+    return StreamingResponse(zip_buffer, media_type="application/zip", headers=headers)
+
+
 @router.get(
     "/lettres-engagement-performance/pdf",
     response_class=StreamingResponse,
@@ -298,6 +340,8 @@ def generate_lettre_engagement_performance_pdf(
 ):
     """Génère la lettre d'engagement de performance."""
     try:
+        from app.services.performance_engagement_letter_service import PerformanceEngagementLetterGenerator
+
         data: dict[str, Any] = {}
 
         def optional_param(param: str, target_key: str, transform=None) -> None:
@@ -338,6 +382,7 @@ def generate_lettre_engagement_performance_pdf(
 
 @router.post("/api/lettres-engagement/upload-photo", name="upload_engagement_photo")
 async def upload_engagement_photo(
+    background_tasks: BackgroundTasks,
     photo: UploadFile = FastAPIFile(...),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
@@ -350,13 +395,6 @@ async def upload_engagement_photo(
     if photo.content_type not in allowed_content_types:
         raise HTTPException(status_code=400, detail="Formats acceptés : JPG, PNG ou WEBP")
 
-    content = await photo.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="Le fichier est vide.")
-
-    if len(content) > max_size_bytes:
-        raise HTTPException(status_code=400, detail="La photo dépasse la taille maximale de 5 MB.")
-
     extension = Path(photo.filename or "").suffix.lower()
     if extension not in {".jpg", ".jpeg", ".png", ".webp"}:
         extension = ".jpg" if photo.content_type in {"image/jpeg", "image/jpg"} else ".png"
@@ -365,8 +403,17 @@ async def upload_engagement_photo(
     photos_dir = path_config.UPLOADS_DIR / "performance" / "engagement"
     path_config.ensure_directory_exists(photos_dir)
 
-    destination = photos_dir / filename
-    destination.write_bytes(content)
+    try:
+        recu = await UploadService.recevoir(photo, photos_dir, session=session, max_octets=max_size_bytes)
+    except HTTPException:
+        raise HTTPException(status_code=400, detail="La photo dépasse la taille maximale de 5 MB.")
+    if not recu.taille:
+        recu.supprimer()
+        raise HTTPException(status_code=400, detail="Le fichier est vide.")
+
+    recu.deplacer(photos_dir / filename)
+    # Variante « pdf » (600 px) intégrée par les générateurs de lettres à la place de l'original
+    background_tasks.add_task(ImageVariantService.generer, photos_dir / filename, "photo")
 
     relative_path = f"uploads/performance/engagement/{filename}"
     file_url = path_config.get_file_url("uploads", f"performance/engagement/{filename}")
@@ -1042,6 +1089,8 @@ def generate_report_api(
 ):
     """API: Génère un rapport de performance"""
     try:
+        from app.services.report_generator import ReportGenerator
+
         # Convertir les dates si fournies
         debut = datetime.strptime(date_debut, "%Y-%m-%d").date() if date_debut else None
         fin = datetime.strptime(date_fin, "%Y-%m-%d").date() if date_fin else None
@@ -1057,20 +1106,16 @@ def generate_report_api(
 
         # Générer le rapport selon le format
         if format == "PDF":
-            pdf_buffer = ReportGenerator.generate_pdf_report(
+            # Artefact partagé: régénéré uniquement si les données ou l'identité visuelle ont changé
+            chemin, cle, dates = ReportGenerator.obtenir_rapport_pdf(
                 session=db, report_type=report_type, period=period, date_debut=debut, date_fin=fin, user_name=user_name
             )
 
             # Nom du fichier
             filename = f"rapport_performance_{report_type.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
-            # Calculer les dates selon la période
-            dates = ReportGenerator._calculate_period_dates(period, debut, fin)
-
-            # Récupérer les KPIs pour les statistiques
+            # Statistiques par requêtes COUNT
             kpis = PerformanceService.get_kpis_objectifs(db)
-            objectifs = PerformanceService.get_objectifs(db, limit=1000)
-            indicateurs = PerformanceService.get_indicateurs(db, limit=1000)
 
             # Créer un enregistrement dans l'historique
             rapport = RapportPerformance(
@@ -1081,10 +1126,12 @@ def generate_report_api(
                 periode=period,
                 date_debut=dates["debut"],
                 date_fin=dates["fin"],
+                fichier_path=chemin.relative_to(path_config.UPLOADS_DIR).as_posix(),
                 fichier_nom=filename,
-                fichier_taille=len(pdf_buffer.getvalue()),
-                nb_objectifs=len(objectifs),
-                nb_indicateurs=len(indicateurs),
+                fichier_taille=chemin.stat().st_size,
+                cle_cache=cle,
+                nb_objectifs=PerformanceService.count_objectifs(db),
+                nb_indicateurs=PerformanceService.count_indicateurs(db),
                 taux_realisation=kpis.get("taux_realisation", 0),
                 created_by_id=current_user.id if hasattr(current_user, "id") else 1,
                 created_by_nom=user_name,
@@ -1105,14 +1152,50 @@ def generate_report_api(
                 icon="📋",
             )
 
-            return StreamingResponse(
-                pdf_buffer,
-                media_type="application/pdf",
-                headers={"Content-Disposition": f"attachment; filename={filename}"},
+            return FileResponse(chemin, media_type="application/pdf", filename=filename)
+
+        elif format in FORMATS_EXPORT:
+            dates = ReportGenerator._calculate_period_dates(period, debut, fin)
+            nom_base = f"rapport_performance_{report_type.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            reponse = ReportExportService.exporter(db, report_type, format, dates, nom_base)
+
+            kpis = PerformanceService.get_kpis_objectifs(db)
+            rapport = RapportPerformance(
+                titre=f"Rapport {report_type} - {dates['debut'].strftime('%d/%m/%Y')} au {dates['fin'].strftime('%d/%m/%Y')}",
+                description=f"Export {format} des données de performance",
+                type_rapport=report_type,
+                format_fichier=format,
+                periode=period,
+                date_debut=dates["debut"],
+                date_fin=dates["fin"],
+                fichier_path=None,
+                fichier_nom=reponse.headers["content-disposition"].split("filename=")[-1].strip('"'),
+                # Taille inconnue pour le CSV d'un seul jeu, envoyé en flux
+                fichier_taille=int(reponse.headers["content-length"]) if "content-length" in reponse.headers else None,
+                nb_objectifs=PerformanceService.count_objectifs(db),
+                nb_indicateurs=PerformanceService.count_indicateurs(db),
+                taux_realisation=kpis.get("taux_realisation", 0),
+                created_by_id=current_user.id if hasattr(current_user, "id") else 1,
+                created_by_nom=user_name,
             )
+            db.add(rapport)
+            db.commit()
+
+            ActivityService.log_activity(
+                db_session=db,
+                user_id=current_user.id if hasattr(current_user, "id") else 1,
+                user_email=current_user.email if hasattr(current_user, "email") else "user@system",
+                user_full_name=current_user.full_name if hasattr(current_user, "full_name") else None,
+                action_type="generate",
+                target_type="rapport_performance",
+                description=f"Export d'un rapport {report_type} ({format}) pour la période {period}",
+                icon="📋",
+            )
+
+            return reponse
 
         else:
-            return {"success": False, "error": f"Format {format} non encore implémenté. Utilisez PDF pour l'instant."}
+            return {"success": False, "error": f"Format {format} non encore implémenté. Utilisez PDF, EXCEL ou CSV."}
 
     except Exception as e:
         logger.error(f"Erreur API generate_report: {e}")
@@ -1120,7 +1203,9 @@ def generate_report_api(
 
 
 @router.get("/api/rapports/historique", name="get_rapports_historique")
-def get_rapports_historique(db: Session = Depends(get_session), current_user=Depends(require_roles("admin", "user"))):
+def get_rapports_historique(
+    request: Request, db: Session = Depends(get_session), current_user=Depends(require_roles("admin", "user"))
+):
     """API: Récupère l'historique des rapports générés"""
     try:
         # Récupérer les 50 derniers rapports
@@ -1141,6 +1226,7 @@ def get_rapports_historique(db: Session = Depends(get_session), current_user=Dep
                     "date_fin": rapport.date_fin.strftime("%Y-%m-%d"),
                     "fichier_nom": rapport.fichier_nom,
                     "fichier_taille": rapport.fichier_taille,
+                    "download_url": str(request.url_for("download_rapport_api", rapport_id=rapport.id)),
                     "nb_objectifs": rapport.nb_objectifs,
                     "nb_indicateurs": rapport.nb_indicateurs,
                     "taux_realisation": float(rapport.taux_realisation) if rapport.taux_realisation else 0,
@@ -1156,6 +1242,42 @@ def get_rapports_historique(db: Session = Depends(get_session), current_user=Dep
         return {"success": False, "error": f"Erreur lors de la récupération de l'historique: {e!s}"}
 
 
+@router.get("/api/rapports/{rapport_id}/download", name="download_rapport_api")
+def download_rapport_api(
+    rapport_id: int, db: Session = Depends(get_session), current_user=Depends(require_roles("admin", "user"))
+):
+    """API: Télécharge l'artefact PDF d'un rapport de l'historique"""
+    from app.services.report_generator import ReportGenerator
+
+    rapport = db.get(RapportPerformance, rapport_id)
+    if not rapport:
+        raise HTTPException(status_code=404, detail="Rapport non trouvé")
+
+    if rapport.format_fichier in FORMATS_EXPORT:
+        # Les exports tabulaires ne sont pas conservés: ils sont rejoués sur les bornes enregistrées
+        nom_base = rapport.fichier_nom.rsplit(".", 1)[0]
+        dates = {"debut": rapport.date_debut, "fin": rapport.date_fin}
+        return ReportExportService.exporter(db, rapport.type_rapport, rapport.format_fichier, dates, nom_base)
+
+    chemin = path_config.UPLOADS_DIR / rapport.fichier_path if rapport.fichier_path else None
+    if chemin is None or not chemin.exists():
+        # Rapport antérieur au stockage ou artefact purgé: régénérer sur les bornes enregistrées
+        chemin, cle, _ = ReportGenerator.obtenir_rapport_pdf(
+            session=db,
+            report_type=rapport.type_rapport,
+            period="CUSTOM",
+            date_debut=rapport.date_debut,
+            date_fin=rapport.date_fin,
+            user_name=rapport.created_by_nom or "Utilisateur",
+        )
+        rapport.fichier_path = chemin.relative_to(path_config.UPLOADS_DIR).as_posix()
+        rapport.cle_cache = cle
+        db.add(rapport)
+        db.commit()
+
+    return FileResponse(chemin, media_type="application/pdf", filename=rapport.fichier_nom)
+
+
 @router.delete("/api/rapports/{rapport_id}", name="delete_rapport_api")
 def delete_rapport_api(
     rapport_id: int, db: Session = Depends(get_session), current_user=Depends(require_roles("admin", "user"))
@@ -1169,9 +1291,18 @@ def delete_rapport_api(
             return {"success": False, "error": "Rapport non trouvé"}
 
         # Supprimer le rapport
+        fichier_path = rapport.fichier_path
         db.delete(rapport)
         db.commit()
 
+        # Supprimer l'artefact s'il n'est plus référencé par aucun autre rapport
+        if fichier_path:
+            encore_utilise = db.exec(
+                select(RapportPerformance.id).where(RapportPerformance.fichier_path == fichier_path)
+            ).first()
+            if not encore_utilise:
+                (path_config.UPLOADS_DIR / fichier_path).unlink(missing_ok=True)
+
         # Logger l'activité
         ActivityService.log_activity(
             db_session=db,
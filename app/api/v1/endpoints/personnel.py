@@ -6,7 +6,6 @@ Endpoints pour la gestion complète du personnel
 import re
 import secrets
 from datetime import datetime
-from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
 from fastapi.responses import HTMLResponse
@@ -31,6 +30,8 @@ from app.models.personnel import (
 )
 from app.models.user import User
 from app.services.activity_service import ActivityService
+from app.services.blob_store_service import BlobStoreService
+from app.services.upload_service import UploadService
 from app.templates import get_template_context, templates
 
 logger = get_logger(__name__)
@@ -487,10 +488,8 @@ async def api_create_agent(
             unique_filename = f"{matricule}_{secrets.token_hex(8)}.{file_extension}"
             file_path = photos_dir / unique_filename
 
-            # Sauvegarder le fichier
-            content = await photo.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
+            # Sauvegarder le fichier (écriture en flux)
+            await UploadService.enregistrer(photo, file_path, session=session)
 
             # Stocker uniquement le chemin relatif (sans préfixe /uploads/)
             relative_path = f"photos/agents/{unique_filename}"
@@ -743,9 +742,7 @@ async def api_update_agent(
             unique_filename = f"{agent.matricule}_{secrets.token_hex(8)}.{file_extension}"
             file_path = photos_dir / unique_filename
 
-            content = await photo.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
+            await UploadService.enregistrer(photo, file_path, session=session)
 
             # Stocker uniquement le chemin relatif (sans préfixe /uploads/)
             relative_path = f"photos/agents/{unique_filename}"
@@ -784,6 +781,9 @@ async def api_update_agent(
 
         return {"ok": True, "agent_id": agent.id}
 
+    except HTTPException:
+        session.rollback()
+        raise
     except Exception as e:
         session.rollback()
         logger.error(f"Erreur mise à jour agent: {e}")
@@ -1023,19 +1023,8 @@ async def api_upload_document(
         raise HTTPException(404, "Agent non trouvé")
 
     try:
-        # Créer le dossier de documents
-        upload_dir = Path("uploads/personnel") / str(agent_id)
-        upload_dir.mkdir(parents=True, exist_ok=True)
-
-        # Générer un nom de fichier unique
-        file_extension = Path(file.filename).suffix
-        unique_filename = f"{secrets.token_hex(16)}{file_extension}"
-        file_path = upload_dir / unique_filename
-
-        # Sauvegarder le fichier
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # Ranger le contenu dans le magasin dédupliqué (écriture en flux)
+        blob = await BlobStoreService.enregistrer(file, session)
 
         # Créer l'entrée en base
         document = DocumentAgent(
@@ -1043,10 +1032,11 @@ async def api_upload_document(
             type_document=type_document,
             titre=titre,
             description=description,
-            file_path=str(file_path),
+            file_path=f"uploads/{blob.chemin}",
             file_name=file.filename,
-            file_size=len(content),
+            file_size=blob.taille,
             file_type=file.content_type,
+            sha256=blob.sha256,
             uploaded_by=current_user.id,
         )
 
@@ -1058,6 +1048,8 @@ async def api_upload_document(
 
         return {"ok": True, "document_id": document.id}
 
+    except HTTPException:
+        raise
     except Exception as e:
         session.rollback()
         logger.error(f"Erreur upload document: {e}")
@@ -9,11 +9,12 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.v1.endpoints.auth import get_current_user, require_roles
 from app.core.enums import GradeCategory
 from app.core.logging_config import get_logger
-from app.db.session import get_session
+from app.db.session import get_async_session, get_session
 from app.models.personnel import Direction, GradeComplet, Programme, Service
 from app.models.stock import CategorieArticle
 from app.models.user import User
@@ -109,33 +110,31 @@ def aide_referentiels(request: Request):
 
 
 @router.get("/api/programmes", name="api_list_programmes_ref")
-def api_list_programmes_ref(session: Session = Depends(get_session)):
+async def api_list_programmes_ref(session: AsyncSession = Depends(get_async_session)):
     """Liste tous les programmes"""
     from app.models.personnel import AgentComplet
 
-    programmes = session.exec(select(Programme).order_by(Programme.code)).all()
+    programmes = (await session.exec(select(Programme).order_by(Programme.code))).all()
 
-    result = []
-    for p in programmes:
-        responsable_nom = ""
-        if p.responsable_id:
-            responsable = session.get(AgentComplet, p.responsable_id)
-            if responsable:
-                responsable_nom = f"{responsable.nom} {responsable.prenom}"
-
-        result.append(
-            {
-                "id": p.id,
-                "code": p.code,
-                "libelle": p.libelle,
-                "description": p.description,
-                "responsable_id": p.responsable_id,
-                "responsable_nom": responsable_nom,
-                "actif": p.actif,
-            }
-        )
+    # Responsables chargés en une seule requête
+    responsable_ids = {p.responsable_id for p in programmes if p.responsable_id}
+    responsables = {}
+    if responsable_ids:
+        agents = await session.exec(select(AgentComplet).where(AgentComplet.id.in_(responsable_ids)))
+        responsables = {a.id: f"{a.nom} {a.prenom}" for a in agents}
 
-    return result
+    return [
+        {
+            "id": p.id,
+            "code": p.code,
+            "libelle": p.libelle,
+            "description": p.description,
+            "responsable_id": p.responsable_id,
+            "responsable_nom": responsables.get(p.responsable_id, ""),
+            "actif": p.actif,
+        }
+        for p in programmes
+    ]
 
 
 @router.post("/api/programmes", name="api_create_programme")
@@ -564,9 +563,9 @@ def api_delete_service(
 
 
 @router.get("/api/grades", name="api_list_grades_ref")
-def api_list_grades_ref(session: Session = Depends(get_session)):
+async def api_list_grades_ref(session: AsyncSession = Depends(get_async_session)):
     """Liste tous les grades"""
-    grades = session.exec(select(GradeComplet).order_by(GradeComplet.code)).all()
+    grades = (await session.exec(select(GradeComplet).order_by(GradeComplet.code))).all()
 
     return [
         {
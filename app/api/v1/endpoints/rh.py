@@ -20,6 +20,7 @@ from app.models.rh import Agent, Grade, HRRequest, HRRequestBase, WorkflowHistor
 from app.models.user import User
 from app.services.activity_service import ActivityService
 from app.services.rh import RHService
+from app.services.upload_service import UploadService
 from app.templates import get_template_context, templates
 
 logger = get_logger(__name__)
@@ -196,10 +197,8 @@ async def rh_create_demande(
             unique_filename = f"{secrets.token_hex(16)}{file_extension}"
             file_path = upload_dir / unique_filename
 
-            # Sauvegarder le fichier
-            with open(file_path, "wb") as buffer:
-                content = await document.read()
-                buffer.write(content)
+            # Sauvegarder le fichier (écriture en flux)
+            await UploadService.enregistrer(document, file_path, session=session)
 
             document_path = str(file_path)
             document_filename = document.filename
@@ -265,6 +264,8 @@ async def rh_create_demande(
             "pages/rh_demande_detail.html",
             get_template_context(request, req=req, history=[], next_steps=next_steps, WorkflowState=WorkflowState),
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Erreur création demande: {e}", exc_info=True)
         raise HTTPException(500, f"Erreur lors de la création de la demande: {e!s}")
@@ -8,7 +8,7 @@ from datetime import date, datetime
 from decimal import Decimal
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, Form, Request, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from sqlmodel import Session, func, select
 
@@ -31,6 +31,7 @@ from app.models.stock import (
 from app.models.user import User
 from app.services.activity_service import ActivityService
 from app.services.stock_service import StockService
+from app.services.upload_service import UploadService
 from app.templates import get_template_context, templates
 
 logger = get_logger(__name__)
@@ -669,10 +670,8 @@ async def api_create_mouvement(
             unique_filename = f"mouvement_{secrets.token_hex(8)}{file_extension}"
             file_path = upload_dir / unique_filename
 
-            # Sauvegarder le fichier
-            content = await document.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
+            # Sauvegarder le fichier (écriture en flux)
+            await UploadService.enregistrer(document, file_path, session=session)
 
             document_path = f"stock/{unique_filename}"
             document_filename = document.filename
@@ -736,6 +735,8 @@ async def api_create_mouvement(
         }
     except ValueError as e:
         return {"success": False, "error": str(e)}
+    except HTTPException as e:
+        return {"success": False, "error": e.detail}
     except Exception as e:
         logger.error(f"Erreur création mouvement: {e}", exc_info=True)
         return {"success": False, "error": "Erreur lors de l'enregistrement du mouvement"}
@@ -870,10 +871,8 @@ async def api_create_demande(
             unique_filename = f"demande_{secrets.token_hex(8)}{file_extension}"
             file_path = upload_dir / unique_filename
 
-            # Sauvegarder le fichier
-            content = await document.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
+            # Sauvegarder le fichier (écriture en flux)
+            await UploadService.enregistrer(document, file_path, session=session)
 
             document_path = f"stock/{unique_filename}"
             document_filename = document.filename
@@ -912,6 +911,8 @@ async def api_create_demande(
             "message": f"Demande {demande.numero} créée avec succès",
             "data": {"id": demande.id, "numero": demande.numero, "document_path": document_path},
         }
+    except HTTPException as e:
+        return {"success": False, "error": e.detail}
     except Exception as e:
         logger.error(f"Erreur création demande: {e}", exc_info=True)
         return {"success": False, "error": "Erreur lors de la création de la demande"}
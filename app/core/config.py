@@ -45,6 +45,15 @@ class Settings(BaseSettings):
     
     # URL complète de la base de données (prioritaire sur les valeurs individuelles)
     DATABASE_URL: str | None = None
+
+    # Pool de connexions (partagé par les moteurs synchrone et asynchrone)
+    DB_POOL_SIZE: int = 10  # Connexions permanentes
+    DB_MAX_OVERFLOW: int = 20  # Connexions supplémentaires en pointe
+    DB_POOL_TIMEOUT: int = 30  # Attente maximale d'une connexion libre (secondes)
+    DB_POOL_RECYCLE: int = 3600  # Recyclage des connexions (secondes)
+    # Au démarrage, si le tampon de version du schéma est absent ou obsolète :
+    # True = le premier worker exécute le bootstrap (sous verrou), False = erreur (lancer scripts/bootstrap.py)
+    DB_BOOTSTRAP_ON_STARTUP: bool = True
     # ==========================================
     # CORS & SECURITY
     # ==========================================
@@ -60,6 +69,7 @@ class Settings(BaseSettings):
     ENABLE_ERROR_HANDLING: bool = True
     ENABLE_LOGGING: bool = True
     ENABLE_REQUEST_ID: bool = True
+    ENABLE_METRICS: bool = True  # Métriques Prometheus sur /api/v1/metrics
     ENABLE_REQUEST_SIZE_LIMIT: bool = True
 
     # Filtres optionnels (manuels)
@@ -98,6 +108,22 @@ class Settings(BaseSettings):
     # ============================================
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/app.log"
+    # Échantillonnage des logs d'accès par modèle de route (1.0 = tout, 0.01 = 1 requête sur 100).
+    # Les réponses en erreur (>= 400) et les N+1 détectés sont toujours journalisés.
+    LOG_ACCESS_SAMPLING: dict[str, float] = {"/api/v1/ping": 0.01, "/api/v1/health": 0.01, "/api/v1/metrics": 0.01}
+    DB_SLOW_QUERY_MS: int = 200  # Requêtes SQL plus lentes journalisées
+    DB_N_PLUS_ONE_SEUIL: int = 5  # Répétitions d'une même requête SQL signalées comme N+1 probable
+    METRICS_TOKEN: str = ""  # Si défini, /metrics exige "Authorization: Bearer <token>"
+    # Agrégation entre workers uvicorn : chaque worker publie ses métriques dans un dossier partagé
+    METRICS_DIR: str = ""  # "" = dossier temporaire du système
+    METRICS_FLUSH_S: float = 5.0  # Délai entre deux publications (les autres workers sont vus avec ce retard)
+    # Un seul worker (leader) exécute les tâches planifiées ; les autres retentent de prendre le verrou
+    SCHEDULER_LEADER_RETRY_S: int = 30
+    # Purges de rétention (tâches planifiées, exécutées par lots de clés primaires)
+    RETENTION_BATCH_SIZE: int = 1000  # Lignes modifiées par transaction
+    SESSION_PURGE_DAYS: int = 90  # Sessions inactives depuis plus longtemps supprimées définitivement
+    ERROR_FILE_RETENTION_DAYS: int = 7  # Fichiers importés en erreur
+    ACTIVITY_RETENTION_DAYS: int = 0  # Journal d'activité (0 = conservé indéfiniment)
 
     # ============================================
     # LIMITES & QUOTAS
@@ -107,6 +133,28 @@ class Settings(BaseSettings):
     SESSION_TIMEOUT: int = 3600
     PASSWORD_MIN_LENGTH: int = 8
     
+    # Extraction PDF des fiches techniques
+    PDF_EXTRACTION_WORKERS: int = 2  # Processus dédiés à l'extraction de texte
+    PDF_PAGES_PAR_LOT: int = 16  # Pages traitées par tâche (borne la mémoire d'un worker)
+    PDF_MAX_PAGES: int = 1000  # Au-delà, le fichier est refusé
+    PDF_IMAGES_CACHE_TAILLE: int = 32  # Images décodées conservées pour le rendu des PDF (logos, photos)
+
+    # Génération par lots des lettres d'engagement
+    # Processus de rendu ReportLab, par worker uvicorn (4 workers x 2 = 8 processus au plus)
+    ENGAGEMENT_LETTERS_WORKERS: int = 2
+
+    # Traitement des fichiers Excel de données
+    EXCEL_SEUIL_LECTURE_PAR_BLOCS_MB: int = 5  # Au-delà, lecture en flux (openpyxl read-only)
+    EXCEL_LIGNES_PAR_BLOC: int = 10000  # Lignes par DataFrame en lecture par blocs
+
+    # Cache des paramètres système (et autres configurations versionnées)
+    SETTINGS_CACHE_CHECK_S: float = 2.0  # Délai entre deux lectures du numéro de version (0 = à chaque accès)
+
+    # Templates Jinja2
+    TEMPLATES_AUTO_RELOAD: bool = False  # → ON si DEBUG=True (relecture des templates modifiés à chaque rendu)
+    TEMPLATES_BYTECODE_CACHE_DIR: str = ""  # Bytecode compilé partagé entre workers ("" = dossier temporaire)
+    TEMPLATES_PRECOMPILE_ON_STARTUP: bool = True  # Compiler tous les templates au démarrage de chaque worker
+
     # Charte de confidentialité
     PRIVACY_POLICY_VERSION: str = "1.0"  # Version actuelle de la charte
     PRIVACY_POLICY_REQUIRED: bool = True  # Forcer l'acceptation
@@ -164,6 +212,13 @@ class Settings(BaseSettings):
             return False
         return self.ENABLE_CLOUDFLARE
 
+    @property
+    def should_auto_reload_templates(self) -> bool:
+        """Relecture des templates modifiés toujours active si DEBUG=True"""
+        if self.DEBUG:
+            return True
+        return self.TEMPLATES_AUTO_RELOAD
+
     @property
     def get_root_path(self) -> str:
         """
@@ -202,6 +257,22 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        """
+        URL de la base pour le moteur asynchrone (même base, pilote asynchrone)
+
+        - sqlite → sqlite+aiosqlite
+        - postgresql / postgresql+psycopg2 → postgresql+asyncpg
+        """
+        url = self.database_url
+        scheme, sep, reste = url.partition("://")
+        dialecte = scheme.split("+", 1)[0]
+        pilotes = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+        if dialecte not in pilotes:
+            return url
+        return f"{pilotes[dialecte]}{sep}{reste}"
+
     @staticmethod
     def _get_asset_version() -> str:
         """Génère la version des assets pour le cache busting"""
@@ -0,0 +1,64 @@
+# app/core/lazy.py
+"""
+Import différé des bibliothèques lourdes (pandas, numpy, openpyxl, ReportLab...)
+
+Ces bibliothèques coûtent plusieurs dizaines de Mo et des centaines de millisecondes
+par worker alors que la plupart des requêtes (connexion, pages RH) n'en ont pas besoin.
+`lazy_import` retourne un module vide qui importe le vrai module au premier accès
+à l'un de ses attributs :
+
+    from app.core.lazy import lazy_import
+
+    pd = lazy_import("pandas")
+
+    def lire(chemin: str) -> "pd.DataFrame":
+        return pd.read_excel(chemin)  # pandas est importé ici, au premier appel
+
+Les annotations qui référencent un module différé sont écrites entre guillemets :
+évaluées à la définition de la fonction, elles déclencheraient l'import.
+"""
+
+import importlib
+import sys
+import threading
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """Module importé au premier accès à l'un de ses attributs"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attribute: str):
+        value = getattr(self._load(), attribute)
+        # Les accès suivants ne passent plus par __getattr__
+        self.__dict__[attribute] = value
+        return value
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "chargé" if self.__dict__["_lazy_module"] is not None else "différé"
+        return f"<module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Retourne `name` sans l'importer (import au premier accès à un attribut)"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
@@ -1,19 +1,22 @@
 # app/core/logging_config.py
 from __future__ import annotations
 
+import atexit
 import logging
-import logging.config
+import logging.handlers
 import os
+import queue
 import sys
 from pathlib import Path
-from typing import Optional
-
 
 DEFAULT_LOG_DIR = Path(__file__).resolve().parents[2] / "logs"
 DEFAULT_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 ENV = os.getenv("APP_ENV", os.getenv("ENV", "prod"))
 DEBUG = os.getenv("DEBUG", "0") in {"1", "true", "True"}
 
+# Threads d'écriture des logs (un par file d'attente)
+_listeners: list[logging.handlers.QueueListener] = []
+
 
 def _supports_utf8_console() -> bool:
     enc = getattr(sys.stdout, "encoding", "") or ""
@@ -51,14 +54,55 @@ def _banner_lines(log_dir: Path) -> list[str]:
         ]
 
 
+def _rotating_file_handler(path: Path, level: str, formatter: logging.Formatter) -> logging.Handler:
+    """
+    Fichier rotatif (5 Mo x 5) partagé entre les workers
+
+    ConcurrentRotatingFileHandler verrouille le fichier pendant l'écriture et la rotation :
+    plusieurs processus uvicorn peuvent écrire dans le même fichier sans se corrompre.
+    """
+    try:
+        from concurrent_log_handler import ConcurrentRotatingFileHandler as FileHandler
+    except ImportError:  # Dépendance absente : rotation non protégée entre processus
+        from logging.handlers import RotatingFileHandler as FileHandler
+
+    handler = FileHandler(str(path), maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8")
+    handler.setLevel(level)
+    handler.setFormatter(formatter)
+    return handler
+
+
+def _queued(*handlers: logging.Handler) -> logging.handlers.QueueHandler:
+    """
+    Retourne un QueueHandler dont les enregistrements sont écrits par un thread dédié
+
+    Le thread appelant (requête, boucle d'événements) ne fait que mettre le message
+    en file : les écritures disque et les rotations se font dans le QueueListener.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return logging.handlers.QueueHandler(log_queue)
+
+
+def stop_logging() -> None:
+    """Vide les files d'attente et arrête les threads d'écriture (appelé à la sortie du process)"""
+    while _listeners:
+        _listeners.pop().stop()
+
+
 def setup_logging(
-    log_dir: Optional[Path] = None,
+    log_dir: Path | None = None,
     level: str = DEFAULT_LEVEL,
     uvicorn_integration: bool = True,
 ) -> logging.Logger:
     """
     Configure tout le système de logs de l'application.
     À appeler UNE SEULE FOIS par process (ex: dans lifespan FastAPI).
+
+    Les loggers n'ont que des QueueHandler : console et fichiers sont alimentés
+    en arrière-plan par des QueueListener (un par destination).
     """
     if getattr(logging, "_mppeep_configured", False):
         # Déjà configuré dans ce process
@@ -68,94 +112,52 @@ def setup_logging(
     log_dir.mkdir(parents=True, exist_ok=True)
 
     # Formats
-    simple_fmt = "%(asctime)s | %(levelname)s | %(message)s"
-    app_fmt = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-    access_fmt = '%(asctime)s | %(levelname)s | %(message)s'  # uvicorn access message déjà formaté
-
-    # Handlers (console + fichiers rotatifs)
-    config = {
-        "version": 1,
-        "disable_existing_loggers": False,  # on laisse les loggers existants
-        "formatters": {
-            "simple": {"format": simple_fmt},
-            "app": {"format": app_fmt},
-            "access": {"format": access_fmt},
-        },
-        "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "level": level,
-                "formatter": "simple",
-                "stream": "ext://sys.stdout",
-            },
-            "app_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "level": level,
-                "formatter": "app",
-                "filename": str(log_dir / "app.log"),
-                "maxBytes": 5 * 1024 * 1024,
-                "backupCount": 5,
-                "encoding": "utf-8",
-            },
-            "error_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "level": "WARNING",
-                "formatter": "app",
-                "filename": str(log_dir / "error.log"),
-                "maxBytes": 5 * 1024 * 1024,
-                "backupCount": 5,
-                "encoding": "utf-8",
-            },
-            "access_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "level": level,
-                "formatter": "access",
-                "filename": str(log_dir / "access.log"),
-                "maxBytes": 5 * 1024 * 1024,
-                "backupCount": 5,
-                "encoding": "utf-8",
-            },
-        },
-        "loggers": {
-            # Logger principal de l'app
-            "mppeep": {
-                "level": level,
-                "handlers": ["console", "app_file", "error_file"],
-                "propagate": False,
-            },
-            # Logger pour les accès HTTP (branché sur uvicorn.access)
-            "mppeep.access": {
-                "level": level,
-                "handlers": ["access_file", "console"],
-                "propagate": False,
-            },
-        },
-        "root": {  # au cas où des libs loggent sans logger nommé
-            "level": level,
-            "handlers": ["console"],
-        },
-    }
-
-    logging.config.dictConfig(config)
-
+    simple_fmt = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
+    app_fmt = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    access_fmt = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")  # message d'accès déjà formaté
+
+    # Handlers réels (console + fichiers rotatifs), exécutés dans les threads des QueueListener
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(level)
+    console.setFormatter(simple_fmt)
+    app_file = _rotating_file_handler(log_dir / "app.log", level, app_fmt)
+    error_file = _rotating_file_handler(log_dir / "error.log", "WARNING", app_fmt)
+    access_file = _rotating_file_handler(log_dir / "access.log", level, access_fmt)
+
+    # Logger principal de l'app
     app_logger = logging.getLogger("mppeep")
+    app_logger.handlers = [_queued(console, app_file, error_file)]
+    app_logger.setLevel(level)
+    app_logger.propagate = False
+
+    # Logger pour les accès HTTP (branché sur uvicorn.access)
+    acc_logger = logging.getLogger("mppeep.access")
+    acc_logger.handlers = [_queued(access_file, console)]
+    acc_logger.setLevel(level)
+    acc_logger.propagate = False
+
+    # Au cas où des libs loggent sans logger nommé
+    root = logging.getLogger()
+    root.handlers = [_queued(console)]
+    root.setLevel(level)
+
+    atexit.register(stop_logging)
 
     # Intégration Uvicorn / FastAPI
     if uvicorn_integration:
         # uvicorn.error -> on réutilise nos handlers "mppeep"
         uv_err = logging.getLogger("uvicorn.error")
-        uv_err.handlers = app_logger.handlers[:]  # même handlers (console + app_file + error_file)
+        uv_err.handlers = app_logger.handlers[:]  # même file (console + app_file + error_file)
         uv_err.setLevel(level)
         uv_err.propagate = False
 
         # uvicorn.access -> redirigé vers notre logger d'accès
         uv_acc = logging.getLogger("uvicorn.access")
-        acc_logger = logging.getLogger("mppeep.access")
         uv_acc.handlers = acc_logger.handlers[:]
         uv_acc.setLevel(level)
         uv_acc.propagate = False
 
-    # Bannière d’initialisation
+    # Bannière d'initialisation
     for line in _banner_lines(log_dir):
         app_logger.info(line)
 
@@ -175,4 +177,4 @@ app_logger = logging.getLogger("mppeep")
 access_logger = logging.getLogger("mppeep.access")
 
 # Export minimal utile
-__all__ = ["access_logger", "app_logger", "setup_logging", "get_logger"]
+__all__ = ["access_logger", "app_logger", "get_logger", "setup_logging", "stop_logging"]
@@ -0,0 +1,459 @@
+# app/core/metrics.py
+"""
+Métriques applicatives au format texte Prometheus
+Registre en mémoire de chaque worker (sans dépendance externe), agrégé entre les
+workers par un dossier partagé (voir MetriquesPartagees) :
+- requêtes HTTP par route (compteur, histogramme de latence, requêtes en cours)
+- pool de connexions de la base et pool de threads de Starlette (relevés à la lecture)
+- durée des tâches planifiées
+- débit des imports (SIGOBE, fichiers Excel)
+- durée de rendu des templates Jinja2
+"""
+
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TypeVar
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Seuils par défaut des histogrammes (secondes), identiques aux clients Prometheus officiels
+SEUILS_LATENCE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SEUILS_TACHES = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _echapper(valeur: str) -> str:
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _nombre(valeur: float) -> str:
+    if math.isinf(valeur):
+        return "+Inf" if valeur > 0 else "-Inf"
+    return repr(float(valeur)) if not float(valeur).is_integer() else str(int(valeur))
+
+
+def _etiquettes(noms: tuple[str, ...], valeurs: tuple[str, ...], extra: str = "") -> str:
+    paires = [f'{nom}="{_echapper(valeur)}"' for nom, valeur in zip(noms, valeurs, strict=True)]
+    if extra:
+        paires.append(extra)
+    return "{" + ",".join(paires) + "}" if paires else ""
+
+
+class _Metrique:
+    type_metrique = ""
+    # Jauges : une série par worker (additionner des débits ou des tailles de pool d'un instant n'a pas de sens)
+    par_worker = False
+
+    def __init__(self, nom: str, aide: str, etiquettes: tuple[str, ...] = ()):
+        self.nom = nom
+        self.aide = aide
+        self.etiquettes = etiquettes
+        self._lock = threading.Lock()
+
+    def _cle(self, valeurs: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(valeurs.get(nom, "")) for nom in self.etiquettes)
+
+    def instantane(self) -> dict[tuple[str, ...], Any]:
+        """Copie des séries du processus (clé : valeurs des étiquettes)"""
+        raise NotImplementedError
+
+    def fusionner(self, cumul: Any, valeur: Any) -> Any:
+        """Cumul de deux workers pour une même série"""
+        return cumul + valeur
+
+    def _lignes(self, etiquettes: tuple[str, ...], series: dict[tuple[str, ...], Any]) -> Iterator[str]:
+        for cle, valeur in sorted(series.items()):
+            yield f"{self.nom}{_etiquettes(etiquettes, cle)} {_nombre(valeur)}"
+
+    def exposer(
+        self, series: dict[tuple[str, ...], Any] | None = None, etiquettes: tuple[str, ...] | None = None
+    ) -> list[str]:
+        series = self.instantane() if series is None else series
+        lignes = list(self._lignes(self.etiquettes if etiquettes is None else etiquettes, series))
+        if not lignes:
+            return []
+        return [f"# HELP {self.nom} {self.aide}", f"# TYPE {self.nom} {self.type_metrique}", *lignes]
+
+
+class Compteur(_Metrique):
+    """Valeur croissante (requêtes, lignes importées)"""
+
+    type_metrique = "counter"
+
+    def __init__(self, nom: str, aide: str, etiquettes: tuple[str, ...] = ()):
+        super().__init__(nom, aide, etiquettes)
+        self._valeurs: dict[tuple[str, ...], float] = {}
+
+    def inc(self, valeur: float = 1, **etiquettes: str) -> None:
+        cle = self._cle(etiquettes)
+        with self._lock:
+            self._valeurs[cle] = self._valeurs.get(cle, 0) + valeur
+
+    def valeur(self, **etiquettes: str) -> float:
+        return self._valeurs.get(self._cle(etiquettes), 0)
+
+    def instantane(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._valeurs)
+
+
+class Jauge(_Metrique):
+    """
+    Valeur instantanée
+
+    Avec `collecte`, la valeur est relevée au moment de l'exposition
+    (la fonction retourne None si la mesure n'est pas disponible).
+    """
+
+    type_metrique = "gauge"
+    par_worker = True
+
+    def __init__(
+        self,
+        nom: str,
+        aide: str,
+        etiquettes: tuple[str, ...] = (),
+        collecte: Callable[[], float | None] | None = None,
+    ):
+        super().__init__(nom, aide, etiquettes)
+        self._valeurs: dict[tuple[str, ...], float] = {}
+        self._collecte = collecte
+
+    def set(self, valeur: float, **etiquettes: str) -> None:
+        with self._lock:
+            self._valeurs[self._cle(etiquettes)] = valeur
+
+    def inc(self, valeur: float = 1, **etiquettes: str) -> None:
+        cle = self._cle(etiquettes)
+        with self._lock:
+            self._valeurs[cle] = self._valeurs.get(cle, 0) + valeur
+
+    def dec(self, valeur: float = 1, **etiquettes: str) -> None:
+        self.inc(-valeur, **etiquettes)
+
+    def valeur(self, **etiquettes: str) -> float:
+        return self._valeurs.get(self._cle(etiquettes), 0)
+
+    def instantane(self) -> dict[tuple[str, ...], float]:
+        if self._collecte is not None:
+            try:
+                valeur = self._collecte()
+            except Exception as e:
+                logger.debug(f"Métrique {self.nom} indisponible: {e}")
+                valeur = None
+            return {} if valeur is None else {(): valeur}
+        with self._lock:
+            return dict(self._valeurs)
+
+
+class Histogramme(_Metrique):
+    """Distribution de durées (seuils cumulatifs, somme et nombre d'observations)"""
+
+    type_metrique = "histogram"
+
+    def __init__(
+        self, nom: str, aide: str, etiquettes: tuple[str, ...] = (), seuils: tuple[float, ...] = SEUILS_LATENCE
+    ):
+        super().__init__(nom, aide, etiquettes)
+        self.seuils = tuple(sorted(seuils))
+        # Par série : [compte par seuil (non cumulé) ..., +Inf], somme
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, valeur: float, **etiquettes: str) -> None:
+        cle = self._cle(etiquettes)
+        index = next((i for i, seuil in enumerate(self.seuils) if valeur <= seuil), len(self.seuils))
+        with self._lock:
+            comptes, somme = self._series.setdefault(cle, ([0] * (len(self.seuils) + 1), [0.0]))
+            comptes[index] += 1
+            somme[0] += valeur
+
+    @contextmanager
+    def chronometrer(self, **etiquettes: str) -> Iterator[None]:
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - debut, **etiquettes)
+
+    def nombre(self, **etiquettes: str) -> int:
+        serie = self._series.get(self._cle(etiquettes))
+        return sum(serie[0]) if serie else 0
+
+    def instantane(self) -> dict[tuple[str, ...], tuple[list[int], float]]:
+        with self._lock:
+            return {cle: (list(comptes), somme[0]) for cle, (comptes, somme) in self._series.items()}
+
+    def fusionner(self, cumul: tuple[list[int], float], valeur: tuple[list[int], float]) -> tuple[list[int], float]:
+        return [a + b for a, b in zip(cumul[0], valeur[0], strict=True)], cumul[1] + valeur[1]
+
+    def _lignes(self, etiquettes: tuple[str, ...], series: dict[tuple[str, ...], Any]) -> Iterator[str]:
+        for cle, (comptes, somme) in sorted(series.items()):
+            cumul = 0
+            for seuil, compte in zip((*self.seuils, math.inf), comptes, strict=True):
+                cumul += compte
+                le = 'le="' + _nombre(seuil) + '"'
+                yield f"{self.nom}_bucket{_etiquettes(etiquettes, cle, le)} {cumul}"
+            yield f"{self.nom}_sum{_etiquettes(etiquettes, cle)} {_nombre(somme)}"
+            yield f"{self.nom}_count{_etiquettes(etiquettes, cle)} {cumul}"
+
+
+M = TypeVar("M", bound=_Metrique)
+
+
+class RegistreMetriques:
+    """Ensemble des métriques exposées par /metrics"""
+
+    def __init__(self):
+        self._metriques: dict[str, _Metrique] = {}
+
+    def enregistrer(self, metrique: M) -> M:
+        self._metriques[metrique.nom] = metrique
+        return metrique
+
+    def instantane(self) -> dict[str, list]:
+        """Séries de toutes les métriques du processus, sérialisables en JSON"""
+        return {
+            nom: [[list(cle), valeur] for cle, valeur in metrique.instantane().items()]
+            for nom, metrique in self._metriques.items()
+        }
+
+    def exposer(self, workers: dict[str, tuple[dict[str, list], bool]] | None = None) -> str:
+        """
+        Texte Prometheus du processus, ou agrégé sur plusieurs workers
+
+        `workers` associe l'identifiant d'un worker à son instantané et à son état (vivant ou non).
+        Compteurs et histogrammes sont additionnés sur tous les workers, y compris ceux qui sont
+        arrêtés (les totaux ne reculent pas quand un worker est remplacé) ; les jauges reçoivent
+        l'étiquette `worker` et ne sont exposées que pour les workers vivants.
+        """
+        lignes: list[str] = []
+        for nom, metrique in self._metriques.items():
+            if workers is None:
+                lignes.extend(metrique.exposer())
+                continue
+            series: dict[tuple[str, ...], Any] = {}
+            for worker, (instantane, vivant) in sorted(workers.items()):
+                if metrique.par_worker and not vivant:
+                    continue
+                for cle, valeur in instantane.get(nom, []):
+                    if len(cle) != len(metrique.etiquettes):
+                        continue  # instantané d'une version précédente (étiquettes différentes)
+                    cle = (*cle, worker) if metrique.par_worker else tuple(cle)
+                    try:
+                        series[cle] = metrique.fusionner(series[cle], valeur) if cle in series else valeur
+                    except (TypeError, ValueError) as e:
+                        # Instantané d'une version précédente (seuils différents)
+                        logger.debug(f"Série {nom}{cle} du worker {worker} ignorée: {e}")
+            etiquettes = (*metrique.etiquettes, "worker") if metrique.par_worker else metrique.etiquettes
+            lignes.extend(metrique.exposer(series, etiquettes))
+        return "\n".join(lignes) + "\n"
+
+
+class MetriquesPartagees:
+    """
+    Agrégation des métriques entre les workers uvicorn (ou gunicorn)
+
+    Le registre vit dans la mémoire de chaque worker : sans agrégation, chaque collecte
+    serait servie par un worker différent (compteurs qui reculent, `rate()` faussé) et les
+    métriques des tâches planifiées, propres au worker leader, manqueraient la plupart du temps.
+
+    Chaque worker publie son instantané dans `<METRICS_DIR>/<pid du processus parent>/<pid>.json`
+    toutes les METRICS_FLUSH_S secondes (et à chaque collecte) ; le worker qui répond à /metrics
+    fusionne tous les fichiers du dossier. Un fichier qui n'est plus rafraîchi depuis plus de trois
+    intervalles est celui d'un worker arrêté : ses compteurs restent comptés, ses jauges disparaissent.
+    """
+
+    def __init__(self, registre_metriques: RegistreMetriques):
+        self.registre = registre_metriques
+        self._arret = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def dossier(self) -> Path:
+        racine = Path(settings.METRICS_DIR) if settings.METRICS_DIR else Path(tempfile.gettempdir()) / "mppeep_metrics"
+        # Les workers d'un même serveur partagent le processus parent (superviseur uvicorn ou arbitre gunicorn)
+        return racine / str(os.getppid())
+
+    @property
+    def _peremption(self) -> float:
+        return 3 * max(settings.METRICS_FLUSH_S, 1.0)
+
+    def publier(self, instantane: dict[str, list] | None = None) -> None:
+        """Écrit l'instantané du worker (remplacement atomique du fichier)"""
+        instantane = self.registre.instantane() if instantane is None else instantane
+        dossier = self.dossier
+        dossier.mkdir(parents=True, exist_ok=True)
+        temporaire = dossier / f".{os.getpid()}.json.tmp"
+        temporaire.write_text(json.dumps(instantane), encoding="utf-8")
+        os.replace(temporaire, dossier / f"{os.getpid()}.json")
+
+    def lire(self) -> dict[str, tuple[dict[str, list], bool]]:
+        """Instantanés publiés dans le dossier, avec l'état (vivant ou non) de chaque worker"""
+        workers: dict[str, tuple[dict[str, list], bool]] = {}
+        limite = time.time() - self._peremption
+        for fichier in self.dossier.glob("*.json"):
+            try:
+                vivant = fichier.stat().st_mtime >= limite
+                workers[fichier.stem] = (json.loads(fichier.read_text(encoding="utf-8")), vivant)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Instantané de métriques illisible {fichier.name}: {e}")
+        return workers
+
+    def exposer(self) -> str:
+        """Texte Prometheus agrégé sur tous les workers du serveur"""
+        instantane = self.registre.instantane()
+        try:
+            self.publier(instantane)
+            workers = self.lire()
+        except OSError as e:
+            logger.warning(f"⚠️  Agrégation des métriques indisponible, métriques du seul worker {os.getpid()}: {e}")
+            workers = {}
+        workers[str(os.getpid())] = (instantane, True)
+        return self.registre.exposer(workers)
+
+    def nettoyer(self) -> None:
+        """Supprime les dossiers des serveurs précédents (plus aucun fichier rafraîchi)"""
+        limite = time.time() - self._peremption
+        for dossier in self.dossier.parent.iterdir():
+            if dossier == self.dossier or not dossier.is_dir():
+                continue
+            if all(fichier.stat().st_mtime < limite for fichier in dossier.iterdir()):
+                shutil.rmtree(dossier, ignore_errors=True)
+
+    def _boucle(self) -> None:
+        while not self._arret.wait(settings.METRICS_FLUSH_S):
+            try:
+                self.publier()
+            except OSError as e:
+                logger.debug(f"Publication des métriques impossible: {e}")
+
+    def demarrer(self) -> None:
+        """Publie l'instantané du worker et démarre sa publication périodique"""
+        try:
+            self.publier()
+            self.nettoyer()
+        except OSError as e:
+            logger.warning(f"⚠️  Dossier des métriques inaccessible ({self.dossier}): {e}")
+        self._arret.clear()
+        self._thread = threading.Thread(target=self._boucle, name="metrics-publication", daemon=True)
+        self._thread.start()
+        logger.info(f"📈 Métriques publiées dans {self.dossier} toutes les {settings.METRICS_FLUSH_S:g} s")
+
+    def arreter(self) -> None:
+        """Arrête la publication ; le dernier instantané reste (compteurs conservés après l'arrêt du worker)"""
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.publier()
+        except OSError as e:
+            logger.debug(f"Publication finale des métriques impossible: {e}")
+
+
+registre = RegistreMetriques()
+partage = MetriquesPartagees(registre)
+
+
+# ==========================================
+# COLLECTES À LA LECTURE
+# ==========================================
+
+
+def _pool_base(attribut: str) -> Callable[[], float | None]:
+    def collecter() -> float | None:
+        from app.db.session import engine
+
+        mesure = getattr(engine.pool, attribut, None)
+        return float(mesure()) if mesure else None
+
+    return collecter
+
+
+def _threads(attribut: str) -> Callable[[], float | None]:
+    def collecter() -> float | None:
+        import anyio.to_thread
+
+        # Limiteur utilisé par Starlette pour les endpoints synchrones (lisible depuis la boucle d'événements)
+        return float(getattr(anyio.to_thread.current_default_thread_limiter(), attribut))
+
+    return collecter
+
+
+# ==========================================
+# MÉTRIQUES DE L'APPLICATION
+# ==========================================
+
+http_requetes = registre.enregistrer(
+    Compteur("http_requests_total", "Requêtes HTTP traitées", ("method", "route", "status"))
+)
+http_latence = registre.enregistrer(
+    Histogramme("http_request_duration_seconds", "Durée de traitement des requêtes HTTP", ("method", "route"))
+)
+http_en_cours = registre.enregistrer(Jauge("http_requests_in_flight", "Requêtes HTTP en cours de traitement"))
+
+registre.enregistrer(Jauge("db_pool_size", "Taille du pool de connexions", collecte=_pool_base("size")))
+registre.enregistrer(Jauge("db_pool_checked_out", "Connexions empruntées au pool", collecte=_pool_base("checkedout")))
+registre.enregistrer(
+    Jauge("db_pool_overflow", "Connexions ouvertes au-delà de la taille du pool", collecte=_pool_base("overflow"))
+)
+registre.enregistrer(
+    Jauge(
+        "threadpool_busy_threads", "Threads occupés par les endpoints synchrones", collecte=_threads("borrowed_tokens")
+    )
+)
+registre.enregistrer(
+    Jauge(
+        "threadpool_max_threads", "Threads disponibles pour les endpoints synchrones", collecte=_threads("total_tokens")
+    )
+)
+
+taches_duree = registre.enregistrer(
+    Histogramme("scheduler_job_duration_seconds", "Durée des tâches planifiées", ("job",), seuils=SEUILS_TACHES)
+)
+taches_echecs = registre.enregistrer(Compteur("scheduler_job_failures_total", "Tâches planifiées en échec", ("job",)))
+
+templates_rendu = registre.enregistrer(
+    Histogramme("template_render_duration_seconds", "Durée de rendu des templates Jinja2", ("template",))
+)
+
+imports_lignes = registre.enregistrer(Compteur("import_rows_total", "Lignes importées", ("source",)))
+imports_duree = registre.enregistrer(
+    Histogramme("import_duration_seconds", "Durée des imports", ("source",), seuils=SEUILS_TACHES)
+)
+imports_debit = registre.enregistrer(
+    Jauge("import_rows_per_second", "Débit du dernier import (lignes par seconde)", ("source",))
+)
+
+
+@contextmanager
+def mesurer_tache(job: str) -> Iterator[None]:
+    """Chronomètre une tâche planifiée (les échecs sont comptés puis propagés)"""
+    debut = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        taches_echecs.inc(job=job)
+        raise
+    finally:
+        taches_duree.observe(time.perf_counter() - debut, job=job)
+
+
+def enregistrer_import(source: str, nb_lignes: int, duree: float) -> None:
+    """Enregistre le volume et le débit d'un import terminé"""
+    imports_lignes.inc(nb_lignes, source=source)
+    imports_duree.observe(duree, source=source)
+    if duree > 0:
+        imports_debit.set(nb_lignes / duree, source=source)
@@ -5,19 +5,25 @@ Un middleware est comme un filtre qui traite toutes les requêtes entrantes et s
 """
 
 import logging
+import random
 import time
 import uuid
+from dataclasses import dataclass
 
-from fastapi import Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
-from app.core.config import settings
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.logging_config import access_logger, get_logger
+from app.core.static_assets import est_empreinte
+from app.db.query_stats import StatistiquesRequetes, suivre_requetes
 
 logger = logging.getLogger(__name__)
+app_logger = get_logger("mppeep.middleware")
 
 # IPs bloquées (liste noire)
 BLOCKED_IPS = []  # Ajoutez ici les IPs à bloquer
@@ -54,326 +60,335 @@ def build_allowed_origins(allowed_hosts: list[str], cors_allow_all: bool = False
     return origins
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """
-    Ajoute des en-têtes de sécurité à toutes les réponses
-
-    Protection contre :
-    - Clickjacking (X-Frame-Options)
-    - MIME sniffing (X-Content-Type-Options)
-    - Fuite d'informations (Referrer-Policy)
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-
-        # En-têtes de sécurité de base
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["Referrer-Policy"] = "no-referrer"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-
-        # HSTS en production (force HTTPS)
-        if hasattr(request.app.state, "settings") and not request.app.state.settings.DEBUG:
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains; preload"
-
-        return response
+# Politique de sécurité du contenu (CSP), calculée une seule fois
+CSP_POLICY = (
+    "default-src 'self'; "
+    # iframes (Power BI)
+    "frame-src 'self' https://app.powerbi.com https://*.powerbi.com; "
+    "child-src 'self' https://app.powerbi.com https://*.powerbi.com; "
+    # qui peut vous embarquer (ok pour votre site)
+    "frame-ancestors 'self'; "
+    # JS / CSS (tu as du inline → on garde provisoirement 'unsafe-inline')
+    "script-src 'self' 'unsafe-inline' cdn.tailwindcss.com cdnjs.cloudflare.com cdn.jsdelivr.net; "
+    "style-src 'self' 'unsafe-inline' fonts.googleapis.com cdnjs.cloudflare.com; "
+    # Fonts / images
+    "font-src 'self' fonts.gstatic.com cdnjs.cloudflare.com; "
+    "img-src 'self' data: blob: https:; "
+    # Réseaux (ajoute *.powerbi.com si tu passes au SDK powerbi-client)
+    "connect-src 'self' cdn.jsdelivr.net; "
+    # Divers durcissements
+    "object-src 'none'; "
+    "base-uri 'self'; "
+    "form-action 'self'"
+)
+
+# En-têtes de sécurité de base (clickjacking, MIME sniffing, fuite du référent)
+SECURITY_HEADERS = (
+    (b"x-frame-options", b"DENY"),
+    (b"x-content-type-options", b"nosniff"),
+    (b"referrer-policy", b"no-referrer"),
+    (b"permissions-policy", b"geolocation=(), microphone=(), camera=()"),
+)
+HSTS_HEADER = (b"strict-transport-security", b"max-age=31536000; includeSubDomains; preload")
+
+# Cache : fichiers statiques 1 an (immuables si le nom porte une empreinte de contenu),
+# tout le reste (API, login, pages protégées) jamais
+CACHE_STATIQUE = ((b"cache-control", b"public, max-age=31536000"),)
+CACHE_IMMUABLE = ((b"cache-control", b"public, max-age=31536000, immutable"),)
+CACHE_AUCUN = (
+    (b"cache-control", b"no-cache, no-store, must-revalidate, private"),
+    (b"pragma", b"no-cache"),
+    (b"expires", b"0"),
+)
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    """Étapes actives du pipeline de requêtes (figées au démarrage)"""
+
+    forward_proto: bool = False
+    cloudflare: bool = False
+    request_id: bool = False
+    metrics: bool = False
+    logging: bool = False
+    user_agent_filter: bool = False
+    ip_filter: bool = False
+    request_size_limit: bool = False
+    error_handling: bool = False
+    cache_control: bool = False
+    security_headers: bool = False
+    hsts: bool = False
+    csp: bool = False
+    db_headers: bool = False  # X-DB-Queries / X-DB-Time (DEBUG)
+    root_path: str = ""
+    access_sampling: tuple[tuple[str, float], ...] = ()  # (modèle de route, taux conservé)
+
+    @classmethod
+    def from_settings(cls, settings) -> "PipelineConfig":
+        return cls(
+            forward_proto=settings.should_enable_forward_proto,
+            cloudflare=settings.should_enable_cloudflare,
+            request_id=settings.ENABLE_REQUEST_ID,
+            metrics=settings.ENABLE_METRICS,
+            logging=settings.ENABLE_LOGGING,
+            user_agent_filter=settings.ENABLE_USER_AGENT_FILTER,
+            ip_filter=settings.ENABLE_IP_FILTER and bool(BLOCKED_IPS),
+            request_size_limit=settings.ENABLE_REQUEST_SIZE_LIMIT,
+            error_handling=settings.ENABLE_ERROR_HANDLING,
+            cache_control=settings.should_enable_cache_control,
+            security_headers=settings.should_enable_security_headers,
+            hsts=not settings.DEBUG,
+            csp=settings.should_enable_csp,
+            db_headers=settings.DEBUG,
+            root_path=settings.get_root_path,
+            access_sampling=tuple(settings.LOG_ACCESS_SAMPLING.items()),
+        )
 
 
-class CSPMiddleware(BaseHTTPMiddleware):
-    """
-    Ajoute une politique de sécurité du contenu (CSP)
+@dataclass
+class _RequestState:
+    """Suivi d'une requête à travers le pipeline"""
 
-    Protection contre :
-    - Injection de scripts (XSS)
-    - Chargement de ressources non autorisées
-    """
+    request_id: str = "no-id"
+    status_code: int = 500
+    response_started: bool = False
+    error: Exception | None = None
+    sql: StatistiquesRequetes | None = None
 
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-
-        # Politique de sécurité du contenu
-        csp_policy = (
-            "default-src 'self'; "
-            # iframes (Power BI)
-            "frame-src 'self' https://app.powerbi.com https://*.powerbi.com; "
-            "child-src 'self' https://app.powerbi.com https://*.powerbi.com; "
-            # qui peut vous embarquer (ok pour votre site)
-            "frame-ancestors 'self'; "
-            # JS / CSS (tu as du inline → on garde provisoirement 'unsafe-inline')
-            "script-src 'self' 'unsafe-inline' cdn.tailwindcss.com cdnjs.cloudflare.com cdn.jsdelivr.net; "
-            "style-src 'self' 'unsafe-inline' fonts.googleapis.com cdnjs.cloudflare.com; "
-            # Fonts / images
-            "font-src 'self' fonts.gstatic.com cdnjs.cloudflare.com; "
-            "img-src 'self' data: blob: https:; "
-            # Réseaux (ajoute *.powerbi.com si tu passes au SDK powerbi-client)
-            "connect-src 'self' cdn.jsdelivr.net; "
-            # Divers durcissements
-            "object-src 'none'; "
-            "base-uri 'self'; "
-            "form-action 'self'"
-        )
 
-        response.headers["Content-Security-Policy"] = csp_policy
-        return response
+def _replace_headers(headers: list, new_headers: list) -> list:
+    """Remplace (et non duplique) les en-têtes déjà posés par l'application"""
+    names = {name for name, _ in new_headers}
+    return [(name, value) for name, value in headers if name.lower() not in names] + new_headers
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class RequestPipelineMiddleware:
     """
-    Enregistre toutes les requêtes HTTP dans les logs
-
-    Logs vers :
-    - Console (stdout/stderr selon niveau)
-    - logs/app.log (tous les logs)
-    - logs/access.log (requêtes HTTP)
-    - logs/error.log (erreurs seulement)
+    Middleware ASGI unique regroupant le traitement transverse des requêtes HTTP
+
+    Étapes, dans l'ordre d'exécution (chacune activable via PipelineConfig) :
+    - Cloudflare : capture des en-têtes CF-* dans request.state
+    - Forward Proto : protocole transmis par le proxy (X-Forwarded-Proto)
+    - Request ID : identifiant unique (request.state.request_id, en-tête X-Request-ID)
+    - Métriques Prometheus par modèle de route
+    - Logging : logs/app.log et logs/access.log, avec le nombre de requêtes SQL
+      et le temps passé en base (les requêtes répétées sont signalées) ;
+      les routes listées dans LOG_ACCESS_SAMPLING ne sont journalisées qu'en partie
+    - Filtres : user agents (robots), IPs bloquées, taille des requêtes
+    - Gestion des erreurs non gérées (réponse JSON 500)
+    - En-têtes de réponse : cache, sécurité, CSP (tuples calculés au démarrage)
+
+    Contrairement à BaseHTTPMiddleware, il n'ajoute ni tâche ni copie de la réponse :
+    seul le message http.response.start est modifié, le corps est transmis tel quel
+    (compatible avec les réponses en flux).
     """
 
-    async def dispatch(self, request: Request, call_next):
-        from app.core.logging_config import access_logger, get_logger
-
-        logger = get_logger("mppeep.middleware")
-        start_time = time.time()
-
-        client_ip = request.client.host if request.client else "unknown"
-        method = request.method
-        url = str(request.url.path)
-        user_agent = request.headers.get("user-agent", "unknown")
-        request_id = request.headers.get("X-Request-ID", "no-id")
-
+    def __init__(self, app: ASGIApp, config: PipelineConfig):
+        self.app = app
+        self.config = config
+
+        root = config.root_path
+        self._static_prefixes = (f"{root}/static", f"{root}/uploads")
+
+        fixed: list[tuple[bytes, bytes]] = []
+        if config.security_headers:
+            fixed.extend(SECURITY_HEADERS)
+            if config.hsts:
+                fixed.append(HSTS_HEADER)
+        if config.csp:
+            fixed.append((b"content-security-policy", CSP_POLICY.encode()))
+        self._fixed_headers = fixed
+        self._sampling = dict(config.access_sampling)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        config = self.config
+        headers = dict(reversed(scope["headers"]))  # première occurrence prioritaire, comme Headers.get
+        state = _RequestState()
+
+        if config.cloudflare:
+            self._capture_cloudflare(scope, headers)
+
+        if config.forward_proto:
+            scope["scheme"] = headers.get(b"x-forwarded-proto", b"https").decode("latin-1")
+
+        if config.request_id:
+            state.request_id = str(uuid.uuid4())
+            scope.setdefault("state", {})["request_id"] = state.request_id
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                state.status_code = message["status"]
+                state.response_started = True
+                extra = self._response_headers(scope, state)
+                if extra:
+                    message["headers"] = _replace_headers(list(message.get("headers", [])), extra)
+            await send(message)
+
+        if config.metrics:
+            metrics.http_en_cours.inc()
+        start_time = time.perf_counter()
         try:
-            response = await call_next(request)
-            duration = time.time() - start_time
-            status_code = response.status_code
-
-            # Log dans app.log
-            log_message = (
-                f"{client_ip} | {method} {url} | "
-                f"Status: {status_code} | Duration: {duration:.3f}s | "
-                f"Request-ID: {request_id}"
-            )
-
-            if status_code >= 500:
-                logger.error(f"❌ {log_message}")
-            elif status_code >= 400:
-                logger.warning(f"⚠️  {log_message}")
+            if config.logging:
+                with suivre_requetes() as state.sql:
+                    await self._handle(scope, receive, send_wrapper, headers, state)
             else:
-                logger.info(f"✅ {log_message}")
-
-            # Log dans access.log (format Apache-like)
-            access_logger.info(f'{client_ip} - "{method} {url}" {status_code} {duration:.3f}s "{user_agent}"')
-
-            return response
-
+                await self._handle(scope, receive, send_wrapper, headers, state)
         except Exception as e:
-            duration = time.time() - start_time
-            error_message = (
-                f"{client_ip} | {method} {url} | "
-                f"ERROR | Duration: {duration:.3f}s | "
-                f"Request-ID: {request_id} | Error: {str(e)[:200]}"
-            )
-
-            logger.error(f"❌ {error_message}", exc_info=True)
-
-            # Log aussi dans access.log
-            access_logger.error(f'{client_ip} - "{method} {url}" 500 {duration:.3f}s "ERROR: {str(e)[:100]}"')
-
+            state.error = e
             raise
+        finally:
+            duration = time.perf_counter() - start_time
+            if config.metrics:
+                self._record_metrics(scope, state, duration)
+            if config.logging and self._should_log(scope, state):
+                self._log_request(scope, headers, state, duration)
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send, headers: dict, state: _RequestState) -> None:
+        """Filtres puis application, avec gestion des erreurs non gérées"""
+        config = self.config
+
+        if config.user_agent_filter:
+            user_agent = headers.get(b"user-agent", b"").decode("latin-1").lower()
+            if any(blocked in user_agent for blocked in BLOCKED_USER_AGENTS):
+                logger.warning(f"🤖 User agent bloqué : {user_agent[:100]}")
+                await JSONResponse(status_code=403, content={"detail": "Accès refusé - Robot détecté"})(
+                    scope, receive, send
+                )
+                return
+
+        if config.ip_filter:
+            client_ip = scope["client"][0] if scope.get("client") else "unknown"
+            if client_ip in BLOCKED_IPS:
+                logger.warning(f"🚫 IP bloquée : {client_ip}")
+                await JSONResponse(status_code=403, content={"detail": "Accès refusé - IP bloquée"})(
+                    scope, receive, send
+                )
+                return
+
+        if config.request_size_limit and scope["method"] in ("POST", "PUT", "PATCH"):
+            content_length = headers.get(b"content-length")
+            if content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_SIZE:
+                logger.warning(f"📏 Requête trop volumineuse : {int(content_length)} bytes")
+                await JSONResponse(
+                    status_code=413,
+                    content={"detail": f"Requête trop volumineuse - Maximum {MAX_REQUEST_SIZE // (1024 * 1024)}MB"},
+                )(scope, receive, send)
+                return
+
+        if not config.error_handling:
+            await self.app(scope, receive, send)
+            return
 
-
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """
-    Ajoute un identifiant unique à chaque requête
-
-    Utile pour tracer une requête dans les logs
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-
-        return response
-
-
-class CacheControlMiddleware(BaseHTTPMiddleware):
-    """
-    Gère le cache des fichiers statiques et des réponses API
-
-    - Fichiers statiques : Cache long (1 an)
-    - API : Pas de cache
-    - Pages HTML : Cache modéré (1 heure)
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-
-        # Cache pour les fichiers statiques (1 an)
-        root_path = settings.get_root_path
-        static_prefix = f"{root_path}/static" if root_path else "/static"
-        uploads_prefix = f"{root_path}/uploads" if root_path else "/uploads"
-        api_prefix = f"{root_path}/api" if root_path else "/api"
-        login_path = f"{root_path}/login" if root_path else "/login"
-        
-        if request.url.path.startswith(static_prefix) or request.url.path.startswith(uploads_prefix):
-            # Fichiers statiques : cache long (1 an)
-            response.headers["Cache-Control"] = "public, max-age=31536000"
-        elif request.url.path.startswith(api_prefix) or request.url.path.startswith(login_path):
-            # API et pages de login : pas de cache
-            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate, private"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
-        else:
-            # Pages protégées (après connexion) : pas de cache non plus pour forcer la déconnexion
-            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate, private"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
-
-        return response
-
-
-class IPFilterMiddleware(BaseHTTPMiddleware):
-    """
-    Bloque les adresses IP malveillantes
-
-    Protection contre :
-    - Attaques répétées
-    - IPs connues comme malveillantes
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host if request.client else "unknown"
-
-        if client_ip in BLOCKED_IPS:
-            logger.warning(f"🚫 IP bloquée : {client_ip}")
-            return JSONResponse(status_code=403, content={"detail": "Accès refusé - IP bloquée"})
-
-        return await call_next(request)
-
-
-class UserAgentFilterMiddleware(BaseHTTPMiddleware):
-    """
-    Bloque les robots malveillants et les scrapers
-
-    Protection contre :
-    - Scraping de données
-    - Bots automatiques
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        user_agent = request.headers.get("user-agent", "").lower()
-
-        if any(blocked in user_agent for blocked in BLOCKED_USER_AGENTS):
-            logger.warning(f"🤖 User agent bloqué : {user_agent[:100]}")
-            return JSONResponse(status_code=403, content={"detail": "Accès refusé - Robot détecté"})
-
-        return await call_next(request)
-
-
-class RequestSizeMiddleware(BaseHTTPMiddleware):
-    """
-    Limite la taille des requêtes
-
-    Protection contre :
-    - Attaques par déni de service (DoS)
-    - Upload de fichiers trop gros
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        if request.method in ["POST", "PUT", "PATCH"]:
-            content_length = request.headers.get("content-length")
-
-            if content_length:
-                try:
-                    size = int(content_length)
-                    if size > MAX_REQUEST_SIZE:
-                        logger.warning(f"📏 Requête trop volumineuse : {size} bytes")
-                        return JSONResponse(
-                            status_code=413,
-                            content={
-                                "detail": f"Requête trop volumineuse - Maximum {MAX_REQUEST_SIZE // (1024 * 1024)}MB"
-                            },
-                        )
-                except ValueError:
-                    pass
-
-        return await call_next(request)
-
-
-class ForwardProtoMiddleware(BaseHTTPMiddleware):
-    """
-    Forwards the protocol to the request
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        proto = request.headers.get("X-Forwarded-Proto", "https")
-        if proto:
-            request.scope["scheme"] = proto
-        return await call_next(request)
-
-
-class CloudflareMiddleware(BaseHTTPMiddleware):
-    """
-    Capture et enrichit les requêtes avec les informations Cloudflare
-
-    Headers Cloudflare capturés :
-    - CF-Connecting-IP : IP réelle du client
-    - CF-Ray : ID unique de la requête Cloudflare
-    - CF-IPCountry : Code pays du client (ISO 3166-1 alpha-2)
-    - CF-Visitor : Protocole utilisé (http/https)
-
-    Les informations sont stockées dans request.state pour y accéder partout :
-    - request.state.cf_ray
-    - request.state.cf_country
-    - request.state.client_ip
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        # Capturer les headers Cloudflare
-        cf_ray = request.headers.get("CF-Ray", "")
-        cf_country = request.headers.get("CF-IPCountry", "")
-        cf_connecting_ip = request.headers.get("CF-Connecting-IP", "")
-        cf_visitor = request.headers.get("CF-Visitor", "")
-
-        # Stocker dans request.state pour y accéder dans les endpoints
-        request.state.cf_ray = cf_ray
-        request.state.cf_country = cf_country
-        request.state.cf_connecting_ip = cf_connecting_ip
-        request.state.cf_visitor = cf_visitor
+        try:
+            await self.app(scope, receive, send)
+        except Exception as e:
+            logger.error(f"💥 Erreur non gérée : {e!s}", exc_info=True)
+            if state.response_started:
+                # Réponse déjà partiellement envoyée (flux) : impossible de la remplacer
+                raise
+            await JSONResponse(
+                status_code=500,
+                content={"detail": "Erreur interne du serveur", "request_id": state.request_id},
+            )(scope, receive, send)
+
+    def _response_headers(self, scope: Scope, state: _RequestState) -> list[tuple[bytes, bytes]]:
+        extra = list(self._fixed_headers)
+        if self.config.request_id:
+            extra.append((b"x-request-id", state.request_id.encode()))
+        if self.config.cache_control:
+            if not scope["path"].startswith(self._static_prefixes):
+                extra.extend(CACHE_AUCUN)
+            else:
+                extra.extend(CACHE_IMMUABLE if est_empreinte(scope["path"]) else CACHE_STATIQUE)
+        if self.config.db_headers and state.sql is not None:
+            extra.append((b"x-db-queries", str(state.sql.total).encode()))
+            extra.append((b"x-db-time", f"{state.sql.duree_ms:.1f}ms".encode()))
+        return extra
+
+    def _should_log(self, scope: Scope, state: _RequestState) -> bool:
+        """Échantillonnage des routes très sollicitées (sondes, métriques) ; erreurs et N+1 toujours journalisés"""
+        if not self._sampling or state.error is not None or state.status_code >= 400:
+            return True
+        rate = self._sampling.get(getattr(scope.get("route"), "path", None))
+        if rate is None or rate >= 1:
+            return True
+        if state.sql is not None and state.sql.repetitions():
+            return True
+        return random.random() < rate
+
+    @staticmethod
+    def _capture_cloudflare(scope: Scope, headers: dict) -> None:
+        """Stocke les en-têtes Cloudflare dans request.state (cf_ray, cf_country, ...)"""
+        request_state = scope.setdefault("state", {})
+        request_state["cf_ray"] = cf_ray = headers.get(b"cf-ray", b"").decode("latin-1")
+        request_state["cf_country"] = headers.get(b"cf-ipcountry", b"").decode("latin-1")
+        request_state["cf_connecting_ip"] = headers.get(b"cf-connecting-ip", b"").decode("latin-1")
+        request_state["cf_visitor"] = headers.get(b"cf-visitor", b"").decode("latin-1")
 
         # Log pour le monitoring (optionnel, peut être désactivé en prod)
         if cf_ray:
-            logger.debug(f"☁️  Cloudflare Ray: {cf_ray} | Country: {cf_country} | IP: {cf_connecting_ip}")
-
-        return await call_next(request)
-
-
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    """
-    Gère les erreurs non gérées de manière élégante
+            logger.debug(
+                f"☁️  Cloudflare Ray: {cf_ray} | Country: {request_state['cf_country']} "
+                f"| IP: {request_state['cf_connecting_ip']}"
+            )
 
-    Avantages :
-    - Messages d'erreur clairs pour l'utilisateur
-    - Logs détaillés pour les développeurs
-    - Pas d'exposition de détails techniques
-    """
+    @staticmethod
+    def _record_metrics(scope: Scope, state: _RequestState, duration: float) -> None:
+        """Requêtes regroupées par modèle de route (/api/v1/users/{user_id}) pour borner les séries"""
+        metrics.http_en_cours.dec()
+        route = getattr(scope.get("route"), "path", None) or "<non résolue>"
+        metrics.http_requetes.inc(method=scope["method"], route=route, status=str(state.status_code))
+        metrics.http_latence.observe(duration, method=scope["method"], route=route)
+
+    @staticmethod
+    def _log_request(scope: Scope, headers: dict, state: _RequestState, duration: float) -> None:
+        """Ligne de log applicatif (app.log) et ligne d'accès au format Apache (access.log)"""
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        method = scope["method"]
+        url = scope["path"]
+        user_agent = headers.get(b"user-agent", b"unknown").decode("latin-1")
+        request_id = headers.get(b"x-request-id", state.request_id.encode()).decode("latin-1")
+        sql = state.sql or StatistiquesRequetes()
+        db = f"DB: {sql.total}q {sql.duree_ms:.1f}ms"
+
+        if state.error is not None and not state.response_started:
+            error = str(state.error)
+            app_logger.error(
+                f"❌ {client_ip} | {method} {url} | ERROR | Duration: {duration:.3f}s | "
+                f"Request-ID: {request_id} | {db} | Error: {error[:200]}",
+                exc_info=state.error,
+            )
+            access_logger.error(
+                f'{client_ip} - "{method} {url}" 500 {duration:.3f}s "ERROR: {error[:100]}" '
+                f"db={sql.total}q/{sql.duree_ms:.1f}ms"
+            )
+            return
 
-    async def dispatch(self, request: Request, call_next):
-        try:
-            return await call_next(request)
+        status_code = state.status_code
+        log_message = (
+            f"{client_ip} | {method} {url} | "
+            f"Status: {status_code} | Duration: {duration:.3f}s | "
+            f"Request-ID: {request_id} | {db}"
+        )
+        if status_code >= 500:
+            app_logger.error(f"❌ {log_message}")
+        elif status_code >= 400:
+            app_logger.warning(f"⚠️  {log_message}")
+        else:
+            app_logger.info(f"✅ {log_message}")
 
-        except Exception as e:
-            logger.error(f"💥 Erreur non gérée : {e!s}", exc_info=True)
+        # Requêtes identiques répétées : N+1 probable
+        for statement, nombre in sql.repetitions():
+            app_logger.warning(f"🔁 N+1 probable sur {method} {url}: {nombre}x {' '.join(statement.split())[:300]}")
 
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "detail": "Erreur interne du serveur",
-                    "request_id": getattr(request.state, "request_id", "unknown"),
-                },
-            )
+        access_logger.info(
+            f'{client_ip} - "{method} {url}" {status_code} {duration:.3f}s "{user_agent}" '
+            f"db={sql.total}q/{sql.duree_ms:.1f}ms"
+        )
 
 
 def setup_middlewares(app, settings):
@@ -381,6 +396,9 @@ def setup_middlewares(app, settings):
     Configure tous les middlewares pour l'application
 
     L'ordre est important : le premier ajouté s'exécute en dernier !
+    Les middlewares Starlette (HTTPS, Trusted Hosts, CORS, GZip) sont conservés ;
+    tout le reste passe par un unique RequestPipelineMiddleware, ajouté en dernier
+    (donc exécuté en premier).
 
     Args:
         app: Instance FastAPI
@@ -391,7 +409,7 @@ def setup_middlewares(app, settings):
     app.state.settings = settings
 
     # ==========================================
-    # MIDDLEWARES DANS L'ORDRE D'EXÉCUTION
+    # MIDDLEWARES STARLETTE (ASGI natifs)
     # ==========================================
 
     # 1. Redirection HTTPS en production
@@ -420,64 +438,33 @@ def setup_middlewares(app, settings):
         )
         logger.info(f"🌐 CORS configuré : {origins}")
 
-    # 4. Gestion des erreurs
-    if settings.ENABLE_ERROR_HANDLING:
-        app.add_middleware(ErrorHandlingMiddleware)
-        logger.info("💥 Error Handling activé")
-
-    # 5. Limitation de taille des requêtes
-    if settings.ENABLE_REQUEST_SIZE_LIMIT:
-        app.add_middleware(RequestSizeMiddleware)
-        logger.info(f"📏 Request Size Limit : {MAX_REQUEST_SIZE // (1024 * 1024)}MB")
-
-    # 6. Filtrage des IPs
-    if settings.ENABLE_IP_FILTER and BLOCKED_IPS:
-        app.add_middleware(IPFilterMiddleware)
-        logger.info(f"🚫 IP Filter activé ({len(BLOCKED_IPS)} IPs bloquées)")
-
-    # 7. Filtrage des user agents
-    if settings.ENABLE_USER_AGENT_FILTER:
-        app.add_middleware(UserAgentFilterMiddleware)
-        logger.info("🤖 User Agent Filter activé")
-
-    # 8. Logging des requêtes
-    if settings.ENABLE_LOGGING:
-        app.add_middleware(LoggingMiddleware)
-        logger.info("📝 Request Logging activé")
-
-    # 9. ID de requête
-    if settings.ENABLE_REQUEST_ID:
-        app.add_middleware(RequestIDMiddleware)
-        logger.info("🎫 Request ID activé")
-
-    # 10. Compression GZip
+    # 4. Compression GZip
     if settings.should_enable_gzip:
         app.add_middleware(GZipMiddleware, minimum_size=1000)
         logger.info("📦 GZip activé")
 
-    # 11. Contrôle du cache
-    if settings.should_enable_cache_control:
-        app.add_middleware(CacheControlMiddleware)
-        logger.info("💾 Cache Control activé")
-
-    # 12. En-têtes de sécurité
-    if settings.should_enable_security_headers:
-        app.add_middleware(SecurityHeadersMiddleware)
-        logger.info("🔒 Security Headers activés")
-
-    # 13. Politique de sécurité du contenu (CSP)
-    if settings.should_enable_csp:
-        app.add_middleware(CSPMiddleware)
-        logger.info("🛡️ CSP activé")
-
-    # 14. Forward Proto (derrière proxy/Cloudflare)
-    if settings.should_enable_forward_proto:
-        app.add_middleware(ForwardProtoMiddleware)
-        logger.info("🔗 Forward Proto activé")
-
-    # 15. Cloudflare (capture des headers CF-*)
-    if settings.should_enable_cloudflare:
-        app.add_middleware(CloudflareMiddleware)
-        logger.info("☁️  Cloudflare Middleware activé")
+    # ==========================================
+    # PIPELINE DE REQUÊTES (un seul middleware ASGI)
+    # ==========================================
+    config = PipelineConfig.from_settings(settings)
+    app.add_middleware(RequestPipelineMiddleware, config=config)
+
+    etapes = [
+        (config.error_handling, "💥 Error Handling"),
+        (config.request_size_limit, f"📏 Request Size Limit ({MAX_REQUEST_SIZE // (1024 * 1024)}MB)"),
+        (config.ip_filter, f"🚫 IP Filter ({len(BLOCKED_IPS)} IPs bloquées)"),
+        (config.user_agent_filter, "🤖 User Agent Filter"),
+        (config.logging, "📝 Request Logging"),
+        (config.metrics, "📈 Metrics"),
+        (config.request_id, "🎫 Request ID"),
+        (config.cache_control, "💾 Cache Control"),
+        (config.security_headers, "🔒 Security Headers"),
+        (config.csp, "🛡️ CSP"),
+        (config.forward_proto, "🔗 Forward Proto"),
+        (config.cloudflare, "☁️  Cloudflare"),
+    ]
+    for actif, libelle in etapes:
+        if actif:
+            logger.info(f"{libelle} activé")
 
     logger.info("✅ Configuration middlewares terminée")
@@ -22,6 +22,7 @@ class PathConfig:
         # === CHEMINS DE BASE ===
         self.BASE_DIR = BASE_DIR
         self.STATIC_DIR = BASE_DIR / "app" / "static"
+        self.STATIC_BUILD_DIR = BASE_DIR / "app" / "static_build"  # Généré par scripts/build_static.py
         self.TEMPLATES_DIR = BASE_DIR / "app" / "templates"
         self.UPLOADS_DIR = BASE_DIR / "uploads"
         self.MEDIA_DIR = BASE_DIR / "media"
@@ -38,6 +39,8 @@ class PathConfig:
         self.UPLOADS_FILES_RAW_DIR = self.UPLOADS_FILES_DIR / "raw"
         self.UPLOADS_FILES_PROCESSED_DIR = self.UPLOADS_FILES_DIR / "processed"
         self.UPLOADS_FILES_ARCHIVE_DIR = self.UPLOADS_FILES_DIR / "archive"
+        self.UPLOADS_FILES_PREVIEWS_DIR = self.UPLOADS_FILES_DIR / "previews"
+        self.UPLOADS_REPORTS_DIR = self.UPLOADS_DIR / "reports"
 
         # === CONFIGURATION DES MONTAGES ===
         self.MOUNT_CONFIGS = {
@@ -107,3 +110,5 @@ path_config.ensure_directory_exists(path_config.UPLOADS_FILES_DIR)
 path_config.ensure_directory_exists(path_config.UPLOADS_FILES_RAW_DIR)
 path_config.ensure_directory_exists(path_config.UPLOADS_FILES_PROCESSED_DIR)
 path_config.ensure_directory_exists(path_config.UPLOADS_FILES_ARCHIVE_DIR)
+path_config.ensure_directory_exists(path_config.UPLOADS_FILES_PREVIEWS_DIR)
+path_config.ensure_directory_exists(path_config.UPLOADS_REPORTS_DIR)
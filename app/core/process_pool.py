@@ -0,0 +1,54 @@
+"""
+Pools de processus partagés pour le travail CPU (extraction PDF, rendu ReportLab)
+
+Chaque pool est identifié par un nom et créé au premier usage, en contexte spawn
+(sûr avec les threads du serveur). Les pools vivent par worker uvicorn : le nombre
+total de processus est (nombre de workers uvicorn) x (processus du pool).
+
+Si un processus du pool meurt (OOM, signal), le pool passe en BrokenProcessPool :
+l'appelant l'abandonne avec `abandonner_pool` et l'appel suivant en recrée un.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_pools: dict[str, ProcessPoolExecutor] = {}
+_verrou = threading.Lock()
+
+
+def obtenir_pool(nom: str, max_workers: int) -> ProcessPoolExecutor:
+    """Pool `nom`, créé au premier usage avec `max_workers` processus"""
+    with _verrou:
+        pool = _pools.get(nom)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[nom] = pool
+            logger.info(f"🧵 Pool '{nom}' démarré ({max_workers} processus)")
+        return pool
+
+
+def abandonner_pool(nom: str, pool: ProcessPoolExecutor) -> None:
+    """Retire un pool cassé (BrokenProcessPool) ; le prochain `obtenir_pool` en crée un neuf"""
+    with _verrou:
+        if _pools.get(nom) is pool:
+            del _pools[nom]
+    pool.shutdown(wait=False, cancel_futures=True)
+    logger.warning(f"⚠️  Pool '{nom}' interrompu (processus arrêté) : il sera recréé au prochain usage")
+
+
+def arreter_pools() -> None:
+    """Arrête tous les pools (appelé à l'arrêt de l'application)"""
+    with _verrou:
+        pools = list(_pools.items())
+        _pools.clear()
+    for nom, pool in pools:
+        pool.shutdown(cancel_futures=True)
+        logger.info(f"🛑 Pool '{nom}' arrêté")
+
+
+__all__ = ["abandonner_pool", "arreter_pools", "obtenir_pool"]
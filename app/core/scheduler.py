@@ -1,52 +1,108 @@
 """
 Planificateur de tâches automatiques
 Exécute des tâches périodiques en arrière-plan
+
+Chaque worker uvicorn démarre un coordinateur, mais un seul (le leader, détenteur du
+verrou consultatif "scheduler") exécute les tâches. Les autres retentent de prendre le
+verrou toutes les SCHEDULER_LEADER_RETRY_S secondes : si le leader meurt, sa connexion
+(ou son verrou de fichier en SQLite) disparaît et un autre worker prend le relais.
+Chaque exécution est historisée dans la table scheduler_run.
 """
-from datetime import datetime
+import os
+import socket
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from sqlmodel import Session, select
+from sqlalchemy import Engine
+from sqlmodel import Session
 
+from app.core.config import settings
 from app.core.logging_config import get_logger
-from app.db.session import engine
-from app.models.session import UserSession
-from app.models.file import File
-from app.core.enums import FileStatus
+from app.core.metrics import mesurer_tache
 from app.core.path_config import path_config
-from pathlib import Path
-from datetime import timedelta
+from app.db.session import engine
+from app.db.verrous import VerrouConsultatif
+from app.models.scheduler_run import SchedulerRun
+from app.services.retention_service import RetentionService
 
 logger = get_logger("scheduler")
 
-# Instance globale du scheduler
-scheduler = None
+# Coordinateur du worker courant (son scheduler n'existe que s'il est leader)
+coordinateur = None
 
 
-def cleanup_expired_sessions():
-    """Nettoie les sessions expirées"""
+def _worker() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _historiser(bind: Engine, passage: SchedulerRun) -> SchedulerRun | None:
+    """Enregistre un passage ; l'historique ne doit jamais empêcher une tâche de tourner"""
     try:
-        logger.info("🧹 [CRON] Nettoyage des sessions expirées...")
-        
-        with Session(engine) as session:
-            statement = select(UserSession).where(UserSession.is_active == True)
-            active_sessions = session.exec(statement).all()
-            
-            expired_count = 0
-            for user_session in active_sessions:
-                if user_session.is_expired():
-                    user_session.deactivate()
-                    expired_count += 1
-            
-            if expired_count > 0:
-                session.commit()
-                logger.info(f"✅ [CRON] {expired_count} session(s) expirée(s) nettoyée(s)")
-            else:
-                logger.debug("✅ [CRON] Aucune session expirée")
-        
-        return expired_count
+        with Session(bind) as session:
+            session.add(passage)
+            session.commit()
+            session.refresh(passage)
+            return passage
     except Exception as e:
-        logger.error(f"❌ [CRON] Erreur nettoyage sessions: {e}", exc_info=True)
-        return 0
+        logger.warning(f"⚠️  [CRON] Historique indisponible pour {passage.job_id}: {e}")
+        return None
+
+
+def executer_tache(job_id: str, tache: Callable[[], Any], bind: Engine | None = None) -> Any:
+    """
+    Exécute une tâche planifiée : durée exposée sur /metrics et passage enregistré dans scheduler_run
+
+    Les exceptions sont enregistrées (statut "echec") puis propagées.
+    """
+    bind = bind or engine
+    passage = _historiser(bind, SchedulerRun(job_id=job_id, worker=_worker()))
+    debut = time.perf_counter()
+    statut, resultat, erreur = "echec", None, None
+    try:
+        with mesurer_tache(job_id):
+            resultat = tache()
+        statut = "succes"
+        return resultat
+    except Exception as e:
+        erreur = str(e)[:2000]
+        raise
+    finally:
+        if passage is not None:
+            passage.finished_at = datetime.now()
+            passage.duration_ms = round((time.perf_counter() - debut) * 1000, 1)
+            passage.status = statut
+            passage.resultat = resultat if isinstance(resultat, int) else None
+            passage.erreur = erreur
+            _historiser(bind, passage)
+
+
+def cleanup_expired_sessions():
+    """Désactive les sessions expirées (UPDATE par lots, sans charger les sessions)"""
+    logger.info("🧹 [CRON] Nettoyage des sessions expirées...")
+    with Session(engine) as session:
+        expired_count = RetentionService.expirer_sessions(session)
+    logger.info(f"✅ [CRON] {expired_count} session(s) expirée(s) nettoyée(s)")
+    return expired_count
+
+
+def purge_inactive_sessions():
+    """Supprime définitivement les sessions fermées ou expirées depuis longtemps"""
+    logger.info(f"🧹 [CRON] Purge des sessions inactives depuis {settings.SESSION_PURGE_DAYS} jours...")
+    with Session(engine) as session:
+        purged_count = RetentionService.purger_sessions_inactives(session)
+    logger.info(f"✅ [CRON] {purged_count} session(s) supprimée(s)")
+    return purged_count
+
+
+def purge_old_activities():
+    """Supprime le journal d'activité au-delà de ACTIVITY_RETENTION_DAYS (désactivé si 0)"""
+    with Session(engine) as session:
+        return RetentionService.purger_activites(session)
 
 
 def cleanup_old_files():
@@ -104,42 +160,38 @@ def cleanup_old_files():
 
 
 def cleanup_error_files():
-    """Nettoie les fichiers en erreur > 7 jours"""
+    """Supprime les fichiers en erreur > 7 jours (DELETE par lots, puis fichiers physiques)"""
+    logger.info("🧹 [CRON] Nettoyage des fichiers en erreur...")
+    with Session(engine) as session:
+        deleted_count = RetentionService.purger_fichiers_en_erreur(session)
+    logger.info(f"✅ [CRON] {deleted_count} fichier(s) en erreur nettoyé(s)")
+    return deleted_count
+
+
+def cleanup_orphan_blobs():
+    """Purge les blobs du magasin dédupliqué qui ne sont plus référencés"""
     try:
-        logger.info("🧹 [CRON] Nettoyage des fichiers en erreur...")
-        
+        logger.info("🧹 [CRON] Purge des blobs sans référence...")
+
+        from app.services.blob_store_service import BlobStoreService
+
         with Session(engine) as session:
-            cutoff_date = datetime.now() - timedelta(days=7)
-            
-            statement = select(File).where(
-                File.status == FileStatus.ERROR,
-                File.created_at < cutoff_date
-            )
-            error_files = session.exec(statement).all()
-            
-            deleted_count = 0
-            for file in error_files:
-                # Supprimer le fichier physique
-                file_path = Path(file.file_path)
-                if file_path.exists():
-                    try:
-                        file_path.unlink()
-                    except Exception as e:
-                        logger.error(f"   Erreur suppression {file.original_filename}: {e}")
-                
-                # Supprimer l'enregistrement en base
-                session.delete(file)
-                deleted_count += 1
-            
-            if deleted_count > 0:
-                session.commit()
-                logger.info(f"✅ [CRON] {deleted_count} fichier(s) en erreur nettoyé(s)")
-            else:
-                logger.debug("✅ [CRON] Aucun fichier en erreur")
-            
-            return deleted_count
+            resultat = BlobStoreService.purger_orphelins(session)
+
+        if resultat["nb_blobs"] == 0:
+            logger.debug("✅ [CRON] Aucun blob orphelin")
+        return resultat["nb_blobs"]
     except Exception as e:
-        logger.error(f"❌ [CRON] Erreur nettoyage fichiers erreur: {e}", exc_info=True)
+        logger.error(f"❌ [CRON] Erreur purge blobs: {e}", exc_info=True)
+        return 0
+
+
+def _etape(job_id: str, tache: Callable[[], int]) -> int:
+    """Une étape du nettoyage quotidien : un échec est historisé sans interrompre les suivantes"""
+    try:
+        return executer_tache(job_id, tache)
+    except Exception as e:
+        logger.error(f"❌ [CRON] Erreur {job_id}: {e}", exc_info=True)
         return 0
 
 
@@ -150,91 +202,140 @@ def run_daily_cleanup():
     logger.info(f"📅 [CRON] Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("=" * 70)
     
-    # Exécuter tous les nettoyages
-    sessions = cleanup_expired_sessions()
-    files = cleanup_old_files()
-    errors = cleanup_error_files()
-    
+    # Exécuter tous les nettoyages (durées exposées sur /metrics, passages dans scheduler_run)
+    sessions = _etape("cleanup_expired_sessions", cleanup_expired_sessions)
+    purged = _etape("purge_inactive_sessions", purge_inactive_sessions)
+    activities = _etape("purge_old_activities", purge_old_activities)
+    files = _etape("cleanup_old_files", cleanup_old_files)
+    errors = _etape("cleanup_error_files", cleanup_error_files)
+    blobs = _etape("cleanup_orphan_blobs", cleanup_orphan_blobs)
+
     # Résumé
-    total = sessions + files + errors
+    total = sessions + purged + activities + files + errors + blobs
     logger.info("")
     logger.info("=" * 70)
     logger.info("📊 [CRON] RÉSUMÉ DU NETTOYAGE")
     logger.info("=" * 70)
     logger.info(f"   🔐 Sessions expirées     : {sessions}")
+    logger.info(f"   🗑️  Sessions purgées      : {purged}")
+    logger.info(f"   📜 Activités purgées     : {activities}")
     logger.info(f"   📊 Fichiers temporaires  : {files}")
     logger.info(f"   ❌ Fichiers en erreur    : {errors}")
+    logger.info(f"   📦 Blobs orphelins       : {blobs}")
     logger.info("")
     logger.info(f"   🎯 TOTAL                 : {total} éléments nettoyés")
     logger.info("=" * 70)
     logger.info("✅ [CRON] NETTOYAGE TERMINÉ")
     logger.info("=" * 70)
+    return total
+
+
+def _creer_scheduler() -> BackgroundScheduler:
+    """Scheduler APScheduler et ses tâches (démarré uniquement par le worker leader)"""
+    nouveau = BackgroundScheduler(timezone="Europe/Paris")
+
+    # Ajouter la tâche de nettoyage quotidien (tous les jours à 3h00)
+    nouveau.add_job(
+        executer_tache,
+        trigger=CronTrigger(hour=3, minute=0),  # Tous les jours à 3h00
+        args=("daily_cleanup", run_daily_cleanup),
+        id="daily_cleanup",
+        name="Nettoyage quotidien",
+        replace_existing=True,
+        coalesce=True,
+    )
+    return nouveau
+
+
+class CoordinateurPlanificateur:
+    """Élection du worker leader : seul le détenteur du verrou exécute les tâches planifiées"""
+
+    def __init__(self, bind: Engine, intervalle: float):
+        self.intervalle = intervalle
+        self.scheduler: BackgroundScheduler | None = None
+        self._verrou = VerrouConsultatif(bind, "scheduler")
+        self._arret = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def leader(self) -> bool:
+        return self.scheduler is not None
+
+    def demarrer(self) -> None:
+        self._thread = threading.Thread(target=self._boucle, name="scheduler-coordinateur", daemon=True)
+        self._thread.start()
+
+    def arreter(self) -> None:
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+            self.scheduler = None
+        self._verrou.liberer()
+
+    def election(self) -> bool:
+        """Un tour d'élection : prend le verrou s'il est libre, vérifie qu'il est toujours détenu sinon"""
+        if self.scheduler is None:
+            if self._verrou.acquerir(bloquant=False):
+                self.scheduler = _creer_scheduler()
+                self.scheduler.start()
+                logger.info(f"👑 Worker {_worker()} élu leader : tâches planifiées actives")
+                for job in self.scheduler.get_jobs():
+                    logger.info(f"   ⏰ Job: {job.name} - Prochaine exécution: {job.next_run_time}")
+        elif not self._verrou.verifier():
+            logger.warning(f"⚠️  Worker {_worker()} n'est plus leader : arrêt des tâches planifiées")
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+        return self.leader
+
+    def _boucle(self) -> None:
+        while not self._arret.is_set():
+            try:
+                self.election()
+            except Exception as e:
+                logger.error(f"❌ Élection du leader du planificateur: {e}")
+            self._arret.wait(self.intervalle)
 
 
 def start_scheduler():
-    """Démarre le planificateur de tâches"""
-    global scheduler
-    
-    if scheduler is not None:
+    """Démarre le coordinateur : le planificateur tourne dans un seul worker à la fois"""
+    global coordinateur
+
+    if coordinateur is not None:
         logger.warning("⚠️  Scheduler déjà démarré")
         return
-    
+
     logger.info("🚀 Démarrage du planificateur de tâches...")
-    
-    # Créer le scheduler
-    scheduler = BackgroundScheduler(timezone="Europe/Paris")
-    
-    # Ajouter la tâche de nettoyage quotidien (tous les jours à 3h00)
-    scheduler.add_job(
-        run_daily_cleanup,
-        trigger=CronTrigger(hour=3, minute=0),  # Tous les jours à 3h00
-        id='daily_cleanup',
-        name='Nettoyage quotidien',
-        replace_existing=True
-    )
-    
-    # Démarrer le scheduler
-    scheduler.start()
-    
-    logger.info("✅ Planificateur démarré")
+    coordinateur = CoordinateurPlanificateur(engine, settings.SCHEDULER_LEADER_RETRY_S)
+    coordinateur.demarrer()
+    logger.info(f"✅ Coordinateur démarré (élection du leader toutes les {settings.SCHEDULER_LEADER_RETRY_S}s)")
     logger.info("   📅 Nettoyage quotidien programmé : 3h00 du matin")
-    
-    # Afficher les jobs planifiés
-    jobs = scheduler.get_jobs()
-    for job in jobs:
-        logger.info(f"   ⏰ Job: {job.name} - Prochaine exécution: {job.next_run_time}")
 
 
 def stop_scheduler():
     """Arrête le planificateur de tâches"""
-    global scheduler
-    
-    if scheduler is None:
+    global coordinateur
+
+    if coordinateur is None:
         return
-    
+
     logger.info("🛑 Arrêt du planificateur de tâches...")
-    scheduler.shutdown()
-    scheduler = None
+    coordinateur.arreter()
+    coordinateur = None
     logger.info("✅ Planificateur arrêté")
 
 
 def get_scheduler_status():
     """Retourne l'état du scheduler"""
-    global scheduler
-    
-    if scheduler is None:
-        return {"running": False, "jobs": []}
-    
+    if coordinateur is None:
+        return {"running": False, "leader": False, "jobs": []}
+
     jobs = []
-    for job in scheduler.get_jobs():
-        jobs.append({
-            "id": job.id,
-            "name": job.name,
-            "next_run": job.next_run_time.isoformat() if job.next_run_time else None
-        })
-    
-    return {
-        "running": True,
-        "jobs": jobs
-    }
+    if coordinateur.scheduler is not None:
+        for job in coordinateur.scheduler.get_jobs():
+            jobs.append(
+                {"id": job.id, "name": job.name, "next_run": job.next_run_time.isoformat() if job.next_run_time else None}
+            )
 
+    return {"running": True, "leader": coordinateur.leader, "worker": _worker(), "jobs": jobs}
@@ -1,66 +1,140 @@
 """
-Cache pour les paramètres système
-Évite de charger depuis la DB à chaque requête
-"""
-
-from datetime import datetime
-
-from app.core.logging_config import get_logger
-
-logger = get_logger(__name__)
-
+Cache versionné pour les paramètres système et les autres configurations quasi statiques
 
-class SettingsCache:
-    """Cache singleton pour les paramètres système"""
+Chaque worker garde en mémoire la valeur calculée d'une clé (ex: "system_settings",
+couleurs dérivées comprises) avec le numéro de version sous lequel il l'a chargée.
+Le numéro de référence est dans la table config_version : une modification l'incrémente
+dans sa propre transaction, et tous les workers rechargent à leur prochain accès.
 
-    _instance = None
-    _settings: dict | None = None
-    _last_update: datetime | None = None
-    _cache_duration: int = 300  # 5 minutes
+Pour que la vérification reste peu coûteuse, la version n'est relue qu'une fois
+toutes les SETTINGS_CACHE_CHECK_S secondes par worker ; la valeur n'est recalculée
+qu'une fois par version.
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-
-    def get(self) -> dict | None:
-        """Récupère les paramètres du cache"""
-        if self._settings is None:
-            return None
+    valeur = settings_cache.obtenir("ma_config", session, lambda: charger(session))
+    ...
+    settings_cache.invalider("ma_config", session)  # avant session.commit()
+"""
 
-        # Vérifier si le cache est expiré
-        if self._last_update is None:
-            return None
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, TypeVar
 
-        age = datetime.now() - self._last_update
-        if age.total_seconds() > self._cache_duration:
-            logger.debug("⏰ Cache des paramètres expiré")
-            return None
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlmodel import Session, select, update
 
-        return self._settings
+from app.core.config import settings as app_settings
+from app.core.logging_config import get_logger
+from app.models.config_version import ConfigVersion
 
-    def set(self, settings: dict):
-        """Met à jour le cache"""
-        self._settings = settings
-        self._last_update = datetime.now()
-        logger.debug("💾 Cache des paramètres mis à jour")
+logger = get_logger(__name__)
 
-    def clear(self):
-        """Vide le cache"""
-        self._settings = None
-        self._last_update = None
+T = TypeVar("T")
+
+
+@dataclass
+class _Entree:
+    version: int
+    valeur: Any
+    verifiee_a: float
+
+
+class CacheVersionne:
+    """Cache clé → valeur du worker, invalidé par le compteur de version partagé en base"""
+
+    def __init__(self, intervalle_verification: float | None = None):
+        self._intervalle = intervalle_verification
+        self._entrees: dict[str, _Entree] = {}
+        self._verrou = threading.Lock()
+
+    @property
+    def intervalle_verification(self) -> float:
+        if self._intervalle is not None:
+            return self._intervalle
+        return app_settings.SETTINGS_CACHE_CHECK_S
+
+    @staticmethod
+    def version(cle: str, session: Session) -> int:
+        """
+        Numéro de version enregistré pour `cle` (0 si jamais modifiée)
+
+        Lu dans un savepoint : en cas d'erreur, seul le savepoint est annulé et le
+        travail en cours de la session appelante est conservé.
+        """
+        try:
+            with session.begin_nested():
+                version = session.exec(select(ConfigVersion.version).where(ConfigVersion.cle == cle)).first()
+        except (OperationalError, ProgrammingError) as e:
+            # Table absente (base pas encore initialisée) : cache local seul
+            logger.debug(f"Version de '{cle}' illisible: {e}")
+            return 0
+        return version or 0
+
+    @staticmethod
+    def _incrementer(cle: str, session: Session, maintenant: datetime) -> bool:
+        resultat = session.exec(
+            update(ConfigVersion)
+            .where(ConfigVersion.cle == cle)
+            .values(version=ConfigVersion.version + 1, updated_at=maintenant)
+        )
+        return resultat.rowcount > 0
+
+    def obtenir(self, cle: str, session: Session, charger: Callable[[], T]) -> T:
+        """
+        Valeur en cache pour `cle`, rechargée par `charger` si la version a changé
+
+        Si `charger` lève une exception, rien n'est mis en cache et l'exception est propagée.
+        """
+        entree = self._entrees.get(cle)
+        if entree is not None and time.monotonic() - entree.verifiee_a < self.intervalle_verification:
+            return entree.valeur
+
+        version = self.version(cle, session)
+        if entree is not None and entree.version == version:
+            entree.verifiee_a = time.monotonic()
+            return entree.valeur
+
+        with self._verrou:
+            # Un autre thread a pu recharger pendant l'attente du verrou
+            entree = self._entrees.get(cle)
+            if entree is not None and entree.version == version:
+                return entree.valeur
+            valeur = charger()
+            self._entrees[cle] = _Entree(version, valeur, time.monotonic())
+        logger.debug(f"💾 Cache '{cle}' chargé (version {version})")
+        return valeur
+
+    def invalider(self, cle: str, session: Session) -> None:
+        """
+        Incrémente la version de `cle` dans la transaction de `session` (à valider par l'appelant)
+
+        Le cache local est vidé immédiatement ; les autres workers rechargent au plus
+        SETTINGS_CACHE_CHECK_S secondes après la validation.
+        """
+        maintenant = datetime.now()
+        if not self._incrementer(cle, session, maintenant):
+            try:
+                with session.begin_nested():
+                    session.add(ConfigVersion(cle=cle, version=1, updated_at=maintenant))
+            except IntegrityError:
+                # Première version créée en parallèle par un autre worker
+                self._incrementer(cle, session, maintenant)
+        self.oublier(cle)
+        logger.debug(f"🔄 Version de '{cle}' incrémentée")
+
+    def oublier(self, cle: str) -> None:
+        """Retire `cle` du cache de ce worker (sans toucher à la version partagée)"""
+        self._entrees.pop(cle, None)
+
+    def clear(self) -> None:
+        """Vide le cache de ce worker"""
+        self._entrees.clear()
         logger.debug("🗑️  Cache des paramètres vidé")
 
-    def is_valid(self) -> bool:
-        """Vérifie si le cache est valide"""
-        if self._settings is None or self._last_update is None:
-            return False
-
-        age = datetime.now() - self._last_update
-        return age.total_seconds() <= self._cache_duration
-
 
 # Instance globale
-settings_cache = SettingsCache()
+settings_cache = CacheVersionne()
 
-__all__ = ["settings_cache"]
+__all__ = ["CacheVersionne", "settings_cache"]
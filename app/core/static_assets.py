@@ -0,0 +1,332 @@
+# app/core/static_assets.py
+"""
+Pipeline des fichiers statiques : empreintes, pré-compression et variantes d'images
+
+Étape de build (scripts/build_static.py → `construire`) :
+- chaque fichier de app/static est copié dans app/static_build sous un nom à empreinte
+  (css/theme.css → css/theme.3f2a1b9c0d4e.css), servi avec un cache « immutable » ;
+- les fichiers texte reçoivent des voisins pré-compressés .gz (et .br si `brotli` est installé) ;
+- les images JPEG/PNG reçoivent des variantes WebP et AVIF aux largeurs de LARGEURS_IMAGES ;
+- manifest.json associe chaque chemin logique à son fichier, ses encodages et ses variantes.
+
+À l'exécution :
+- `FichiersStatiques` sert app/static_build puis app/static, négocie Accept-Encoding
+  (br > gzip > identité) et émet des ETag forts dérivés du contenu ;
+- `fichier_statique` (utilisé par le global Jinja `static_url`) traduit un chemin logique
+  grâce au manifeste ; sans build, les chemins sont servis tels quels depuis app/static.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.logging_config import get_logger
+from app.core.path_config import path_config
+
+logger = get_logger(__name__)
+
+MANIFESTE = "manifest.json"
+LONGUEUR_EMPREINTE = 12
+LARGEURS_IMAGES = (640, 1280, 1920)
+EXTENSIONS_COMPRESSIBLES = {".css", ".js", ".mjs", ".json", ".map", ".svg", ".txt", ".xml", ".html", ".ico"}
+EXTENSIONS_IMAGES = {".jpg", ".jpeg", ".png"}
+# Encodages pré-compressés, par ordre de préférence, et suffixe du fichier voisin
+ENCODAGES = (("br", ".br"), ("gzip", ".gz"))
+
+# Nom à empreinte : nom.<12 hex>.ext ou nom.<12 hex>.<largeur>w.ext
+_RE_EMPREINTE = re.compile(rf"\.([0-9a-f]{{{LONGUEUR_EMPREINTE}}})(?:\.\d+w)?\.[^./]+$")
+
+
+# ==========================================
+# BUILD
+# ==========================================
+
+
+def empreinte(contenu: bytes) -> str:
+    return hashlib.sha256(contenu).hexdigest()[:LONGUEUR_EMPREINTE]
+
+
+def _compresseurs() -> dict[str, Callable[[bytes], bytes]]:
+    compresseurs = {".gz": lambda contenu: gzip.compress(contenu, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+
+        compresseurs[".br"] = lambda contenu: brotli.compress(contenu, quality=11)
+    except ImportError:
+        logger.warning("⚠️  Module brotli absent : seuls les fichiers .gz seront générés")
+    return compresseurs
+
+
+def _ecrire(chemin: Path, contenu: bytes) -> None:
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    temporaire = chemin.with_name(f".{chemin.name}.tmp")
+    temporaire.write_bytes(contenu)
+    temporaire.replace(chemin)
+
+
+def _variantes_image(source: Path, cible: Path, largeurs: tuple[int, ...]) -> tuple[int, dict[str, dict[str, str]]]:
+    """Génère les variantes WebP/AVIF de `source` à côté de `cible` (nom à empreinte)"""
+    from PIL import Image, features
+
+    formats = [("webp", "WEBP", {"quality": 80, "method": 4})]
+    if features.check("avif"):
+        formats.insert(0, ("avif", "AVIF", {"quality": 55, "speed": 8}))
+
+    with Image.open(source) as image:
+        largeur_origine = image.width
+        tailles = sorted({largeur for largeur in largeurs if largeur < largeur_origine} | {largeur_origine})
+        variantes: dict[str, dict[str, str]] = {nom: {} for nom, _, _ in formats}
+        for largeur in tailles:
+            redimensionnee = None
+            for nom, format_pil, options in formats:
+                chemin = cible.with_name(f"{cible.stem}.{largeur}w.{nom}")
+                variantes[nom][str(largeur)] = chemin.name
+                if chemin.exists():
+                    continue
+                if redimensionnee is None:
+                    hauteur = round(image.height * largeur / largeur_origine)
+                    redimensionnee = image if largeur == largeur_origine else image.resize((largeur, hauteur))
+                    if redimensionnee.mode not in ("RGB", "RGBA"):
+                        redimensionnee = redimensionnee.convert(
+                            "RGBA" if redimensionnee.mode in ("P", "LA", "PA") else "RGB"
+                        )
+                chemin_tmp = chemin.with_name(f".{chemin.name}.tmp")
+                redimensionnee.save(chemin_tmp, format_pil, **options)
+                chemin_tmp.replace(chemin)
+    return largeur_origine, variantes
+
+
+def construire(
+    source: Path | None = None,
+    destination: Path | None = None,
+    largeurs: tuple[int, ...] = LARGEURS_IMAGES,
+    nettoyer: bool = True,
+) -> dict:
+    """
+    Construit app/static_build à partir de app/static et écrit le manifeste
+
+    Incrémental : un fichier dont le nom à empreinte existe déjà n'est pas régénéré.
+    Avec `nettoyer`, les fichiers absents du nouveau manifeste (anciennes empreintes) sont supprimés.
+
+    Returns:
+        Le manifeste écrit
+    """
+    source = Path(source or path_config.STATIC_DIR)
+    destination = Path(destination or path_config.STATIC_BUILD_DIR)
+    compresseurs = _compresseurs()
+    fichiers: dict[str, dict] = {}
+    produits: set[Path] = set()
+
+    for chemin in sorted(source.rglob("*")):
+        relatif = chemin.relative_to(source)
+        if not chemin.is_file() or any(partie.startswith(".") for partie in relatif.parts):
+            continue
+        contenu = chemin.read_bytes()
+        suffixe = chemin.suffix.lower()
+        cible = destination / relatif.with_name(f"{chemin.stem}.{empreinte(contenu)}{chemin.suffix}")
+        if not cible.exists():
+            _ecrire(cible, contenu)
+        produits.add(cible)
+        entree: dict = {"fichier": cible.relative_to(destination).as_posix()}
+
+        if suffixe in EXTENSIONS_COMPRESSIBLES:
+            entree["encodages"] = []
+            for encodage, suffixe_encodage in ENCODAGES:
+                if suffixe_encodage not in compresseurs:
+                    continue
+                voisin = cible.with_name(cible.name + suffixe_encodage)
+                if not voisin.exists():
+                    compresse = compresseurs[suffixe_encodage](contenu)
+                    if len(compresse) >= len(contenu) * 0.95:
+                        continue
+                    _ecrire(voisin, compresse)
+                produits.add(voisin)
+                entree["encodages"].append(encodage)
+
+        if suffixe in EXTENSIONS_IMAGES:
+            try:
+                entree["largeur"], variantes = _variantes_image(chemin, cible, largeurs)
+            except Exception as e:
+                logger.warning(f"⚠️  Variantes impossibles pour {relatif}: {e}")
+            else:
+                dossier = cible.parent.relative_to(destination)
+                entree["variantes"] = {
+                    nom: {largeur: (dossier / nom_fichier).as_posix() for largeur, nom_fichier in tailles.items()}
+                    for nom, tailles in variantes.items()
+                }
+                produits.update(cible.with_name(nom) for tailles in variantes.values() for nom in tailles.values())
+
+        fichiers[relatif.as_posix()] = entree
+
+    manifeste = {"version": 1, "fichiers": fichiers}
+    _ecrire(destination / MANIFESTE, json.dumps(manifeste, indent=2, sort_keys=True).encode())
+
+    if nettoyer:
+        for chemin in destination.rglob("*"):
+            if chemin.is_file() and chemin.name != MANIFESTE and chemin not in produits:
+                chemin.unlink()
+
+    logger.info(f"📦 Assets statiques : {len(fichiers)} fichier(s) → {destination}")
+    _cache_manifeste.clear()
+    return manifeste
+
+
+# ==========================================
+# MANIFESTE
+# ==========================================
+
+_cache_manifeste: dict[str, tuple[int, dict]] = {}
+_verrou_manifeste = threading.Lock()
+
+
+def charger_manifeste(destination: Path | None = None) -> dict[str, dict]:
+    """Entrées du manifeste (vide sans build), relu seulement si le fichier a changé"""
+    chemin = Path(destination or path_config.STATIC_BUILD_DIR) / MANIFESTE
+    try:
+        modifie = chemin.stat().st_mtime_ns
+    except OSError:
+        return {}
+    cle = str(chemin)
+    en_cache = _cache_manifeste.get(cle)
+    if en_cache and en_cache[0] == modifie:
+        return en_cache[1]
+    with _verrou_manifeste:
+        try:
+            fichiers = json.loads(chemin.read_text(encoding="utf-8")).get("fichiers", {})
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Manifeste des assets illisible ({chemin}): {e}")
+            fichiers = {}
+        _cache_manifeste[cle] = (modifie, fichiers)
+    return fichiers
+
+
+def fichier_statique(chemin: str) -> str:
+    """Chemin à servir pour le fichier logique `chemin` (nom à empreinte si le build existe)"""
+    entree = charger_manifeste().get(chemin.lstrip("/"))
+    return entree["fichier"] if entree else chemin
+
+
+def variante_statique(chemin: str, largeur: int | None = None, format: str = "webp") -> str:
+    """
+    Variante d'image au `format` demandé, la plus petite couvrant `largeur`
+    (la plus grande si aucune ne suffit) ; à défaut, le fichier lui-même
+    """
+    entree = charger_manifeste().get(chemin.lstrip("/"))
+    variantes = (entree or {}).get("variantes", {}).get(format)
+    if not variantes:
+        return fichier_statique(chemin)
+    tailles = sorted(variantes, key=int)
+    choix = next((taille for taille in tailles if largeur is not None and int(taille) >= largeur), tailles[-1])
+    return variantes[choix]
+
+
+def srcset_statique(chemin: str, format: str = "webp") -> list[tuple[str, int]]:
+    """Couples (chemin, largeur) des variantes d'une image, pour un attribut srcset"""
+    entree = charger_manifeste().get(chemin.lstrip("/"))
+    variantes = (entree or {}).get("variantes", {}).get(format, {})
+    return [(variantes[taille], int(taille)) for taille in sorted(variantes, key=int)]
+
+
+def est_empreinte(chemin: str) -> bool:
+    return _RE_EMPREINTE.search(chemin.split("?", 1)[0]) is not None
+
+
+# ==========================================
+# SERVICE DES FICHIERS
+# ==========================================
+
+
+def encodages_acceptes(accept_encoding: str) -> set[str]:
+    """Encodages acceptés par le client (q=0 exclut), '*' couvrant tous les encodages"""
+    acceptes, refuses = set(), set()
+    for element in accept_encoding.lower().split(","):
+        nom, _, parametres = element.strip().partition(";")
+        if not nom:
+            continue
+        qualite = 1.0
+        for parametre in parametres.split(";"):
+            cle, _, valeur = parametre.strip().partition("=")
+            if cle == "q":
+                try:
+                    qualite = float(valeur)
+                except ValueError:
+                    qualite = 0.0
+        (acceptes if qualite > 0 else refuses).add(nom.strip())
+    if "*" in acceptes:
+        acceptes |= {encodage for encodage, _ in ENCODAGES} - refuses
+    return acceptes
+
+
+class FichiersStatiques(StaticFiles):
+    """
+    StaticFiles servant les fichiers pré-compressés et des ETag forts
+
+    Les répertoires sont consultés dans l'ordre : le build (noms à empreinte) puis les sources.
+    """
+
+    def __init__(self, directory: str | Path, build_directory: str | Path | None = None, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.build_directory = Path(build_directory or path_config.STATIC_BUILD_DIR)
+        self.all_directories = [self.build_directory, *self.all_directories]
+        self._empreintes: dict[tuple[str, int, int], str] = {}
+
+    def _etag(self, chemin: str, stat_result: os.stat_result) -> str:
+        """Empreinte du contenu : lue dans le nom des fichiers du build, calculée une fois sinon"""
+        trouvee = _RE_EMPREINTE.search(os.path.basename(chemin))
+        if trouvee:
+            return trouvee.group(1)
+        cle = (chemin, stat_result.st_mtime_ns, stat_result.st_size)
+        valeur = self._empreintes.get(cle)
+        if valeur is None:
+            with open(chemin, "rb") as fichier:
+                valeur = hashlib.file_digest(fichier, "sha256").hexdigest()[:LONGUEUR_EMPREINTE]
+            self._empreintes[cle] = valeur
+        return valeur
+
+    def file_response(
+        self,
+        full_path: "os.PathLike | str",
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        chemin = os.fspath(full_path)
+        etag = self._etag(chemin, stat_result)
+        headers = {}
+        servi, stat_servi, encodage_servi = chemin, stat_result, None
+
+        if os.path.splitext(chemin)[1].lower() in EXTENSIONS_COMPRESSIBLES:
+            acceptes = encodages_acceptes(request_headers.get("accept-encoding", ""))
+            for encodage, suffixe in ENCODAGES:
+                try:
+                    stat_voisin = os.stat(chemin + suffixe)
+                except OSError:
+                    continue
+                headers["vary"] = "Accept-Encoding"
+                if encodage_servi is None and encodage in acceptes:
+                    servi, stat_servi, encodage_servi = chemin + suffixe, stat_voisin, encodage
+
+        if encodage_servi:
+            headers["content-encoding"] = encodage_servi
+            etag = f"{etag}-{encodage_servi}"
+        headers["etag"] = f'"{etag}"'
+
+        media_type = mimetypes.guess_type(chemin)[0] or "text/plain"
+        response = FileResponse(
+            servi, status_code=status_code, headers=headers, media_type=media_type, stat_result=stat_servi
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,173 @@
+"""
+Bootstrap de la base de données et tampon de version du schéma
+
+Le bootstrap complet (création de la base, des tables, migrations, paramètres système,
+administrateur) est exécuté une seule fois par version du schéma :
+- par la commande `python scripts/bootstrap.py` (avant de lancer les workers) ;
+- ou par le premier worker qui démarre sur une base non initialisée, sous un verrou
+  consultatif (pg_advisory_lock en PostgreSQL, verrou de fichier en SQLite) : les autres
+  workers attendent puis constatent que le tampon est à jour.
+
+Au démarrage, un worker ne fait donc qu'une lecture : l'empreinte enregistrée dans
+`schema_version` est comparée à celle calculée depuis les modèles.
+
+En PostgreSQL, la base elle-même est créée avant la prise du verrou (qui a besoin
+d'une connexion à cette base), via la base de maintenance `postgres`.
+"""
+
+import hashlib
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy import Engine, MetaData, create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.db.session import engine as default_engine
+from app.db.verrous import VerrouConsultatif
+from app.models.schema_version import SchemaVersion
+
+logger = get_logger(__name__)
+
+# À incrémenter quand l'initialisation change sans modifier les modèles
+# (paramètres système par défaut, données de référence...)
+# 2 : contrainte d'unicité et alimentation du cube SIGOBE pour l'historique
+REVISION_INITIALISATION = 2
+
+
+def empreinte_schema(metadata: MetaData | None = None) -> str:
+    """
+    Empreinte du schéma attendu par le code
+
+    Calculée depuis les tables, colonnes, types, nullabilité et clés primaires des modèles :
+    toute modification d'un modèle produit une nouvelle version.
+    """
+    if metadata is None:
+        import app.models  # noqa: F401 - enregistre toutes les tables dans SQLModel.metadata
+
+        metadata = SQLModel.metadata
+
+    empreinte = hashlib.sha256(f"revision={REVISION_INITIALISATION}".encode())
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        empreinte.update(f"\n{table.name}".encode())
+        for colonne in sorted(table.columns, key=lambda c: c.name):
+            empreinte.update(f"|{colonne.name}:{colonne.type!r}:{colonne.nullable}:{colonne.primary_key}".encode())
+    return empreinte.hexdigest()
+
+
+def base_absente(engine: Engine) -> bool:
+    """True si le serveur PostgreSQL répond mais que la base de `engine` n'existe pas encore"""
+    if engine.dialect.name != "postgresql":
+        return False
+    serveur = create_engine(engine.url.set(database="postgres"), poolclass=NullPool)
+    try:
+        with serveur.connect() as conn:
+            existe = conn.execute(
+                text("SELECT 1 FROM pg_database WHERE datname = :nom"), {"nom": engine.url.database}
+            ).first()
+        return existe is None
+    except Exception:
+        return False
+    finally:
+        serveur.dispose()
+
+
+def lire_version(engine: Engine = default_engine) -> str | None:
+    """Empreinte enregistrée par le dernier bootstrap (None si la base n'est pas initialisée ou n'existe pas)"""
+    try:
+        if not inspect(engine).has_table(SchemaVersion.__tablename__):
+            return None
+    except OperationalError:
+        if base_absente(engine):
+            logger.info(f"📦 La base '{engine.url.database}' n'existe pas encore")
+            return None
+        raise
+    with Session(engine) as session:
+        tampon = session.get(SchemaVersion, 1)
+        return tampon.version if tampon else None
+
+
+def enregistrer_version(version: str, engine: Engine = default_engine) -> None:
+    """Enregistre l'empreinte du schéma appliqué"""
+    SQLModel.metadata.create_all(engine, tables=[SchemaVersion.__table__])
+    with Session(engine) as session:
+        tampon = session.get(SchemaVersion, 1) or SchemaVersion(version=version)
+        tampon.version = version
+        tampon.applied_at = datetime.now()
+        session.add(tampon)
+        session.commit()
+
+
+def schema_a_jour(engine: Engine = default_engine) -> bool:
+    """True si le dernier bootstrap correspond au schéma attendu par le code"""
+    return lire_version(engine) == empreinte_schema()
+
+
+def bootstrap(
+    engine: Engine = default_engine,
+    initialiser: Callable[[], bool] | None = None,
+    force: bool = False,
+    creer_base: Callable[[], bool] | None = None,
+) -> bool:
+    """
+    Exécute l'initialisation complète une seule fois pour la version courante du schéma
+
+    Args:
+        engine: Moteur de la base à initialiser
+        initialiser: Étapes d'initialisation (par défaut scripts.init_db.initialize_database)
+        force: Exécuter même si le tampon est à jour
+        creer_base: Création de la base, exécutée avant la prise du verrou
+            (par défaut, avec l'initialisation par défaut : scripts.init_db.create_database_if_not_exists)
+
+    Returns:
+        True si la base est prête (initialisée ici ou par un autre processus)
+    """
+    if initialiser is None:
+        from scripts.init_db import create_database_if_not_exists, initialize_database
+
+        initialiser = initialize_database
+        creer_base = creer_base or create_database_if_not_exists
+
+    # Le verrou consultatif se prend sur la base elle-même : elle doit exister
+    if creer_base is not None and not creer_base():
+        logger.error("❌ Bootstrap en échec : base de données inaccessible ou impossible à créer")
+        return False
+
+    version = empreinte_schema()
+    with VerrouConsultatif(engine, "bootstrap"):
+        # Relecture sous verrou : un autre worker a peut-être terminé pendant l'attente
+        if not force and lire_version(engine) == version:
+            logger.info("✅ Schéma déjà initialisé par un autre processus")
+            return True
+
+        logger.info(f"🗄️  Bootstrap de la base (schéma {version[:12]})...")
+        if not initialiser():
+            logger.error("❌ Bootstrap en échec : le tampon de version n'est pas mis à jour")
+            return False
+
+        enregistrer_version(version, engine)
+        logger.info(f"✅ Bootstrap terminé, schéma {version[:12]} enregistré")
+        return True
+
+
+def preparer_base(engine: Engine = default_engine) -> bool:
+    """
+    Chemin rapide du démarrage d'un worker
+
+    Une seule lecture si le schéma est à jour ; sinon bootstrap sous verrou
+    (ou erreur si DB_BOOTSTRAP_ON_STARTUP est désactivé).
+    """
+    try:
+        if schema_a_jour(engine):
+            logger.info("✅ Schéma de la base à jour, initialisation ignorée")
+            return True
+    except Exception as e:
+        logger.warning(f"⚠️  Lecture du tampon de version impossible: {e}")
+
+    if not settings.DB_BOOTSTRAP_ON_STARTUP:
+        logger.error("❌ Base non initialisée ou schéma obsolète : exécutez `python scripts/bootstrap.py`")
+        return False
+    return bootstrap(engine)
@@ -0,0 +1,135 @@
+# app/db/query_stats.py
+"""
+Instrumentation des requêtes SQL
+- comptage des requêtes et du temps passé en base pour chaque requête HTTP
+- journalisation des requêtes lentes
+- détection des requêtes identiques répétées (motif N+1)
+"""
+
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+logger = get_logger("mppeep.sql")
+
+# Longueur maximale d'une requête SQL recopiée dans les logs
+EXTRAIT_SQL = 300
+
+
+@dataclass
+class StatistiquesRequetes:
+    """Requêtes SQL exécutées pendant une requête HTTP (ou un bloc de code)"""
+
+    total: int = 0
+    duree: float = 0.0  # Secondes cumulées
+    instructions: Counter = field(default_factory=Counter)
+
+    @property
+    def duree_ms(self) -> float:
+        return self.duree * 1000
+
+    def enregistrer(self, sql: str, duree: float) -> None:
+        self.total += 1
+        self.duree += duree
+        self.instructions[sql] += 1
+
+    def repetitions(self, seuil: int | None = None) -> list[tuple[str, int]]:
+        """Requêtes identiques (mêmes SQL, paramètres différents) exécutées au moins `seuil` fois"""
+        seuil = seuil or settings.DB_N_PLUS_ONE_SEUIL
+        return [(sql, nombre) for sql, nombre in self.instructions.most_common() if nombre >= seuil]
+
+    def resume(self) -> str:
+        lignes = [f"{self.total} requêtes SQL ({self.duree_ms:.1f}ms)"]
+        lignes += [f"  {nombre}x {_extrait(sql)}" for sql, nombre in self.instructions.most_common(10)]
+        return "\n".join(lignes)
+
+
+_statistiques: ContextVar[StatistiquesRequetes | None] = ContextVar("statistiques_sql", default=None)
+
+
+def _extrait(sql: str) -> str:
+    sql = " ".join(sql.split())
+    return sql if len(sql) <= EXTRAIT_SQL else sql[:EXTRAIT_SQL] + "…"
+
+
+def _avant_execution(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("debuts_requetes", []).append(time.perf_counter())
+
+
+def _apres_execution(conn, cursor, statement, parameters, context, executemany) -> None:
+    debuts = conn.info.get("debuts_requetes")
+    if not debuts:
+        return
+    duree = time.perf_counter() - debuts.pop()
+
+    stats = _statistiques.get()
+    if stats is not None:
+        stats.enregistrer(statement, duree)
+
+    if duree * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warning(f"🐢 Requête SQL lente ({duree * 1000:.0f}ms): {_extrait(statement)}")
+
+
+def _erreur_execution(contexte) -> None:
+    """Requête en échec : after_cursor_execute n'est pas appelé, on retire son heure de début"""
+    if contexte.connection is None or contexte.statement is None:
+        return
+    debuts = contexte.connection.info.get("debuts_requetes")
+    if debuts:
+        debuts.pop()
+
+
+def instrumenter_moteur(engine: Engine) -> None:
+    """Branche le comptage et la journalisation des requêtes sur un moteur (synchrone)"""
+    if not event.contains(engine, "before_cursor_execute", _avant_execution):
+        event.listen(engine, "before_cursor_execute", _avant_execution)
+        event.listen(engine, "after_cursor_execute", _apres_execution)
+        event.listen(engine, "handle_error", _erreur_execution)
+
+
+@contextmanager
+def suivre_requetes() -> Iterator[StatistiquesRequetes]:
+    """
+    Collecte les requêtes SQL exécutées dans le contexte courant
+
+    La variable de contexte est héritée par les tâches et les threads lancés
+    par Starlette : les requêtes d'un endpoint synchrone sont bien comptées.
+    """
+    stats = StatistiquesRequetes()
+    jeton = _statistiques.set(stats)
+    try:
+        yield stats
+    finally:
+        _statistiques.reset(jeton)
+
+
+@contextmanager
+def compter_requetes(engine: Engine) -> Iterator[StatistiquesRequetes]:
+    """
+    Compte toutes les requêtes exécutées sur un moteur, quel que soit le thread (tests)
+    """
+    stats = StatistiquesRequetes()
+    debuts: dict[int, float] = {}
+
+    def avant(conn, cursor, statement, parameters, context, executemany):
+        debuts[id(cursor)] = time.perf_counter()
+
+    def apres(conn, cursor, statement, parameters, context, executemany):
+        stats.enregistrer(statement, time.perf_counter() - debuts.pop(id(cursor), time.perf_counter()))
+
+    event.listen(engine, "before_cursor_execute", avant)
+    event.listen(engine, "after_cursor_execute", apres)
+    try:
+        yield stats
+    finally:
+        event.remove(engine, "before_cursor_execute", avant)
+        event.remove(engine, "after_cursor_execute", apres)
@@ -1,21 +1,40 @@
+from collections.abc import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import Session, SQLModel, create_engine
-from sqlalchemy.pool import QueuePool
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # from app.core.logique_metier.rh_workflow import ensure_workflow_steps  # ← Ancien système désactivé
 from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.db.query_stats import instrumenter_moteur
+
+logger = get_logger(__name__)
+
+# Paramètres du pool de connexions (configurables via Settings / variables d'environnement)
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,  # Connexions permanentes
+    "max_overflow": settings.DB_MAX_OVERFLOW,  # Connexions supplémentaires
+    "pool_timeout": settings.DB_POOL_TIMEOUT,  # Timeout d'attente d'une connexion (secondes)
+    "pool_recycle": settings.DB_POOL_RECYCLE,  # Recyclage des connexions
+    "pool_pre_ping": True,  # Test de connexion avant utilisation
+}
 
 # Configuration optimisée pour les connexions simultanées
 engine = create_engine(
-    settings.database_url, 
+    settings.database_url,
     echo=settings.DEBUG,
-    # Pool de connexions optimisé pour la production
     poolclass=QueuePool,
-    pool_size=10,           # Connexions permanentes (au lieu de 5)
-    max_overflow=20,        # Connexions supplémentaires (au lieu de 10)
-    pool_timeout=30,        # Timeout d'attente d'une connexion (secondes)
-    pool_recycle=3600,      # Recyclage des connexions (1 heure)
-    pool_pre_ping=True      # Test de connexion avant utilisation
+    **POOL_OPTIONS,
 )
+# Comptage par requête HTTP, requêtes lentes et détection des N+1
+instrumenter_moteur(engine)
+
+# Moteur asynchrone (asyncpg en production, aiosqlite en dev/tests), créé au premier usage :
+# les pilotes asynchrones ne sont chargés que si un endpoint asynchrone est appelé
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
 
 
 def init_db() -> None:
@@ -26,3 +45,42 @@ def get_session():
     with Session(engine) as session:
         # ensure_workflow_steps(session)  # ← Ancien système désactivé - Utiliser les workflows personnalisés
         yield session
+
+
+def get_async_engine() -> AsyncEngine:
+    """Retourne le moteur asynchrone partagé (même base que le moteur synchrone)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            settings.async_database_url,
+            echo=settings.DEBUG,
+            poolclass=AsyncAdaptedQueuePool,
+            **POOL_OPTIONS,
+        )
+        instrumenter_moteur(_async_engine.sync_engine)
+        # expire_on_commit=False : les objets restent lisibles après commit sans I/O implicite
+        _async_session_factory = async_sessionmaker(_async_engine, class_=AsyncSession, expire_on_commit=False)
+        logger.info(f"⚡ Moteur de base asynchrone initialisé ({_async_engine.url.drivername})")
+    return _async_engine
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """
+    Dépendance FastAPI fournissant une AsyncSession
+
+    À utiliser dans les endpoints `async def` de lecture fréquente : la requête
+    attend la base sans occuper un thread du pool de Starlette.
+    """
+    get_async_engine()
+    async with _async_session_factory() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    """Ferme les connexions du moteur asynchrone (appelé à l'arrêt de l'application)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+        logger.info("🛑 Moteur de base asynchrone fermé")
@@ -0,0 +1,158 @@
+"""
+Verrous consultatifs partagés entre les processus (workers uvicorn, scripts)
+
+- PostgreSQL : pg_advisory_lock sur une connexion dédiée, libéré à la fermeture de la connexion
+- SQLite : verrou exclusif sur un fichier voisin de la base, libéré par le système à la fin du processus
+- SQLite en mémoire : verrou de thread (un seul processus peut voir la base)
+
+Dans tous les cas, le verrou disparaît avec le processus qui le détient : un autre processus
+peut alors l'acquérir (reprise après la mort d'un worker).
+"""
+
+import contextlib
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import IO
+
+from sqlalchemy import Connection, Engine, text
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_verrous_memoire: dict[str, threading.Lock] = {}
+
+
+class VerrouConsultatif:
+    """Verrou nommé, exclusif entre processus partageant la même base"""
+
+    def __init__(self, engine: Engine, nom: str):
+        self.engine = engine
+        self.nom = nom
+        # Clé 32 bits stable (PostgreSQL accepte un bigint)
+        self.cle = zlib.crc32(f"mppeep:{nom}".encode())
+        self._connexion: Connection | None = None
+        self._fichier: IO[bytes] | None = None
+        self._verrou_memoire: threading.Lock | None = None
+
+    @property
+    def detenu(self) -> bool:
+        return self._connexion is not None or self._fichier is not None or self._verrou_memoire is not None
+
+    def acquerir(self, bloquant: bool = True) -> bool:
+        """Acquiert le verrou (sans attendre si bloquant=False) ; retourne True s'il est détenu"""
+        if self.detenu:
+            return True
+        if self.engine.dialect.name == "postgresql":
+            return self._acquerir_postgresql(bloquant)
+
+        base = self.engine.url.database
+        if not base or base == ":memory:":
+            verrou = _verrous_memoire.setdefault(self.nom, threading.Lock())
+            if verrou.acquire(blocking=bloquant):
+                self._verrou_memoire = verrou
+                return True
+            return False
+        return self._acquerir_fichier(Path(f"{base}.{self.nom}.lock"), bloquant)
+
+    def verifier(self) -> bool:
+        """True si le verrou est toujours détenu (la connexion PostgreSQL qui le porte est vivante)"""
+        if self._connexion is None:
+            return self.detenu
+        try:
+            self._connexion.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️  Verrou '{self.nom}' perdu (connexion fermée): {e}")
+            self._fermer_connexion()
+            return False
+
+    def liberer(self) -> None:
+        if self._connexion is not None:
+            try:
+                self._connexion.execute(text("SELECT pg_advisory_unlock(:cle)"), {"cle": self.cle})
+            except Exception as e:
+                logger.debug(f"Libération du verrou '{self.nom}' impossible: {e}")
+            self._fermer_connexion()
+        if self._fichier is not None:
+            _deverrouiller_fichier(self._fichier)
+            self._fichier.close()
+            self._fichier = None
+        if self._verrou_memoire is not None:
+            self._verrou_memoire.release()
+            self._verrou_memoire = None
+
+    def __enter__(self) -> "VerrouConsultatif":
+        self.acquerir()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.liberer()
+
+    def _acquerir_postgresql(self, bloquant: bool) -> bool:
+        # Connexion dédiée en autocommit : le verrou de session vit aussi longtemps qu'elle
+        connexion = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            if bloquant:
+                connexion.execute(text("SELECT pg_advisory_lock(:cle)"), {"cle": self.cle})
+                obtenu = True
+            else:
+                obtenu = connexion.execute(text("SELECT pg_try_advisory_lock(:cle)"), {"cle": self.cle}).scalar()
+        except Exception:
+            connexion.close()
+            raise
+        if not obtenu:
+            connexion.close()
+            return False
+        self._connexion = connexion
+        return True
+
+    def _acquerir_fichier(self, chemin: Path, bloquant: bool) -> bool:
+        fichier = chemin.open("a+b")
+        if not _verrouiller_fichier(fichier, bloquant):
+            fichier.close()
+            return False
+        self._fichier = fichier
+        return True
+
+    def _fermer_connexion(self) -> None:
+        with contextlib.suppress(Exception):
+            self._connexion.close()
+        self._connexion = None
+
+
+def _verrouiller_fichier(fichier: IO[bytes], bloquant: bool) -> bool:
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+
+        fichier.seek(0)
+        while True:
+            try:
+                msvcrt.locking(fichier.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not bloquant:
+                    return False
+                time.sleep(0.5)
+
+    try:
+        fcntl.flock(fichier.fileno(), fcntl.LOCK_EX if bloquant else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _deverrouiller_fichier(fichier: IO[bytes]) -> None:
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+
+        fichier.seek(0)
+        msvcrt.locking(fichier.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+    fcntl.flock(fichier.fileno(), fcntl.LOCK_UN)
@@ -9,6 +9,7 @@ from app.api.v1 import api_router
 from app.core.config import settings
 from app.core.logging_config import get_logger, setup_logging  # ⬅️ on importe setup_logging
 from app.core.middleware import setup_middlewares
+from app.core.static_assets import FichiersStatiques
 from app.templates import get_template_context, templates
 
 from app.api.v1.endpoints.auth import get_current_user
@@ -28,14 +29,26 @@ async def lifespan(app: FastAPI):
     logger.info(f"📊 Environnement : {settings.ENV}")
     logger.info(f"🐛 Debug mode : {settings.DEBUG}")
     try:
-        # Initialisation de la base de données principale
-        from scripts.init_db import initialize_database
+        # Vérification du tampon de version du schéma (bootstrap sous verrou si nécessaire)
+        from app.db.bootstrap import preparer_base
 
-        logger.info("🗄️  Initialisation de la base de données...")
-        initialize_database()
-        logger.info("✅ Initialisation de la base terminée avec succès")
+        logger.info("🗄️  Vérification de la base de données...")
+        if preparer_base():
+            logger.info("✅ Base de données prête")
+
+        # Compilation des templates (le premier rendu de chaque page ne la paie plus)
+        if settings.TEMPLATES_PRECOMPILE_ON_STARTUP:
+            from app.templates import precompiler_templates
+
+            precompiler_templates()
 
         logger.info("✅ Système RH : Workflows personnalisés activés")
+
+        # Publication des métriques du worker (agrégées entre workers par /metrics)
+        if settings.ENABLE_METRICS:
+            from app.core.metrics import partage
+
+            partage.demarrer()
         
         # Démarrer le planificateur de tâches (nettoyage automatique)
         from app.core.scheduler import start_scheduler
@@ -61,6 +74,28 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Erreur arrêt scheduler: {e}")
 
+    # Dernière publication des métriques du worker (ses compteurs restent dans l'agrégat)
+    if settings.ENABLE_METRICS:
+        try:
+            from app.core.metrics import partage
+            partage.arreter()
+        except Exception as e:
+            logger.error(f"❌ Erreur arrêt de la publication des métriques: {e}")
+
+    # Arrêter les pools de processus (extraction PDF, rendu des lettres d'engagement)
+    try:
+        from app.core.process_pool import arreter_pools
+        arreter_pools()
+    except Exception as e:
+        logger.error(f"❌ Erreur arrêt des pools de processus: {e}")
+
+    # Fermer les connexions du moteur asynchrone
+    try:
+        from app.db.session import dispose_async_engine
+        await dispose_async_engine()
+    except Exception as e:
+        logger.error(f"❌ Erreur fermeture moteur asynchrone: {e}")
+
 
 # 3) App FastAPI
 root_path = settings.get_root_path  # Dynamique selon DEBUG/ENV
@@ -132,7 +167,7 @@ setup_middlewares(subapp, settings)
 
 
 # 5) Static & templates
-subapp.mount("/static", StaticFiles(directory="app/static"), name="static")
+subapp.mount("/static", FichiersStatiques(directory="app/static"), name="static")
 subapp.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
 # 6) API
@@ -19,9 +19,11 @@ from app.models.budget import (
     ServiceBeneficiaire,
     SigobeChargement,
     SigobeExecution,
+    SigobeFaitAgrege,
     SigobeKpi,
 )
-from app.models.file import File
+from app.models.config_version import ConfigVersion
+from app.models.file import BlobContenu, File
 from app.models.personnel import (
     AgentComplet,
     Direction,
@@ -40,6 +42,8 @@ from app.models.performance import (
     RapportPerformance,
 )
 from app.models.rh import Agent, Grade, HRRequest, WorkflowHistory, WorkflowStep
+from app.models.schema_version import SchemaVersion
+from app.models.scheduler_run import SchedulerRun
 from app.models.session import UserSession
 from app.models.workflow_config import (
     CustomRole,
@@ -70,7 +74,9 @@ __all__ = [
     "AgentComplet",
     "Article",
     "BesoinAgent",
+    "BlobContenu",
     "CategorieArticle",
+    "ConfigVersion",
     "ConsolidationBesoin",
     "CustomRole",
     "CustomRoleAssignment",
@@ -102,10 +108,13 @@ __all__ = [
     "ProgrammePerformance",
     "RapportPerformance",
     "RequestTypeCustom",
+    "SchedulerRun",
+    "SchemaVersion",
     "Service",
     "ServiceBeneficiaire",
     "SigobeChargement",
     "SigobeExecution",
+    "SigobeFaitAgrege",
     "SigobeKpi",
     "SuiviBesoin",
     "SystemSettings",
@@ -6,6 +6,7 @@ Modèles pour la gestion budgétaire
 from datetime import date, datetime
 from decimal import Decimal
 
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, SQLModel
 
 
@@ -146,6 +147,7 @@ class DocumentBudget(SQLModel, table=True):
     nom_fichier: str
     file_path: str
     taille_octets: int
+    sha256: str | None = Field(default=None, max_length=64, index=True)  # Blob partagé (BlobContenu)
 
     # Metadata
     uploaded_by_user_id: int = Field(foreign_key="user.id")
@@ -370,6 +372,7 @@ class DocumentLigneBudgetaire(SQLModel, table=True):
     chemin_fichier: str = Field(max_length=1000)  # Chemin complet: uploads/budget/lignes/{ligne_id}/...
     type_fichier: str = Field(max_length=50)  # Extension: .pdf, .xlsx, etc.
     taille_octets: int = Field(default=0)  # Taille en octets
+    sha256: str | None = Field(default=None, max_length=64, index=True)  # Blob partagé (BlobContenu)
 
     # Codes pour identification rapide et traçabilité
     code_action: str = Field(max_length=50)
@@ -495,3 +498,43 @@ class SigobeKpi(SQLModel, table=True):
     # Traçabilité
     chargement_id: int = Field(foreign_key="sigobe_chargement.id")
     date_calcul: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SigobeFaitAgrege(SQLModel, table=True):
+    """
+    Cube analytique SIGOBE (table de faits pré-agrégée)
+    Une ligne par chargement x programme x action x type de dépense.
+    Maintenue à l'import et à la suppression des chargements, elle permet
+    les tendances pluriannuelles sans relire sigobe_execution.
+    """
+
+    __tablename__ = "sigobe_fait_agrege"
+    __table_args__ = (
+        UniqueConstraint("chargement_id", "programme", "action", "type_depense", name="uq_sigobe_fait_agrege_cellule"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+
+    # Lien avec le chargement (sert à la purge et au choix du dernier chargement par période)
+    chargement_id: int = Field(foreign_key="sigobe_chargement.id", index=True)
+
+    # Période
+    annee: int = Field(index=True)
+    trimestre: int | None = Field(default=None, index=True)
+
+    # Dimensions
+    programme: str = Field(default="", max_length=500, index=True)
+    action: str = Field(default="", max_length=500, index=True)
+    type_depense: str = Field(default="", max_length=200, index=True)
+
+    # Mesures (sommes en FCFA)
+    budget_vote: Decimal = Field(default=0, decimal_places=2, max_digits=18)
+    budget_actuel: Decimal = Field(default=0, decimal_places=2, max_digits=18)
+    engagements_emis: Decimal = Field(default=0, decimal_places=2, max_digits=18)
+    disponible_eng: Decimal = Field(default=0, decimal_places=2, max_digits=18)
+    mandats_emis: Decimal = Field(default=0, decimal_places=2, max_digits=18)
+    mandats_vise_cf: Decimal = Field(default=0, decimal_places=2, max_digits=18)
+    mandats_pec: Decimal = Field(default=0, decimal_places=2, max_digits=18)
+    nb_lignes: int = 0
+
+    date_calcul: datetime = Field(default_factory=datetime.utcnow)
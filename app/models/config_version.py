@@ -0,0 +1,28 @@
+"""
+Modèle pour les numéros de version de la configuration partagée entre workers
+"""
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class ConfigVersion(SQLModel, table=True):
+    """
+    Compteur de version d'une configuration mise en cache par chaque worker
+
+    Chaque modification (paramètres système...) incrémente le compteur dans la même
+    transaction ; les workers comparent leur version en cache à celle-ci pour savoir
+    s'ils doivent recharger (voir app/core/settings_cache.py).
+
+    Attributes:
+        cle: Nom de la configuration (ex: "system_settings")
+        version: Compteur incrémenté à chaque modification
+        updated_at: Date de la dernière modification
+    """
+
+    __tablename__ = "config_version"
+
+    cle: str = Field(primary_key=True, max_length=100)
+    version: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.now)
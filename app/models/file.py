@@ -21,6 +21,7 @@ class File(SQLModel, table=True):
         title: Titre descriptif du fichier
         description: Description optionnelle
         file_size: Taille du fichier en bytes
+        sha256: Empreinte SHA-256 du contenu
         mime_type: Type MIME du fichier
         status: Statut du traitement (uploaded, processing, processed, error)
         processing_error: Message d'erreur si échec
@@ -40,6 +41,7 @@ class File(SQLModel, table=True):
     stored_filename: str = Field(max_length=500)
     file_path: str = Field(max_length=1000)
     file_size: int  # En bytes
+    sha256: str | None = Field(default=None, max_length=64, index=True)  # Empreinte du contenu (clé de l'aperçu)
     mime_type: str = Field(max_length=100, default="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
     # Métadonnées
@@ -78,3 +80,22 @@ class File(SQLModel, table=True):
     def file_size_mb(self) -> float:
         """Retourne la taille en MB"""
         return round(self.file_size / (1024 * 1024), 2)
+
+
+class BlobContenu(SQLModel, table=True):
+    """
+    Contenu de fichier adressé par son empreinte SHA-256
+
+    Un même contenu (ex: un PDF joint à plusieurs lignes) n'est stocké qu'une fois
+    sous uploads/blobs/{sha[:2]}/{sha[2:4]}/ ; les documents y font référence et
+    nb_references compte ces références. Un blob à 0 référence est purgé par le cron.
+    """
+
+    __tablename__ = "blob_contenu"
+
+    sha256: str = Field(primary_key=True, max_length=64)
+    chemin: str = Field(max_length=500)  # Relatif à UPLOADS_DIR
+    taille: int = Field(default=0)
+    nb_references: int = Field(default=0, index=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
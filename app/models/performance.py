@@ -240,8 +240,9 @@ class RapportPerformance(SQLModel, table=True):
     date_debut: date
     date_fin: date
 
-    # Chemin du fichier généré
+    # Chemin du fichier généré (relatif à uploads/, partagé entre rapports de même clé)
     fichier_path: str | None = Field(max_length=500)
+    cle_cache: str | None = Field(default=None, max_length=64, index=True)
     fichier_nom: str = Field(max_length=200)
     fichier_taille: int | None = None  # Taille en octets
 
@@ -208,6 +208,7 @@ class DocumentAgent(SQLModel, table=True):
     file_name: str = Field(max_length=255)
     file_size: int | None = None  # en octets
     file_type: str | None = Field(default=None, max_length=50)  # MIME type
+    sha256: str | None = Field(default=None, max_length=64, index=True)  # Blob partagé (BlobContenu)
 
     # Dates importantes (pour documents avec validité)
     date_emission: date | None = None
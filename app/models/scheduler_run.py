@@ -0,0 +1,36 @@
+"""
+Modèle pour l'historique des tâches planifiées
+"""
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class SchedulerRun(SQLModel, table=True):
+    """
+    Exécution d'une tâche planifiée (une ligne par passage)
+
+    Attributes:
+        id: Identifiant unique
+        job_id: Identifiant de la tâche (daily_cleanup, cleanup_expired_sessions...)
+        worker: Processus ayant exécuté la tâche (hôte:pid du worker leader)
+        started_at: Début de l'exécution
+        finished_at: Fin de l'exécution (None tant que la tâche tourne)
+        duration_ms: Durée en millisecondes
+        status: en_cours, succes ou echec
+        resultat: Nombre d'éléments traités retourné par la tâche
+        erreur: Message d'erreur en cas d'échec
+    """
+
+    __tablename__ = "scheduler_run"
+
+    id: int | None = Field(default=None, primary_key=True)
+    job_id: str = Field(max_length=100, index=True)
+    worker: str = Field(max_length=255)
+    started_at: datetime = Field(default_factory=datetime.now, index=True)
+    finished_at: datetime | None = Field(default=None)
+    duration_ms: float | None = Field(default=None)
+    status: str = Field(default="en_cours", max_length=20)
+    resultat: int | None = Field(default=None)
+    erreur: str | None = Field(default=None, max_length=2000)
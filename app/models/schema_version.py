@@ -0,0 +1,27 @@
+"""
+Modèle pour le tampon de version du schéma
+"""
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class SchemaVersion(SQLModel, table=True):
+    """
+    Version du schéma appliquée par le dernier bootstrap réussi
+
+    Au démarrage, chaque worker compare l'empreinte attendue (calculée depuis les modèles)
+    à celle enregistrée ici : si elles sont identiques, l'initialisation est ignorée.
+
+    Attributes:
+        id: Identifiant unique (toujours 1 - singleton)
+        version: Empreinte du schéma attendu par le code
+        applied_at: Date du bootstrap
+    """
+
+    __tablename__ = "schema_version"
+
+    id: int = Field(default=1, primary_key=True)  # Singleton - toujours ID 1
+    version: str = Field(max_length=64)
+    applied_at: datetime = Field(default_factory=datetime.now)
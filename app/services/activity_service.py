@@ -9,6 +9,7 @@ from sqlmodel import Session, select
 
 from app.core.logging_config import get_logger
 from app.models.activity import Activity
+from app.services.retention_service import RetentionService
 
 logger = get_logger(__name__)
 
@@ -206,17 +207,7 @@ class ActivityService:
             Nombre d'activités supprimées
         """
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
-
-            statement = select(Activity).where(Activity.created_at < cutoff_date)
-            old_activities = db_session.exec(statement).all()
-
-            count = len(old_activities)
-
-            for activity in old_activities:
-                db_session.delete(activity)
-
-            db_session.commit()
+            count = RetentionService.purger_activites(db_session, days)
 
             logger.info(f"🧹 {count} activités anciennes supprimées")
 
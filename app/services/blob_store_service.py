@@ -0,0 +1,182 @@
+# app/services/blob_store_service.py
+"""
+Magasin de contenus adressés par empreinte (SHA-256)
+Un contenu identique n'est écrit qu'une fois sous uploads/blobs/ab/cd/ ; les documents
+référencent le blob et la table blob_contenu compte les références
+"""
+
+import contextlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fastapi import UploadFile
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, delete, update
+
+from app.core.logging_config import get_logger
+from app.core.path_config import path_config
+from app.models.file import BlobContenu
+from app.services.upload_service import FichierRecu, UploadService
+
+logger = get_logger(__name__)
+
+# Fichiers reçus en attente de rangement, dans session.info : [(FichierRecu, destination)]
+_CLE_EN_ATTENTE = "blobs_en_attente"
+
+
+def _ranger_apres_commit(session: Session) -> None:
+    """Range les nouveaux blobs une fois leur ligne validée (pas au commit d'un savepoint)"""
+    if session.in_nested_transaction():
+        return
+    for recu, destination in session.info.pop(_CLE_EN_ATTENTE, []):
+        if destination.exists():
+            # Rangé entre-temps par une requête concurrente (même contenu)
+            recu.supprimer()
+        else:
+            recu.deplacer(destination)
+            logger.info(f"📦 Nouveau blob : {recu.nom_original} → {destination.name}")
+
+
+def _abandonner_en_fin_de_transaction(session: Session, transaction) -> None:
+    """Transaction principale terminée sans commit (rollback, fermeture) : fichiers reçus supprimés"""
+    if transaction.parent is not None:
+        return
+    for recu, _ in session.info.pop(_CLE_EN_ATTENTE, []):
+        recu.supprimer()
+        logger.info(f"🗑️ Blob abandonné (transaction annulée) : {recu.nom_original}")
+
+
+class BlobStoreService:
+    """Service de stockage dédupliqué des fichiers uploadés"""
+
+    RACINE = path_config.UPLOADS_DIR / "blobs"
+
+    @staticmethod
+    def chemin_relatif(sha256: str, extension: str = "") -> str:
+        """Chemin du blob relatif à UPLOADS_DIR (répertoires répartis sur les 4 premiers caractères)"""
+        return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension.lower()}"
+
+    @staticmethod
+    def chemin_absolu(blob: BlobContenu) -> Path:
+        return path_config.UPLOADS_DIR / blob.chemin
+
+    @staticmethod
+    def chemin_contenu(sha256: str, session: Session) -> Path | None:
+        """Chemin physique du blob d'empreinte sha256 (None s'il n'est pas connu)"""
+        blob = session.get(BlobContenu, sha256)
+        return BlobStoreService.chemin_absolu(blob) if blob else None
+
+    @staticmethod
+    def _incrementer(sha256: str, session: Session) -> bool:
+        resultat = session.exec(
+            update(BlobContenu)
+            .where(BlobContenu.sha256 == sha256)
+            .values(nb_references=BlobContenu.nb_references + 1, updated_at=datetime.now())
+        )
+        return resultat.rowcount > 0
+
+    @staticmethod
+    def _ranger_au_commit(recu: FichierRecu, destination: Path, session: Session) -> None:
+        """Diffère le rangement du fichier au commit de la session (supprimé si elle est annulée)"""
+        if not session.info.get("blobs_ecoute"):
+            event.listen(session, "after_commit", _ranger_apres_commit)
+            event.listen(session, "after_transaction_end", _abandonner_en_fin_de_transaction)
+            session.info["blobs_ecoute"] = True
+        session.info.setdefault(_CLE_EN_ATTENTE, []).append((recu, destination))
+
+    @staticmethod
+    def stocker(recu: FichierRecu, session: Session) -> BlobContenu:
+        """
+        Range un fichier reçu dans le magasin et lui ajoute une référence (sans commit)
+
+        Si le contenu existe déjà, le fichier reçu est supprimé et seul le compteur
+        de références est incrémenté. Sinon le fichier n'est déplacé dans le magasin
+        qu'au commit de la session : un rollback ne laisse pas de fichier sans ligne.
+
+        Args:
+            recu: Fichier temporaire reçu par UploadService
+            session: Session DB (la référence est validée avec le document qui la porte)
+
+        Returns:
+            BlobContenu référencé
+        """
+        extension = Path(recu.nom_original or "").suffix
+
+        if not BlobStoreService._incrementer(recu.sha256, session):
+            blob = BlobContenu(
+                sha256=recu.sha256,
+                chemin=BlobStoreService.chemin_relatif(recu.sha256, extension),
+                taille=recu.taille,
+                nb_references=1,
+            )
+            try:
+                with session.begin_nested():
+                    session.add(blob)
+            except IntegrityError:
+                # Même contenu inséré en parallèle par une autre requête
+                BlobStoreService._incrementer(recu.sha256, session)
+
+        blob = session.get(BlobContenu, recu.sha256, populate_existing=True)
+        destination = BlobStoreService.chemin_absolu(blob)
+        if destination.exists():
+            recu.supprimer()
+            logger.info(f"♻️ Contenu déjà stocké : {recu.nom_original} → {blob.chemin} ({blob.nb_references} réf.)")
+        else:
+            BlobStoreService._ranger_au_commit(recu, destination, session)
+        return blob
+
+    @staticmethod
+    async def enregistrer(upload_file: UploadFile, session: Session, max_octets: int | None = None) -> BlobContenu:
+        """
+        Reçoit un upload en flux et le range dans le magasin (sans commit)
+
+        Le fichier temporaire est écrit sous RACINE pour que le rangement soit un rename atomique.
+        """
+        recu = await UploadService.recevoir(upload_file, BlobStoreService.RACINE, session, max_octets)
+        return BlobStoreService.stocker(recu, session)
+
+    @staticmethod
+    def liberer(sha256: str | None, session: Session) -> None:
+        """
+        Retire une référence au blob (sans commit)
+
+        Le fichier n'est pas supprimé ici : les blobs sans référence sont purgés par
+        purger_orphelins (cron), ce qui évite de perdre un contenu si la transaction échoue.
+        """
+        if not sha256:
+            return
+        session.exec(
+            update(BlobContenu)
+            .where(BlobContenu.sha256 == sha256, BlobContenu.nb_references > 0)
+            .values(nb_references=BlobContenu.nb_references - 1, updated_at=datetime.now())
+        )
+
+    @staticmethod
+    def purger_orphelins(session: Session, delai_grace: timedelta = timedelta(hours=1)) -> dict:
+        """
+        Supprime les blobs qui ne sont plus référencés (ligne puis fichier)
+
+        Seuls les blobs inchangés depuis delai_grace sont purgés, pour ne pas retirer
+        un contenu qu'un upload concurrent est en train de référencer.
+
+        Returns:
+            Dict avec le nombre de blobs purgés et les octets libérés
+        """
+        limite = datetime.now() - delai_grace
+        orphelins = session.exec(
+            delete(BlobContenu)
+            .where(BlobContenu.nb_references <= 0, BlobContenu.updated_at < limite)
+            .returning(BlobContenu.chemin, BlobContenu.taille)
+        ).all()
+        session.commit()
+
+        octets = 0
+        for chemin, taille in orphelins:
+            with contextlib.suppress(FileNotFoundError):
+                (path_config.UPLOADS_DIR / chemin).unlink()
+                octets += taille
+
+        if orphelins:
+            logger.info(f"🧹 {len(orphelins)} blob(s) orphelin(s) purgé(s) ({octets / (1024 * 1024):.2f} MB)")
+        return {"nb_blobs": len(orphelins), "octets": octets}
@@ -0,0 +1,123 @@
+# app/services/engagement_letter_batch_service.py
+"""
+Génération par lots des lettres d'engagement opérationnel
+Une lettre par fiche technique (programme / BOP) de l'année, rendue dans un pool
+de processus puis regroupée dans une archive ZIP
+"""
+
+import re
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.core.process_pool import abandonner_pool, obtenir_pool
+from app.models.budget import FicheTechnique
+from app.models.personnel import Direction, Programme
+
+logger = get_logger(__name__)
+
+POOL = "lettres_engagement"
+
+
+def _rendre_lettre(data: dict[str, Any]) -> bytes:
+    """Rend une lettre d'engagement (exécuté dans un processus du pool, sans accès à la base)"""
+    from app.services.engagement_letter_service import EngagementLetterGenerator
+
+    return EngagementLetterGenerator(data).render().getvalue()
+
+
+class EngagementLetterBatchService:
+    """Génération des lettres d'engagement de tous les programmes/BOP d'une année"""
+
+    @staticmethod
+    def _nom_fichier(annee: int, *parties: str) -> str:
+        slug = "_".join(re.sub(r"[^A-Za-z0-9]+", "-", p).strip("-") for p in parties if p)
+        return f"lettre_engagement_{annee}_{slug or 'programme'}.pdf"
+
+    @staticmethod
+    def preparer_lettres(
+        session: Session, annee: int, donnees_communes: dict[str, Any] | None = None
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Prépare les données complètes de chaque lettre de l'année
+
+        Les annexes sont résolues ici, dans le processus appelant, pour que le rendu
+        n'ait besoin que de données sérialisables.
+
+        Returns:
+            Liste de (nom du fichier dans l'archive, données de la lettre)
+        """
+        lignes = session.exec(
+            select(FicheTechnique, Programme, Direction)
+            .join(Programme, Programme.id == FicheTechnique.programme_id)
+            .outerjoin(Direction, Direction.id == FicheTechnique.direction_id)
+            .where(FicheTechnique.annee_budget == annee)
+            .order_by(Programme.code, Direction.code, FicheTechnique.id)
+        ).all()
+
+        from app.services.engagement_letter_service import EngagementLetterGenerator
+
+        lettres: list[tuple[str, dict[str, Any]]] = []
+        noms_utilises: set[str] = set()
+        for fiche, programme, direction in lignes:
+            data = {
+                **(donnees_communes or {}),
+                "annee": annee,
+                "programme_intitule": programme.libelle,
+                "programme_code": programme.code,
+                "annexe_fiche_id": fiche.id,
+                "annexe_year": annee,
+            }
+            if direction:
+                data["bop_intitule"] = direction.libelle
+
+            generateur = EngagementLetterGenerator(data)
+            data["annexe_actions"] = generateur.fetch_annex_actions(session) or generateur.STATIC_ANNEX_ACTIONS
+
+            nom = EngagementLetterBatchService._nom_fichier(annee, programme.code, direction.code if direction else "")
+            if nom in noms_utilises:
+                nom = nom.replace(".pdf", f"_{fiche.numero_fiche}.pdf")
+            noms_utilises.add(nom)
+            lettres.append((nom, data))
+
+        return lettres
+
+    @staticmethod
+    def generer_zip(session: Session, annee: int, donnees_communes: dict[str, Any] | None = None) -> BytesIO:
+        """
+        Rend toutes les lettres de l'année en parallèle et les regroupe dans une archive ZIP
+
+        Raises:
+            ValueError: si aucune fiche technique n'existe pour l'année
+        """
+        lettres = EngagementLetterBatchService.preparer_lettres(session, annee, donnees_communes)
+        if not lettres:
+            raise ValueError(f"Aucune fiche technique pour l'année {annee}")
+
+        noms = [nom for nom, _ in lettres]
+        donnees = [data for _, data in lettres]
+        if len(lettres) == 1 or settings.ENGAGEMENT_LETTERS_WORKERS <= 1:
+            pdfs = map(_rendre_lettre, donnees)
+        else:
+            pool = obtenir_pool(POOL, settings.ENGAGEMENT_LETTERS_WORKERS)
+            try:
+                pdfs = list(pool.map(_rendre_lettre, donnees))
+            except BrokenProcessPool:
+                # Processus du pool arrêté (OOM...) : rendu dans ce processus, pool recréé au prochain lot
+                abandonner_pool(POOL, pool)
+                pdfs = map(_rendre_lettre, donnees)
+
+        buffer = BytesIO()
+        # Les PDF sont déjà compressés: les stocker tels quels évite de les recompresser
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+            for nom, pdf in zip(noms, pdfs, strict=True):
+                archive.writestr(nom, pdf)
+
+        logger.info(f"📦 {len(lettres)} lettres d'engagement {annee} générées")
+        buffer.seek(0)
+        return buffer
@@ -10,7 +10,6 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.units import cm
 from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
 from sqlmodel import Session, select
 from sqlalchemy import func
 
@@ -18,6 +17,7 @@ from app.core.path_config import path_config
 from app.db.session import engine
 from app.models.budget import ActionBudgetaire, ActiviteBudgetaire, FicheTechnique, ServiceBeneficiaire
 from app.models.personnel import Programme
+from app.services.pdf_assets_service import PdfAssetsService
 
 
 
@@ -209,53 +209,71 @@ class EngagementLetterGenerator:
         },
     ]
 
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        # Données propres à l'instance: deux rendus concurrents ne partagent aucun état
+        self.data = {**self.DEFAULT_DATA, **(data or {})}
+
     @classmethod
     def generate_pdf(cls, data: dict[str, Any]) -> BytesIO:
-        cls.data = {**cls.DEFAULT_DATA, **(data or {})}
-        
+        return cls(data).render()
+
+    def render(self) -> BytesIO:
         buffer = BytesIO()
         pdf = canvas.Canvas(buffer, pagesize=A4)
         width, height = A4
 
         # Important : l'ordre des appels détermine la superposition des éléments.
-        cls._draw_background_shapes(pdf, width, height)
-        cls._draw_header(pdf, width, height)
-        cls._draw_cover_block(pdf, width, height)
-        cls._draw_footer(pdf, width, height)
+        PdfAssetsService.dessiner_fond(
+            pdf, self._background_key(width, height), lambda c: self._draw_background_shapes(c, width, height)
+        )
+        self._draw_header(pdf, width, height)
+        self._draw_cover_block(pdf, width, height)
+        self._draw_footer(pdf, width, height)
 
         pdf.showPage()
 
-        cls._draw_signatories_page(pdf, width, height)
+        self._draw_signatories_page(pdf, width, height)
 
         pdf.showPage()
 
-        cls._draw_preamble_page(pdf, width, height)
+        self._draw_preamble_page(pdf, width, height)
 
         pdf.showPage()
 
-        cls._draw_chapter_one_page(pdf, width, height)
+        self._draw_chapter_one_page(pdf, width, height)
 
         pdf.showPage()
 
-        cls._draw_chapter_two_page(pdf, width, height)
+        self._draw_chapter_two_page(pdf, width, height)
 
         pdf.showPage()
 
-        cls._draw_signature_page(pdf, width, height)
+        self._draw_signature_page(pdf, width, height)
 
         pdf.showPage()
 
-        next_page = cls._draw_annex_matrice_page(pdf, start_page=7)
+        next_page = self._draw_annex_matrice_page(pdf, start_page=7)
 
         pdf.showPage()
-        cls._draw_annex_operational_results_page(pdf, start_page=next_page)
+        self._draw_annex_operational_results_page(pdf, start_page=next_page)
 
         pdf.save()
         buffer.seek(0)
         return buffer
 
-    @classmethod
-    def _draw_background_shapes(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _background_key(self, width: float, height: float) -> tuple:
+        """Clé du fond décoratif: ne dépend que du format de page et de la palette."""
+        palette = (
+            self.PRIMARY_GREEN,
+            self.SECONDARY_GREEN,
+            self.LIGHT_GREEN,
+            self.PRIMARY_ORANGE,
+            self.LIGHT_ORANGE,
+            self.LIGHT_2_ORANGE,
+        )
+        return (type(self).__name__, width, height, *(color.hexval() for color in palette))
+
+    def _draw_background_shapes(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine les éléments décoratifs de fond (triangles, bandes, lignes)."""
 
         # ---------- TRIANGLE ----------
@@ -265,7 +283,7 @@ class EngagementLetterGenerator:
         tri.lineTo(width, height - 140)
         tri.lineTo(width - 220, height)
         tri.close()
-        pdf.setFillColor(cls.PRIMARY_GREEN)
+        pdf.setFillColor(self.PRIMARY_GREEN)
         pdf.drawPath(tri, stroke=0, fill=1)
 
         # ---------- GÉOMÉTRIE HYPOTÉNUSE ----------
@@ -384,25 +402,25 @@ class EngagementLetterGenerator:
         draw_band_slide(s_px=0.00*L, length_px=0.30*L, offset_px=offset,
                 thickness=thickness, round_start=False, round_end=True,
                 extend_start_px=20, extend_end_px=0,
-                color=cls.LIGHT_GREEN, reverse=False, clamp=False)
+                color=self.LIGHT_GREEN, reverse=False, clamp=False)
 
         # Bande qui "glisse" : teste différentes positions s_px (0 → L)
         draw_band_slide(s_px=0.00*L, length_px=0.30*L, offset_px=offset,
                 thickness=thickness, round_start=False, round_end=True,
                 extend_start_px=40, extend_end_px=0,
-                color=cls.LIGHT_GREEN, reverse=True, clamp=False)
+                color=self.LIGHT_GREEN, reverse=True, clamp=False)
 
         # Bande qui "glisse" : teste différentes positions s_px (0 → L)
         draw_band_slide(s_px=0.00*L, length_px=0.30*L, offset_px=offset+20,
                 thickness=thickness+10, round_start=False, round_end=True,
                 extend_start_px=40, extend_end_px=30,
-                color=cls.SECONDARY_GREEN, reverse=False, clamp=False)
+                color=self.SECONDARY_GREEN, reverse=False, clamp=False)
 
         # Bande qui "glisse" : teste différentes positions s_px (0 → L)
         draw_band_center(c_px=0.50*L, length_px=0.50*L, offset_px=offset-10,
                 thickness=thickness, round_start=True, round_end=True,
                 extend_start_px=40, extend_end_px=30,
-                color=cls.SECONDARY_GREEN, reverse=False, clamp=False)
+                color=self.SECONDARY_GREEN, reverse=False, clamp=False)
 
         pdf.restoreState()   # remet l'état de dessin initial
 
@@ -435,7 +453,7 @@ class EngagementLetterGenerator:
         tri_bl.lineTo(0, 120)
         tri_bl.lineTo(220, 0)
         tri_bl.close()
-        pdf.setFillColor(cls.PRIMARY_ORANGE)
+        pdf.setFillColor(self.PRIMARY_ORANGE)
         pdf.drawPath(tri_bl, stroke=0, fill=1)
 
         # Géométrie de l'hypoténuse (de (0,120) -> (220,0))
@@ -523,7 +541,7 @@ class EngagementLetterGenerator:
             thickness = thickness2,
             round_start = True, round_end = True,
             extend_start_px = 20, extend_end_px = 4,
-            color = cls.PRIMARY_ORANGE,
+            color = self.PRIMARY_ORANGE,
             reverse = False, clamp = False
         )
 
@@ -535,7 +553,7 @@ class EngagementLetterGenerator:
             thickness = thickness2,
             round_start = False, round_end = True,
             extend_start_px = 40, extend_end_px = 0,
-            color = cls.PRIMARY_ORANGE,
+            color = self.PRIMARY_ORANGE,
             reverse = True, clamp = False
         )
 
@@ -547,7 +565,7 @@ class EngagementLetterGenerator:
             thickness = thickness2+13,
             round_start = False, round_end = True,
             extend_start_px = 0, extend_end_px = 0,
-            color = cls.LIGHT_2_ORANGE,
+            color = self.LIGHT_2_ORANGE,
             reverse = False, clamp = False
         )
 
@@ -559,7 +577,7 @@ class EngagementLetterGenerator:
             thickness = thickness2+13,
             round_start = False, round_end = True,
             extend_start_px = 40, extend_end_px = 30,
-            color = cls.LIGHT_ORANGE,
+            color = self.LIGHT_ORANGE,
             reverse = False, clamp = False
         )
 
@@ -571,7 +589,7 @@ class EngagementLetterGenerator:
             thickness = thickness2,        # épaisseur
             round_start = True, round_end = True,
             extend_start_px = 6, extend_end_px = 6,
-            color = cls.LIGHT_ORANGE,
+            color = self.LIGHT_ORANGE,
             reverse = False, clamp = False
         )
 
@@ -579,8 +597,7 @@ class EngagementLetterGenerator:
 
         pdf.restoreState()  # fin du clip du triangle bas-gauche
  
-    @classmethod
-    def _draw_header(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_header(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine l'en-tête institutionnel (bloc ministère + devise + logo)."""
         pdf.saveState()
 
@@ -591,14 +608,14 @@ class EngagementLetterGenerator:
             "ENTREPRISES PUBLIQUES",
         ]
         pdf.setFont("Helvetica", 11)
-        pdf.setFillColor(cls.DARK_TEXT)
+        pdf.setFillColor(self.DARK_TEXT)
         y = height - 30
         for line in header_lines:
             pdf.drawString(1 * cm, y, line)
             y -= 14
 
         # Logo central si disponible
-        logo_path = cls._resolve_asset_path("images/logo.webp")
+        logo_path = self._resolve_asset_path("images/logo.webp")
         if logo_path:
             try:
                 logo_width = 2.5 * cm
@@ -606,21 +623,10 @@ class EngagementLetterGenerator:
                 x = (width - logo_width) / 2
                 y_logo = height - 85
 
-                if logo_path.lower().endswith(".webp"):
-                    try:
-                        from PIL import Image
-
-                        with Image.open(logo_path) as im:
-                            im = im.convert("RGBA")
-                            buffer = BytesIO()
-                            im.save(buffer, format="PNG")
-                            buffer.seek(0)
-                            pdf.drawImage(ImageReader(buffer), x, y_logo, width=logo_width, height=logo_height, preserveAspectRatio=True, mask="auto")
-                    except Exception:
-                        # Si la conversion échoue, on tente quand même de charger le fichier brut
-                        pdf.drawImage(logo_path, x, y_logo, width=logo_width, height=logo_height, preserveAspectRatio=True)
-                else:
-                    pdf.drawImage(logo_path, x, y_logo, width=logo_width, height=logo_height, preserveAspectRatio=True)
+                logo = PdfAssetsService.image_reader(logo_path)
+                if logo is not None:
+                    mask = "auto" if logo_path.lower().endswith(".webp") else None
+                    pdf.drawImage(logo, x, y_logo, width=logo_width, height=logo_height, preserveAspectRatio=True, mask=mask)
             except Exception:
                 pass
 
@@ -630,7 +636,7 @@ class EngagementLetterGenerator:
         pdf.drawString(width - 170, height - 30, "République de Côte d'Ivoire")
 
         pdf.setFont("Helvetica", 9)
-        motto = cls.data.get("devise", "")
+        motto = self.data.get("devise", "")
         if not motto:
             motto = "Union – Discipline – Travail"
         pdf.drawString(width - 150, height - 40, motto)
@@ -644,8 +650,7 @@ class EngagementLetterGenerator:
 
         pdf.restoreState()
 
-    @classmethod
-    def _draw_cover_block(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_cover_block(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine le bloc central (double cadre + titres et responsables)."""
         margin_x = 1.4 * cm  # marge latérale du cadre extérieur
         margin_y = height / 2 - 5.5 * cm  # position verticale du bloc
@@ -654,14 +659,14 @@ class EngagementLetterGenerator:
 
         pdf.saveState()
         pdf.setLineWidth(3)
-        pdf.setStrokeColor(cls.PRIMARY_ORANGE)
+        pdf.setStrokeColor(self.PRIMARY_ORANGE)
         pdf.rect(margin_x, margin_y, block_width, block_height, stroke=1, fill=0)
 
         pdf.setLineWidth(1.2)
         # Deuxième cadre : jouer sur (+4 / -8) pour agrandir ou réduire l'écart
         pdf.rect(margin_x + 4, margin_y + 4, block_width - 8, block_height - 8, stroke=1, fill=0)
 
-        pdf.setFillColor(cls.DARK_TEXT)
+        pdf.setFillColor(self.DARK_TEXT)
         center_x = width / 2
         current_y = margin_y + block_height - 56  # point de départ pour les textes
 
@@ -673,14 +678,14 @@ class EngagementLetterGenerator:
         pdf.drawCentredString(center_x, current_y, "CONCLU ENTRE")
 
         current_y -= 35  # espace avant le bloc RESPONSABLE PROGRAMME
-        programme = cls.data.get("programme_intitule", "").strip()
+        programme = self.data.get("programme_intitule", "").strip()
         if programme:
             programme_text = f"LE RESPONSABLE DU PROGRAMME {programme.upper()}"
         else:
             programme_text = "LE RESPONSABLE DU PROGRAMME"
         pdf.setFont("Helvetica-Bold", 14)
         # Texte découpé automatiquement en plusieurs lignes centrées
-        current_y = cls._draw_wrapped_centered_lines(
+        current_y = self._draw_wrapped_centered_lines(
             pdf,
             programme_text,
             center_x,
@@ -696,7 +701,7 @@ class EngagementLetterGenerator:
         current_y -= 26  # espace avant le bloc RESPONSABLE BOP
         base_text = "LE RESPONSABLE DU BUDGET OPÉRATIONNEL DE PROGRAMME"
         pdf.setFont("Helvetica-Bold", 14)
-        current_y = cls._draw_wrapped_centered_lines(
+        current_y = self._draw_wrapped_centered_lines(
             pdf,
             base_text,
             center_x,
@@ -705,12 +710,12 @@ class EngagementLetterGenerator:
             char_limit=52,
         )
 
-        bop = cls.data.get("bop_intitule", "").strip()
+        bop = self.data.get("bop_intitule", "").strip()
         if bop:
             current_y -= 8  # espace avant l'intitulé du BOP
             label = f"« {bop.upper()} »"
             pdf.setFont("Helvetica-Bold", 14)
-            cls._draw_wrapped_centered_lines(
+            self._draw_wrapped_centered_lines(
                 pdf,
                 label,
                 center_x,
@@ -746,8 +751,7 @@ class EngagementLetterGenerator:
             y -= line_height  # prépare la hauteur pour la prochaine ligne
         return y
 
-    @classmethod
-    def _draw_footer(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_footer(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine le bloc année en bas de page.
 
         Modifier `box_width`, `box_height`, `x` et `y` pour déplacer/redimensionner
@@ -767,28 +771,27 @@ class EngagementLetterGenerator:
         pdf.rect(x - 3, y - 3, box_width - 2, 3, stroke=0, fill=1)  # ombre bas affinée
 
         pdf.setDash(6, 4)  # motif pointillé (6 plein / 4 vide)
-        pdf.setStrokeColor(cls.PRIMARY_ORANGE)
+        pdf.setStrokeColor(self.PRIMARY_ORANGE)
         pdf.setLineWidth(1.2)
         pdf.rect(x, y, box_width, box_height, stroke=1, fill=0)  # cadre sans angles arrondis
 
         pdf.setDash()  # retour à un tracé continu pour le texte
         pdf.setFillColor(colors.grey)
         pdf.setFont("Helvetica", 14)
-        year = str(cls.data.get("annee", "") or "")
+        year = str(self.data.get("annee", "") or "")
         # Texte centré dans le cartouche, fallback sur 2025 si non renseigné
         pdf.drawCentredString(x + box_width / 2, y + box_height / 2 - 4, year if year else "2025")
 
         pdf.restoreState()
 
-    @classmethod
-    def _draw_signatories_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_signatories_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine la page des signataires avec photos et informations."""
         pdf.saveState()
 
         def resolve_photo(path_key: str) -> str | None:
-            raw = cls.data.get(path_key)
+            raw = self.data.get(path_key)
             if raw:
-                resolved = cls._resolve_asset_path(raw)
+                resolved = self._resolve_asset_path(raw)
                 print(f"🛑 [DEBUG] photo key={path_key} raw={raw!r} -> resolved={resolved}")
                 return resolved
             print(f"🛑 [DEBUG] photo key={path_key} has no value")
@@ -800,10 +803,11 @@ class EngagementLetterGenerator:
             box_height = 8 * cm
             current_y = top_y
 
-            if photo_path:
+            photo = PdfAssetsService.image_reader(photo_path)
+            if photo is not None:
                 try:
                     pdf.drawImage(
-                        photo_path,
+                        photo,
                         (width - box_width) / 2,
                         current_y - box_height,
                         width=box_width,
@@ -817,9 +821,9 @@ class EngagementLetterGenerator:
             else:
                 current_y -= 8
 
-            name = (cls.data.get(name_key) or "Nom Prénom").upper()
-            fonction = cls.data.get(fonction_key) or "Fonction"
-            entite = cls.data.get(entite_key)
+            name = (self.data.get(name_key) or "Nom Prénom").upper()
+            fonction = self.data.get(fonction_key) or "Fonction"
+            entite = self.data.get(entite_key)
 
             pdf.setFont("Helvetica-Bold", 13)
             pdf.drawCentredString(width / 2, current_y, name)
@@ -853,8 +857,7 @@ class EngagementLetterGenerator:
 
   
 
-    @classmethod
-    def _draw_preamble_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_preamble_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine la page du préambule (page 3)."""
         pdf.saveState()
 
@@ -912,9 +915,9 @@ class EngagementLetterGenerator:
         for paragraph in paragraphs:
             story.append(Paragraph(paragraph, body_style))
 
-        bop_title = cls.data.get("bop_intitule", "")
-        decret_num = cls.data.get("decret_org_num", "")
-        decret_date = cls.data.get("decret_org_date", "")
+        bop_title = self.data.get("bop_intitule", "")
+        decret_num = self.data.get("decret_org_num", "")
+        decret_date = self.data.get("decret_org_date", "")
 
         story.append(
             Paragraph(
@@ -941,10 +944,10 @@ class EngagementLetterGenerator:
         story.append(Paragraph("De ce qui précède, il est conclu une lettre d'engagement opérationnel :", body_style))
         story.append(Paragraph("ENTRE :", body_style))
 
-        programme = cls.data.get("programme_intitule", "ADMINISTRATION GENERALE").upper()
-        rprog_decret_num = cls.data.get("decret_resp_num", "")
-        rprog_decret_date = cls.data.get("decret_resp_date", "")
-        bop_title = cls.data.get("bop_intitule", "Affaires Administratives et Financières")
+        programme = self.data.get("programme_intitule", "ADMINISTRATION GENERALE").upper()
+        rprog_decret_num = self.data.get("decret_resp_num", "")
+        rprog_decret_date = self.data.get("decret_resp_date", "")
+        bop_title = self.data.get("bop_intitule", "Affaires Administratives et Financières")
 
         story.append(
             Paragraph(
@@ -982,8 +985,7 @@ class EngagementLetterGenerator:
         pdf.restoreState()
 
 
-    @classmethod
-    def _draw_chapter_one_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_chapter_one_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine la page du Chapitre I (page 4)."""
         pdf.saveState()
 
@@ -1037,8 +1039,8 @@ class EngagementLetterGenerator:
         story.append(Paragraph("CHAPITRE I : DISPOSITIONS GENERALES", chapter_style))
         story.append(Paragraph("Article 1 : Objet", article_style))
 
-        bop_title = cls.data.get("bop_intitule", "Affaires Administratives et Financières")
-        programme = cls.data.get("programme_intitule", "ADMINISTRATION GENERALE")
+        bop_title = self.data.get("bop_intitule", "Affaires Administratives et Financières")
+        programme = self.data.get("programme_intitule", "ADMINISTRATION GENERALE")
 
         story.append(
             Paragraph(
@@ -1112,8 +1114,7 @@ class EngagementLetterGenerator:
 
         pdf.restoreState()
 
-    @classmethod
-    def _draw_chapter_two_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_chapter_two_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine la page du Chapitre I (suite) et début du Chapitre II (page 5)."""
         pdf.saveState()
 
@@ -1164,8 +1165,8 @@ class EngagementLetterGenerator:
             bulletIndent=15,
         )
 
-        programme = cls.data.get("programme_intitule", "ADMINISTRATION GENERALE").upper()
-        bop_title = cls.data.get("bop_intitule", "Affaires Administratives et Financières")
+        programme = self.data.get("programme_intitule", "ADMINISTRATION GENERALE").upper()
+        bop_title = self.data.get("bop_intitule", "Affaires Administratives et Financières")
 
         story: list[Any] = []
 
@@ -1262,8 +1263,7 @@ class EngagementLetterGenerator:
         pdf.restoreState()
 
 
-    @classmethod
-    def _draw_signature_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_signature_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine la page de signatures et l'article 10 (page 6)."""
         pdf.saveState()
 
@@ -1314,13 +1314,13 @@ class EngagementLetterGenerator:
         )
         frame.addFromList(story, pdf)
 
-        ville = cls.data.get("ville_signature", "Abidjan")
+        ville = self.data.get("ville_signature", "Abidjan")
         pdf.setFont("Helvetica", 12)
         pdf.drawRightString(width - left_margin, height / 2 + 40, f"Fait à {ville}, le…………………………")
 
         # Zone de signature RBOP (gauche)
-        bop_title = (cls.data.get("bop_intitule") or "Affaires Administratives et Financières").upper()
-        rbop_nom = (cls.data.get("rbop_nom") or "Nom Prénom").upper()
+        bop_title = (self.data.get("bop_intitule") or "Affaires Administratives et Financières").upper()
+        rbop_nom = (self.data.get("rbop_nom") or "Nom Prénom").upper()
         pdf.setFont("Helvetica", 11)
         pdf.drawCentredString(left_margin + available_width * 0.25, height / 2 - 10, "Responsable de Budget Opérationnel de Programme")
         pdf.drawCentredString(left_margin + available_width * 0.25, height / 2 - 26, f"« {bop_title} »")
@@ -1328,8 +1328,8 @@ class EngagementLetterGenerator:
         pdf.drawCentredString(left_margin + available_width * 0.25, height / 2 - 90, rbop_nom)
 
         # Zone de signature RPROG (droite)
-        programme = (cls.data.get("programme_intitule") or "ADMINISTRATION GENERALE").upper()
-        rprog_nom = (cls.data.get("rprog_nom") or "Nom Prénom").upper()
+        programme = (self.data.get("programme_intitule") or "ADMINISTRATION GENERALE").upper()
+        rprog_nom = (self.data.get("rprog_nom") or "Nom Prénom").upper()
         pdf.setFont("Helvetica", 11)
         pdf.drawCentredString(left_margin + available_width * 0.75, height / 2 - 10, "Responsable du Programme")
         pdf.drawCentredString(left_margin + available_width * 0.75, height / 2 - 26, f"« {programme} »")
@@ -1342,8 +1342,7 @@ class EngagementLetterGenerator:
 
         pdf.restoreState()
 
-    @classmethod
-    def _draw_annex_matrice_page(cls, pdf: canvas.Canvas, start_page: int) -> int:
+    def _draw_annex_matrice_page(self, pdf: canvas.Canvas, start_page: int) -> int:
         """Dessine la page d'annexe (matrice des activités) en orientation paysage.
 
         Args:
@@ -1412,7 +1411,7 @@ class EngagementLetterGenerator:
             alignment=1,
         )
 
-        actions_data = cls._get_annex_actions()
+        actions_data = self._get_annex_actions()
 
         head_rows = [
             [Paragraph("ANNEXE :", header_style)],
@@ -1531,115 +1530,118 @@ class EngagementLetterGenerator:
         return draw_page_header.page_number + 1
 
 
-    @classmethod
-    def _get_annex_actions(cls) -> list[dict[str, Any]]:
-        db_actions = cls._fetch_annex_actions_from_db()
+    def _get_annex_actions(self) -> list[dict[str, Any]]:
+        # Annexe déjà résolue par l'appelant (génération par lots: le rendu ne touche pas la base)
+        data = self.data.get("annexe_actions")
+        if isinstance(data, list) and data:
+            return data
+        db_actions = self._fetch_annex_actions_from_db()
         if db_actions:
             return db_actions
-        cls.logger.debug("Aucune donnée d'annexe en base, utilisation du jeu statique par défaut")
-        return cls.STATIC_ANNEX_ACTIONS
+        self.logger.debug("Aucune donnée d'annexe en base, utilisation du jeu statique par défaut")
+        return self.STATIC_ANNEX_ACTIONS
 
-    @classmethod
-    def _get_operational_results_annex(cls) -> list[dict[str, str]]:
-        data = cls.data.get("annexe_operational_results")
+    def _get_operational_results_annex(self) -> list[dict[str, str]]:
+        data = self.data.get("annexe_operational_results")
         if isinstance(data, list) and data:
             return data
-        return cls.STATIC_OPERATIONAL_RESULTS
+        return self.STATIC_OPERATIONAL_RESULTS
 
-    @classmethod
-    def _fetch_annex_actions_from_db(cls) -> list[dict[str, Any]]:
+    def _fetch_annex_actions_from_db(self) -> list[dict[str, Any]]:
         """Récupère dynamiquement les actions/activités depuis la base si disponible."""
         try:
             with Session(engine) as session:
-                fiche_id = cls._resolve_annex_fiche_id(session)
-                if not fiche_id:
-                    cls.logger.debug("Impossible de résoudre la fiche technique pour l'annexe")
-                    return []
-
-                actions = session.exec(
-                    select(ActionBudgetaire)
-                    .where(ActionBudgetaire.fiche_technique_id == fiche_id)
-                    .order_by(ActionBudgetaire.ordre, ActionBudgetaire.id)
-                ).all()
-
-                if not actions:
-                    cls.logger.debug("Aucune action budgétaire trouvée pour la fiche %s", fiche_id)
-                    return []
-
-                annex_payload: list[dict[str, Any]] = []
-
-                for idx, action in enumerate(actions, start=1):
-                    services = session.exec(
-                        select(ServiceBeneficiaire)
-                        .where(ServiceBeneficiaire.action_id == action.id)
-                        .order_by(ServiceBeneficiaire.ordre, ServiceBeneficiaire.id)
-                    ).all()
-
-                    service_ids = [srv.id for srv in services if srv.id is not None]
-                    if not service_ids:
-                        cls.logger.debug("Action %s sans service bénéficiaire", action.id)
-                        continue
-
-                    activities = session.exec(
-                        select(ActiviteBudgetaire)
-                        .where(ActiviteBudgetaire.service_beneficiaire_id.in_(service_ids))
-                        .order_by(ActiviteBudgetaire.ordre, ActiviteBudgetaire.id)
-                    ).all()
-
-                    if not activities:
-                        cls.logger.debug("Action %s sans activité budgétaire", action.id)
-                        continue
-
-                    service_map = {srv.id: srv for srv in services if srv.id is not None}
-                    activities_payload: list[dict[str, Any]] = []
-
-                    for activity_idx, activity in enumerate(activities, start=1):
-                        code = (activity.code or "").strip()
-                        if not code:
-                            code = f"Activité {idx}.{activity_idx}"
-
-                        description = (activity.libelle or "").strip()
-                        service = service_map.get(activity.service_beneficiaire_id)
-                        if service and service.libelle:
-                            service_label = service.libelle.strip()
-                            if service_label and service_label.lower() not in description.lower():
-                                description = f"{description} ({service_label})" if description else service_label
-
-                        activities_payload.append({"code": code, "description": description})
-
-                    if not activities_payload:
-                        continue
-
-                    title = (action.libelle or "").strip()
-                    if title:
-                        title = f"Action {idx} : {title}"
-                    else:
-                        title = f"Action {idx}"
-
-                    annex_payload.append({"title": title, "activities": activities_payload})
-
-                return annex_payload
-
+                return self.fetch_annex_actions(session)
         except Exception as exc:
-            cls.logger.error("Erreur lors de la récupération des actions d'annexe: %s", exc, exc_info=True)
+            self.logger.error("Erreur lors de la récupération des actions d'annexe: %s", exc, exc_info=True)
             return []
 
-    @classmethod
-    def _resolve_annex_fiche_id(cls, session: Session) -> int | None:
+    def fetch_annex_actions(self, session: Session) -> list[dict[str, Any]]:
+        """Construit les actions/activités de l'annexe à partir de la fiche technique résolue."""
+        fiche_id = self._resolve_annex_fiche_id(session)
+        if not fiche_id:
+            self.logger.debug("Impossible de résoudre la fiche technique pour l'annexe")
+            return []
+
+        actions = session.exec(
+            select(ActionBudgetaire)
+            .where(ActionBudgetaire.fiche_technique_id == fiche_id)
+            .order_by(ActionBudgetaire.ordre, ActionBudgetaire.id)
+        ).all()
+
+        if not actions:
+            self.logger.debug("Aucune action budgétaire trouvée pour la fiche %s", fiche_id)
+            return []
+
+        annex_payload: list[dict[str, Any]] = []
+
+        for idx, action in enumerate(actions, start=1):
+            services = session.exec(
+                select(ServiceBeneficiaire)
+                .where(ServiceBeneficiaire.action_id == action.id)
+                .order_by(ServiceBeneficiaire.ordre, ServiceBeneficiaire.id)
+            ).all()
+
+            service_ids = [srv.id for srv in services if srv.id is not None]
+            if not service_ids:
+                self.logger.debug("Action %s sans service bénéficiaire", action.id)
+                continue
+
+            activities = session.exec(
+                select(ActiviteBudgetaire)
+                .where(ActiviteBudgetaire.service_beneficiaire_id.in_(service_ids))
+                .order_by(ActiviteBudgetaire.ordre, ActiviteBudgetaire.id)
+            ).all()
+
+            if not activities:
+                self.logger.debug("Action %s sans activité budgétaire", action.id)
+                continue
+
+            service_map = {srv.id: srv for srv in services if srv.id is not None}
+            activities_payload: list[dict[str, Any]] = []
+
+            for activity_idx, activity in enumerate(activities, start=1):
+                code = (activity.code or "").strip()
+                if not code:
+                    code = f"Activité {idx}.{activity_idx}"
+
+                description = (activity.libelle or "").strip()
+                service = service_map.get(activity.service_beneficiaire_id)
+                if service and service.libelle:
+                    service_label = service.libelle.strip()
+                    if service_label and service_label.lower() not in description.lower():
+                        description = f"{description} ({service_label})" if description else service_label
+
+                activities_payload.append({"code": code, "description": description})
+
+            if not activities_payload:
+                continue
+
+            title = (action.libelle or "").strip()
+            if title:
+                title = f"Action {idx} : {title}"
+            else:
+                title = f"Action {idx}"
+
+            annex_payload.append({"title": title, "activities": activities_payload})
+
+        return annex_payload
+
+    def _resolve_annex_fiche_id(self, session: Session) -> int | None:
         """Détermine la fiche technique à utiliser pour l'annexe."""
-        explicit_fiche = cls.data.get("annexe_fiche_id")
+        explicit_fiche = self.data.get("annexe_fiche_id")
         if explicit_fiche:
             fiche = session.get(FicheTechnique, explicit_fiche)
             if fiche:
                 return fiche.id
-            cls.logger.warning(
+            self.logger.warning(
                 "Fiche technique %s introuvable pour l'annexe, tentative de résolution automatique",
                 explicit_fiche,
             )
 
         programme_id: int | None = None
-        programme_code = cls.data.get("programme_code")
-        programme_label = cls.data.get("programme_intitule")
+        programme_code = self.data.get("programme_code")
+        programme_label = self.data.get("programme_intitule")
 
         if programme_code:
             programme = session.exec(
@@ -1656,10 +1658,10 @@ class EngagementLetterGenerator:
                 programme_id = programme.id
 
         if programme_id is None:
-            cls.logger.debug("Programme introuvable pour l'annexe (%s / %s)", programme_code, programme_label)
+            self.logger.debug("Programme introuvable pour l'annexe (%s / %s)", programme_code, programme_label)
             return None
 
-        year = cls.data.get("annexe_year") or cls.data.get("annee")
+        year = self.data.get("annexe_year") or self.data.get("annee")
         fiche_query = select(FicheTechnique).where(FicheTechnique.programme_id == programme_id)
         if year:
             try:
@@ -1671,7 +1673,7 @@ class EngagementLetterGenerator:
         if fiche:
             return fiche.id
 
-        cls.logger.debug(
+        self.logger.debug(
             "Aucune fiche technique trouvée pour programme_id=%s et annee=%s", programme_id, year
         )
         return None
@@ -1705,8 +1707,7 @@ class EngagementLetterGenerator:
 
         return None
 
-    @classmethod
-    def _draw_annex_operational_results_page(cls, pdf: canvas.Canvas, start_page: int) -> int:
+    def _draw_annex_operational_results_page(self, pdf: canvas.Canvas, start_page: int) -> int:
         """Dessine l'annexe opérationnelle (tableau des résultats) en orientation paysage.
 
         Args:
@@ -1777,7 +1778,7 @@ class EngagementLetterGenerator:
         ]
 
         rows = [column_headers]
-        for item in cls._get_operational_results_annex():
+        for item in self._get_operational_results_annex():
             rows.append(
                 [
                     Paragraph(item.get("activite", ""), cell_style),
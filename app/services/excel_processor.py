@@ -1,23 +1,83 @@
 """
 Service de traitement des fichiers Excel
-Chaque type de fichier a son propre traitement
+Chaque type de fichier est décrit par une spécification déclarative de colonnes
+(position → champ → nettoyage), appliquée en opérations vectorisées sur le DataFrame
 """
 
+import json
+import os
+import time
+from collections.abc import Iterator
 from datetime import datetime
 from typing import Any
 
-import pandas as pd
-
+from app.core.config import settings
 from app.core.enums import FileType
+from app.core.lazy import lazy_import
 from app.core.logging_config import get_logger
+from app.core.metrics import enregistrer_import
+from app.core.path_config import path_config
 
 logger = get_logger(__name__)
 
+pd = lazy_import("pandas")
+
+# Spécifications par type de fichier
+# - colonnes : (champ de sortie, nettoyage) dans l'ordre des colonnes du fichier
+# - cle : champ obligatoire (ligne rejetée s'il est vide)
+# - colonnes_attendues : en-têtes documentés (simple avertissement si absents)
+# Les types sans spécification passent par le traitement générique.
+SPECS: dict[str, dict] = {
+    FileType.BUDGET.value: {
+        "libelle": "💰 BUDGET",
+        "colonnes_attendues": ["Ligne budgétaire", "Montant prévu"],
+        "colonnes": [
+            ("ligne_budgetaire", "texte"),
+            ("montant_prevu", "montant"),
+            ("montant_realise", "montant"),
+            ("ecart", "montant"),
+            ("commentaire", "texte"),
+        ],
+        "cle": "ligne_budgetaire",
+    },
+}
+
+# Libellés des types traités génériquement (journalisation)
+LIBELLES_GENERIQUES = {
+    FileType.FICHE_PERSONNEL.value: "👥 PERSONNEL",
+    FileType.RAPPORT_ACTIVITE.value: "📋 RAPPORT D'ACTIVITÉ",
+    FileType.LISTE_BENEFICIAIRES.value: "👤 BÉNÉFICIAIRES",
+    FileType.INDICATEURS_PERFORMANCE.value: "📊 INDICATEURS",
+}
+
+
+def _nettoyer_texte(serie: "pd.Series") -> tuple["pd.Series", "pd.Series"]:
+    """Texte : cellules vides → chaîne vide"""
+    return serie.where(serie.notna(), "").astype(str).str.strip(), pd.Series(False, index=serie.index)
+
+
+def _nettoyer_montant(serie: "pd.Series") -> tuple["pd.Series", "pd.Series"]:
+    """Montant : conversion numérique ; une cellule remplie non convertible invalide la ligne"""
+    valeurs = pd.to_numeric(serie, errors="coerce")
+    invalides = serie.notna() & valeurs.isna()
+    return valeurs.fillna(0.0).astype(float), invalides
+
+
+NETTOYAGES = {
+    "texte": _nettoyer_texte,
+    "montant": _nettoyer_montant,
+}
+
+VALEURS_ABSENTES = {"texte": "", "montant": 0.0}
+
+# Nombre de lignes conservées dans l'aperçu en cache
+APERCU_NB_LIGNES = 50
+
 
 class ExcelProcessorService:
     """
     Service pour traiter les fichiers Excel
-    Chaque type de fichier a sa propre méthode de traitement
+    Chaque type de fichier a sa propre spécification de colonnes (SPECS)
     """
 
     @classmethod
@@ -27,253 +87,149 @@ class ExcelProcessorService:
         """
         Point d'entrée principal pour traiter un fichier
 
+        Les fichiers au-delà de EXCEL_SEUIL_LECTURE_PAR_BLOCS_MB sont lus en flux par blocs
+        de EXCEL_LIGNES_PAR_BLOC lignes.
+
         Args:
             file_path: Chemin du fichier à traiter
-            file_type: Type du fichier (budget, depenses, etc.)
+            file_type: Type du fichier (valeur de FileType)
             metadata: Métadonnées du fichier
 
         Returns:
             Tuple: (success, rows_processed, rows_failed, error_message, processed_data)
         """
+        debut = time.perf_counter()
         try:
             logger.info(f"📊 Début du traitement du fichier: {file_path} (type: {file_type})")
 
-            # Lire le fichier Excel
-            df = pd.read_excel(file_path, engine="openpyxl")
-            logger.info(f"📄 Fichier lu: {len(df)} lignes, {len(df.columns)} colonnes")
-
-            # Dispatcher selon le type de fichier
-            if file_type == FileType.BUDGET:
-                result = cls._process_budget(df, metadata)
-            elif file_type == FileType.DEPENSES:
-                result = cls._process_depenses(df, metadata)
-            elif file_type == FileType.REVENUS:
-                result = cls._process_revenus(df, metadata)
-            elif file_type == FileType.PERSONNEL:
-                result = cls._process_personnel(df, metadata)
-            elif file_type == FileType.RAPPORT_ACTIVITE:
-                result = cls._process_rapport_activite(df, metadata)
-            elif file_type == FileType.BENEFICIAIRES:
-                result = cls._process_beneficiaires(df, metadata)
-            elif file_type == FileType.INDICATEURS:
-                result = cls._process_indicateurs(df, metadata)
-            else:
-                result = cls._process_generic(df, metadata)
-
-            success, rows_processed, rows_failed, error_msg, processed_data = result
+            spec = SPECS.get(str(file_type))
+            libelle = spec["libelle"] if spec else LIBELLES_GENERIQUES.get(str(file_type), "📄 GÉNÉRIQUE")
+            logger.info(f"{libelle} : traitement vectorisé")
 
-            if success:
-                logger.info(f"✅ Traitement réussi: {rows_processed} lignes traitées, {rows_failed} échecs")
-            else:
-                logger.error(f"❌ Traitement échoué: {error_msg}")
-
-            return result
-
-        except Exception as e:
-            error_msg = f"Erreur lors du traitement: {e!s}"
-            logger.error(f"❌ {error_msg}", exc_info=True)
-            return False, 0, 0, error_msg, []
-
-    @classmethod
-    def _process_budget(cls, df: pd.DataFrame, metadata: dict) -> tuple[bool, int, int, str | None, list[dict]]:
-        """
-        Traitement spécifique pour les fichiers de type BUDGET
-
-        Structure attendue (à adapter selon vos besoins):
-        - Colonne A: Ligne budgétaire / Poste
-        - Colonne B: Montant prévu
-        - Colonne C: Montant réalisé
-        - Colonne D: Écart
-        - Colonne E: Commentaire
-        """
-        logger.info("💰 Traitement d'un fichier BUDGET")
-
-        try:
-            processed_data = []
+            processed_data: list[dict] = []
             rows_failed = 0
-
-            # Nettoyer les noms de colonnes
-            df.columns = df.columns.str.strip()
-
-            # Vérifier les colonnes minimales requises
-            # Note: Adapter selon votre structure réelle
-            required_columns = ["Ligne budgétaire", "Montant prévu"]
-            missing_columns = [col for col in required_columns if col not in df.columns]
-
-            if missing_columns:
-                # Si les colonnes ne correspondent pas, utiliser les indices
-                logger.warning(f"⚠️ Colonnes manquantes: {missing_columns}. Utilisation des indices.")
-                df.columns = [f"Col_{i}" for i in range(len(df.columns))]
-
-            # Traiter chaque ligne
-            for idx, row in df.iterrows():
-                try:
-                    # Extraire les données (à adapter selon votre structure)
-                    record = {
-                        "row_index": idx,
-                        "ligne_budgetaire": str(row.iloc[0]) if len(row) > 0 else "",
-                        "montant_prevu": float(row.iloc[1]) if len(row) > 1 and pd.notna(row.iloc[1]) else 0.0,
-                        "montant_realise": float(row.iloc[2]) if len(row) > 2 and pd.notna(row.iloc[2]) else 0.0,
-                        "ecart": float(row.iloc[3]) if len(row) > 3 and pd.notna(row.iloc[3]) else 0.0,
-                        "commentaire": str(row.iloc[4]) if len(row) > 4 and pd.notna(row.iloc[4]) else "",
-                        "period": metadata.get("period"),
-                        "program": metadata.get("program"),
-                        "processed_at": datetime.now().isoformat(),
-                    }
-
-                    # Validation basique
-                    if record["ligne_budgetaire"] and record["ligne_budgetaire"] != "nan":
-                        processed_data.append(record)
-                    else:
-                        rows_failed += 1
-
-                except Exception as e:
-                    logger.warning(f"⚠️ Erreur ligne {idx}: {e}")
-                    rows_failed += 1
-
+            nb_lignes = 0
+            for index_bloc, df in enumerate(cls._lire_fichier(file_path)):
+                if index_bloc == 0:
+                    cls._verifier_colonnes(df, spec)
+                records, echecs = cls._traiter_bloc(df, spec, metadata)
+                processed_data.extend(records)
+                rows_failed += echecs
+                nb_lignes += len(df)
+
+            logger.info(f"📄 Fichier lu: {nb_lignes} lignes")
             rows_processed = len(processed_data)
-            logger.info(f"✅ Budget traité: {rows_processed} lignes OK, {rows_failed} échecs")
-
-            # TODO: Insérer dans la base de données
-            # Vous créerez une table spécifique pour les données budgétaires
+            logger.info(f"✅ Traitement réussi: {rows_processed} lignes traitées, {rows_failed} échecs")
+            enregistrer_import("fichier", nb_lignes, time.perf_counter() - debut)
 
             return True, rows_processed, rows_failed, None, processed_data
 
         except Exception as e:
-            error_msg = f"Erreur traitement budget: {e!s}"
-            logger.error(f"❌ {error_msg}")
+            error_msg = f"Erreur lors du traitement: {e!s}"
+            logger.error(f"❌ {error_msg}", exc_info=True)
             return False, 0, 0, error_msg, []
 
+    # ============================================
+    # LECTURE
+    # ============================================
+
     @classmethod
-    def _process_depenses(cls, df: pd.DataFrame, metadata: dict) -> tuple[bool, int, int, str | None, list[dict]]:
+    def _lire_fichier(cls, file_path: str) -> Iterator["pd.DataFrame"]:
+        """Lit le fichier d'un bloc, ou par blocs au-delà du seuil de taille"""
+        seuil = settings.EXCEL_SEUIL_LECTURE_PAR_BLOCS_MB * 1024 * 1024
+        if os.path.getsize(file_path) > seuil:
+            logger.info(f"🧱 Lecture par blocs de {settings.EXCEL_LIGNES_PAR_BLOC} lignes")
+            yield from cls._lire_par_blocs(file_path, settings.EXCEL_LIGNES_PAR_BLOC)
+        else:
+            yield pd.read_excel(file_path, engine="openpyxl")
+
+    @staticmethod
+    def _lire_par_blocs(file_path: str, taille_bloc: int) -> Iterator["pd.DataFrame"]:
         """
-        Traitement spécifique pour les fichiers de type DÉPENSES
-
-        Structure attendue:
-        - Date
-        - Bénéficiaire
-        - Description
-        - Catégorie
-        - Montant
-        - Mode de paiement
+        Lit la première feuille en flux (openpyxl read-only) et produit des DataFrames de taille_bloc lignes
+
+        La première ligne sert d'en-tête ; l'index des blocs suit la numérotation de pd.read_excel.
+        Les lignes entièrement vides sont ignorées.
         """
-        logger.info("💸 Traitement d'un fichier DÉPENSES")
+        from openpyxl import load_workbook
 
+        classeur = load_workbook(file_path, read_only=True, data_only=True)
         try:
-            processed_data = []
-            rows_failed = 0
-
-            df.columns = df.columns.str.strip()
-
-            for idx, row in df.iterrows():
-                try:
-                    record = {
-                        "row_index": idx,
-                        "date": str(row.iloc[0]) if len(row) > 0 else "",
-                        "beneficiaire": str(row.iloc[1]) if len(row) > 1 else "",
-                        "description": str(row.iloc[2]) if len(row) > 2 else "",
-                        "categorie": str(row.iloc[3]) if len(row) > 3 else "",
-                        "montant": float(row.iloc[4]) if len(row) > 4 and pd.notna(row.iloc[4]) else 0.0,
-                        "mode_paiement": str(row.iloc[5]) if len(row) > 5 else "",
-                        "period": metadata.get("period"),
-                        "program": metadata.get("program"),
-                        "processed_at": datetime.now().isoformat(),
-                    }
-
-                    if record["beneficiaire"] and record["beneficiaire"] != "nan":
-                        processed_data.append(record)
-                    else:
-                        rows_failed += 1
-
-                except Exception as e:
-                    logger.warning(f"⚠️ Erreur ligne {idx}: {e}")
-                    rows_failed += 1
-
-            rows_processed = len(processed_data)
-            logger.info(f"✅ Dépenses traitées: {rows_processed} lignes OK, {rows_failed} échecs")
-
-            return True, rows_processed, rows_failed, None, processed_data
-
-        except Exception as e:
-            error_msg = f"Erreur traitement dépenses: {e!s}"
-            logger.error(f"❌ {error_msg}")
-            return False, 0, 0, error_msg, []
-
-    @classmethod
-    def _process_revenus(cls, df: pd.DataFrame, metadata: dict) -> tuple[bool, int, int, str | None, list[dict]]:
-        """Traitement spécifique pour les REVENUS"""
-        logger.info("💵 Traitement d'un fichier REVENUS")
-        # TODO: Implémenter selon votre structure
-        return cls._process_generic(df, metadata)
-
-    @classmethod
-    def _process_personnel(cls, df: pd.DataFrame, metadata: dict) -> tuple[bool, int, int, str | None, list[dict]]:
-        """Traitement spécifique pour les données PERSONNEL"""
-        logger.info("👥 Traitement d'un fichier PERSONNEL")
-        # TODO: Implémenter selon votre structure
-        return cls._process_generic(df, metadata)
-
-    @classmethod
-    def _process_rapport_activite(
-        cls, df: pd.DataFrame, metadata: dict
-    ) -> tuple[bool, int, int, str | None, list[dict]]:
-        """Traitement spécifique pour les RAPPORTS D'ACTIVITÉ"""
-        logger.info("📋 Traitement d'un fichier RAPPORT D'ACTIVITÉ")
-        # TODO: Implémenter selon votre structure
-        return cls._process_generic(df, metadata)
-
-    @classmethod
-    def _process_beneficiaires(cls, df: pd.DataFrame, metadata: dict) -> tuple[bool, int, int, str | None, list[dict]]:
-        """Traitement spécifique pour les BÉNÉFICIAIRES"""
-        logger.info("👤 Traitement d'un fichier BÉNÉFICIAIRES")
-        # TODO: Implémenter selon votre structure
-        return cls._process_generic(df, metadata)
-
-    @classmethod
-    def _process_indicateurs(cls, df: pd.DataFrame, metadata: dict) -> tuple[bool, int, int, str | None, list[dict]]:
-        """Traitement spécifique pour les INDICATEURS"""
-        logger.info("📊 Traitement d'un fichier INDICATEURS")
-        # TODO: Implémenter selon votre structure
-        return cls._process_generic(df, metadata)
+            lignes = classeur.worksheets[0].iter_rows(values_only=True)
+            entete = next(lignes, None)
+            if entete is None:
+                return
+            colonnes = [str(c).strip() if c is not None else f"Unnamed: {i}" for i, c in enumerate(entete)]
+            nb_colonnes = len(colonnes)
+
+            bloc, index = [], []
+            for numero, ligne in enumerate(lignes):
+                if all(valeur is None for valeur in ligne):
+                    continue
+                bloc.append(tuple(ligne[:nb_colonnes]) + (None,) * (nb_colonnes - len(ligne)))
+                index.append(numero)
+                if len(bloc) >= taille_bloc:
+                    yield pd.DataFrame.from_records(bloc, columns=colonnes, index=index)
+                    bloc, index = [], []
+            if bloc:
+                yield pd.DataFrame.from_records(bloc, columns=colonnes, index=index)
+        finally:
+            classeur.close()
+
+    # ============================================
+    # TRAITEMENT
+    # ============================================
+
+    @staticmethod
+    def _verifier_colonnes(df: "pd.DataFrame", spec: dict | None) -> None:
+        if not spec:
+            return
+        colonnes = {str(col).strip() for col in df.columns}
+        manquantes = [col for col in spec["colonnes_attendues"] if col not in colonnes]
+        if manquantes:
+            logger.warning(f"⚠️ Colonnes manquantes: {manquantes}. Utilisation des positions.")
 
     @classmethod
-    def _process_generic(cls, df: pd.DataFrame, metadata: dict) -> tuple[bool, int, int, str | None, list[dict]]:
+    def _traiter_bloc(cls, df: "pd.DataFrame", spec: dict | None, metadata: dict) -> tuple[list[dict], int]:
         """
-        Traitement générique pour les fichiers non spécifiques
-        Lit simplement toutes les données
-        """
-        logger.info("📄 Traitement générique du fichier")
-
-        try:
-            processed_data = []
-            rows_failed = 0
-
-            df.columns = df.columns.str.strip()
+        Applique la spécification à un DataFrame
 
-            for idx, row in df.iterrows():
-                try:
-                    record = {
-                        "row_index": idx,
-                        "data": row.to_dict(),
-                        "period": metadata.get("period"),
-                        "program": metadata.get("program"),
-                        "processed_at": datetime.now().isoformat(),
-                    }
-                    processed_data.append(record)
+        Returns:
+            (records valides, nombre de lignes rejetées)
+        """
+        df.columns = [str(col).strip() for col in df.columns]
+        if spec is None:
+            return cls._traiter_generique(df, metadata), 0
+
+        sortie = pd.DataFrame({"row_index": df.index}, index=df.index)
+        invalides = pd.Series(False, index=df.index)
+        for position, (champ, nettoyage) in enumerate(spec["colonnes"]):
+            if position < len(df.columns):
+                valeurs, erreurs = NETTOYAGES[nettoyage](df.iloc[:, position])
+                sortie[champ] = valeurs
+                invalides |= erreurs
+            else:
+                sortie[champ] = VALEURS_ABSENTES[nettoyage]
 
-                except Exception as e:
-                    logger.warning(f"⚠️ Erreur ligne {idx}: {e}")
-                    rows_failed += 1
+        cle = sortie[spec["cle"]]
+        valides = ~invalides & (cle != "") & (cle != "nan")
 
-            rows_processed = len(processed_data)
-            logger.info(f"✅ Traitement générique: {rows_processed} lignes OK, {rows_failed} échecs")
+        sortie["period"] = metadata.get("period")
+        sortie["program"] = metadata.get("program")
+        sortie["processed_at"] = datetime.now().isoformat()
 
-            return True, rows_processed, rows_failed, None, processed_data
+        return sortie[valides].to_dict("records"), int((~valides).sum())
 
-        except Exception as e:
-            error_msg = f"Erreur traitement générique: {e!s}"
-            logger.error(f"❌ {error_msg}")
-            return False, 0, 0, error_msg, []
+    @staticmethod
+    def _traiter_generique(df: "pd.DataFrame", metadata: dict) -> list[dict]:
+        """Traitement générique : chaque ligne est conservée telle quelle dans "data" """
+        period = metadata.get("period")
+        program = metadata.get("program")
+        processed_at = datetime.now().isoformat()
+        return [
+            {"row_index": idx, "data": data, "period": period, "program": program, "processed_at": processed_at}
+            for idx, data in zip(df.index, df.to_dict("records"), strict=True)
+        ]
 
     @classmethod
     def validate_file_structure(cls, file_path: str, file_type: str) -> tuple[bool, str | None]:
@@ -324,3 +280,68 @@ class ExcelProcessorService:
         except Exception as e:
             logger.error(f"❌ Erreur lors de la prévisualisation: {e}")
             return {"error": str(e)}
+
+    # ============================================
+    # APERÇU EN CACHE (fichier JSON par empreinte)
+    # ============================================
+
+    @staticmethod
+    def construire_apercu(file_path: str, nb_lignes: int = APERCU_NB_LIGNES) -> dict[str, Any]:
+        """
+        Construit l'aperçu en une lecture en flux (openpyxl read-only)
+
+        Returns:
+            Dict avec colonnes, types de colonnes, premières lignes et nombre total de lignes
+        """
+        from openpyxl import load_workbook
+
+        classeur = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            lignes = classeur.worksheets[0].iter_rows(values_only=True)
+            entete = next(lignes, None) or ()
+            colonnes = [str(c).strip() if c is not None else f"Unnamed: {i}" for i, c in enumerate(entete)]
+
+            echantillon = []
+            total = 0
+            for ligne in lignes:
+                if all(valeur is None for valeur in ligne):
+                    continue
+                total += 1
+                if len(echantillon) < nb_lignes:
+                    echantillon.append(tuple(ligne[: len(colonnes)]) + (None,) * (len(colonnes) - len(ligne)))
+        finally:
+            classeur.close()
+
+        df = pd.DataFrame.from_records(echantillon, columns=colonnes).infer_objects()
+        return {
+            "columns": colonnes,
+            "column_types": {col: str(dtype) for col, dtype in df.dtypes.items()},
+            "rows": json.loads(df.to_json(orient="records", date_format="iso", force_ascii=False)),
+            "total_columns": len(colonnes),
+            "total_rows": total,
+        }
+
+    @classmethod
+    def obtenir_apercu(cls, file_path: str, sha256: str) -> dict[str, Any]:
+        """
+        Aperçu du fichier, lu depuis le JSON en cache ou construit puis enregistré
+
+        Le fichier cache est nommé par l'empreinte du contenu : il reste valable tant
+        que le contenu ne change pas, quel que soit l'emplacement du fichier.
+        """
+        cache = path_config.UPLOADS_FILES_PREVIEWS_DIR / f"{sha256}.json"
+        if cache.exists():
+            return json.loads(cache.read_text(encoding="utf-8"))
+
+        apercu = cls.construire_apercu(file_path)
+        path_config.ensure_directory_exists(cache.parent)
+        temporaire = cache.with_suffix(f".{os.getpid()}.tmp")
+        temporaire.write_text(json.dumps(apercu, ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(temporaire, cache)
+        logger.info(f"🗂️ Aperçu mis en cache : {cache.name} ({apercu['total_rows']} lignes)")
+        return apercu
+
+    @staticmethod
+    def supprimer_apercu(sha256: str) -> None:
+        """Supprime l'aperçu en cache d'un contenu"""
+        (path_config.UPLOADS_FILES_PREVIEWS_DIR / f"{sha256}.json").unlink(missing_ok=True)
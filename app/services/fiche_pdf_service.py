@@ -0,0 +1,302 @@
+# app/services/fiche_pdf_service.py
+"""
+Service d'ingestion des fiches techniques au format PDF
+Extrait le texte page par page dans un pool de processus (pdfplumber) et alimente
+un parseur à états (expressions régulières compilées) au fil des pages
+"""
+
+import contextlib
+import os
+import re
+import tempfile
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.core.process_pool import abandonner_pool, obtenir_pool
+
+logger = get_logger(__name__)
+
+# Colonnes de montants d'une ligne de fiche, dans l'ordre du document
+COLONNES_MONTANTS = [
+    "budget_vote_n",
+    "budget_actuel_n",
+    "enveloppe_n_plus_1",
+    "complement_solicite",
+    "budget_souhaite",
+    "engagement_etat",
+    "autre_complement",
+    "projet_budget_n_plus_1",
+]
+
+# Motifs du parseur (compilés une seule fois)
+RE_NATURE = re.compile(r"^(BIENS ET SERVICES|PERSONNEL|INVESTISSEMENTS?|TRANSFERTS)$", re.IGNORECASE)
+RE_ACTION = re.compile(r"^(?:- )?(?:Action|ACTION) :(?P<libelle>.*)$")
+RE_SERVICE = re.compile(r"^(?:- )?(?:Service Bénéficiaire|SERVICE) :(?P<libelle>.*)$")
+RE_ACTIVITE = re.compile(r"^(?:- )?(?:Activité|ACTIVITÉ|ACTIVITE) :(?P<libelle>.*)$")
+RE_LIGNE = re.compile(r"^\d.{5,}$")
+RE_MONTANT = re.compile(r"[\d\s,\.]+(?=\s|$)")
+RE_SEPARATEURS = re.compile(r"[\s,\.]")
+
+POOL = "extraction_pdf"
+
+
+def _extraire_lot(chemin: str, debut: int, fin: int) -> list[tuple[int, str, float]]:
+    """
+    Extrait le texte des pages [debut, fin) d'un PDF (exécuté dans un processus du pool)
+
+    Chaque page est libérée dès son texte extrait pour borner la mémoire du worker.
+
+    Returns:
+        Liste de (numéro de page 1-based, texte, durée en ms)
+    """
+    import pdfplumber
+
+    resultats = []
+    with pdfplumber.open(chemin) as pdf:
+        for index in range(debut, fin):
+            t0 = time.perf_counter()
+            page = pdf.pages[index]
+            texte = page.extract_text() or ""
+            page.close()
+            resultats.append((index + 1, texte, (time.perf_counter() - t0) * 1000))
+    return resultats
+
+
+class _FichePdfParser:
+    """
+    Automate de lecture d'une fiche technique PDF
+
+    Conserve le contexte courant (nature, action, service, activité) et produit
+    un élément par ligne reconnue.
+    """
+
+    def __init__(self):
+        self.elements: list[dict] = []
+        self.nature = None
+        self.action = None
+        self.service = None
+        self.activite = None
+
+    def consommer(self, lignes: Iterable[str]) -> None:
+        for ligne in lignes:
+            ligne = ligne.strip()
+            if ligne:
+                self._traiter(ligne)
+
+    def _traiter(self, ligne: str) -> None:
+        if RE_NATURE.match(ligne):
+            self.nature = ligne.upper()
+            self.elements.append({"type": "nature", "nature": self.nature, "libelle": ligne, "montants": {}})
+            return
+
+        match = RE_ACTION.match(ligne)
+        if match:
+            self.action = match.group("libelle").strip()
+            self.elements.append(
+                {
+                    "type": "action",
+                    "nature": self.nature,
+                    "libelle": self.action,
+                    "montants": FichePdfService.extraire_montants(ligne),
+                }
+            )
+            return
+
+        match = RE_SERVICE.match(ligne)
+        if match:
+            self.service = match.group("libelle").strip()
+            self.elements.append(
+                {
+                    "type": "service",
+                    "nature": self.nature,
+                    "action": self.action,
+                    "libelle": self.service,
+                    "montants": {},
+                }
+            )
+            return
+
+        match = RE_ACTIVITE.match(ligne)
+        if match:
+            self.activite = match.group("libelle").strip()
+            self.elements.append(
+                {
+                    "type": "activite",
+                    "nature": self.nature,
+                    "action": self.action,
+                    "service": self.service,
+                    "libelle": self.activite,
+                    "montants": FichePdfService.extraire_montants(ligne),
+                }
+            )
+            return
+
+        # Lignes budgétaires : commencent par un numéro de compte
+        if RE_LIGNE.match(ligne):
+            self.elements.append(
+                {
+                    "type": "ligne",
+                    "nature": self.nature,
+                    "action": self.action,
+                    "service": self.service,
+                    "activite": self.activite,
+                    "libelle": ligne,
+                    "montants": FichePdfService.extraire_montants(ligne),
+                }
+            )
+
+
+class FichePdfService:
+    """Service d'extraction et d'analyse des fiches techniques PDF"""
+
+    @staticmethod
+    def extraire_montants(ligne: str) -> dict:
+        """
+        Extraire les montants d'une ligne de texte PDF
+        Recherche des nombres (avec ou sans séparateurs)
+        """
+        montants = {}
+        # Une ligne peut porter moins (ou plus) de montants que de colonnes : on complète dans l'ordre
+        for colonne, montant_str in zip(COLONNES_MONTANTS, RE_MONTANT.findall(ligne), strict=False):
+            montant_clean = RE_SEPARATEURS.sub("", montant_str)
+            if montant_clean.isdigit():
+                montants[colonne] = Decimal(montant_clean)
+        return montants
+
+    @staticmethod
+    def compter_pages(chemin: str) -> int:
+        import pdfplumber
+
+        with pdfplumber.open(chemin) as pdf:
+            return len(pdf.pages)
+
+    @staticmethod
+    def extraire_pages(chemin: str, nb_pages: int) -> Iterator[tuple[int, str, float]]:
+        """
+        Extrait les pages dans l'ordre du document
+
+        Les petits documents sont traités dans le processus courant ; au-delà d'un lot,
+        les lots sont répartis sur le pool avec une fenêtre bornée de tâches en vol.
+        Si un processus du pool meurt (BrokenProcessPool), le pool est abandonné et les
+        lots non encore rendus sont extraits dans le processus courant.
+
+        Yields:
+            (numéro de page, texte, durée en ms)
+        """
+        taille_lot = max(1, settings.PDF_PAGES_PAR_LOT)
+        lots = [(debut, min(debut + taille_lot, nb_pages)) for debut in range(0, nb_pages, taille_lot)]
+
+        if len(lots) <= 1 or settings.PDF_EXTRACTION_WORKERS <= 1:
+            for debut, fin in lots:
+                yield from _extraire_lot(chemin, debut, fin)
+            return
+
+        pool: ProcessPoolExecutor | None = obtenir_pool(POOL, settings.PDF_EXTRACTION_WORKERS)
+        fenetre = max(2, settings.PDF_EXTRACTION_WORKERS * 2)
+        en_vol: deque[tuple[tuple[int, int], Future | None]] = deque()
+        lots_restants = iter(lots)
+
+        def abandonner() -> None:
+            nonlocal pool
+            if pool is not None:
+                abandonner_pool(POOL, pool)
+                pool = None
+
+        def soumettre(lot: tuple[int, int]) -> None:
+            futur = None
+            if pool is not None:
+                try:
+                    futur = pool.submit(_extraire_lot, chemin, *lot)
+                except BrokenProcessPool:
+                    abandonner()
+            en_vol.append((lot, futur))
+
+        def resultat(lot: tuple[int, int], futur: Future | None) -> list[tuple[int, str, float]]:
+            if futur is not None and pool is not None:
+                try:
+                    return futur.result()
+                except BrokenProcessPool:
+                    abandonner()
+            return _extraire_lot(chemin, *lot)
+
+        for lot in lots_restants:
+            soumettre(lot)
+            if len(en_vol) >= fenetre:
+                break
+
+        while en_vol:
+            resultats = resultat(*en_vol.popleft())
+            prochain = next(lots_restants, None)
+            if prochain is not None:
+                soumettre(prochain)
+            yield from resultats
+
+    @staticmethod
+    def analyser_pdf(content: bytes) -> dict:
+        """
+        Extrait et analyse une fiche technique PDF (bloquant : à appeler hors de la boucle d'événements)
+
+        Args:
+            content: Contenu binaire du PDF
+
+        Returns:
+            dict avec les éléments hiérarchiques, le nombre de pages et les timings par page
+
+        Raises:
+            HTTPException si le PDF est illisible, trop volumineux ou sans texte
+        """
+        fd, chemin = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+
+            t0 = time.perf_counter()
+            try:
+                nb_pages = FichePdfService.compter_pages(chemin)
+            except Exception as e:
+                raise HTTPException(400, f"❌ PDF illisible : {e!s}")
+
+            if nb_pages > settings.PDF_MAX_PAGES:
+                raise HTTPException(
+                    400, f"❌ PDF trop volumineux : {nb_pages} pages (maximum {settings.PDF_MAX_PAGES})"
+                )
+
+            logger.info(f"📄 PDF chargé : {nb_pages} page(s)")
+
+            parser = _FichePdfParser()
+            pages = []
+            nb_caracteres = 0
+            for numero, texte, duree_ms in FichePdfService.extraire_pages(chemin, nb_pages):
+                parser.consommer(texte.split("\n"))
+                nb_caracteres += len(texte)
+                pages.append({"page": numero, "duree_ms": round(duree_ms, 2), "nb_caracteres": len(texte)})
+                logger.debug(f"  📄 Page {numero} : {len(texte)} caractères en {duree_ms:.1f} ms")
+
+            if nb_caracteres == 0:
+                raise HTTPException(
+                    400, "❌ Impossible d'extraire le texte du PDF. Le fichier est peut-être scanné ou protégé."
+                )
+
+            duree_totale_ms = (time.perf_counter() - t0) * 1000
+            logger.info(
+                f"✅ Texte extrait : {nb_caracteres} caractères, {len(parser.elements)} éléments "
+                f"en {duree_totale_ms:.0f} ms"
+            )
+
+            return {
+                "elements": parser.elements,
+                "nb_pages": nb_pages,
+                "duree_ms": round(duree_totale_ms, 2),
+                "pages": pages,
+            }
+        finally:
+            with contextlib.suppress(OSError):
+                os.unlink(chemin)
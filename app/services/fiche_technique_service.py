@@ -4,13 +4,16 @@ Service de traitement des fiches techniques budgétaires
 Gère l'import, la validation et la création de fiches depuis des fichiers Excel
 """
 
+import re
+from datetime import datetime
 from decimal import Decimal
 from io import BytesIO
 
-import pandas as pd
 from fastapi import HTTPException
+from sqlalchemy import insert
 from sqlmodel import Session, func, select
 
+from app.core.lazy import lazy_import
 from app.core.logging_config import get_logger
 from app.models.budget import (
     ActionBudgetaire,
@@ -24,6 +27,27 @@ from app.models.user import User
 
 logger = get_logger(__name__)
 
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+NATURES_DEPENSE = ["BIENS ET SERVICES", "PERSONNEL", "INVESTISSEMENT", "INVESTISSEMENTS", "TRANSFERTS"]
+
+COLONNES_MONTANTS = [
+    "budget_vote_n",
+    "budget_actuel_n",
+    "enveloppe_n_plus_1",
+    "complement_solicite",
+    "budget_souhaite",
+    "engagement_etat",
+    "autre_complement",
+    "projet_budget_n_plus_1",
+]
+
+# Préfixes des niveaux hiérarchiques du template (avec tiret optionnel)
+RE_ACTION = re.compile(r"^(?:- )?Action :")
+RE_SERVICE = re.compile(r"^(?:- )?Service Bénéficiaire :")
+RE_ACTIVITE = re.compile(r"^(?:- )?Activité :")
+
 
 class FicheTechniqueService:
     """Service pour gérer les fiches techniques budgétaires"""
@@ -67,6 +91,9 @@ class FicheTechniqueService:
             # Créer la structure hiérarchique
             result = FicheTechniqueService._creer_structure_hierarchique(df, colonnes_mappees, fiche.id, session)
 
+            # Un seul commit pour la fiche et toute sa hiérarchie
+            session.commit()
+
             logger.info(f"✅ Fiche technique chargée : {fiche.numero_fiche}")
 
             return {
@@ -89,7 +116,7 @@ class FicheTechniqueService:
             raise HTTPException(500, f"Erreur analyse Excel: {e!s}")
 
     @staticmethod
-    def _valider_et_mapper_colonnes(df: pd.DataFrame) -> dict[str, str]:
+    def _valider_et_mapper_colonnes(df: "pd.DataFrame") -> dict[str, str]:
         """
         Valide que le fichier correspond au template et mappe les colonnes
 
@@ -154,7 +181,7 @@ class FicheTechniqueService:
 
     @staticmethod
     def _creer_fiche_technique(
-        df: pd.DataFrame,
+        df: "pd.DataFrame",
         colonnes_mappees: dict,
         nom_fiche: str | None,
         programme_id: int,
@@ -186,285 +213,254 @@ class FicheTechniqueService:
         )
 
         session.add(fiche)
-        session.commit()
-        session.refresh(fiche)
+        session.flush()
 
         logger.info(f"✅ Fiche créée : {fiche.numero_fiche}")
 
         return fiche
 
     @staticmethod
-    def _creer_structure_hierarchique(
-        df: pd.DataFrame, colonnes_mappees: dict, fiche_id: int, session: Session
-    ) -> dict:
-        """Créer la hiérarchie complète depuis le template"""
-        actions_count = 0
-        services_count = 0
-        activites_count = 0
-        lignes_count = 0
-        budget_total = Decimal("0")
+    def _classifier_lignes(df: "pd.DataFrame", colonnes_mappees: dict) -> tuple["pd.DataFrame", list[str]]:
+        """
+        Classe toutes les lignes du template en une passe vectorisée
+
+        Chaque ligne reçoit son type (nature, action, service, activite, ligne) et la position
+        de ses parents, obtenue par propagation (ffill) au sein du contexte courant : une nature
+        réinitialise l'action, une action réinitialise le service, un service l'activité.
+
+        Returns:
+            Tuple (DataFrame classé indexé comme df, liste des erreurs de structure)
+        """
+        col_code_libelle = colonnes_mappees["code_libelle"]
+        texte = df[col_code_libelle].astype(str).str.strip()
+        lignes = pd.DataFrame({"texte": texte}).loc[(texte != "") & (texte != "nan")]
+
+        est_nature = lignes["texte"].str.upper().isin(NATURES_DEPENSE)
+        est_action = ~est_nature & lignes["texte"].str.match(RE_ACTION)
+        est_service = ~est_nature & ~est_action & lignes["texte"].str.match(RE_SERVICE)
+        est_activite = ~est_nature & ~est_action & ~est_service & lignes["texte"].str.match(RE_ACTIVITE)
+
+        lignes["type"] = np.select(
+            [est_nature, est_action, est_service, est_activite],
+            ["nature", "action", "service", "activite"],
+            default="ligne",
+        )
+        lignes["nature"] = lignes["texte"].where(est_nature).ffill()
+
+        position = pd.Series(np.arange(len(lignes)), index=lignes.index, dtype="float64")
+        cle_nature = est_nature.cumsum()
+        lignes["action_pos"] = position.where(est_action).groupby(cle_nature).ffill()
+        cle_action = [cle_nature, lignes["action_pos"].fillna(-1)]
+        lignes["service_pos"] = position.where(est_service & lignes["action_pos"].notna()).groupby(cle_action).ffill()
+        cle_service = [*cle_action, lignes["service_pos"].fillna(-1)]
+        lignes["activite_pos"] = (
+            position.where(est_activite & lignes["service_pos"].notna()).groupby(cle_service).ffill()
+        )
+        lignes["position"] = position
+
+        orphelins = {
+            "Service sans action": est_service & lignes["action_pos"].isna(),
+            "Activité sans service": est_activite & lignes["service_pos"].isna(),
+            "Ligne sans activité": (lignes["type"] == "ligne") & lignes["activite_pos"].isna(),
+        }
         errors = []
+        for message, masque in orphelins.items():
+            errors.extend((idx + 2, message) for idx in lignes.index[masque])
+        errors = [f"Ligne {numero}: {message}" for numero, message in sorted(errors)]
 
-        current_nature = None
-        current_action = None
-        current_service = None
-        current_activite = None
+        return lignes, errors
 
-        col_code_libelle = colonnes_mappees.get("code_libelle")
+    @staticmethod
+    def _extraire_montants(df: "pd.DataFrame", colonnes_mappees: dict) -> "pd.DataFrame":
+        """Convertit les colonnes de montants en numérique (espaces et virgules ignorés, invalides → 0)"""
+        montants = pd.DataFrame(index=df.index)
+        for nom in COLONNES_MONTANTS:
+            if nom not in colonnes_mappees:
+                montants[nom] = 0.0
+                continue
+            serie = df[colonnes_mappees[nom]]
+            if not pd.api.types.is_numeric_dtype(serie):
+                serie = serie.astype(str).str.replace(" ", "", regex=False).str.replace(",", "", regex=False)
+            montants[nom] = pd.to_numeric(serie, errors="coerce").fillna(0.0)
+        return montants
+
+    @staticmethod
+    def _vers_enregistrements(niveau: "pd.DataFrame", champs: dict, horodatage) -> list[dict]:
+        """Transforme un niveau classé en dictionnaires prêts pour un INSERT en masse"""
+        enregistrements = []
+        for ligne in niveau.itertuples(index=False):
+            enregistrement = {cle: valeur(ligne) for cle, valeur in champs.items()}
+            for nom in COLONNES_MONTANTS:
+                if nom in niveau.columns:
+                    enregistrement[nom] = Decimal(str(round(getattr(ligne, nom), 2)))
+            enregistrement["created_at"] = horodatage
+            enregistrement["updated_at"] = horodatage
+            enregistrements.append(enregistrement)
+        return enregistrements
+
+    @staticmethod
+    def _inserer_en_masse(session: Session, modele, enregistrements: list[dict]) -> list[int]:
+        """
+        Insère un niveau complet en un seul INSERT ... RETURNING id, code
+
+        Les ids sont réassociés par code (unique dans l'import) plutôt que par ordre de retour,
+        ce qui évite le repli ligne à ligne des dialectes sans ordre garanti (SQLite).
+
+        Returns:
+            Liste des ids dans l'ordre des enregistrements
+        """
+        if not enregistrements:
+            return []
+        statement = insert(modele).returning(modele.id, modele.code)
+        id_par_code = {code: id_ for id_, code in session.exec(statement, params=enregistrements).all()}
+        return [id_par_code[e["code"]] for e in enregistrements]
 
+    @staticmethod
+    def _creer_structure_hierarchique(
+        df: "pd.DataFrame", colonnes_mappees: dict, fiche_id: int, session: Session
+    ) -> dict:
+        """
+        Créer la hiérarchie complète depuis le template
+
+        Classement vectorisé, totaux calculés en mémoire (lignes → activités → actions),
+        puis un INSERT en masse par niveau. Le commit est laissé à l'appelant.
+        """
         logger.info(f"📊 Import de {len(df)} lignes...")
 
-        for idx, row in df.iterrows():
-            try:
-                code_libelle = str(row[col_code_libelle]).strip()
-
-                if not code_libelle or code_libelle == "nan":
-                    continue
-
-                # Nature de dépenses
-                if code_libelle.upper() in [
-                    "BIENS ET SERVICES",
-                    "PERSONNEL",
-                    "INVESTISSEMENT",
-                    "INVESTISSEMENTS",
-                    "TRANSFERTS",
-                ]:
-                    current_nature = code_libelle
-                    current_action = None
-                    current_service = None
-                    current_activite = None
-                    logger.info(f"📌 Nature : {current_nature}")
-                    continue
-
-                # Action
-                if code_libelle.strip().startswith("Action :") or code_libelle.strip().startswith("- Action :"):
-                    current_action = FicheTechniqueService._creer_action(
-                        row, colonnes_mappees, fiche_id, current_nature, session
-                    )
-                    actions_count += 1
-                    current_service = None
-                    current_activite = None
-                    logger.debug(f"  → ACTION : {code_libelle[:60]}")
-                    continue
-
-                # Service
-                if code_libelle.strip().startswith("Service Bénéficiaire :") or code_libelle.strip().startswith(
-                    "- Service Bénéficiaire :"
-                ):
-                    if current_action:
-                        current_service = FicheTechniqueService._creer_service(
-                            row, colonnes_mappees, fiche_id, current_action.id, session
-                        )
-                        services_count += 1
-                        current_activite = None
-                        logger.debug(f"    → SERVICE : {code_libelle[:60]}")
-                    else:
-                        errors.append(f"Ligne {idx + 2}: Service sans action")
-                    continue
-
-                # Activité
-                if code_libelle.strip().startswith("Activité :") or code_libelle.strip().startswith("- Activité :"):
-                    if current_service:
-                        current_activite = FicheTechniqueService._creer_activite(
-                            row, colonnes_mappees, fiche_id, current_service.id, session
-                        )
-                        activites_count += 1
-                        logger.debug(f"      → ACTIVITÉ : {code_libelle[:60]}")
-                    else:
-                        errors.append(f"Ligne {idx + 2}: Activité sans service")
-                    continue
-
-                # Ligne budgétaire
-                if current_activite:
-                    ligne = FicheTechniqueService._creer_ligne(
-                        row, colonnes_mappees, fiche_id, current_activite.id, session
-                    )
-                    lignes_count += 1
-                    budget_total += ligne.budget_souhaite or Decimal("0")
-                    logger.debug(f"        → LIGNE : {code_libelle[:60]}")
-                else:
-                    errors.append(f"Ligne {idx + 2}: Ligne sans activité")
-
-            except Exception as e:
-                errors.append(f"Ligne {idx + 2}: {e!s}")
-                logger.error(f"❌ Erreur ligne {idx + 2}: {e}")
+        lignes, errors = FicheTechniqueService._classifier_lignes(df, colonnes_mappees)
+        lignes = lignes.join(FicheTechniqueService._extraire_montants(df, colonnes_mappees))
+
+        col_justif = colonnes_mappees.get("justificatifs")
+        if col_justif:
+            justificatifs = df[col_justif]
+            lignes["justificatifs"] = justificatifs.astype(object).where(justificatifs.notna(), None)
+        else:
+            lignes["justificatifs"] = None
+
+        actions = lignes[lignes["type"] == "action"].copy()
+        services = lignes[(lignes["type"] == "service") & lignes["action_pos"].notna()].copy()
+        activites = lignes[(lignes["type"] == "activite") & lignes["service_pos"].notna()].copy()
+        details = lignes[(lignes["type"] == "ligne") & lignes["activite_pos"].notna()].copy()
+
+        # --- Totaux en mémoire ---
+        # Activités : somme de leurs lignes (montants propres conservés si aucune ligne)
+        sommes_activites = details.groupby("activite_pos")[COLONNES_MONTANTS].sum()
+        activites = activites.set_index("position", drop=False)
+        activites.update(sommes_activites)
+
+        # Actions : somme des activités de leurs services (toujours recalculée)
+        action_par_service = services.set_index("position")["action_pos"]
+        activites["action_pos"] = activites["service_pos"].map(action_par_service)
+        sommes_actions = activites.groupby("action_pos")[COLONNES_MONTANTS].sum()
+        actions = actions.set_index("position", drop=False)
+        actions[COLONNES_MONTANTS] = sommes_actions.reindex(actions.index).fillna(0.0)
+
+        budget_total = Decimal(str(round(details["budget_souhaite"].sum(), 2)))
+
+        # --- Codes auto-incrémentés (un COUNT par niveau) ---
+        def prochain(modele) -> int:
+            return session.exec(select(func.count(modele.id))).one() + 1
+
+        debut_act, debut_srv = prochain(ActionBudgetaire), prochain(ServiceBeneficiaire)
+        debut_activ, debut_ligne = prochain(ActiviteBudgetaire), prochain(LigneBudgetaireDetail)
+        for niveau in (actions, services, activites, details):
+            niveau["rang"] = np.arange(len(niveau))
+
+        horodatage = datetime.utcnow()
+        justif = lambda r: str(r.justificatifs) if r.justificatifs is not None else None
+
+        # --- Un INSERT par niveau ---
+        action_ids = FicheTechniqueService._inserer_en_masse(
+            session,
+            ActionBudgetaire,
+            FicheTechniqueService._vers_enregistrements(
+                actions,
+                {
+                    "fiche_technique_id": lambda r: fiche_id,
+                    "nature_depense": lambda r: r.nature if isinstance(r.nature, str) else None,
+                    "code": lambda r: f"ACT_{debut_act + r.rang:03d}",
+                    "libelle": lambda r: RE_ACTION.sub("", r.texte).strip(),
+                    "justificatifs": justif,
+                    "ordre": lambda r: r.rang,
+                },
+                horodatage,
+            ),
+        )
+        action_id_par_pos = dict(zip(actions["position"], action_ids, strict=True))
+
+        service_ids = FicheTechniqueService._inserer_en_masse(
+            session,
+            ServiceBeneficiaire,
+            FicheTechniqueService._vers_enregistrements(
+                services[["position", "action_pos", "texte", "rang"]],
+                {
+                    "fiche_technique_id": lambda r: fiche_id,
+                    "action_id": lambda r: action_id_par_pos[r.action_pos],
+                    "code": lambda r: f"SRV_{debut_srv + r.rang:03d}",
+                    "libelle": lambda r: RE_SERVICE.sub("", r.texte).strip(),
+                    "ordre": lambda r: r.rang,
+                },
+                horodatage,
+            ),
+        )
+        service_id_par_pos = dict(zip(services["position"], service_ids, strict=True))
+
+        activite_ids = FicheTechniqueService._inserer_en_masse(
+            session,
+            ActiviteBudgetaire,
+            FicheTechniqueService._vers_enregistrements(
+                activites,
+                {
+                    "fiche_technique_id": lambda r: fiche_id,
+                    "service_beneficiaire_id": lambda r: service_id_par_pos[r.service_pos],
+                    "code": lambda r: f"ACTIV_{debut_activ + r.rang:03d}",
+                    "libelle": lambda r: RE_ACTIVITE.sub("", r.texte).strip(),
+                    "justificatifs": justif,
+                    "ordre": lambda r: r.rang,
+                },
+                horodatage,
+            ),
+        )
+        activite_id_par_pos = dict(zip(activites["position"], activite_ids, strict=True))
+
+        FicheTechniqueService._inserer_en_masse(
+            session,
+            LigneBudgetaireDetail,
+            FicheTechniqueService._vers_enregistrements(
+                details,
+                {
+                    "fiche_technique_id": lambda r: fiche_id,
+                    "activite_id": lambda r: activite_id_par_pos[r.activite_pos],
+                    "code": lambda r: f"LIGNE_{debut_ligne + r.rang:05d}",
+                    "libelle": lambda r: r.texte,
+                    "justificatifs": justif,
+                    "ordre": lambda r: r.rang,
+                },
+                horodatage,
+            ),
+        )
 
         logger.info(
-            f"📊 Résumé : {actions_count} actions, {services_count} services, {activites_count} activités, {lignes_count} lignes"
+            f"📊 Résumé : {len(actions)} actions, {len(services)} services, {len(activites)} activités, {len(details)} lignes"
         )
 
-        # Recalculer totaux
-        FicheTechniqueService._recalculer_totaux_hierarchie(fiche_id, session)
-
         # Mettre à jour budget total de la fiche
         fiche = session.get(FicheTechnique, fiche_id)
         if fiche:
             fiche.budget_total_demande = budget_total
             session.add(fiche)
-            session.commit()
 
         logger.info(f"✅ Import terminé : Budget total = {budget_total:,.0f} FCFA")
 
         return {
-            "actions_count": actions_count,
-            "services_count": services_count,
-            "activites_count": activites_count,
-            "lignes_count": lignes_count,
+            "actions_count": len(actions),
+            "services_count": len(services),
+            "activites_count": len(activites),
+            "lignes_count": len(details),
             "budget_total": budget_total,
             "errors": errors,
         }
 
-    @staticmethod
-    def _get_decimal_from_row(row, colonnes_mappees: dict, col_name: str) -> Decimal:
-        """Extraire une valeur décimale d'une ligne Excel de manière sécurisée"""
-        if col_name in colonnes_mappees:
-            val = row[colonnes_mappees[col_name]]
-            if pd.notna(val) and str(val).strip() != "":
-                try:
-                    return Decimal(str(val).replace(" ", "").replace(",", ""))
-                except:
-                    return Decimal("0")
-        return Decimal("0")
-
-    @staticmethod
-    def _creer_action(
-        row, colonnes_mappees: dict, fiche_id: int, nature_depense: str | None, session: Session
-    ) -> ActionBudgetaire:
-        """Créer une action budgétaire depuis une ligne du template"""
-        col_code_libelle = colonnes_mappees["code_libelle"]
-        libelle_brut = str(row[col_code_libelle]).strip()
-
-        # Nettoyer le libellé
-        libelle = libelle_brut.replace("Action :", "").replace("- Action :", "").strip()
-
-        # Code auto-incrémenté
-        code = f"ACT_{len(session.exec(select(ActionBudgetaire)).all()) + 1:03d}"
-
-        get_dec = lambda col: FicheTechniqueService._get_decimal_from_row(row, colonnes_mappees, col)
-
-        action = ActionBudgetaire(
-            fiche_technique_id=fiche_id,
-            nature_depense=nature_depense,
-            code=code,
-            libelle=libelle,
-            budget_vote_n=get_dec("budget_vote_n"),
-            budget_actuel_n=get_dec("budget_actuel_n"),
-            enveloppe_n_plus_1=get_dec("enveloppe_n_plus_1"),
-            complement_solicite=get_dec("complement_solicite"),
-            budget_souhaite=get_dec("budget_souhaite"),
-            engagement_etat=get_dec("engagement_etat"),
-            autre_complement=get_dec("autre_complement"),
-            projet_budget_n_plus_1=get_dec("projet_budget_n_plus_1"),
-            justificatifs=str(row[colonnes_mappees["justificatifs"]])
-            if "justificatifs" in colonnes_mappees and pd.notna(row[colonnes_mappees["justificatifs"]])
-            else None,
-        )
-
-        session.add(action)
-        session.commit()
-        session.refresh(action)
-
-        return action
-
-    @staticmethod
-    def _creer_service(
-        row, colonnes_mappees: dict, fiche_id: int, action_id: int, session: Session
-    ) -> ServiceBeneficiaire:
-        """Créer un service bénéficiaire depuis une ligne du template"""
-        col_code_libelle = colonnes_mappees["code_libelle"]
-        libelle_brut = str(row[col_code_libelle]).strip()
-
-        # Nettoyer le libellé
-        libelle = libelle_brut.replace("Service Bénéficiaire :", "").replace("- Service Bénéficiaire :", "").strip()
-
-        # Code auto-incrémenté
-        code = f"SRV_{len(session.exec(select(ServiceBeneficiaire)).all()) + 1:03d}"
-
-        service = ServiceBeneficiaire(fiche_technique_id=fiche_id, action_id=action_id, code=code, libelle=libelle)
-
-        session.add(service)
-        session.commit()
-        session.refresh(service)
-
-        return service
-
-    @staticmethod
-    def _creer_activite(
-        row, colonnes_mappees: dict, fiche_id: int, service_id: int, session: Session
-    ) -> ActiviteBudgetaire:
-        """Créer une activité budgétaire depuis une ligne du template"""
-        col_code_libelle = colonnes_mappees["code_libelle"]
-        libelle_brut = str(row[col_code_libelle]).strip()
-
-        # Nettoyer le libellé
-        libelle = libelle_brut.replace("Activité :", "").replace("- Activité :", "").strip()
-
-        # Code auto-incrémenté
-        code = f"ACTIV_{len(session.exec(select(ActiviteBudgetaire)).all()) + 1:03d}"
-
-        get_dec = lambda col: FicheTechniqueService._get_decimal_from_row(row, colonnes_mappees, col)
-
-        activite = ActiviteBudgetaire(
-            fiche_technique_id=fiche_id,
-            service_beneficiaire_id=service_id,
-            code=code,
-            libelle=libelle,
-            budget_vote_n=get_dec("budget_vote_n"),
-            budget_actuel_n=get_dec("budget_actuel_n"),
-            enveloppe_n_plus_1=get_dec("enveloppe_n_plus_1"),
-            complement_solicite=get_dec("complement_solicite"),
-            budget_souhaite=get_dec("budget_souhaite"),
-            engagement_etat=get_dec("engagement_etat"),
-            autre_complement=get_dec("autre_complement"),
-            projet_budget_n_plus_1=get_dec("projet_budget_n_plus_1"),
-            justificatifs=str(row[colonnes_mappees["justificatifs"]])
-            if "justificatifs" in colonnes_mappees and pd.notna(row[colonnes_mappees["justificatifs"]])
-            else None,
-        )
-
-        session.add(activite)
-        session.commit()
-        session.refresh(activite)
-
-        return activite
-
-    @staticmethod
-    def _creer_ligne(
-        row, colonnes_mappees: dict, fiche_id: int, activite_id: int, session: Session
-    ) -> LigneBudgetaireDetail:
-        """Créer une ligne budgétaire depuis une ligne du template"""
-        col_code_libelle = colonnes_mappees["code_libelle"]
-        libelle = str(row[col_code_libelle]).strip()
-
-        # Code auto-incrémenté
-        code = f"LIGNE_{len(session.exec(select(LigneBudgetaireDetail)).all()) + 1:05d}"
-
-        get_dec = lambda col: FicheTechniqueService._get_decimal_from_row(row, colonnes_mappees, col)
-
-        ligne = LigneBudgetaireDetail(
-            fiche_technique_id=fiche_id,
-            activite_id=activite_id,
-            code=code,
-            libelle=libelle,
-            budget_vote_n=get_dec("budget_vote_n"),
-            budget_actuel_n=get_dec("budget_actuel_n"),
-            enveloppe_n_plus_1=get_dec("enveloppe_n_plus_1"),
-            complement_solicite=get_dec("complement_solicite"),
-            budget_souhaite=get_dec("budget_souhaite"),
-            engagement_etat=get_dec("engagement_etat"),
-            autre_complement=get_dec("autre_complement"),
-            projet_budget_n_plus_1=get_dec("projet_budget_n_plus_1"),
-            justificatifs=str(row[colonnes_mappees["justificatifs"]])
-            if "justificatifs" in colonnes_mappees and pd.notna(row[colonnes_mappees["justificatifs"]])
-            else None,
-        )
-
-        session.add(ligne)
-        session.commit()
-        session.refresh(ligne)
-
-        return ligne
-
     @staticmethod
     def _recalculer_totaux_hierarchie(fiche_id: int, session: Session):
         """
@@ -3,18 +3,22 @@ Service de gestion des fichiers
 Gère les opérations CRUD et le stockage des fichiers
 """
 
+import hashlib
 import os
 import shutil
+import time
 from datetime import datetime
 from pathlib import Path
 
 from fastapi import UploadFile
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 
 from app.core.enums import FileStatus
 from app.core.logging_config import get_logger
 from app.core.path_config import path_config
 from app.models.file import File
+from app.services.excel_processor import ExcelProcessorService
+from app.services.upload_service import CHUNK_SIZE, UploadService
 
 logger = get_logger(__name__)
 
@@ -27,6 +31,10 @@ class FileService:
     PROCESSED_DIR = path_config.UPLOADS_FILES_PROCESSED_DIR
     ARCHIVE_DIR = path_config.UPLOADS_FILES_ARCHIVE_DIR
 
+    # Cache des statistiques : (horodatage monotone, statistiques)
+    STATISTICS_CACHE_SECONDS = 30
+    _statistics_cache: tuple[float, dict] | None = None
+
     @classmethod
     def _ensure_directories(cls):
         """Vérifie que les dossiers nécessaires existent (normalement déjà créés au démarrage)"""
@@ -55,7 +63,14 @@ class FileService:
         return stored_name
 
     @classmethod
-    async def save_file(cls, session: Session, upload_file: UploadFile, metadata: dict, uploaded_by: int) -> File:
+    async def save_file(
+        cls,
+        session: Session,
+        upload_file: UploadFile,
+        metadata: dict,
+        uploaded_by: int,
+        max_octets: int | None = None,
+    ) -> File:
         """
         Sauvegarde un fichier et crée l'entrée en base de données
 
@@ -64,6 +79,7 @@ class FileService:
             upload_file: Fichier uploadé
             metadata: Métadonnées du fichier
             uploaded_by: ID de l'utilisateur
+            max_octets: Taille maximale propre à l'appelant (en plus de la limite système)
 
         Returns:
             File: Objet File créé
@@ -74,14 +90,11 @@ class FileService:
         stored_filename = cls._generate_stored_filename(metadata, upload_file.filename)
         file_path = cls.RAW_DIR / stored_filename
 
-        # Sauvegarder le fichier physiquement
+        # Sauvegarder le fichier physiquement (écriture par blocs, limite système appliquée en flux)
         try:
-            with open(file_path, "wb") as buffer:
-                content = await upload_file.read()
-                buffer.write(content)
-
-            file_size = os.path.getsize(file_path)
-            logger.info(f"✅ Fichier sauvegardé: {stored_filename} ({file_size} bytes)")
+            recu = await UploadService.enregistrer(upload_file, file_path, session=session, max_octets=max_octets)
+            file_size = recu.taille
+            logger.info(f"✅ Fichier sauvegardé: {stored_filename} ({file_size} bytes, sha256={recu.sha256[:12]})")
 
         except Exception as e:
             logger.error(f"❌ Erreur lors de la sauvegarde du fichier: {e}")
@@ -93,6 +106,7 @@ class FileService:
             stored_filename=stored_filename,
             file_path=str(file_path),
             file_size=file_size,
+            sha256=recu.sha256,
             mime_type=upload_file.content_type or "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             file_type=metadata.get("file_type"),
             program=metadata.get("program"),
@@ -108,6 +122,7 @@ class FileService:
         session.add(db_file)
         session.commit()
         session.refresh(db_file)
+        cls.invalidate_statistics()
 
         logger.info(f"✅ Fichier créé en DB: ID={db_file.id}")
         return db_file
@@ -118,6 +133,23 @@ class FileService:
         statement = select(File).where(File.id == file_id)
         return session.exec(statement).first()
 
+    @classmethod
+    def ensure_sha256(cls, session: Session, db_file: File) -> str:
+        """Retourne l'empreinte du fichier, calculée et enregistrée pour les fichiers antérieurs au hachage"""
+        if db_file.sha256:
+            return db_file.sha256
+
+        empreinte = hashlib.sha256()
+        with open(db_file.file_path, "rb") as f:
+            while bloc := f.read(CHUNK_SIZE):
+                empreinte.update(bloc)
+
+        db_file.sha256 = empreinte.hexdigest()
+        session.add(db_file)
+        session.commit()
+        session.refresh(db_file)
+        return db_file.sha256
+
     @classmethod
     def get_all_files(
         cls,
@@ -148,7 +180,7 @@ class FileService:
         cls, session: Session, file_type: str | None = None, status: str | None = None, program: str | None = None
     ) -> int:
         """Compte les fichiers avec filtres optionnels"""
-        statement = select(File)
+        statement = select(func.count(File.id))
 
         if file_type:
             statement = statement.where(File.file_type == file_type)
@@ -157,7 +189,12 @@ class FileService:
         if program:
             statement = statement.where(File.program == program)
 
-        return len(list(session.exec(statement).all()))
+        return session.exec(statement).one()
+
+    @classmethod
+    def count_files_with_hash(cls, session: Session, sha256: str) -> int:
+        """Compte les fichiers de même contenu"""
+        return session.exec(select(func.count(File.id)).where(File.sha256 == sha256)).one()
 
     @classmethod
     def update_file_status(
@@ -186,6 +223,7 @@ class FileService:
         session.add(db_file)
         session.commit()
         session.refresh(db_file)
+        cls.invalidate_statistics()
 
         logger.info(f"✅ Statut du fichier {file_id} mis à jour: {status}")
         return db_file
@@ -214,6 +252,7 @@ class FileService:
         session.add(db_file)
         session.commit()
         session.refresh(db_file)
+        cls.invalidate_statistics()
 
         logger.info(f"✅ Métadonnées du fichier {file_id} mises à jour")
         return db_file
@@ -235,8 +274,14 @@ class FileService:
             logger.error(f"❌ Erreur lors de la suppression du fichier physique: {e}")
 
         # Supprimer l'entrée en DB
+        sha256 = db_file.sha256
         session.delete(db_file)
         session.commit()
+        cls.invalidate_statistics()
+
+        # Supprimer l'aperçu en cache s'il n'est plus partagé avec un autre fichier
+        if sha256 and cls.count_files_with_hash(session, sha256) == 0:
+            ExcelProcessorService.supprimer_apercu(sha256)
 
         logger.info(f"✅ Fichier {file_id} supprimé de la DB")
         return True
@@ -267,6 +312,7 @@ class FileService:
             session.add(db_file)
             session.commit()
             session.refresh(db_file)
+            cls.invalidate_statistics()
 
             return db_file
 
@@ -276,35 +322,48 @@ class FileService:
 
     @classmethod
     def get_statistics(cls, session: Session) -> dict:
-        """Récupère les statistiques des fichiers"""
-        all_files = cls.get_all_files(session, limit=1000)
+        """
+        Récupère les statistiques des fichiers
 
-        # Compter par statut
-        files_by_status = {}
-        for status in FileStatus:
-            files_by_status[status.value] = sum(1 for f in all_files if f.status == status.value)
+        Agrégats calculés en SQL (GROUP BY) sur toute la table, mis en cache
+        STATISTICS_CACHE_SECONDS ; le cache est vidé à chaque modification de fichier.
+        """
+        cached = cls._statistics_cache
+        if cached is not None and time.monotonic() - cached[0] < cls.STATISTICS_CACHE_SECONDS:
+            return cached[1]
 
-        # Compter par type
-        files_by_type = {}
-        for file in all_files:
-            files_by_type[file.file_type] = files_by_type.get(file.file_type, 0) + 1
+        # Total et taille en une requête
+        total_files, total_size = session.exec(
+            select(func.count(File.id), func.coalesce(func.sum(File.file_size), 0))
+        ).one()
 
-        # Compter par programme
-        files_by_program = {}
-        for file in all_files:
-            files_by_program[file.program] = files_by_program.get(file.program, 0) + 1
+        # Compter par statut (tous les statuts présents, même à 0)
+        files_by_status = {status.value: 0 for status in FileStatus}
+        for status, count in session.exec(select(File.status, func.count(File.id)).group_by(File.status)).all():
+            files_by_status[str(status)] = count
 
-        # Taille totale
-        total_size_mb = sum(f.file_size for f in all_files) / (1024 * 1024)
+        # Compter par type et par programme
+        files_by_type = dict(session.exec(select(File.file_type, func.count(File.id)).group_by(File.file_type)).all())
+        files_by_program = dict(session.exec(select(File.program, func.count(File.id)).group_by(File.program)).all())
 
         # Fichiers récents
-        recent_uploads = sorted(all_files, key=lambda x: x.created_at, reverse=True)[:10]
+        recent_uploads = [
+            {**f.model_dump(), "file_size_mb": f.file_size_mb}
+            for f in session.exec(select(File).order_by(File.created_at.desc()).limit(10)).all()
+        ]
 
-        return {
-            "total_files": len(all_files),
+        stats = {
+            "total_files": total_files,
             "files_by_status": files_by_status,
             "files_by_type": files_by_type,
             "files_by_program": files_by_program,
-            "total_size_mb": round(total_size_mb, 2),
+            "total_size_mb": round(total_size / (1024 * 1024), 2),
             "recent_uploads": recent_uploads,
         }
+        cls._statistics_cache = (time.monotonic(), stats)
+        return stats
+
+    @classmethod
+    def invalidate_statistics(cls) -> None:
+        """Vide le cache des statistiques"""
+        cls._statistics_cache = None
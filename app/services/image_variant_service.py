@@ -0,0 +1,141 @@
+# app/services/image_variant_service.py
+"""
+Variantes de taille fixe des images uploadées (photos de profil, logo, photo du ministre,
+photos des lettres d'engagement)
+
+À l'upload, l'original est conservé et des variantes sont générées à côté de lui,
+en tâche de fond (thread du pool de Starlette) :
+    profiles/profile_3_20250101.jpg
+    profiles/profile_3_20250101.avatar.webp   # pages (128 px affichés, 2x)
+    profiles/profile_3_20250101.navbar.webp   # barre de navigation (28-36 px affichés, 2x)
+    profiles/profile_3_20250101.pdf.jpg       # intégration ReportLab (PNG si l'image a de la transparence)
+
+Les templates (`image_variant`, `profile_picture_url`) et PdfAssetsService utilisent la
+variante si elle existe et l'original sinon : une image dont les variantes ne sont pas
+encore générées (ou jamais générées) reste affichée.
+"""
+
+from pathlib import Path
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Variantes par type d'image : nom → (largeur, hauteur, recadrage)
+# Avec recadrage, l'image remplit exactement le cadre (comme object-fit: cover) ;
+# sans recadrage, elle est réduite pour tenir dans le cadre (jamais agrandie).
+PROFILS_VARIANTES: dict[str, dict[str, tuple[int, int, bool]]] = {
+    "photo": {"avatar": (256, 256, True), "navbar": (72, 72, True), "pdf": (600, 600, False)},
+    "logo": {"avatar": (256, 256, False), "navbar": (288, 72, False), "pdf": (600, 600, False)},
+}
+# Extensions possibles d'une variante (WebP pour le web, JPEG/PNG pour ReportLab)
+EXTENSIONS_VARIANTES = (".webp", ".jpg", ".png")
+# Recadrage des photos : visage généralement dans le tiers supérieur
+CENTRAGE_PORTRAIT = (0.5, 0.35)
+
+
+class ImageVariantService:
+    """Génération et résolution des variantes d'images"""
+
+    @staticmethod
+    def chemins_variantes(original: Path, variante: str) -> list[Path]:
+        original = Path(original)
+        return [original.with_name(f"{original.stem}.{variante}{extension}") for extension in EXTENSIONS_VARIANTES]
+
+    @staticmethod
+    def chemin_variante(original: str | Path, variante: str | None) -> Path | None:
+        """Chemin de la variante si elle existe sur disque, None sinon"""
+        if not variante or not original:
+            return None
+        for chemin in ImageVariantService.chemins_variantes(Path(original), variante):
+            if chemin.is_file():
+                return chemin
+        return None
+
+    @staticmethod
+    def variante_relative(racine: Path, chemin_relatif: str, variante: str | None) -> str:
+        """Chemin relatif (à `racine`) de la variante si elle existe, sinon `chemin_relatif` inchangé"""
+        chemin = ImageVariantService.chemin_variante(racine / chemin_relatif, variante)
+        if chemin is None:
+            return chemin_relatif
+        return str(Path(chemin_relatif).with_name(chemin.name)).replace("\\", "/")
+
+    @staticmethod
+    def generer(original: str | Path, profil: str = "photo") -> dict[str, Path]:
+        """
+        Génère toutes les variantes du profil pour `original` (remplace les existantes)
+
+        Synchrone et coûteux (décodage Pillow) : à appeler en tâche de fond
+        (`background_tasks.add_task(ImageVariantService.generer, chemin)`).
+
+        Returns:
+            Variantes générées {nom: chemin} ({} si l'image est illisible)
+        """
+        from PIL import Image, ImageOps
+
+        original = Path(original)
+        generees: dict[str, Path] = {}
+        try:
+            with Image.open(original) as image:
+                image = ImageOps.exif_transpose(image)
+                transparente = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+                image = image.convert("RGBA" if transparente else "RGB")
+
+                for nom, (largeur, hauteur, recadrer) in PROFILS_VARIANTES[profil].items():
+                    if recadrer:
+                        redimensionnee = ImageOps.fit(
+                            image, (largeur, hauteur), Image.Resampling.LANCZOS, centering=CENTRAGE_PORTRAIT
+                        )
+                    else:
+                        redimensionnee = image.copy()
+                        redimensionnee.thumbnail((largeur, hauteur), Image.Resampling.LANCZOS)
+
+                    if nom != "pdf":
+                        extension, format_pil, options = ".webp", "WEBP", {"quality": 82, "method": 6}
+                    elif transparente:
+                        extension, format_pil, options = ".png", "PNG", {"optimize": True}
+                    else:
+                        # JPEG : ReportLab l'intègre tel quel (DCTDecode) au lieu de ré-encoder les pixels
+                        extension, format_pil, options = ".jpg", "JPEG", {"quality": 85, "optimize": True}
+
+                    for ancienne in ImageVariantService.chemins_variantes(original, nom):
+                        ancienne.unlink(missing_ok=True)
+                    chemin = original.with_name(f"{original.stem}.{nom}{extension}")
+                    temporaire = chemin.with_name(f".{chemin.name}.tmp")
+                    redimensionnee.save(temporaire, format_pil, **options)
+                    temporaire.replace(chemin)
+                    generees[nom] = chemin
+        except Exception as e:
+            logger.warning(f"⚠️  Variantes impossibles pour {original.name}: {e}")
+            return generees
+
+        taille_origine = original.stat().st_size
+        tailles = ", ".join(f"{nom} {chemin.stat().st_size // 1024} Ko" for nom, chemin in generees.items())
+        logger.info(f"🖼️  Variantes de {original.name} ({taille_origine // 1024} Ko): {tailles}")
+        return generees
+
+    @staticmethod
+    def supprimer(original: str | Path) -> None:
+        """Supprime l'original et ses variantes"""
+        original = Path(original)
+        for variante in PROFILS_VARIANTES["photo"]:
+            for chemin in ImageVariantService.chemins_variantes(original, variante):
+                chemin.unlink(missing_ok=True)
+        original.unlink(missing_ok=True)
+
+    @staticmethod
+    def generer_manquantes(repertoire: Path, profil: str = "photo", motif: str = "*") -> int:
+        """Génère les variantes des images de `repertoire` qui n'en ont pas encore (reprise de l'existant)"""
+        total = 0
+        for chemin in sorted(Path(repertoire).glob(motif)):
+            if (
+                not chemin.is_file()
+                or chemin.suffix.lower() not in (".jpg", ".jpeg", ".png", ".gif", ".webp")
+                or any(chemin.stem.endswith(f".{variante}") for variante in PROFILS_VARIANTES[profil])
+            ):
+                continue
+            if all(ImageVariantService.chemin_variante(chemin, nom) for nom in PROFILS_VARIANTES[profil]):
+                continue
+            if ImageVariantService.generer(chemin, profil):
+                total += 1
+        return total
@@ -0,0 +1,154 @@
+# app/services/pdf_assets_service.py
+"""
+Cache des ressources de rendu ReportLab partagé par les générateurs de PDF
+- images décodées (ImageReader) dans un LRU indexé par chemin + date de modification,
+  lues dans leur variante « pdf » (600 px, voir ImageVariantService) quand elle existe
+- fonds de page décoratifs: géométrie calculée une fois par format et palette,
+  puis dessinée dans un Form XObject réutilisé par toutes les pages d'un document
+"""
+
+import hashlib
+import threading
+from collections.abc import Callable
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from typing import Any, ClassVar
+
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas, pathobject
+from reportlab.platypus import Image
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.services.image_variant_service import ImageVariantService
+
+logger = get_logger(__name__)
+
+
+class _CanvasEnregistreur:
+    """
+    Canvas factice qui enregistre les opérations de dessin pour les rejouer
+
+    Les chemins sont de vrais PDFPathObject (indépendants du canvas), seuls les
+    appels de méthodes sont mémorisés.
+    """
+
+    def __init__(self):
+        self.operations: list[tuple[str, tuple, dict]] = []
+        self._profondeur = 0
+
+    def beginPath(self) -> pathobject.PDFPathObject:  # noqa: N802 - API ReportLab
+        return pathobject.PDFPathObject()
+
+    def saveState(self) -> None:  # noqa: N802 - API ReportLab
+        self._profondeur += 1
+        self.operations.append(("saveState", (), {}))
+
+    def restoreState(self) -> None:  # noqa: N802 - API ReportLab
+        self._profondeur -= 1
+        self.operations.append(("restoreState", (), {}))
+
+    def __getattr__(self, nom: str) -> Callable[..., None]:
+        def enregistrer(*args, **kwargs) -> None:
+            self.operations.append((nom, args, kwargs))
+
+        return enregistrer
+
+    def terminer(self) -> list[tuple[str, tuple, dict]]:
+        """Referme les états graphiques laissés ouverts: un Form XObject doit être équilibré"""
+        return self.operations + [("restoreState", (), {})] * max(self._profondeur, 0)
+
+
+class LecteurImage(ImageReader):
+    """
+    ImageReader décodé une fois et lisible comme un fichier
+
+    platypus.Image accepte un objet lisible comme source et en construit un ImageReader ;
+    construit à partir d'un ImageReader, celui-ci partage son état décodé au lieu de relire l'image.
+    """
+
+    def read(self, *args) -> bytes:
+        return self.fp.getvalue()
+
+
+@lru_cache(maxsize=settings.PDF_IMAGES_CACHE_TAILLE)
+def _charger_image(chemin: str, mtime_ns: int, taille: int) -> LecteurImage:
+    """Lit et décode une image une seule fois pour une version donnée du fichier"""
+    if chemin.lower().endswith(".webp"):
+        # ReportLab gère mal la transparence WebP: conversion en PNG RGBA
+        from PIL import Image as PILImage
+
+        with PILImage.open(chemin) as image:
+            buffer = BytesIO()
+            image.convert("RGBA").save(buffer, format="PNG")
+        buffer.seek(0)
+        return LecteurImage(buffer)
+    return LecteurImage(BytesIO(Path(chemin).read_bytes()))
+
+
+class PdfAssetsService:
+    """Ressources de rendu partagées entre les rapports et lettres d'engagement"""
+
+    _fonds: ClassVar[dict[tuple, list[tuple[str, tuple, dict]]]] = {}
+    _fonds_lock = threading.Lock()
+
+    @staticmethod
+    def image_reader(chemin: str | Path | None) -> LecteurImage | None:
+        """
+        Retourne l'image décodée depuis le cache (None si le fichier est absent ou illisible)
+
+        La clé inclut la date de modification et la taille: un fichier remplacé
+        (nouveau logo, nouvelle photo) est relu automatiquement.
+        """
+        if not chemin:
+            return None
+        chemin = ImageVariantService.chemin_variante(chemin, "pdf") or chemin
+        try:
+            stat = Path(chemin).stat()
+            return _charger_image(str(chemin), stat.st_mtime_ns, stat.st_size)
+        except Exception as e:
+            logger.warning(f"⚠️  Image illisible {chemin}: {e}")
+            return None
+
+    @staticmethod
+    def image_flowable(chemin: str | Path | None, width: float, height: float) -> Image | None:
+        """Flowable Platypus alimenté par l'image du cache"""
+        lecteur = PdfAssetsService.image_reader(chemin)
+        if lecteur is None:
+            return None
+        return Image(lecteur, width=width, height=height)
+
+    @staticmethod
+    def dessiner_fond(pdf: canvas.Canvas, cle: tuple, dessin: Callable[[Any], None]) -> None:
+        """
+        Dessine un fond de page via un Form XObject
+
+        Args:
+            pdf: Canvas cible
+            cle: Identifie le fond (générateur, format de page, palette)
+            dessin: Fonction de dessin appelée une seule fois par clé, sur un canvas enregistreur
+        """
+        with PdfAssetsService._fonds_lock:
+            operations = PdfAssetsService._fonds.get(cle)
+        if operations is None:
+            enregistreur = _CanvasEnregistreur()
+            dessin(enregistreur)
+            operations = enregistreur.terminer()
+            with PdfAssetsService._fonds_lock:
+                PdfAssetsService._fonds[cle] = operations
+
+        nom_forme = "Fond" + hashlib.sha1(repr(cle).encode()).hexdigest()[:12]
+        if not pdf.hasForm(nom_forme):
+            pdf.beginForm(nom_forme)
+            for nom, args, kwargs in operations:
+                getattr(pdf, nom)(*args, **kwargs)
+            pdf.endForm()
+        pdf.doForm(nom_forme)
+
+    @staticmethod
+    def vider() -> None:
+        """Vide les caches (tests, changement d'identité visuelle)"""
+        _charger_image.cache_clear()
+        with PdfAssetsService._fonds_lock:
+            PdfAssetsService._fonds.clear()
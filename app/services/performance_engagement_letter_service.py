@@ -10,7 +10,6 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.units import cm
 from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
 from sqlmodel import Session, select
 from sqlalchemy import func
 
@@ -18,6 +17,7 @@ from app.core.path_config import path_config
 from app.db.session import engine
 from app.models.budget import ActionBudgetaire, ActiviteBudgetaire, FicheTechnique, ServiceBeneficiaire
 from app.models.personnel import Programme
+from app.services.pdf_assets_service import PdfAssetsService
 
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import Paragraph, Frame, KeepTogether, Spacer
@@ -61,65 +61,73 @@ class PerformanceEngagementLetterGenerator:
         "date_signature": "",
     }
 
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        # Données propres à l'instance: deux rendus concurrents ne partagent aucun état
+        self.data = {**self.DEFAULT_DATA, **(data or {})}
+
     @classmethod
     def generate_pdf(cls, data: dict[str, Any]) -> BytesIO:
+        return cls(data).render()
+
+    def render(self) -> BytesIO:
         import logging
         logger = logging.getLogger(__name__)
         
         logger.info("🚀 DÉBUT génération PDF lettre d'engagement de performance")
-        cls.data = {**cls.DEFAULT_DATA, **(data or {})}
-        
+
         buffer = BytesIO()
         pdf = canvas.Canvas(buffer, pagesize=A4)
         width, height = A4
 
         logger.info("📄 Page 1: Couverture")
         # Important : l'ordre des appels détermine la superposition des éléments.
-        cls._draw_background_shapes(pdf, width, height)
-        cls._draw_header(pdf, width, height)
-        cls._draw_cover_block(pdf, width, height)
-        cls._draw_footer(pdf, width, height)
+        PdfAssetsService.dessiner_fond(
+            pdf, self._background_key(width, height), lambda c: self._draw_background_shapes(c, width, height)
+        )
+        self._draw_header(pdf, width, height)
+        self._draw_cover_block(pdf, width, height)
+        self._draw_footer(pdf, width, height)
 
         pdf.showPage()
 
         logger.info("📄 Page 2: Signataires")
-        cls._draw_signatories_page(pdf, width, height)
+        self._draw_signatories_page(pdf, width, height)
 
         pdf.showPage()
 
         logger.info("📄 Page 3+: Préambule")
         # Pages de contenu - à compléter avec le contenu fourni par l'utilisateur
-        cls._draw_preamble_page(pdf, width, height)
+        self._draw_preamble_page(pdf, width, height)
 
         pdf.showPage()
 
         logger.info("📄 Page 4: Les Parties")
-        cls._draw_parties_page(pdf, width, height)
+        self._draw_parties_page(pdf, width, height)
 
         pdf.showPage()
 
         logger.info("📄 Page 5+: CHAPITRE I")
-        cls._draw_chapter_one_page(pdf, width, height)
+        self._draw_chapter_one_page(pdf, width, height)
 
         pdf.showPage()
 
         logger.info("📄 Page 6+: CHAPITRE II")
-        cls._draw_chapter_two_page(pdf, width, height)
+        self._draw_chapter_two_page(pdf, width, height)
 
         pdf.showPage()
 
         logger.info("📄 Page 7+: CHAPITRE III et Signatures")
-        cls._draw_chapter_three_and_signatures(pdf, width, height)
+        self._draw_chapter_three_and_signatures(pdf, width, height)
 
         pdf.showPage()
 
         logger.info("📄 Annexes: Tableau de performance")
         # Annexes - à compléter avec le contenu fourni par l'utilisateur
-        next_page = cls._draw_annex_matrice_page(pdf, start_page=9)
+        next_page = self._draw_annex_matrice_page(pdf, start_page=9)
 
         
         logger.info("📄 Annexes: Matrice d'actions")
-        cls._draw_annex_performance_results_page(pdf, start_page=next_page)
+        self._draw_annex_performance_results_page(pdf, start_page=next_page)
 
         logger.info("💾 Sauvegarde du PDF...")
         pdf.save()
@@ -127,8 +135,19 @@ class PerformanceEngagementLetterGenerator:
         logger.info("✅ FIN génération PDF - Succès!")
         return buffer
 
-    @classmethod
-    def _draw_background_shapes(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _background_key(self, width: float, height: float) -> tuple:
+        """Clé du fond décoratif: ne dépend que du format de page et de la palette."""
+        palette = (
+            self.PRIMARY_GREEN,
+            self.SECONDARY_GREEN,
+            self.LIGHT_GREEN,
+            self.PRIMARY_ORANGE,
+            self.LIGHT_ORANGE,
+            self.LIGHT_2_ORANGE,
+        )
+        return (type(self).__name__, width, height, *(color.hexval() for color in palette))
+
+    def _draw_background_shapes(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine les éléments décoratifs de fond (triangles, bandes, lignes)."""
         # Réutilise la même logique que EngagementLetterGenerator
         # ---------- TRIANGLE ----------
@@ -138,7 +157,7 @@ class PerformanceEngagementLetterGenerator:
         tri.lineTo(width, height - 140)
         tri.lineTo(width - 220, height)
         tri.close()
-        pdf.setFillColor(cls.PRIMARY_GREEN)
+        pdf.setFillColor(self.PRIMARY_GREEN)
         pdf.drawPath(tri, stroke=0, fill=1)
 
         # ---------- GÉOMÉTRIE HYPOTÉNUSE ----------
@@ -226,22 +245,22 @@ class PerformanceEngagementLetterGenerator:
         draw_band_slide(s_px=0.00*L, length_px=0.30*L, offset_px=offset,
                 thickness=thickness, round_start=False, round_end=True,
                 extend_start_px=20, extend_end_px=0,
-                color=cls.LIGHT_GREEN, reverse=False, clamp=False)
+                color=self.LIGHT_GREEN, reverse=False, clamp=False)
 
         draw_band_slide(s_px=0.00*L, length_px=0.30*L, offset_px=offset,
                 thickness=thickness, round_start=False, round_end=True,
                 extend_start_px=40, extend_end_px=0,
-                color=cls.LIGHT_GREEN, reverse=True, clamp=False)
+                color=self.LIGHT_GREEN, reverse=True, clamp=False)
 
         draw_band_slide(s_px=0.00*L, length_px=0.30*L, offset_px=offset+20,
                 thickness=thickness+10, round_start=False, round_end=True,
                 extend_start_px=40, extend_end_px=30,
-                color=cls.SECONDARY_GREEN, reverse=False, clamp=False)
+                color=self.SECONDARY_GREEN, reverse=False, clamp=False)
 
         draw_band_center(c_px=0.50*L, length_px=0.50*L, offset_px=offset-10,
                 thickness=thickness, round_start=True, round_end=True,
                 extend_start_px=40, extend_end_px=30,
-                color=cls.SECONDARY_GREEN, reverse=False, clamp=False)
+                color=self.SECONDARY_GREEN, reverse=False, clamp=False)
 
         pdf.restoreState()
 
@@ -263,7 +282,7 @@ class PerformanceEngagementLetterGenerator:
         tri_bl.lineTo(0, 120)
         tri_bl.lineTo(220, 0)
         tri_bl.close()
-        pdf.setFillColor(cls.PRIMARY_ORANGE)
+        pdf.setFillColor(self.PRIMARY_ORANGE)
         pdf.drawPath(tri_bl, stroke=0, fill=1)
 
         start2_x, start2_y = 0,   120
@@ -332,7 +351,7 @@ class PerformanceEngagementLetterGenerator:
             thickness = thickness2,
             round_start = True, round_end = True,
             extend_start_px = 20, extend_end_px = 4,
-            color = cls.PRIMARY_ORANGE,
+            color = self.PRIMARY_ORANGE,
             reverse = False, clamp = False
         )
 
@@ -343,7 +362,7 @@ class PerformanceEngagementLetterGenerator:
             thickness = thickness2,
             round_start = False, round_end = True,
             extend_start_px = 40, extend_end_px = 0,
-            color = cls.PRIMARY_ORANGE,
+            color = self.PRIMARY_ORANGE,
             reverse = True, clamp = False
         )
 
@@ -354,7 +373,7 @@ class PerformanceEngagementLetterGenerator:
             thickness = thickness2+13,
             round_start = False, round_end = True,
             extend_start_px = 0, extend_end_px = 0,
-            color = cls.LIGHT_2_ORANGE,
+            color = self.LIGHT_2_ORANGE,
             reverse = False, clamp = False
         )
 
@@ -365,7 +384,7 @@ class PerformanceEngagementLetterGenerator:
             thickness = thickness2+13,
             round_start = False, round_end = True,
             extend_start_px = 40, extend_end_px = 30,
-            color = cls.LIGHT_ORANGE,
+            color = self.LIGHT_ORANGE,
             reverse = False, clamp = False
         )
 
@@ -376,14 +395,13 @@ class PerformanceEngagementLetterGenerator:
             thickness = thickness2,
             round_start = True, round_end = True,
             extend_start_px = 6, extend_end_px = 6,
-            color = cls.LIGHT_ORANGE,
+            color = self.LIGHT_ORANGE,
             reverse = False, clamp = False
         )
 
         pdf.restoreState()
 
-    @classmethod
-    def _draw_header(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_header(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine l'en-tête institutionnel (bloc ministère + devise + logo)."""
         pdf.saveState()
 
@@ -393,13 +411,13 @@ class PerformanceEngagementLetterGenerator:
             "ENTREPRISES PUBLIQUES",
         ]
         pdf.setFont("Helvetica", 11)
-        pdf.setFillColor(cls.DARK_TEXT)
+        pdf.setFillColor(self.DARK_TEXT)
         y = height - 30
         for line in header_lines:
             pdf.drawString(1 * cm, y, line)
             y -= 14
 
-        logo_path = cls._resolve_asset_path("images/logo.webp")
+        logo_path = self._resolve_asset_path("images/logo.webp")
         if logo_path:
             try:
                 logo_width = 2.5 * cm
@@ -407,20 +425,10 @@ class PerformanceEngagementLetterGenerator:
                 x = (width - logo_width) / 2
                 y_logo = height - 85
 
-                if logo_path.lower().endswith(".webp"):
-                    try:
-                        from PIL import Image
-
-                        with Image.open(logo_path) as im:
-                            im = im.convert("RGBA")
-                            buffer = BytesIO()
-                            im.save(buffer, format="PNG")
-                            buffer.seek(0)
-                            pdf.drawImage(ImageReader(buffer), x, y_logo, width=logo_width, height=logo_height, preserveAspectRatio=True, mask="auto")
-                    except Exception:
-                        pdf.drawImage(logo_path, x, y_logo, width=logo_width, height=logo_height, preserveAspectRatio=True)
-                else:
-                    pdf.drawImage(logo_path, x, y_logo, width=logo_width, height=logo_height, preserveAspectRatio=True)
+                logo = PdfAssetsService.image_reader(logo_path)
+                if logo is not None:
+                    mask = "auto" if logo_path.lower().endswith(".webp") else None
+                    pdf.drawImage(logo, x, y_logo, width=logo_width, height=logo_height, preserveAspectRatio=True, mask=mask)
             except Exception:
                 pass
 
@@ -429,7 +437,7 @@ class PerformanceEngagementLetterGenerator:
         pdf.drawString(width - 170, height - 30, "République de Côte d'Ivoire")
 
         pdf.setFont("Helvetica", 9)
-        motto = cls.data.get("devise", "")
+        motto = self.data.get("devise", "")
         if not motto:
             motto = "Union – Discipline – Travail"
         pdf.drawString(width - 150, height - 40, motto)
@@ -442,8 +450,7 @@ class PerformanceEngagementLetterGenerator:
 
         pdf.restoreState()
 
-    @classmethod
-    def _draw_cover_block(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_cover_block(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine le bloc central (double cadre + titres et responsables)."""
         margin_x = 1.4 * cm
         margin_y = height / 2 - 5.5 * cm
@@ -452,13 +459,13 @@ class PerformanceEngagementLetterGenerator:
 
         pdf.saveState()
         pdf.setLineWidth(3)
-        pdf.setStrokeColor(cls.PRIMARY_ORANGE)
+        pdf.setStrokeColor(self.PRIMARY_ORANGE)
         pdf.rect(margin_x, margin_y, block_width, block_height, stroke=1, fill=0)
 
         pdf.setLineWidth(1.2)
         pdf.rect(margin_x + 4, margin_y + 4, block_width - 8, block_height - 8, stroke=1, fill=0)
 
-        pdf.setFillColor(cls.DARK_TEXT)
+        pdf.setFillColor(self.DARK_TEXT)
         center_x = width / 2
         current_y = margin_y + block_height - 56
 
@@ -474,7 +481,7 @@ class PerformanceEngagementLetterGenerator:
         # Ministre
         minister_text = "LE MINISTRE DU PATRIMOINE, DU PORTEFEUILLE DE L'ETAT\nET DES ENTREPRISES PUBLIQUES"
         pdf.setFont("Helvetica-Bold", 14)
-        current_y = cls._draw_wrapped_centered_lines(
+        current_y = self._draw_wrapped_centered_lines(
             pdf,
             minister_text,
             center_x,
@@ -495,7 +502,7 @@ class PerformanceEngagementLetterGenerator:
         current_y -= 18
         
         # Le nom du programme sur la ligne suivante (avec wrap si trop long)
-        programme = cls.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT").strip().upper()
+        programme = self.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT").strip().upper()
         programme_text = f"« {programme} »"
         # Diviser par nombre de caractères si le nom est trop long
         programme_lines = wrap(programme_text, width=40)  # Diviser à environ 40 caractères
@@ -526,8 +533,7 @@ class PerformanceEngagementLetterGenerator:
             y -= line_height
         return y
 
-    @classmethod
-    def _draw_footer(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_footer(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine le bloc année en bas de page."""
         pdf.saveState()
         box_width = 7 * cm
@@ -542,33 +548,32 @@ class PerformanceEngagementLetterGenerator:
         pdf.rect(x - 3, y - 3, box_width - 2, 3, stroke=0, fill=1)
 
         pdf.setDash(6, 4)
-        pdf.setStrokeColor(cls.PRIMARY_ORANGE)
+        pdf.setStrokeColor(self.PRIMARY_ORANGE)
         pdf.setLineWidth(1.2)
         pdf.rect(x, y, box_width, box_height, stroke=1, fill=0)
 
         pdf.setDash()
         pdf.setFillColor(colors.grey)
         pdf.setFont("Helvetica", 14)
-        year = str(cls.data.get("annee", "") or "")
+        year = str(self.data.get("annee", "") or "")
         pdf.drawCentredString(x + box_width / 2, y + box_height / 2 - 4, year if year else "2025")
 
         pdf.restoreState()
 
-    @classmethod
-    def _draw_signatories_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_signatories_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine la page des signataires avec photos et informations."""
         pdf.saveState()
 
         def resolve_photo(path_key: str) -> str | None:
-            raw = cls.data.get(path_key)
+            raw = self.data.get(path_key)
             if raw and raw.strip():
-                resolved = cls._resolve_asset_path(raw)
+                resolved = self._resolve_asset_path(raw)
                 if resolved:
-                    cls.logger.debug(f"Photo résolue pour {path_key}: {raw} -> {resolved}")
+                    self.logger.debug(f"Photo résolue pour {path_key}: {raw} -> {resolved}")
                 else:
-                    cls.logger.warning(f"Photo non trouvée pour {path_key}: {raw}")
+                    self.logger.warning(f"Photo non trouvée pour {path_key}: {raw}")
                 return resolved
-            cls.logger.debug(f"Aucune photo fournie pour {path_key}")
+            self.logger.debug(f"Aucune photo fournie pour {path_key}")
             return None
 
         def draw_person(photo_key: str, name_key: str, fonction_key: str, entite_key: str = None, top_y: float = None) -> float:
@@ -577,10 +582,11 @@ class PerformanceEngagementLetterGenerator:
             box_height = 8 * cm
             current_y = top_y if top_y is not None else height - 90
 
-            if photo_path:
+            photo = PdfAssetsService.image_reader(photo_path)
+            if photo is not None:
                 try:
                     pdf.drawImage(
-                        photo_path,
+                        photo,
                         (width - box_width) / 2,
                         current_y - box_height,
                         width=box_width,
@@ -594,9 +600,9 @@ class PerformanceEngagementLetterGenerator:
             else:
                 current_y -= 8
 
-            name = (cls.data.get(name_key) or "Nom Prénom").upper()
-            fonction = cls.data.get(fonction_key) or "Fonction"
-            entite = cls.data.get(entite_key) if entite_key else None
+            name = (self.data.get(name_key) or "Nom Prénom").upper()
+            fonction = self.data.get(fonction_key) or "Fonction"
+            entite = self.data.get(entite_key) if entite_key else None
 
             pdf.setFont("Helvetica-Bold", 13)
             pdf.drawCentredString(width / 2, current_y, name)
@@ -627,8 +633,8 @@ class PerformanceEngagementLetterGenerator:
         # Ministre en haut
         top_margin = height - 90
         # Récupérer la civilité du ministre
-        minister_civility = cls.data.get("minister_civility", "")
-        minister_name = cls.data.get("minister_nom", "")
+        minister_civility = self.data.get("minister_civility", "")
+        minister_name = self.data.get("minister_nom", "")
         # Construire le nom complet avec civilité
         if minister_civility and minister_name:
             full_name = f"{minister_civility.upper()} {minister_name.upper()}"
@@ -636,8 +642,8 @@ class PerformanceEngagementLetterGenerator:
             full_name = minister_name.upper() if minister_name else "Nom Prénom"
         
         # Sauvegarder temporairement le nom complet
-        original_name = cls.data.get("minister_nom")
-        cls.data["minister_nom"] = full_name
+        original_name = self.data.get("minister_nom")
+        self.data["minister_nom"] = full_name
         
         current = draw_person(
             "minister_photo",
@@ -649,7 +655,7 @@ class PerformanceEngagementLetterGenerator:
         
         # Restaurer le nom original
         if original_name:
-            cls.data["minister_nom"] = original_name
+            self.data["minister_nom"] = original_name
 
         # "Et" entre les deux
         pdf.setFont("Helvetica-Bold", 12)
@@ -672,9 +678,8 @@ class PerformanceEngagementLetterGenerator:
 
    
 
-    @classmethod
     def _render_multipage_story(
-        cls,
+        self,
         pdf: canvas.Canvas,
         story: list,
         *,
@@ -694,7 +699,7 @@ class PerformanceEngagementLetterGenerator:
         - Coupe proprement sans boucle infinie :
           si aucun élément n'est consommé, on sort de la boucle.
         """
-        logger = cls.logger
+        logger = self.logger
         first_page = True
 
         while story:
@@ -736,8 +741,7 @@ class PerformanceEngagementLetterGenerator:
             first_page = False
 
 
-    @classmethod
-    def _draw_preamble_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_preamble_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Pages de préambule (page 3+), avec justification, puces et pagination auto."""
         left_margin   = 2 * cm
         right_margin  = 2 * cm
@@ -795,7 +799,7 @@ class PerformanceEngagementLetterGenerator:
         for p in paragraphs:
             story.append(Paragraph(p, body_style))
 
-        programme = cls.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT")
+        programme = self.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT")
         story.append(Paragraph(f"À ce titre, le Programme « {programme} » est chargé :", body_style))
 
         bullet_points = [
@@ -816,7 +820,7 @@ class PerformanceEngagementLetterGenerator:
         for point in bullet_points:
             story.append(Paragraph(point, bullet_style, bulletText="•"))
 
-        cls._render_multipage_story(
+        self._render_multipage_story(
             pdf,
             story,
             page_num=3,
@@ -828,8 +832,7 @@ class PerformanceEngagementLetterGenerator:
         )
 
 
-    @classmethod
-    def _draw_parties_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_parties_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Section LES PARTIES (page 4+), avec justification et pagination auto."""
         left_margin   = 2 * cm
         right_margin  = 2 * cm
@@ -873,9 +876,9 @@ class PerformanceEngagementLetterGenerator:
         story.append(Paragraph("LES PARTIES", title_style))
         story.append(Spacer(1, 0.8 * cm))
 
-        minister_civility = cls.data.get("minister_civility", "Monsieur")
-        minister_nom = cls.data.get("minister_nom", "")
-        minister_fonction = cls.data.get("minister_fonction", "")
+        minister_civility = self.data.get("minister_civility", "Monsieur")
+        minister_nom = self.data.get("minister_nom", "")
+        minister_fonction = self.data.get("minister_fonction", "")
 
         minister_text = (
             f"Le Ministère du Patrimoine, du Portefeuille de l'Etat et des Entreprises Publiques, "
@@ -888,9 +891,9 @@ class PerformanceEngagementLetterGenerator:
         story.append(Paragraph("Et", center_body_style))
         story.append(Spacer(1, 0.5 * cm))
 
-        dg_nom = cls.data.get("dg_nom", "BAMBA Seydou")
-        dg_fonction = cls.data.get("dg_fonction", "Directeur Général du Portefeuille de l'Etat")
-        programme = cls.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT")
+        dg_nom = self.data.get("dg_nom", "BAMBA Seydou")
+        dg_fonction = self.data.get("dg_fonction", "Directeur Général du Portefeuille de l'Etat")
+        programme = self.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT")
 
         dg_text = (
             f"La Direction Générale du Portefeuille de l'Etat représentée par "
@@ -902,7 +905,7 @@ class PerformanceEngagementLetterGenerator:
 
         story.append(Paragraph("Conviennent de ce qui suit :", body_style))
 
-        cls._render_multipage_story(
+        self._render_multipage_story(
             pdf,
             story,
             page_num=4,
@@ -914,8 +917,7 @@ class PerformanceEngagementLetterGenerator:
         )
 
 
-    @classmethod
-    def _draw_chapter_one_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_chapter_one_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """
         CHAPITRE I : DISPOSITIONS GÉNÉRALES
         - Titre de chapitre au début de la page (generate_pdf doit faire showPage avant).
@@ -985,7 +987,7 @@ class PerformanceEngagementLetterGenerator:
             spaceAfter=2,
         )
 
-        programme = cls.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT")
+        programme = self.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT")
 
         story: list[Any] = []
         story.append(Paragraph("CHAPITRE I : DISPOSITIONS GÉNÉRALES", chapter_title_style))
@@ -1051,7 +1053,7 @@ class PerformanceEngagementLetterGenerator:
         story.append(Paragraph("Article 5 : Droits des parties", article_title_style))
         story.append(Paragraph(article5_text, body_style))
 
-        cls._render_multipage_story(
+        self._render_multipage_story(
             pdf,
             story,
             page_num=5,
@@ -1062,8 +1064,7 @@ class PerformanceEngagementLetterGenerator:
             page_width=width,
         )
 
-    @classmethod
-    def _draw_chapter_two_page(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_chapter_two_page(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """Dessine la page 6 avec le CHAPITRE II : DISPOSITIONS RELATIVES A LA PERFORMANCE."""
         left_margin = 2 * cm
         right_margin = 2 * cm
@@ -1168,9 +1169,9 @@ class PerformanceEngagementLetterGenerator:
         story.append(Spacer(1, 0.1 * cm))
 
         # Article 9 : Moyens de mise en œuvre
-        programme = cls.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT")
+        programme = self.data.get("programme_intitule", "PORTEFEUILLE DE L'ETAT")
         from datetime import datetime
-        annee = cls.data.get("annee", datetime.now().year)
+        annee = self.data.get("annee", datetime.now().year)
         
         article9_para1 = (
             f"Pour la mise en œuvre de la présente lettre d'engagement, le RESPONSABLE DE PROGRAMME "
@@ -1240,8 +1241,7 @@ class PerformanceEngagementLetterGenerator:
 
         pdf.restoreState()
 
-    @classmethod
-    def _draw_chapter_three_and_signatures(cls, pdf: canvas.Canvas, width: float, height: float) -> None:
+    def _draw_chapter_three_and_signatures(self, pdf: canvas.Canvas, width: float, height: float) -> None:
         """
         Dessine le CHAPITRE III (articles 11-14) et les signatures.
         Si le chapitre se termine avec de l'espace, les signatures sont dessinées sur la même page.
@@ -1405,12 +1405,12 @@ class PerformanceEngagementLetterGenerator:
         story.append(Spacer(1, 1.5 * cm))
         
         # Ajouter les signatures comme un élément de la story, juste après l'article 14
-        signatures_flowable = SignaturesFlowable(cls.data, available_width)
+        signatures_flowable = SignaturesFlowable(self.data, available_width)
         story.append(signatures_flowable)
 
         # Utiliser _render_multipage_story pour gérer la pagination
         page_num = 7
-        cls._render_multipage_story(
+        self._render_multipage_story(
             pdf,
             story,
             page_num=page_num,
@@ -1422,8 +1422,7 @@ class PerformanceEngagementLetterGenerator:
             show_page_number=True,
         )
 
-    @classmethod
-    def _draw_annex_matrice_page(cls, pdf: canvas.Canvas, start_page: int) -> int:
+    def _draw_annex_matrice_page(self, pdf: canvas.Canvas, start_page: int) -> int:
         """Dessine l'annexe avec le tableau de performance en orientation paysage."""
         page_width, page_height = landscape(A4)
         pdf.setPageSize((page_width, page_height))
@@ -1488,7 +1487,7 @@ class PerformanceEngagementLetterGenerator:
             alignment=4,  # Justifié
         )
 
-        annee = cls.data.get("annee", 2025)
+        annee = self.data.get("annee", 2025)
 
         # En-tête
         head_rows = [
@@ -1640,8 +1639,7 @@ class PerformanceEngagementLetterGenerator:
         pdf.setPageSize(A4)
         return start_page + 1
 
-    @classmethod
-    def _draw_annex_performance_results_page(cls, pdf: canvas.Canvas, start_page: int) -> int:
+    def _draw_annex_performance_results_page(self, pdf: canvas.Canvas, start_page: int) -> int:
         """Dessine l'annexe avec la matrice d'actions en orientation paysage."""
         page_width, page_height = landscape(A4)
         pdf.setPageSize((page_width, page_height))
@@ -1698,7 +1696,7 @@ class PerformanceEngagementLetterGenerator:
             alignment=1,  # Centré
         )
 
-        annee = cls.data.get("annee", 2025)
+        annee = self.data.get("annee", 2025)
 
         # En-tête
         head_rows = [
@@ -125,6 +125,11 @@ class PerformanceService:
             logger.error(f"Erreur lors de la récupération des objectifs: {e}")
             return []
 
+    @staticmethod
+    def count_objectifs(session: Session) -> int:
+        """Compte les objectifs (requête COUNT, sans charger les lignes)"""
+        return session.exec(select(func.count(ObjectifPerformance.id))).one() or 0
+
     @staticmethod
     def modifier_objectif(
         session: Session, objectif_id: int, objectif_data: dict[str, Any]
@@ -331,6 +336,14 @@ class PerformanceService:
             logger.error(f"Erreur lors de la récupération des indicateurs: {e}")
             return []
 
+    @staticmethod
+    def count_indicateurs(session: Session, actif_only: bool = True) -> int:
+        """Compte les indicateurs (requête COUNT, sans charger les lignes)"""
+        query = select(func.count(IndicateurPerformance.id))
+        if actif_only:
+            query = query.where(IndicateurPerformance.actif)
+        return session.exec(query).one() or 0
+
     @staticmethod
     def get_indicateur(session: Session, indicateur_id: int) -> IndicateurPerformance | None:
         """Récupère un indicateur par son ID"""
@@ -0,0 +1,233 @@
+# app/services/report_export_service.py
+"""
+Export tabulaire des rapports de performance (Excel, CSV)
+Les lignes sont lues par lots depuis un curseur côté serveur et écrites au fil de l'eau
+(openpyxl en mode write-only, CSV produit par un générateur) : un export volumineux
+n'est jamais entièrement chargé en mémoire.
+"""
+
+import csv
+import io
+import os
+import tempfile
+import zipfile
+from collections.abc import Iterator
+from datetime import date
+from typing import Any
+
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlmodel import Session, and_, select
+from starlette.background import BackgroundTask
+
+from app.core.logging_config import get_logger
+from app.models.performance import EvaluationPerformance, IndicateurPerformance, ObjectifPerformance
+
+logger = get_logger(__name__)
+
+# Lignes lues par aller-retour avec la base
+LIGNES_PAR_LOT = 1000
+
+# Jeux de données exportables: (titre de la feuille, modèle, colonnes (en-tête, attribut), filtre par période)
+JEUX_DE_DONNEES: dict[str, dict[str, Any]] = {
+    "objectifs": {
+        "titre": "Objectifs",
+        "modele": ObjectifPerformance,
+        "colonnes": [
+            ("ID", "id"),
+            ("Titre", "titre"),
+            ("Type", "type_objectif"),
+            ("Priorité", "priorite"),
+            ("Période", "periode"),
+            ("Date début", "date_debut"),
+            ("Date fin", "date_fin"),
+            ("Valeur cible", "valeur_cible"),
+            ("Valeur actuelle", "valeur_actuelle"),
+            ("Unité", "unite"),
+            ("Progression (%)", "progression_pourcentage"),
+            ("Statut", "statut"),
+            ("Service responsable", "service_responsable"),
+            ("Commentaires", "commentaires"),
+        ],
+        "filtre_periode": True,
+    },
+    "indicateurs": {
+        "titre": "Indicateurs",
+        "modele": IndicateurPerformance,
+        "colonnes": [
+            ("ID", "id"),
+            ("Nom", "nom"),
+            ("Catégorie", "categorie"),
+            ("Type", "type_indicateur"),
+            ("Valeur cible", "valeur_cible"),
+            ("Valeur actuelle", "valeur_actuelle"),
+            ("Unité", "unite"),
+            ("Seuil alerte bas", "seuil_alerte_bas"),
+            ("Seuil alerte haut", "seuil_alerte_haut"),
+            ("Fréquence", "frequence_maj"),
+            ("Service responsable", "service_responsable"),
+            ("Source", "source_donnees"),
+            ("Actif", "actif"),
+            ("Mis à jour le", "updated_at"),
+        ],
+        "filtre_periode": False,
+    },
+    "evaluations": {
+        "titre": "Évaluations",
+        "modele": EvaluationPerformance,
+        "colonnes": [
+            ("ID", "id"),
+            ("Titre", "titre"),
+            ("Période", "periode_evaluation"),
+            ("Date début", "date_debut"),
+            ("Date fin", "date_fin"),
+            ("Type", "type_evaluation"),
+            ("Statut", "statut"),
+        ],
+        "filtre_periode": True,
+    },
+}
+
+# Jeux exportés selon le type de rapport
+JEUX_PAR_TYPE = {
+    "OBJECTIFS": ["objectifs"],
+    "INDICATEURS": ["indicateurs"],
+    "GLOBAL": ["objectifs", "indicateurs", "evaluations"],
+    "SYNTHESE": ["objectifs", "indicateurs", "evaluations"],
+}
+
+FORMATS_EXPORT = ("EXCEL", "CSV")
+
+
+def _valeur(valeur: Any) -> Any:
+    """Valeur exportable (les énumérations sont exportées par leur valeur)"""
+    return getattr(valeur, "value", valeur)
+
+
+class ReportExportService:
+    """Exports Excel/CSV des objectifs, indicateurs et évaluations"""
+
+    @staticmethod
+    def jeux_pour_type(report_type: str) -> list[str]:
+        if report_type not in JEUX_PAR_TYPE:
+            raise HTTPException(status_code=400, detail=f"Type de rapport inconnu: {report_type}")
+        return JEUX_PAR_TYPE[report_type]
+
+    @staticmethod
+    def iterer_lignes(session: Session, jeu: str, dates: dict[str, date]) -> Iterator[tuple]:
+        """
+        Parcourt les lignes d'un jeu de données par lots (curseur côté serveur)
+
+        Seules les colonnes exportées sont sélectionnées: aucun objet ORM n'est
+        conservé dans la session pendant le parcours.
+        """
+        spec = JEUX_DE_DONNEES[jeu]
+        modele = spec["modele"]
+        query = select(*(getattr(modele, attribut) for _, attribut in spec["colonnes"])).order_by(modele.id)
+        if spec["filtre_periode"]:
+            # Chevauchement avec la période du rapport
+            query = query.where(and_(modele.date_debut <= dates["fin"], modele.date_fin >= dates["debut"]))
+
+        resultat = session.exec(query.execution_options(yield_per=LIGNES_PAR_LOT))
+        for ligne in resultat:
+            yield tuple(_valeur(v) for v in ligne)
+
+    @staticmethod
+    def lignes_csv(session: Session, jeu: str, dates: dict[str, date]) -> Iterator[str]:
+        """Produit le CSV d'un jeu de données morceau par morceau (séparateur ';', BOM pour Excel)"""
+        tampon = io.StringIO()
+        writer = csv.writer(tampon, delimiter=";")
+
+        def vider() -> str:
+            contenu = tampon.getvalue()
+            tampon.seek(0)
+            tampon.truncate()
+            return contenu
+
+        tampon.write("\ufeff")
+        writer.writerow([entete for entete, _ in JEUX_DE_DONNEES[jeu]["colonnes"]])
+        for index, ligne in enumerate(ReportExportService.iterer_lignes(session, jeu, dates), start=1):
+            writer.writerow(ligne)
+            if index % LIGNES_PAR_LOT == 0:
+                yield vider()
+        yield vider()
+
+    @staticmethod
+    def ecrire_xlsx(session: Session, jeux: list[str], dates: dict[str, date], destination) -> None:
+        """Écrit un classeur (une feuille par jeu) en mode write-only"""
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        classeur = Workbook(write_only=True)
+        gras = Font(bold=True)
+        for jeu in jeux:
+            spec = JEUX_DE_DONNEES[jeu]
+            feuille = classeur.create_sheet(spec["titre"])
+            entetes = []
+            for entete, _ in spec["colonnes"]:
+                cellule = WriteOnlyCell(feuille, value=entete)
+                cellule.font = gras
+                entetes.append(cellule)
+            feuille.append(entetes)
+            for ligne in ReportExportService.iterer_lignes(session, jeu, dates):
+                feuille.append(ligne)
+        classeur.save(destination)
+
+    @staticmethod
+    def ecrire_zip_csv(session: Session, jeux: list[str], dates: dict[str, date], destination) -> None:
+        """Écrit une archive contenant un CSV par jeu de données"""
+        with zipfile.ZipFile(destination, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for jeu in jeux:
+                with archive.open(f"{jeu}.csv", "w") as entree:
+                    for morceau in ReportExportService.lignes_csv(session, jeu, dates):
+                        entree.write(morceau.encode("utf-8"))
+
+    @staticmethod
+    def exporter(session: Session, report_type: str, format_fichier: str, dates: dict[str, date], nom_base: str):
+        """
+        Construit la réponse d'export d'un rapport
+
+        - CSV d'un seul jeu: flux direct depuis le curseur
+        - CSV de plusieurs jeux: archive ZIP d'un CSV par jeu
+        - EXCEL: classeur write-only, une feuille par jeu
+
+        Les fichiers intermédiaires sont écrits sur disque puis supprimés après l'envoi ;
+        leur réponse porte Content-Length (taille enregistrée dans l'historique).
+        Le CSV en flux n'a pas de taille connue à l'avance.
+        """
+        jeux = ReportExportService.jeux_pour_type(report_type)
+
+        if format_fichier == "CSV" and len(jeux) == 1:
+            return StreamingResponse(
+                ReportExportService.lignes_csv(session, jeux[0], dates),
+                media_type="text/csv; charset=utf-8",
+                headers={"Content-Disposition": f'attachment; filename="{nom_base}.csv"'},
+            )
+
+        if format_fichier == "CSV":
+            suffixe, media_type, ecrire = ".zip", "application/zip", ReportExportService.ecrire_zip_csv
+        elif format_fichier == "EXCEL":
+            suffixe = ".xlsx"
+            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            ecrire = ReportExportService.ecrire_xlsx
+        else:
+            raise HTTPException(status_code=400, detail=f"Format {format_fichier} non pris en charge")
+
+        descripteur, chemin = tempfile.mkstemp(suffix=suffixe, prefix="export_")
+        try:
+            with os.fdopen(descripteur, "wb") as fichier:
+                ecrire(session, jeux, dates, fichier)
+        except Exception:
+            os.unlink(chemin)
+            raise
+
+        stat = os.stat(chemin)
+        logger.info(f"📤 Export {format_fichier} {report_type} ({stat.st_size} octets)")
+        return FileResponse(
+            chemin,
+            media_type=media_type,
+            filename=f"{nom_base}{suffixe}",
+            stat_result=stat,
+            background=BackgroundTask(os.unlink, chemin),
+        )
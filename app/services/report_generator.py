@@ -3,6 +3,9 @@ Service de génération de rapports de performance
 Génère des rapports PDF, Excel, etc.
 """
 
+import hashlib
+import json
+import os
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from io import BytesIO
@@ -14,13 +17,21 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import cm, inch
 from reportlab.pdfgen import canvas
-from reportlab.platypus import Image, KeepTogether, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
-from sqlmodel import Session
+from reportlab.platypus import KeepTogether, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from sqlmodel import Session, func, select
 
 from app.core.config import settings
 from app.core.logging_config import get_logger
-from app.models.performance import PrioriteObjectif, StatutObjectif, TypeObjectif
+from app.core.path_config import path_config
+from app.models.performance import (
+    IndicateurPerformance,
+    ObjectifPerformance,
+    PrioriteObjectif,
+    StatutObjectif,
+    TypeObjectif,
+)
 from app.models.system_settings import SystemSettings
+from app.services.pdf_assets_service import PdfAssetsService
 from app.services.performance_service import PerformanceService
 
 logger = get_logger(__name__)
@@ -232,8 +243,7 @@ class ReportGenerator:
         """
         try:
             # Vérifier s'il y a des données, sinon générer des données factices
-            objectifs_count = len(PerformanceService.get_objectifs(session, limit=1))
-            if objectifs_count == 0:
+            if PerformanceService.count_objectifs(session) == 0:
                 logger.warning("⚠️  Aucune donnée de performance trouvée. Génération de données factices...")
                 ReportGenerator._generate_sample_data(session)
 
@@ -356,14 +366,11 @@ class ReportGenerator:
                 if static_logo.exists():
                     logo_path = str(static_logo)
 
-            if logo_path:
-                try:
-                    logo = Image(logo_path, width=1.5 * inch, height=1.5 * inch)
-                    logo.hAlign = "CENTER"
-                    header_content.append(logo)
-                    header_content.append(Spacer(1, 0.3 * inch))
-                except:
-                    pass
+            logo = PdfAssetsService.image_flowable(logo_path, width=1.5 * inch, height=1.5 * inch)
+            if logo is not None:
+                logo.hAlign = "CENTER"
+                header_content.append(logo)
+                header_content.append(Spacer(1, 0.3 * inch))
 
             # Nom de l'entreprise
             company_name = system_settings.company_name or "MPPEEP Dashboard"
@@ -687,6 +694,99 @@ class ReportGenerator:
             logger.error(f"Erreur lors de la génération du rapport PDF: {e}")
             raise
 
+    # Champs des paramètres système qui apparaissent dans le PDF (couleurs, logo, pied de page)
+    CHAMPS_IDENTITE = (
+        "company_name",
+        "company_description",
+        "company_email",
+        "company_phone",
+        "company_address",
+        "logo_path",
+        "primary_color",
+        "secondary_color",
+        "accent_color",
+    )
+
+    @staticmethod
+    def _version_donnees(session: Session, model) -> list:
+        """Version d'une table: (nombre de lignes, dernière modification, plus grand ID)"""
+        nombre, derniere_maj, dernier_id = session.exec(
+            select(func.count(model.id), func.max(model.updated_at), func.max(model.id))
+        ).one()
+        return [nombre, str(derniere_maj), dernier_id]
+
+    @staticmethod
+    def cle_rapport(session: Session, report_type: str, period: str, dates: dict[str, date]) -> str:
+        """
+        Calcule la clé de cache d'un rapport
+
+        La clé couvre le type, la période (la section comparative en dépend) et ses bornes,
+        la version des objectifs et indicateurs et l'identité visuelle: toute modification
+        produit une nouvelle clé.
+        """
+        system_settings = session.get(SystemSettings, 1) or SystemSettings()
+        composants = {
+            "type": report_type,
+            "periode": period,
+            "debut": dates["debut"].isoformat(),
+            "fin": dates["fin"].isoformat(),
+            "objectifs": ReportGenerator._version_donnees(session, ObjectifPerformance),
+            "indicateurs": ReportGenerator._version_donnees(session, IndicateurPerformance),
+            "identite": {champ: getattr(system_settings, champ) for champ in ReportGenerator.CHAMPS_IDENTITE},
+            "application": settings.APP_NAME,
+        }
+        return hashlib.sha256(json.dumps(composants, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def chemin_rapport(cle: str) -> Path:
+        """Chemin physique de l'artefact PDF d'une clé"""
+        return path_config.UPLOADS_REPORTS_DIR / f"{cle}.pdf"
+
+    @staticmethod
+    def obtenir_rapport_pdf(
+        session: Session,
+        report_type: str,
+        period: str,
+        date_debut: date | None = None,
+        date_fin: date | None = None,
+        user_name: str = "Utilisateur",
+    ) -> tuple[Path, str, dict[str, date]]:
+        """
+        Retourne l'artefact PDF d'un rapport, généré uniquement s'il n'existe pas encore
+
+        Returns:
+            (chemin du PDF, clé de cache, bornes de la période)
+        """
+        # Les données factices éventuelles doivent exister avant le calcul de la clé
+        if PerformanceService.count_objectifs(session) == 0:
+            logger.warning("⚠️  Aucune donnée de performance trouvée. Génération de données factices...")
+            ReportGenerator._generate_sample_data(session)
+
+        dates = ReportGenerator._calculate_period_dates(period, date_debut, date_fin)
+        cle = ReportGenerator.cle_rapport(session, report_type, period, dates)
+        chemin = ReportGenerator.chemin_rapport(cle)
+
+        if chemin.exists():
+            logger.info(f"📄 Rapport {report_type} servi depuis le cache ({cle[:12]})")
+            return chemin, cle, dates
+
+        pdf_buffer = ReportGenerator.generate_pdf_report(
+            session=session,
+            report_type=report_type,
+            period=period,
+            date_debut=date_debut,
+            date_fin=date_fin,
+            user_name=user_name,
+        )
+
+        # Écriture atomique: un lecteur concurrent ne voit jamais de PDF partiel
+        chemin.parent.mkdir(parents=True, exist_ok=True)
+        temporaire = chemin.with_name(f".{cle}.{os.getpid()}.tmp")
+        temporaire.write_bytes(pdf_buffer.getbuffer())
+        os.replace(temporaire, chemin)
+        logger.info(f"📄 Rapport {report_type} généré et stocké ({cle[:12]})")
+        return chemin, cle, dates
+
     @staticmethod
     def _create_progress_bar(percentage: float, width: float = 4 * inch, height: float = 0.3 * inch) -> Table:
         """Crée une barre de progression visuelle"""
@@ -0,0 +1,140 @@
+# app/services/retention_service.py
+"""
+Purges de rétention ensemblistes (sessions, journal d'activité, fichiers en erreur)
+
+Chaque purge est une instruction UPDATE/DELETE unique rejouée par tranches de clés
+primaires : une tranche = au plus RETENTION_BATCH_SIZE lignes et une transaction courte,
+pour ne pas verrouiller longtemps des tables lues par les requêtes HTTP.
+Aucune ligne n'est chargée en objets ORM.
+"""
+
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Delete, Update, or_
+from sqlmodel import Session, delete, select, update
+
+from app.core.config import settings
+from app.core.enums import FileStatus
+from app.core.logging_config import get_logger
+from app.models.activity import Activity
+from app.models.file import File
+from app.models.session import UserSession
+
+logger = get_logger(__name__)
+
+
+class RetentionService:
+    """Purges par lots, utilisées par les tâches planifiées et les services"""
+
+    @staticmethod
+    def par_tranches(
+        session: Session,
+        modele: type,
+        conditions: list[Any],
+        instruction: Update | Delete,
+        retour: tuple = (),
+        taille_lot: int | None = None,
+    ) -> tuple[int, list]:
+        """
+        Applique `instruction` aux lignes de `modele` vérifiant `conditions`, tranche par tranche
+
+        La borne haute de chaque tranche est la N-ième clé primaire restant à traiter
+        (lecture sur l'index de la clé primaire) ; chaque tranche est validée séparément.
+
+        Returns:
+            (nombre de lignes affectées, lignes retournées par RETURNING si `retour`)
+        """
+        taille_lot = taille_lot or settings.RETENTION_BATCH_SIZE
+        cle = modele.id
+        debut = time.perf_counter()
+        total, lignes, nb_tranches = 0, [], 0
+        derniere_borne = None
+
+        while True:
+            filtre = list(conditions)
+            if derniere_borne is not None:
+                filtre.append(cle > derniere_borne)
+            borne = session.exec(select(cle).where(*filtre).order_by(cle).offset(taille_lot - 1).limit(1)).first()
+            if borne is not None:
+                filtre.append(cle <= borne)
+
+            tranche = instruction.where(*filtre).execution_options(synchronize_session=False)
+            if retour:
+                resultat = session.exec(tranche.returning(*retour)).all()
+                lignes.extend(resultat)
+                total += len(resultat)
+            else:
+                total += session.exec(tranche).rowcount
+            session.commit()
+            nb_tranches += 1
+
+            if borne is None:
+                break
+            derniere_borne = borne
+
+        if total:
+            duree_ms = (time.perf_counter() - debut) * 1000
+            logger.info(f"🧹 {modele.__tablename__}: {total} ligne(s) en {nb_tranches} tranche(s) ({duree_ms:.0f} ms)")
+        return total, lignes
+
+    @staticmethod
+    def expirer_sessions(session: Session) -> int:
+        """Désactive les sessions actives dont la date d'expiration est passée"""
+        total, _ = RetentionService.par_tranches(
+            session,
+            UserSession,
+            [UserSession.is_active, UserSession.expires_at < datetime.now()],
+            update(UserSession).values(is_active=False),
+        )
+        return total
+
+    @staticmethod
+    def purger_sessions_inactives(session: Session, jours: int | None = None) -> int:
+        """Supprime les sessions fermées ou expirées sans activité depuis `jours` jours"""
+        jours = settings.SESSION_PURGE_DAYS if jours is None else jours
+        maintenant = datetime.now()
+        total, _ = RetentionService.par_tranches(
+            session,
+            UserSession,
+            [
+                or_(UserSession.is_active.is_(False), UserSession.expires_at < maintenant),
+                UserSession.last_activity < maintenant - timedelta(days=jours),
+            ],
+            delete(UserSession),
+        )
+        return total
+
+    @staticmethod
+    def purger_activites(session: Session, jours: int | None = None) -> int:
+        """Supprime les activités plus anciennes que `jours` jours (0 = conservation illimitée)"""
+        jours = settings.ACTIVITY_RETENTION_DAYS if jours is None else jours
+        if jours <= 0:
+            return 0
+        total, _ = RetentionService.par_tranches(
+            session,
+            Activity,
+            [Activity.created_at < datetime.now() - timedelta(days=jours)],
+            delete(Activity),
+        )
+        return total
+
+    @staticmethod
+    def purger_fichiers_en_erreur(session: Session, jours: int | None = None) -> int:
+        """Supprime les fichiers importés en erreur depuis plus de `jours` jours (ligne puis fichier)"""
+        jours = settings.ERROR_FILE_RETENTION_DAYS if jours is None else jours
+        total, chemins = RetentionService.par_tranches(
+            session,
+            File,
+            [File.status == FileStatus.ERROR, File.created_at < datetime.now() - timedelta(days=jours)],
+            delete(File),
+            retour=(File.file_path,),
+        )
+        for (chemin,) in chemins:
+            try:
+                Path(chemin).unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"   Erreur suppression {chemin}: {e}")
+        return total
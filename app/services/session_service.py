@@ -11,6 +11,7 @@ from sqlmodel import Session, select
 from app.core.logging_config import get_logger
 from app.models.session import UserSession
 from app.models.user import User
+from app.services.retention_service import RetentionService
 
 logger = get_logger(__name__)
 
@@ -212,15 +213,7 @@ class SessionService:
         Returns:
             Nombre de sessions nettoyées
         """
-        statement = select(UserSession).where(UserSession.is_active, UserSession.expires_at < datetime.now())
-        sessions = db_session.exec(statement).all()
-
-        count = 0
-        for session in sessions:
-            session.deactivate()
-            count += 1
-
-        db_session.commit()
+        count = RetentionService.expirer_sessions(db_session)
 
         if count > 0:
             logger.info(f"🧹 {count} session(s) expirée(s) nettoyée(s)")
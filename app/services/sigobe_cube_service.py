@@ -0,0 +1,359 @@
+# app/services/sigobe_cube_service.py
+"""
+Cube analytique SIGOBE
+Maintient la table de faits pré-agrégée (annee, trimestre, programme, action, type_depense)
+et répond aux requêtes de tendances pluriannuelles et de drill-down sans lire sigobe_execution
+"""
+
+from sqlalchemy import insert, literal
+from sqlmodel import Session, delete, func, select
+
+from app.core.logging_config import get_logger
+from app.db.verrous import VerrouConsultatif
+from app.models.budget import SigobeChargement, SigobeExecution, SigobeFaitAgrege
+
+logger = get_logger(__name__)
+
+# Mesures sommées : colonne du cube -> colonne de sigobe_execution
+MESURES = {
+    "budget_vote": SigobeExecution.budget_vote,
+    "budget_actuel": SigobeExecution.budget_actuel,
+    "engagements_emis": SigobeExecution.engagements_emis,
+    "disponible_eng": SigobeExecution.disponible_eng,
+    "mandats_emis": SigobeExecution.mandats_emis,
+    "mandats_vise_cf": SigobeExecution.mandats_vise_cf,
+    "mandats_pec": SigobeExecution.mandats_pec,
+}
+
+# Niveaux de drill-down autorisés (ordre hiérarchique)
+NIVEAUX = ("programme", "action", "type_depense")
+
+
+class SigobeCubeService:
+    """Service de gestion du cube analytique SIGOBE"""
+
+    # ============================================
+    # MAINTENANCE DU CUBE
+    # ============================================
+
+    @staticmethod
+    def rafraichir_chargement(chargement_id: int, session: Session) -> int:
+        """
+        (Re)calcule les faits agrégés d'un chargement en une seule requête INSERT ... SELECT
+
+        Sous verrou consultatif par chargement : deux recalculs simultanés (import, correction)
+        ne peuvent pas insérer chacun leurs faits.
+
+        Args:
+            chargement_id: ID du chargement SIGOBE
+            session: Session DB
+
+        Returns:
+            Nombre de faits agrégés créés
+        """
+        chargement = session.get(SigobeChargement, chargement_id)
+        if not chargement:
+            logger.warning(f"⚠️ Cube SIGOBE : chargement {chargement_id} introuvable")
+            return 0
+
+        with VerrouConsultatif(session.get_bind(), f"sigobe_cube:{chargement_id}"):
+            session.exec(delete(SigobeFaitAgrege).where(SigobeFaitAgrege.chargement_id == chargement_id))
+
+            programme = func.coalesce(SigobeExecution.programmes, "")
+            action = func.coalesce(SigobeExecution.actions, "")
+            type_depense = func.coalesce(SigobeExecution.type_depense, "")
+
+            source = (
+                select(
+                    literal(chargement_id),
+                    literal(chargement.annee),
+                    literal(chargement.trimestre),
+                    programme,
+                    action,
+                    type_depense,
+                    *[func.coalesce(func.sum(col), 0) for col in MESURES.values()],
+                    func.count(SigobeExecution.id),
+                    func.current_timestamp(),
+                )
+                .where(SigobeExecution.chargement_id == chargement_id)
+                .group_by(programme, action, type_depense)
+            )
+
+            colonnes = [
+                "chargement_id",
+                "annee",
+                "trimestre",
+                "programme",
+                "action",
+                "type_depense",
+                *MESURES.keys(),
+                "nb_lignes",
+                "date_calcul",
+            ]
+            session.exec(insert(SigobeFaitAgrege).from_select(colonnes, source))
+            session.commit()
+
+        nb_faits = session.exec(
+            select(func.count(SigobeFaitAgrege.id)).where(SigobeFaitAgrege.chargement_id == chargement_id)
+        ).one()
+
+        logger.info(f"🧊 Cube SIGOBE : {nb_faits} faits agrégés pour le chargement {chargement_id}")
+        return nb_faits
+
+    @staticmethod
+    def supprimer_chargement(chargement_id: int, session: Session) -> None:
+        """
+        Retire les faits d'un chargement du cube (sans commit, à inclure dans la transaction de suppression)
+        """
+        session.exec(delete(SigobeFaitAgrege).where(SigobeFaitAgrege.chargement_id == chargement_id))
+
+    @staticmethod
+    def reconstruire(session: Session) -> dict:
+        """
+        Reconstruit le cube complet à partir de tous les chargements (rattrapage de l'historique)
+
+        Returns:
+            Dict avec le nombre de chargements et de faits traités
+        """
+        chargement_ids = session.exec(select(SigobeChargement.id)).all()
+        nb_faits = 0
+        for chargement_id in chargement_ids:
+            nb_faits += SigobeCubeService.rafraichir_chargement(chargement_id, session)
+
+        logger.info(f"✅ Cube SIGOBE reconstruit : {len(chargement_ids)} chargements, {nb_faits} faits")
+        return {"nb_chargements": len(chargement_ids), "nb_faits": nb_faits}
+
+    @staticmethod
+    def alimenter_manquants(session: Session) -> int:
+        """
+        Alimente le cube pour les chargements qui ont des exécutions mais aucun fait
+        (historique importé avant le cube). Exécuté par le bootstrap, pas par les lectures.
+
+        Returns:
+            Nombre de chargements alimentés
+        """
+        avec_faits = select(SigobeFaitAgrege.chargement_id).distinct()
+        avec_executions = select(SigobeExecution.chargement_id).distinct()
+        chargement_ids = session.exec(
+            select(SigobeChargement.id).where(
+                SigobeChargement.id.in_(avec_executions), SigobeChargement.id.not_in(avec_faits)
+            )
+        ).all()
+        for chargement_id in chargement_ids:
+            SigobeCubeService.rafraichir_chargement(chargement_id, session)
+
+        if chargement_ids:
+            logger.info(f"🧊 Cube SIGOBE : {len(chargement_ids)} chargement(s) antérieur(s) au cube alimenté(s)")
+        return len(chargement_ids)
+
+    # ============================================
+    # SÉLECTION DES CHARGEMENTS DE RÉFÉRENCE
+    # ============================================
+
+    @staticmethod
+    def chargements_actifs(
+        session: Session,
+        annee_debut: int | None = None,
+        annee_fin: int | None = None,
+        trimestre: int | None = None,
+        par_trimestre: bool = False,
+    ) -> dict[tuple, int]:
+        """
+        Retourne le dernier chargement terminé de chaque période
+
+        Même règle que le dashboard : sans trimestre, la période annuelle est représentée
+        par le chargement le plus récent de l'année, quel que soit son trimestre.
+
+        Args:
+            annee_debut: Première année incluse (optionnel)
+            annee_fin: Dernière année incluse (optionnel)
+            trimestre: Restreindre à un trimestre (optionnel)
+            par_trimestre: Une période par (annee, trimestre) au lieu d'une par année
+
+        Returns:
+            Dict {(annee, trimestre|None): chargement_id} trié par période
+        """
+        query = select(
+            SigobeChargement.id, SigobeChargement.annee, SigobeChargement.trimestre, SigobeChargement.date_chargement
+        ).where(SigobeChargement.statut == "Terminé")
+        if annee_debut is not None:
+            query = query.where(SigobeChargement.annee >= annee_debut)
+        if annee_fin is not None:
+            query = query.where(SigobeChargement.annee <= annee_fin)
+        if trimestre is not None:
+            query = query.where(SigobeChargement.trimestre == trimestre)
+        if par_trimestre:
+            query = query.where(SigobeChargement.trimestre.is_not(None))
+
+        actifs: dict[tuple, tuple] = {}
+        for chargement_id, annee, trim, date_chargement in session.exec(query).all():
+            cle = (annee, trim) if (par_trimestre or trimestre is not None) else (annee, None)
+            if cle not in actifs or date_chargement > actifs[cle][1]:
+                actifs[cle] = (chargement_id, date_chargement)
+
+        return {cle: actifs[cle][0] for cle in sorted(actifs, key=lambda c: (c[0], c[1] or 0))}
+
+    # ============================================
+    # REQUÊTES ANALYTIQUES
+    # ============================================
+
+    @staticmethod
+    def calculer_taux(totaux: dict) -> dict:
+        """
+        Calcule les taux d'exécution selon les formules DAX du dashboard
+
+        Args:
+            totaux: Dict des mesures sommées (clés de MESURES)
+
+        Returns:
+            Dict des taux en pourcentage (arrondis à 2 décimales)
+        """
+        budget_actuel = float(totaux.get("budget_actuel") or 0)
+        budget_vote = float(totaux.get("budget_vote") or 0)
+        engagements = float(totaux.get("engagements_emis") or 0)
+        mandats_emis = float(totaux.get("mandats_emis") or 0)
+        mandats_vises = float(totaux.get("mandats_vise_cf") or 0)
+        mandats_pec = float(totaux.get("mandats_pec") or 0)
+        disponible = float(totaux.get("disponible_eng") or 0)
+
+        budg_select = budget_actuel or budget_vote
+
+        def ratio(num: float, den: float) -> float:
+            return round(num / den * 100, 2) if den > 0 else 0
+
+        return {
+            "taux_engagement": ratio(engagements, budg_select),
+            "taux_mandatement_emis": ratio(mandats_emis, engagements),
+            "taux_mandatement_vise": ratio(mandats_vises, mandats_pec),
+            "taux_mandatement_pec": ratio(mandats_pec, mandats_emis),
+            "taux_execution_global": ratio(disponible, budg_select),
+        }
+
+    @staticmethod
+    def _filtrer(query, programme: str | None, action: str | None, type_depense: str | None):
+        if programme is not None:
+            query = query.where(SigobeFaitAgrege.programme == programme)
+        if action is not None:
+            query = query.where(SigobeFaitAgrege.action == action)
+        if type_depense is not None:
+            query = query.where(SigobeFaitAgrege.type_depense == type_depense)
+        return query
+
+    @staticmethod
+    def _sommes():
+        return [func.coalesce(func.sum(getattr(SigobeFaitAgrege, nom)), 0).label(nom) for nom in MESURES]
+
+    @staticmethod
+    def _ligne_vers_totaux(ligne) -> dict:
+        return {nom: float(getattr(ligne, nom) or 0) for nom in MESURES}
+
+    @staticmethod
+    def totaux_chargement(session: Session, chargement_id: int) -> dict:
+        """
+        Totaux d'un chargement lus dans le cube
+
+        Returns:
+            Dict des mesures sommées en float
+        """
+        query = select(*SigobeCubeService._sommes()).where(SigobeFaitAgrege.chargement_id == chargement_id)
+        ligne = session.exec(query).one()
+        return SigobeCubeService._ligne_vers_totaux(ligne)
+
+    @staticmethod
+    def tendances(
+        session: Session,
+        annee_debut: int | None = None,
+        annee_fin: int | None = None,
+        trimestre: int | None = None,
+        par_trimestre: bool = False,
+        programme: str | None = None,
+        action: str | None = None,
+        type_depense: str | None = None,
+    ) -> list[dict]:
+        """
+        Série temporelle des montants et taux, une entrée par période
+
+        Returns:
+            Liste de points {annee, trimestre, chargement_id, <mesures>, <taux>}
+        """
+        actifs = SigobeCubeService.chargements_actifs(session, annee_debut, annee_fin, trimestre, par_trimestre)
+        if not actifs:
+            return []
+
+        query = select(SigobeFaitAgrege.chargement_id, *SigobeCubeService._sommes()).where(
+            SigobeFaitAgrege.chargement_id.in_(list(actifs.values()))
+        )
+        query = SigobeCubeService._filtrer(query, programme, action, type_depense)
+        query = query.group_by(SigobeFaitAgrege.chargement_id)
+
+        par_chargement = {ligne.chargement_id: ligne for ligne in session.exec(query).all()}
+
+        points = []
+        for (annee, trim), chargement_id in actifs.items():
+            ligne = par_chargement.get(chargement_id)
+            totaux = SigobeCubeService._ligne_vers_totaux(ligne) if ligne else dict.fromkeys(MESURES, 0.0)
+            points.append(
+                {
+                    "annee": annee,
+                    "trimestre": trim,
+                    "chargement_id": chargement_id,
+                    **totaux,
+                    **SigobeCubeService.calculer_taux(totaux),
+                }
+            )
+        return points
+
+    @staticmethod
+    def drill_down(
+        session: Session,
+        annee: int,
+        niveau: str = "programme",
+        trimestre: int | None = None,
+        programme: str | None = None,
+        action: str | None = None,
+        type_depense: str | None = None,
+    ) -> list[dict]:
+        """
+        Ventilation d'une période selon une dimension (programme, action ou type de dépense)
+
+        Returns:
+            Liste de {valeur, <mesures>, <taux>} triée par budget actuel décroissant
+
+        Raises:
+            ValueError si le niveau est inconnu
+        """
+        if niveau not in NIVEAUX:
+            raise ValueError(f"Niveau inconnu : {niveau} (attendu : {', '.join(NIVEAUX)})")
+
+        actifs = SigobeCubeService.chargements_actifs(session, annee, annee, trimestre)
+        chargement_id = actifs.get((annee, trimestre))
+        if chargement_id is None:
+            return []
+
+        dimension = getattr(SigobeFaitAgrege, niveau)
+        query = select(dimension.label("valeur"), *SigobeCubeService._sommes()).where(
+            SigobeFaitAgrege.chargement_id == chargement_id
+        )
+        query = SigobeCubeService._filtrer(query, programme, action, type_depense).group_by(dimension)
+
+        resultats = []
+        for ligne in session.exec(query).all():
+            totaux = SigobeCubeService._ligne_vers_totaux(ligne)
+            resultats.append({"valeur": ligne.valeur, **totaux, **SigobeCubeService.calculer_taux(totaux)})
+
+        return sorted(resultats, key=lambda r: r["budget_actuel"], reverse=True)
+
+    @staticmethod
+    def comparer(session: Session, annee: int, trimestre: int | None = None) -> dict:
+        """
+        Comparaison N / N-1 d'une période (variations en points de pourcentage)
+
+        Returns:
+            Dict {n, n1, variations}; n1 et variations valent None sans données N-1
+        """
+        points = {p["annee"]: p for p in SigobeCubeService.tendances(session, annee - 1, annee, trimestre=trimestre)}
+        n, n1 = points.get(annee), points.get(annee - 1)
+        variations = None
+        if n and n1:
+            variations = {cle: round(n[cle] - n1[cle], 2) for cle in SigobeCubeService.calculer_taux({})}
+        return {"n": n, "n1": n1, "variations": variations}
@@ -9,28 +9,33 @@ import re
 from datetime import datetime
 from decimal import Decimal
 from io import BytesIO
+from pathlib import Path
 
-import pandas as pd
 from fastapi import HTTPException
 from sqlmodel import Session, select
 
+from app.core.lazy import lazy_import
 from app.core.logging_config import get_logger
 from app.models.budget import SigobeChargement, SigobeExecution, SigobeKpi
 from app.models.user import User
 
 logger = get_logger(__name__)
 
+pd = lazy_import("pandas")
+
 
 class SigobeService:
     """Service pour gérer les données SIGOBE"""
 
     @staticmethod
-    def parse_fichier_excel(excel_file: BytesIO, annee: int, trimestre: int | None) -> tuple[pd.DataFrame, dict, list]:
+    def parse_fichier_excel(
+        excel_file: BytesIO | str | Path, annee: int, trimestre: int | None
+    ) -> tuple["pd.DataFrame", dict, list]:
         """
         Parse un fichier SIGOBE depuis notre template structuré
 
         Args:
-            excel_file: Fichier Excel en mémoire
+            excel_file: Fichier Excel en mémoire ou chemin sur disque
             annee: Année budgétaire
             trimestre: Trimestre (optionnel)
 
@@ -187,7 +192,7 @@ class SigobeService:
         nom_fichier: str,
         annee: int,
         trimestre: int | None,
-        df: pd.DataFrame,
+        df: "pd.DataFrame",
         metadata: dict,
         session: Session,
         current_user: User,
@@ -241,7 +246,7 @@ class SigobeService:
         return chargement
 
     @staticmethod
-    def creer_executions(df: pd.DataFrame, cols_to_keep: list, chargement_id: int, session: Session) -> int:
+    def creer_executions(df: "pd.DataFrame", cols_to_keep: list, chargement_id: int, session: Session) -> int:
         """
         Créer les enregistrements d'exécution SIGOBE depuis le DataFrame
 
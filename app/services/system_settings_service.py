@@ -14,6 +14,9 @@ from app.models.system_settings import SystemSettings
 
 logger = get_logger(__name__)
 
+# Clé des paramètres système dans le cache versionné
+CLE_CACHE = "system_settings"
+
 
 class SystemSettingsService:
     """Service de gestion des paramètres système"""
@@ -112,11 +115,11 @@ class SystemSettingsService:
         settings.update_timestamp(user_id)
 
         db_session.add(settings)
+        # Nouvelle version dans la même transaction : tous les workers rechargeront
+        settings_cache.invalider(CLE_CACHE, db_session)
         db_session.commit()
         db_session.refresh(settings)
-
-        # Vider le cache pour forcer le rechargement
-        settings_cache.clear()
+        settings_cache.oublier(CLE_CACHE)
 
         logger.info(f"✅ Paramètres système mis à jour par user #{user_id}")
 
@@ -126,7 +129,7 @@ class SystemSettingsService:
     def get_settings_as_dict(db_session: Session) -> dict:
         """
         Récupère les paramètres système sous forme de dictionnaire
-        Utilise le cache si disponible, sinon charge depuis la DB
+        Utilise le cache versionné (couleurs dérivées calculées une fois par version)
 
         Args:
             db_session: Session de base de données
@@ -134,44 +137,10 @@ class SystemSettingsService:
         Returns:
             Dictionnaire des paramètres
         """
-        # Vérifier le cache
-        cached = settings_cache.get()
-        if cached is not None:
-            return cached
-
-        # Charger depuis la DB
         try:
-            settings = SystemSettingsService.get_settings(db_session)
-
-            result = {
-                "company_name": settings.company_name,
-                "company_description": settings.company_description,
-                "company_email": settings.company_email,
-                "company_phone": settings.company_phone,
-                "company_address": settings.company_address,
-                "logo_path": settings.logo_path,
-                "primary_color": settings.primary_color,
-                "secondary_color": settings.secondary_color,
-                "accent_color": settings.accent_color,
-                "minister_civility": settings.minister_civility,
-                "minister_photo": settings.minister_photo,
-                "minister_name": settings.minister_name,
-                "minister_role": settings.minister_role,
-                # Calculer les couleurs dérivées
-                "primary_dark": SystemSettingsService.darken_color(settings.primary_color, 0.1),
-                "primary_light": SystemSettingsService.lighten_color(settings.primary_color, 0.2),
-                "footer_text": settings.footer_text,
-                "maintenance_mode": settings.maintenance_mode,
-                "allow_registration": settings.allow_registration,
-                "max_upload_size_mb": settings.max_upload_size_mb,
-                "session_timeout_minutes": settings.session_timeout_minutes,
-                "updated_at": settings.updated_at,
-            }
-
-            # Mettre en cache
-            settings_cache.set(result)
-
-            return result
+            return settings_cache.obtenir(
+                CLE_CACHE, db_session, lambda: SystemSettingsService._charger_dict(db_session)
+            )
         except Exception as e:
             logger.warning(
                 f"⚠️  Impossible de charger les paramètres depuis la DB, utilisation des valeurs par défaut: {e}"
@@ -179,6 +148,36 @@ class SystemSettingsService:
             # Fallback sur les valeurs par défaut depuis la config
             return SystemSettingsService.get_default_settings()
 
+    @staticmethod
+    def _charger_dict(db_session: Session) -> dict:
+        """Charge les paramètres depuis la DB et calcule les valeurs dérivées"""
+        settings = SystemSettingsService.get_settings(db_session)
+
+        return {
+            "company_name": settings.company_name,
+            "company_description": settings.company_description,
+            "company_email": settings.company_email,
+            "company_phone": settings.company_phone,
+            "company_address": settings.company_address,
+            "logo_path": settings.logo_path,
+            "primary_color": settings.primary_color,
+            "secondary_color": settings.secondary_color,
+            "accent_color": settings.accent_color,
+            "minister_civility": settings.minister_civility,
+            "minister_photo": settings.minister_photo,
+            "minister_name": settings.minister_name,
+            "minister_role": settings.minister_role,
+            # Calculer les couleurs dérivées
+            "primary_dark": SystemSettingsService.darken_color(settings.primary_color, 0.1),
+            "primary_light": SystemSettingsService.lighten_color(settings.primary_color, 0.2),
+            "footer_text": settings.footer_text,
+            "maintenance_mode": settings.maintenance_mode,
+            "allow_registration": settings.allow_registration,
+            "max_upload_size_mb": settings.max_upload_size_mb,
+            "session_timeout_minutes": settings.session_timeout_minutes,
+            "updated_at": settings.updated_at,
+        }
+
     @staticmethod
     def ensure_schema(db_session: Session, force: bool = False) -> None:
         """
@@ -0,0 +1,136 @@
+# app/services/upload_service.py
+"""
+Réception des fichiers uploadés
+Écrit l'UploadFile par blocs (aiofiles) dans un fichier temporaire, calcule la taille et
+l'empreinte SHA-256 à la volée, applique la limite de taille pendant la lecture puis
+déplace atomiquement le fichier à sa place définitive
+"""
+
+import contextlib
+import hashlib
+import os
+import secrets
+from pathlib import Path
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile
+from sqlmodel import Session
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Taille des blocs lus depuis l'upload (1 MB)
+CHUNK_SIZE = 1024 * 1024
+
+
+class FichierRecu:
+    """Fichier reçu sur disque (temporaire tant qu'il n'a pas été déplacé)"""
+
+    def __init__(self, chemin: Path, taille: int, sha256: str, nom_original: str | None, content_type: str | None):
+        self.chemin = chemin
+        self.taille = taille
+        self.sha256 = sha256
+        self.nom_original = nom_original
+        self.content_type = content_type
+
+    def deplacer(self, destination: Path) -> Path:
+        """Déplace atomiquement le fichier (même système de fichiers) et retourne sa nouvelle position"""
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.chemin, destination)
+        self.chemin = destination
+        return destination
+
+    def supprimer(self) -> None:
+        """Supprime le fichier (abandon de l'upload)"""
+        with contextlib.suppress(FileNotFoundError):
+            self.chemin.unlink()
+
+
+class UploadService:
+    """Service de réception en flux des fichiers uploadés"""
+
+    @staticmethod
+    def limite_systeme_octets(session: Session | None) -> int | None:
+        """Limite d'upload configurée dans les paramètres système (None si indisponible)"""
+        if session is None:
+            return None
+        from app.services.system_settings_service import SystemSettingsService
+
+        max_mb = SystemSettingsService.get_settings_as_dict(session).get("max_upload_size_mb")
+        return int(max_mb) * 1024 * 1024 if max_mb else None
+
+    @staticmethod
+    def _limite_effective(session: Session | None, max_octets: int | None) -> int | None:
+        limites = [limite for limite in (max_octets, UploadService.limite_systeme_octets(session)) if limite]
+        return min(limites) if limites else None
+
+    @staticmethod
+    async def recevoir(
+        upload_file: UploadFile,
+        repertoire: Path,
+        session: Session | None = None,
+        max_octets: int | None = None,
+    ) -> FichierRecu:
+        """
+        Reçoit un upload dans un fichier temporaire du répertoire cible
+
+        Le fichier temporaire est créé dans le répertoire de destination pour que le
+        déplacement final soit un simple rename atomique.
+
+        Args:
+            upload_file: Fichier uploadé
+            repertoire: Répertoire où le fichier sera finalement rangé
+            session: Session DB (pour lire max_upload_size_mb des paramètres système)
+            max_octets: Limite propre à l'endpoint (la plus petite des deux s'applique)
+
+        Returns:
+            FichierRecu (temporaire) avec taille et SHA-256
+
+        Raises:
+            HTTPException 413 si la limite est dépassée pendant la lecture
+        """
+        limite = UploadService._limite_effective(session, max_octets)
+        repertoire = Path(repertoire)
+        repertoire.mkdir(parents=True, exist_ok=True)
+        chemin_tmp = repertoire / f".upload-{secrets.token_hex(8)}.part"
+
+        empreinte = hashlib.sha256()
+        taille = 0
+        try:
+            async with aiofiles.open(chemin_tmp, "wb") as destination:
+                while bloc := await upload_file.read(CHUNK_SIZE):
+                    taille += len(bloc)
+                    if limite and taille > limite:
+                        raise HTTPException(
+                            413, f"Le fichier est trop volumineux (max {limite / (1024 * 1024):.0f} MB)"
+                        )
+                    empreinte.update(bloc)
+                    await destination.write(bloc)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                await aiofiles.os.remove(chemin_tmp)
+            raise
+
+        logger.debug(f"📥 Upload reçu : {upload_file.filename} ({taille} octets)")
+        return FichierRecu(chemin_tmp, taille, empreinte.hexdigest(), upload_file.filename, upload_file.content_type)
+
+    @staticmethod
+    async def enregistrer(
+        upload_file: UploadFile,
+        destination: Path,
+        session: Session | None = None,
+        max_octets: int | None = None,
+    ) -> FichierRecu:
+        """
+        Reçoit un upload et le range directement à sa place définitive
+
+        Returns:
+            FichierRecu positionné sur destination
+        """
+        destination = Path(destination)
+        fichier = await UploadService.recevoir(upload_file, destination.parent, session, max_octets)
+        fichier.deplacer(destination)
+        return fichier
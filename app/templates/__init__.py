@@ -2,16 +2,24 @@
 Configuration des templates Jinja2 pour le projet
 """
 
+import time
 from datetime import datetime
 from pathlib import Path
 
+import jinja2
 from fastapi import Request
 from fastapi.templating import Jinja2Templates
 
-from app.core.config import settings
+from app.core import metrics
+from app.core.config import Settings, settings
+from app.core.logging_config import get_logger
 from app.core.path_config import path_config
+from app.core.static_assets import est_empreinte, fichier_statique, srcset_statique, variante_statique
+from app.services.image_variant_service import ImageVariantService
 from app.utils.helpers import endpoint, get_client_ip
 
+logger = get_logger(__name__)
+
 # Configuration du répertoire des templates
 TEMPLATES_DIR = Path(__file__).parent
 
@@ -116,8 +124,32 @@ def static_url(file_path: str) -> str:
 
     Usage dans template: {{ static_url('images/logo.webp') }}
     Résultat: /static/images/logo.webp
+              /static/images/logo.3f2a1b9c0d4e.webp (après scripts/build_static.py)
     """
-    return path_config.get_file_url("static", file_path)
+    return path_config.get_file_url("static", fichier_statique(file_path))
+
+
+def static_variant_url(file_path: str, width: int | None = None, format: str = "webp") -> str:
+    """
+    Génère l'URL de la variante WebP/AVIF d'une image, la plus petite couvrant `width` pixels
+
+    Usage dans template: {{ static_variant_url('images/backgroundlogin/BGlogin.jpg', 1920) }}
+    Résultat: /static/images/backgroundlogin/BGlogin.3f2a1b9c0d4e.1770w.webp (image d'origine sans build)
+    """
+    return path_config.get_file_url("static", variante_statique(file_path, width, format))
+
+
+def static_srcset(file_path: str, format: str = "webp") -> str:
+    """
+    Génère un attribut srcset à partir des variantes d'une image
+
+    Usage dans template: <img srcset="{{ static_srcset('images/BGLogin.jpg') }}" sizes="100vw">
+    Résultat: /static/images/BGLogin.3f2a1b9c0d4e.640w.webp 640w, ... ("" sans build)
+    """
+    return ", ".join(
+        f"{path_config.get_file_url('static', chemin)} {largeur}w"
+        for chemin, largeur in srcset_statique(file_path, format)
+    )
 
 
 def media_url(file_path: str) -> str:
@@ -140,7 +172,21 @@ def upload_url(file_path: str) -> str:
     return path_config.get_file_url("uploads", file_path)
 
 
-def profile_picture_url(user_or_picture: any, add_cache_buster: bool = True) -> str:
+def image_variant(file_path: str, variant: str, mount: str = "static") -> str:
+    """
+    Chemin de la variante de taille fixe d'une image uploadée (avatar, navbar, pdf),
+    ou le chemin d'origine si la variante n'a pas (encore) été générée
+
+    Usage dans template: {{ static_url(image_variant(system_settings.minister_photo, 'avatar')) }}
+    Résultat: images/minister_photo.avatar.webp
+    """
+    if not file_path:
+        return file_path
+    racine = path_config.UPLOADS_DIR if mount == "uploads" else path_config.STATIC_DIR
+    return ImageVariantService.variante_relative(racine, file_path, variant)
+
+
+def profile_picture_url(user_or_picture: any, add_cache_buster: bool = True, variant: str | None = "avatar") -> str:
     """
     Génère l'URL de la photo de profil avec fallback vers l'image par défaut
 
@@ -152,12 +198,14 @@ def profile_picture_url(user_or_picture: any, add_cache_buster: bool = True) ->
             - Une chaîne directe (chemin de l'image)
             - None
         add_cache_buster: Ajouter un paramètre de cache pour forcer le refresh
+        variant: Variante de taille fixe à servir si elle existe ("avatar", "navbar", None = original)
 
     Usage dans template:
         {{ profile_picture_url(current_user) }}
         {{ profile_picture_url(agent) }}  # Utilise photo_path
         {{ profile_picture_url(user.profile_picture) }}
         {{ profile_picture_url(None) }}  # Retourne l'image par défaut
+        {{ profile_picture_url(current_user, variant="navbar") }}  # Miniature de la barre de navigation
 
     Returns:
         URL de l'image de profil ou de l'image par défaut
@@ -206,11 +254,11 @@ def profile_picture_url(user_or_picture: any, add_cache_buster: bool = True) ->
     # Ex: "/static/images/..." → utiliser static_url
     elif picture_path.startswith("/static/"):
         relative_path = picture_path.replace("/static/", "")
-        return static_url(relative_path)
+        return static_url(image_variant(relative_path, variant))
     
     # Maintenant picture_path est toujours relatif (ex: "photos/agents/photo.jpg")
     # Construire l'URL avec le bon préfixe selon l'environnement
-    image_url = upload_url(picture_path)
+    image_url = upload_url(image_variant(picture_path, variant, mount="uploads"))
 
     # Ajouter un cache buster si demandé
     if add_cache_buster and user_id:
@@ -220,7 +268,7 @@ def profile_picture_url(user_or_picture: any, add_cache_buster: bool = True) ->
     return image_url
 
 
-def get_logo_url() -> str:
+def get_logo_url(variant: str | None = None) -> str:
     """
     Retourne l'URL du logo de l'entreprise depuis system_settings
     Détecte automatiquement l'extension du logo (.webp, .png, .jpg, .svg)
@@ -228,6 +276,9 @@ def get_logo_url() -> str:
     Usage dans template: {{ get_logo_url() }}
     Résultat: /static/images/logo.webp (ou autre extension détectée)
 
+    Usage dans template: {{ get_logo_url('navbar') }}
+    Résultat: /static/images/logo.navbar.webp (variante de taille fixe si elle existe)
+
     Fallback : Cherche logo.* avec n'importe quelle extension
     """
     from pathlib import Path
@@ -246,16 +297,16 @@ def get_logo_url() -> str:
         
         if root_path and logo_path.startswith(f"{root_path}/uploads/"):
             logo_path = logo_path.replace(f"{root_path}/uploads/", "")
-            return upload_url(logo_path)
+            return upload_url(image_variant(logo_path, variant, mount="uploads"))
         elif logo_path.startswith("/uploads/"):
             logo_path = logo_path.replace("/uploads/", "")
-            return upload_url(logo_path)
+            return upload_url(image_variant(logo_path, variant, mount="uploads"))
         elif root_path and logo_path.startswith(f"{root_path}/static/"):
             logo_path = logo_path.replace(f"{root_path}/static/", "")
-            return static_url(logo_path)
+            return static_url(image_variant(logo_path, variant))
         elif logo_path.startswith("/static/"):
             logo_path = logo_path.replace("/static/", "")
-            return static_url(logo_path)
+            return static_url(image_variant(logo_path, variant))
 
         # Vérifier si le fichier existe physiquement
         from app.core.path_config import path_config
@@ -263,7 +314,7 @@ def get_logo_url() -> str:
         full_path = path_config.STATIC_DIR / logo_path
 
         if full_path.exists():
-            return static_url(logo_path)
+            return static_url(image_variant(logo_path, variant))
 
         # Si n'existe pas, chercher logo.* avec n'importe quelle extension
         logo_dir = full_path.parent
@@ -275,7 +326,7 @@ def get_logo_url() -> str:
                 logo_file = logo_dir / f"{logo_name}{ext}"
                 if logo_file.exists():
                     relative_path = str(logo_file.relative_to(path_config.STATIC_DIR)).replace("\\", "/")
-                    return static_url(relative_path)
+                    return static_url(image_variant(relative_path, variant))
 
         # Fallback par défaut
         return static_url("images/logo_default.png")
@@ -524,7 +575,10 @@ def static_versioned_url(url: str) -> str:
 
     Usage: {{ static_versioned_url('/static/css/style.css') }}
     Résultat: /static/css/style.css?v=abc123
+    Les URLs à empreinte (fournies par static_url après build) sont renvoyées telles quelles.
     """
+    if est_empreinte(url):
+        return url
     sep = "&" if "?" in url else "?"
     return f"{url}{sep}v={settings.ASSET_VERSION}"
 
@@ -543,9 +597,12 @@ templates.env.globals.update(
     datetime=datetime,
     static_url=static_url,  # URL statique de base
     static_versioned_url=static_versioned_url,  # URL avec cache busting
+    static_variant_url=static_variant_url,  # Variante WebP/AVIF d'une image
+    static_srcset=static_srcset,  # srcset des variantes d'une image
     media_url=media_url,
     upload_url=upload_url,
     profile_picture_url=profile_picture_url,  # Helper pour images de profil avec fallback
+    image_variant=image_variant,  # Variante de taille fixe d'une image uploadée (avatar, navbar, pdf)
     user_initials=user_initials,  # Helper pour générer les initiales
     get_logo_url=get_logo_url,  # Helper pour récupérer le logo de l'entreprise
     path_config=path_config,  # Accès complet à path_config si nécessaire
@@ -555,12 +612,68 @@ templates.env.globals.update(
 # CONFIGURATION
 # ==========================================
 
-# Auto-reload des templates en développement
-# (à activer via settings.DEBUG si vous avez des settings)
-templates.env.auto_reload = True
+
+
+class TemplateMesure(jinja2.Template):
+    """Template dont chaque rendu est chronométré (histogramme par nom de template)"""
+
+    def render(self, *args, **kwargs) -> str:
+        with metrics.templates_rendu.chronometrer(template=self.name or "<chaîne>"):
+            return super().render(*args, **kwargs)
+
+
+def configurer_environnement(env: jinja2.Environment, config: Settings = settings) -> jinja2.Environment:
+    """
+    Applique le mode de production à un environnement Jinja2
+
+    - auto_reload seulement en développement : sinon chaque rendu relit la date de
+      modification du template, de ses parents et de ses inclusions
+    - cache de bytecode sur disque : un template n'est compilé qu'une fois pour tous les workers
+    - rendus chronométrés (métrique template_render_duration_seconds)
+    """
+    env.auto_reload = config.should_auto_reload_templates
+    env.template_class = TemplateMesure
+    try:
+        if config.TEMPLATES_BYTECODE_CACHE_DIR:
+            Path(config.TEMPLATES_BYTECODE_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+            env.bytecode_cache = jinja2.FileSystemBytecodeCache(config.TEMPLATES_BYTECODE_CACHE_DIR)
+        else:
+            env.bytecode_cache = jinja2.FileSystemBytecodeCache()
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"⚠️  Cache de bytecode des templates désactivé: {e}")
+        env.bytecode_cache = None
+    return env
+
+
+def precompiler_templates(env: jinja2.Environment | None = None) -> int:
+    """
+    Compile tous les templates HTML au démarrage du worker (cache mémoire et bytecode)
+
+    Le premier rendu de chaque page ne paie plus la compilation ; un template invalide
+    est signalé dès le démarrage.
+
+    Returns:
+        Nombre de templates compilés
+    """
+    env = env or templates.env
+    debut = time.perf_counter()
+    noms = env.list_templates(extensions=["html"])
+    compiles = 0
+    for nom in noms:
+        try:
+            env.get_template(nom)
+            compiles += 1
+        except jinja2.TemplateError as e:
+            logger.error(f"❌ Template invalide {nom}: {e}")
+    duree_ms = (time.perf_counter() - debut) * 1000
+    logger.info(f"🧩 {compiles}/{len(noms)} templates compilés en {duree_ms:.0f} ms")
+    return compiles
+
+
+configurer_environnement(templates.env)
 
 # ==========================================
 # EXPORTS
 # ==========================================
 
-__all__ = ["get_template_context", "templates"]
+__all__ = ["get_template_context", "precompiler_templates", "templates"]
@@ -0,0 +1,89 @@
+"""
+Benchmark du traitement des fichiers Excel par type de fichier
+Génère des classeurs synthétiques, les traite en lecture complète puis par blocs
+et affiche le débit (lignes/s) et le nombre d'enregistrements produits.
+
+Utilisation: python scripts/benchmark_excel_processor.py [--lignes 20000 50000] [--bloc 10000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.enums import FileType
+from app.services.excel_processor import ExcelProcessorService
+
+# BUDGET passe par sa spécification vectorisée, RAPPORT_ACTIVITE par le traitement générique
+TYPES = [FileType.BUDGET.value, FileType.RAPPORT_ACTIVITE.value]
+
+
+def generer_classeur(file_type: str, nb_lignes: int, chemin: Path) -> None:
+    """Crée un fichier Excel synthétique représentatif du type"""
+    rng = np.random.default_rng(42)
+    montants = rng.integers(0, 10_000_000, size=(nb_lignes, 3)).astype(float)
+
+    if file_type == FileType.BUDGET.value:
+        df = pd.DataFrame(
+            {
+                "Ligne budgétaire": [f"6{i:05d} - Fournitures" for i in range(nb_lignes)],
+                "Montant prévu": montants[:, 0],
+                "Montant réalisé": montants[:, 1],
+                "Écart": montants[:, 0] - montants[:, 1],
+                "Commentaire": np.where(np.arange(nb_lignes) % 7 == 0, None, "RAS"),
+            }
+        )
+    else:
+        df = pd.DataFrame({"Activité": [f"A{i}" for i in range(nb_lignes)], "Réalisé": montants[:, 0]})
+
+    df.to_excel(chemin, index=False, engine="openpyxl")
+
+
+def mesurer(chemin: Path, file_type: str, par_blocs: bool) -> tuple[float, int]:
+    settings.EXCEL_SEUIL_LECTURE_PAR_BLOCS_MB = 0 if par_blocs else 10_000
+    debut = time.perf_counter()
+    success, rows_processed, _, error_msg, _ = ExcelProcessorService.process_file(str(chemin), file_type, {})
+    duree = time.perf_counter() - debut
+    if not success:
+        raise RuntimeError(error_msg)
+    return duree, rows_processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du traitement Excel par type de fichier")
+    parser.add_argument("--lignes", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--bloc", type=int, default=settings.EXCEL_LIGNES_PAR_BLOC)
+    args = parser.parse_args()
+
+    settings.EXCEL_LIGNES_PAR_BLOC = args.bloc
+    seuil_initial = settings.EXCEL_SEUIL_LECTURE_PAR_BLOCS_MB
+
+    print(f"{'type':<28} {'lignes':>8} {'mode':<8} {'durée (s)':>10} {'lignes/s':>10} {'records':>8}")
+    print("-" * 78)
+    try:
+        with tempfile.TemporaryDirectory() as dossier:
+            for file_type in TYPES:
+                for nb_lignes in args.lignes:
+                    chemin = Path(dossier) / f"bench_{nb_lignes}.xlsx"
+                    generer_classeur(file_type, nb_lignes, chemin)
+                    for par_blocs in (False, True):
+                        duree, records = mesurer(chemin, file_type, par_blocs)
+                        mode = "blocs" if par_blocs else "complet"
+                        print(
+                            f"{file_type:<28} {nb_lignes:>8} {mode:<8} {duree:>10.2f} "
+                            f"{nb_lignes / duree:>10.0f} {records:>8}"
+                        )
+    finally:
+        settings.EXCEL_SEUIL_LECTURE_PAR_BLOCS_MB = seuil_initial
+
+
+if __name__ == "__main__":
+    main()
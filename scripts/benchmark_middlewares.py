@@ -0,0 +1,118 @@
+"""
+Benchmark du coût par requête de la pile de middlewares
+Construit une application minimale (une route texte), l'enveloppe avec setup_middlewares
+dans une configuration de production (tous les middlewares activés) et appelle l'application
+directement en ASGI, sans serveur ni client HTTP, pour isoler le coût des middlewares.
+
+Utilisation: python scripts/benchmark_middlewares.py [--requetes 20000] [--tours 5]
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.middleware import setup_middlewares
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "https",
+    "path": "/api/ping",
+    "raw_path": b"/api/ping",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [
+        (b"host", b"localhost"),
+        (b"user-agent", b"Mozilla/5.0 (benchmark)"),
+        (b"x-forwarded-proto", b"https"),
+        (b"cf-ray", b"8a1b2c3d4e5f-CDG"),
+        (b"cf-ipcountry", b"CI"),
+    ],
+    "client": ("127.0.0.1", 50000),
+    "server": ("localhost", 443),
+}
+
+
+def construire_app(avec_middlewares: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    def ping():
+        return PlainTextResponse("pong")
+
+    if avec_middlewares:
+        config = settings.model_copy(
+            update={
+                "DEBUG": False,
+                "ENV": "production",
+                "ALLOWED_HOSTS": ["*"],
+                "ENABLE_HTTPS_REDIRECT": False,
+                "ENABLE_IP_FILTER": True,
+                "ENABLE_USER_AGENT_FILTER": True,
+            }
+        )
+        setup_middlewares(app, config)
+    return app
+
+
+async def mesurer(app: FastAPI, nb_requetes: int) -> float:
+    """Durée moyenne d'une requête (microsecondes)"""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Échauffement (construction de la pile, caches)
+    for _ in range(200):
+        await app(dict(SCOPE), receive, send)
+
+    debut = time.perf_counter()
+    for _ in range(nb_requetes):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - debut) / nb_requetes * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût par requête de la pile de middlewares")
+    parser.add_argument("--requetes", type=int, default=20000)
+    parser.add_argument("--tours", type=int, default=5)
+    args = parser.parse_args()
+
+    # Les logs d'accès iraient sur disque: on mesure la mécanique des middlewares, pas les E/S
+    logging.disable(logging.CRITICAL)
+
+    sans = construire_app(avec_middlewares=False)
+    avec = construire_app(avec_middlewares=True)
+    nb_couches = len(avec.user_middleware)
+
+    resultats_sans, resultats_avec = [], []
+    for _ in range(args.tours):
+        resultats_sans.append(asyncio.run(mesurer(sans, args.requetes)))
+        resultats_avec.append(asyncio.run(mesurer(avec, args.requetes)))
+
+    base = statistics.median(resultats_sans)
+    total = statistics.median(resultats_avec)
+    print(f"Requêtes par tour : {args.requetes} x {args.tours} tours (médiane)")
+    print(f"Couches de middlewares : {nb_couches}")
+    print(f"Sans middleware   : {base:8.1f} µs/requête")
+    print(f"Avec middlewares  : {total:8.1f} µs/requête")
+    print(f"Surcoût           : {total - base:8.1f} µs/requête")
+
+
+if __name__ == "__main__":
+    main()
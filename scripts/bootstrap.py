@@ -0,0 +1,50 @@
+"""
+Bootstrap de la base de données (à exécuter une fois, avant de lancer les workers)
+
+Crée la base et les tables, applique les migrations de schéma, initialise les paramètres
+système et l'administrateur, puis enregistre le tampon de version du schéma. Les workers
+qui démarrent ensuite se contentent de vérifier ce tampon.
+
+Utilisation:
+    python scripts/bootstrap.py            # bootstrap si le schéma n'est pas à jour
+    python scripts/bootstrap.py --force    # bootstrap même si le schéma est à jour
+    python scripts/bootstrap.py --check    # code de sortie 0 si à jour, 1 sinon
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.logging_config import get_logger
+from app.db.bootstrap import bootstrap, empreinte_schema, lire_version
+
+logger = get_logger(__name__)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bootstrap de la base de données")
+    parser.add_argument("--force", action="store_true", help="Exécuter même si le schéma est à jour")
+    parser.add_argument("--check", action="store_true", help="Vérifier le tampon de version sans rien modifier")
+    args = parser.parse_args()
+
+    if args.check:
+        attendue = empreinte_schema()
+        try:
+            enregistree = lire_version()
+        except Exception as e:
+            logger.error(f"❌ Base inaccessible: {e}")
+            return 1
+        if enregistree == attendue:
+            logger.info(f"✅ Schéma à jour ({attendue[:12]})")
+            return 0
+        logger.warning(f"⚠️  Schéma à initialiser (attendu {attendue[:12]}, enregistré {(enregistree or 'aucun')[:12]})")
+        return 1
+
+    return 0 if bootstrap(force=args.force) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Build des fichiers statiques (à exécuter au déploiement, avant de lancer les workers)
+
+Copie app/static dans app/static_build sous des noms à empreinte de contenu, génère les
+voisins pré-compressés (.gz, et .br si le module brotli est installé) et les variantes
+WebP/AVIF des images, puis écrit app/static_build/manifest.json lu par `static_url`.
+
+Utilisation:
+    python scripts/build_static.py                      # build incrémental
+    python scripts/build_static.py --largeurs 800,1600  # largeurs des variantes d'images
+    python scripts/build_static.py --clean              # repartir d'un répertoire vide
+"""
+
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.logging_config import get_logger
+from app.core.path_config import path_config
+from app.core.static_assets import LARGEURS_IMAGES, construire
+
+logger = get_logger(__name__)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build des fichiers statiques")
+    parser.add_argument(
+        "--largeurs",
+        default=",".join(str(largeur) for largeur in LARGEURS_IMAGES),
+        help="Largeurs des variantes d'images, séparées par des virgules",
+    )
+    parser.add_argument("--clean", action="store_true", help="Supprimer le build existant avant de reconstruire")
+    args = parser.parse_args()
+
+    try:
+        largeurs = tuple(int(largeur) for largeur in args.largeurs.split(",") if largeur.strip())
+    except ValueError:
+        logger.error(f"❌ Largeurs invalides: {args.largeurs}")
+        return 1
+
+    if args.clean:
+        shutil.rmtree(path_config.STATIC_BUILD_DIR, ignore_errors=True)
+
+    debut = time.perf_counter()
+    manifeste = construire(largeurs=largeurs)
+    fichiers = manifeste["fichiers"].values()
+    nb_variantes = sum(len(tailles) for entree in fichiers for tailles in entree.get("variantes", {}).values())
+    nb_compresses = sum(len(entree.get("encodages", [])) for entree in fichiers)
+    logger.info(
+        f"✅ {len(fichiers)} fichier(s), {nb_compresses} version(s) pré-compressée(s), "
+        f"{nb_variantes} variante(s) d'images en {time.perf_counter() - debut:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Génère les variantes de taille fixe (avatar, navbar, pdf) des images déjà uploadées
+
+Les nouveaux uploads les génèrent automatiquement ; ce script reprend l'existant
+(photos de profil, photos des agents, photos des lettres d'engagement, logo, photo du ministre).
+Seules les images sans variantes sont traitées : le script peut être relancé sans coût.
+
+Utilisation:
+    python scripts/generate_image_variants.py
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.logging_config import get_logger
+from app.core.path_config import path_config
+from app.services.image_variant_service import ImageVariantService
+
+logger = get_logger(__name__)
+
+# (répertoire, profil de variantes, motif)
+SOURCES = [
+    (path_config.UPLOADS_DIR / "profiles", "photo", "*"),
+    (path_config.UPLOADS_DIR / "photos" / "agents", "photo", "*"),
+    (path_config.UPLOADS_DIR / "performance" / "engagement", "photo", "*"),
+    (path_config.STATIC_IMAGES_DIR, "logo", "logo.*"),
+    (path_config.STATIC_IMAGES_DIR, "photo", "minister_photo.*"),
+]
+
+
+def main() -> int:
+    total = 0
+    for repertoire, profil, motif in SOURCES:
+        if not repertoire.exists():
+            continue
+        nombre = ImageVariantService.generer_manquantes(repertoire, profil, motif)
+        logger.info(f"🖼️  {repertoire.relative_to(path_config.BASE_DIR)}/{motif}: {nombre} image(s) traitée(s)")
+        total += nombre
+    logger.info(f"✅ Variantes générées pour {total} image(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -221,6 +221,47 @@ def initialize_personnel_data():
         logger.error(f"❌ Erreur initialisation données personnel: {e}", exc_info=True)
         return False
 
+def initialize_sigobe_cube():
+    """
+    Prépare le cube analytique SIGOBE :
+    - contrainte d'unicité des faits sur une table créée avant elle (create_all ne modifie pas
+      une table existante) ; les chargements en double sont recalculés avant sa création
+    - alimentation des chargements importés avant le cube
+    """
+    try:
+        from sqlalchemy import func, inspect, text
+        from app.models.budget import SigobeFaitAgrege
+        from app.services.sigobe_cube_service import SigobeCubeService
+
+        colonnes = ["chargement_id", "programme", "action", "type_depense"]
+        inspecteur = inspect(engine)
+        unique = any(c["column_names"] == colonnes for c in inspecteur.get_unique_constraints("sigobe_fait_agrege")) or any(
+            i["unique"] and i["column_names"] == colonnes for i in inspecteur.get_indexes("sigobe_fait_agrege")
+        )
+
+        with Session(engine) as session:
+            if not unique:
+                doublons = session.exec(
+                    select(SigobeFaitAgrege.chargement_id)
+                    .group_by(*[getattr(SigobeFaitAgrege, c) for c in colonnes])
+                    .having(func.count() > 1)
+                    .distinct()
+                ).all()
+                for chargement_id in doublons:
+                    SigobeCubeService.rafraichir_chargement(chargement_id, session)
+                session.exec(text(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS uq_sigobe_fait_agrege_cellule "
+                    "ON sigobe_fait_agrege (chargement_id, programme, action, type_depense)"
+                ))
+                session.commit()
+                logger.info(f"✅ Cube SIGOBE : contrainte d'unicité ajoutée ({len(doublons)} chargement(s) dédoublonné(s))")
+
+            SigobeCubeService.alimenter_manquants(session)
+        return True
+    except Exception as e:
+        logger.error(f"❌ Erreur préparation du cube SIGOBE: {e}", exc_info=True)
+        return False
+
 def create_admin_user():
     """Crée l'utilisateur admin par défaut SI aucun admin n'existe"""
     try:
@@ -280,6 +321,7 @@ def initialize_database():
     0. Crée la base de données PostgreSQL si nécessaire
     1. Crée les tables si elles n'existent pas
     2. Initialise les paramètres système
+    2.5. Prépare le cube analytique SIGOBE (unicité des faits, historique)
     3. Initialise les données de référence du personnel
     4. Crée l'utilisateur admin si aucun utilisateur n'existe
     """
@@ -311,6 +353,10 @@ def initialize_database():
         logger.error("❌ Échec de l'initialisation des paramètres système")
         return False
     logger.info("✅ Paramètres système initialisés avec succès")
+    # Étape 2.5: Contrainte et alimentation du cube analytique SIGOBE
+    if not initialize_sigobe_cube():
+        logger.error("❌ Échec de la préparation du cube SIGOBE")
+        return False
     # Étape 3: Initialiser les données de référence du personnel (DÉSACTIVÉ - géré par l'utilisateur)
     # if not initialize_personnel_data():
     #     logger.error("❌ Échec de l'initialisation des données de référence")
@@ -2,6 +2,8 @@
 Configuration pytest et fixtures partagées
 """
 import os
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine
@@ -12,6 +14,7 @@ os.environ["DEBUG"] = "True"
 os.environ["ENV"] = "dev"
 
 from app.core.security import get_password_hash
+from app.db.query_stats import compter_requetes, instrumenter_moteur
 from app.db.session import get_session
 from app.main import app
 from app.models.user import User
@@ -28,11 +31,31 @@ def session_fixture():
         poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(engine)
+    instrumenter_moteur(engine)
 
     with Session(engine) as session:
         yield session
 
 
+@pytest.fixture(name="query_budget")
+def query_budget_fixture(session: Session):
+    """
+    Vérifie le nombre de requêtes SQL exécutées dans un bloc
+
+    Usage :
+        with query_budget(5):
+            client.get("/api/...")
+    """
+
+    @contextmanager
+    def budget(maximum: int):
+        with compter_requetes(session.get_bind()) as stats:
+            yield stats
+        assert stats.total <= maximum, f"Budget de {maximum} requêtes dépassé\n{stats.resume()}"
+
+    return budget
+
+
 @pytest.fixture(name="test_session")
 def test_session_fixture():
     """
@@ -0,0 +1,72 @@
+"""
+Tests unitaires pour le moteur et les sessions asynchrones
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import Settings
+from app.db.session import get_async_session
+from app.main import app, subapp
+from app.models.personnel import AgentComplet, GradeComplet, Programme
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    """Client dont la dépendance AsyncSession pointe vers une base SQLite fichier (aiosqlite)"""
+    chemin = tmp_path / "async.db"
+    engine = create_engine(f"sqlite:///{chemin}")
+    SQLModel.metadata.create_all(engine)
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{chemin}")
+    fabrique = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_async_session_override():
+        async with fabrique() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    subapp.dependency_overrides[get_async_session] = get_async_session_override
+    with Session(engine) as session:
+        yield TestClient(app), session
+    app.dependency_overrides.clear()
+    subapp.dependency_overrides.clear()
+    engine.dispose()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("url", "attendu"),
+    [
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("postgresql://u:p@db:5432/mppeep", "postgresql+asyncpg://u:p@db:5432/mppeep"),
+        ("postgresql+psycopg2://u:p@db/mppeep", "postgresql+asyncpg://u:p@db/mppeep"),
+    ],
+)
+def test_async_database_url(url, attendu):
+    """Même base que le moteur synchrone, avec le pilote asynchrone correspondant"""
+    assert Settings(DATABASE_URL=url).async_database_url == attendu
+
+
+@pytest.mark.unit
+def test_referentiels_lus_en_asynchrone(async_client):
+    """Les listes de grades et de programmes passent par l'AsyncSession"""
+    client, session = async_client
+    agent = AgentComplet(matricule="A001", nom="KOFFI", prenom="Awa")
+    session.add(agent)
+    session.commit()
+    session.add(Programme(code="P02", libelle="Budget", responsable_id=agent.id))
+    session.add(Programme(code="P01", libelle="Administration"))
+    session.add(GradeComplet(code="A3", libelle="Administrateur", categorie="A"))
+    session.commit()
+
+    programmes = client.get("/api/v1/referentiels/api/programmes").json()
+    assert [p["code"] for p in programmes] == ["P01", "P02"]
+    assert programmes[0]["responsable_nom"] == ""
+    assert programmes[1]["responsable_nom"] == "KOFFI Awa"
+
+    grades = client.get("/api/v1/referentiels/api/grades").json()
+    assert grades[0]["code"] == "A3" and grades[0]["libelle"] == "Administrateur"
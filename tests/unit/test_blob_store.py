@@ -0,0 +1,87 @@
+"""
+Tests unitaires pour le magasin de contenus dédupliqué
+"""
+
+import asyncio
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+from sqlmodel import Session
+
+from app.core.path_config import path_config
+from app.models.file import BlobContenu
+from app.services.blob_store_service import BlobStoreService
+
+
+@pytest.fixture(autouse=True)
+def uploads_temporaires(tmp_path, monkeypatch):
+    monkeypatch.setattr(path_config, "UPLOADS_DIR", tmp_path)
+    monkeypatch.setattr(BlobStoreService, "RACINE", tmp_path / "blobs")
+    return tmp_path
+
+
+def _enregistrer(session: Session, contenu: bytes, nom: str = "piece.pdf") -> BlobContenu:
+    upload = UploadFile(file=BytesIO(contenu), filename=nom)
+    return asyncio.run(BlobStoreService.enregistrer(upload, session))
+
+
+@pytest.mark.unit
+def test_contenu_identique_stocke_une_seule_fois(session: Session, uploads_temporaires):
+    """Deux uploads identiques partagent le même blob et incrémentent les références"""
+    premier = _enregistrer(session, b"%PDF-1.4 devis", "devis.pdf")
+    second = _enregistrer(session, b"%PDF-1.4 devis", "copie.PDF")
+    session.commit()
+
+    assert premier.sha256 == second.sha256
+    assert second.nb_references == 2
+    assert premier.chemin == f"blobs/{premier.sha256[:2]}/{premier.sha256[2:4]}/{premier.sha256}.pdf"
+
+    fichiers = [p for p in (uploads_temporaires / "blobs").rglob("*") if p.is_file()]
+    assert fichiers == [uploads_temporaires / premier.chemin]
+
+
+@pytest.mark.unit
+def test_liberation_et_purge_des_orphelins(session: Session, uploads_temporaires):
+    """Le fichier n'est supprimé qu'une fois la dernière référence libérée, par la purge"""
+    blob = _enregistrer(session, b"contenu partage")
+    _enregistrer(session, b"contenu partage")
+    session.commit()
+    sha256, chemin = blob.sha256, uploads_temporaires / blob.chemin
+
+    BlobStoreService.liberer(sha256, session)
+    session.commit()
+    assert BlobStoreService.purger_orphelins(session, delai_grace=timedelta(0))["nb_blobs"] == 0
+    assert chemin.exists()
+
+    BlobStoreService.liberer(sha256, session)
+    BlobStoreService.liberer(sha256, session)
+    session.commit()
+    assert session.get(BlobContenu, sha256, populate_existing=True).nb_references == 0
+
+    # Dans le délai de grâce, le blob est conservé
+    assert BlobStoreService.purger_orphelins(session)["nb_blobs"] == 0
+
+    resultat = BlobStoreService.purger_orphelins(session, delai_grace=timedelta(0))
+    assert resultat == {"nb_blobs": 1, "octets": len(b"contenu partage")}
+    assert not chemin.exists()
+    session.expunge_all()
+    assert session.get(BlobContenu, sha256) is None
+
+
+@pytest.mark.unit
+def test_rollback_ne_laisse_pas_de_fichier(session: Session, uploads_temporaires):
+    """Le nouveau blob n'est rangé qu'au commit ; annulé, le fichier reçu est supprimé"""
+    blob = _enregistrer(session, b"contenu annule")
+    chemin = uploads_temporaires / blob.chemin
+    assert not chemin.exists()
+
+    session.rollback()
+
+    assert [p for p in (uploads_temporaires / "blobs").rglob("*") if p.is_file()] == []
+    assert session.get(BlobContenu, blob.sha256) is None
+
+    blob = _enregistrer(session, b"contenu valide")
+    session.commit()
+    assert (uploads_temporaires / blob.chemin).read_bytes() == b"contenu valide"
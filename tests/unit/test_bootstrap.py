@@ -0,0 +1,102 @@
+"""
+Tests unitaires pour le bootstrap unique de la base et le tampon de version du schéma
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table
+from sqlmodel import create_engine
+
+from app.core.config import settings
+from app.db import bootstrap as db_bootstrap
+
+
+@pytest.fixture
+def engine_fichier(tmp_path):
+    """Base SQLite sur fichier (le verrou de bootstrap est un verrou de fichier voisin)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'bootstrap.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_empreinte_suit_les_modeles():
+    """L'empreinte est stable et change dès qu'une colonne change"""
+    assert db_bootstrap.empreinte_schema() == db_bootstrap.empreinte_schema()
+
+    avant, apres = MetaData(), MetaData()
+    Table("agent", avant, Column("id", Integer, primary_key=True), Column("nom", String(100)))
+    Table("agent", apres, Column("id", Integer, primary_key=True), Column("nom", String(200)))
+    assert db_bootstrap.empreinte_schema(avant) != db_bootstrap.empreinte_schema(apres)
+
+
+@pytest.mark.unit
+def test_workers_concurrents_un_seul_bootstrap(engine_fichier):
+    """Quatre workers démarrent ensemble : l'initialisation n'est exécutée qu'une fois"""
+    appels = []
+
+    def initialiser():
+        appels.append(threading.get_ident())
+        time.sleep(0.2)  # laisse aux autres workers le temps d'attendre le verrou
+        return True
+
+    resultats = []
+    workers = [
+        threading.Thread(target=lambda: resultats.append(db_bootstrap.bootstrap(engine_fichier, initialiser)))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(appels) == 1
+    assert resultats == [True] * 4
+    assert db_bootstrap.schema_a_jour(engine_fichier)
+
+
+@pytest.mark.unit
+def test_demarrage_rapide_et_echec(engine_fichier, monkeypatch):
+    """Tampon absent : pas de bootstrap si désactivé ; un bootstrap en échec n'enregistre rien"""
+    assert db_bootstrap.lire_version(engine_fichier) is None
+
+    monkeypatch.setattr(settings, "DB_BOOTSTRAP_ON_STARTUP", False)
+    assert db_bootstrap.preparer_base(engine_fichier) is False
+
+    assert db_bootstrap.bootstrap(engine_fichier, lambda: False) is False
+    assert db_bootstrap.lire_version(engine_fichier) is None
+
+    db_bootstrap.enregistrer_version(db_bootstrap.empreinte_schema(), engine_fichier)
+    assert db_bootstrap.preparer_base(engine_fichier) is True
+
+
+@pytest.mark.unit
+def test_base_creee_avant_le_verrou(engine_fichier, monkeypatch):
+    """La base est créée avant la prise du verrou (qui a besoin d'une connexion à cette base)"""
+    etapes = []
+
+    class VerrouTrace:
+        def __init__(self, engine, nom):
+            pass
+
+        def __enter__(self):
+            etapes.append("verrou")
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(db_bootstrap, "VerrouConsultatif", VerrouTrace)
+
+    def initialiser():
+        etapes.append("initialisation")
+        return True
+
+    assert db_bootstrap.bootstrap(engine_fichier, initialiser, creer_base=lambda: etapes.append("base") or True)
+    assert etapes == ["base", "verrou", "initialisation"]
+
+    # Création impossible (serveur injoignable) : ni verrou ni initialisation
+    etapes.clear()
+    assert db_bootstrap.bootstrap(engine_fichier, initialiser, force=True, creer_base=lambda: False) is False
+    assert etapes == []
@@ -0,0 +1,96 @@
+"""
+Tests unitaires pour le rendu des lettres d'engagement (instances isolées, génération par lots)
+"""
+
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+import pdfplumber
+import pytest
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.process_pool import arreter_pools, obtenir_pool
+from app.models.budget import FicheTechnique
+from app.models.personnel import Direction, Programme
+from app.services import engagement_letter_batch_service
+from app.services.engagement_letter_batch_service import EngagementLetterBatchService
+from app.services.engagement_letter_service import EngagementLetterGenerator
+
+
+def _texte_couverture(pdf: bytes) -> str:
+    with pdfplumber.open(BytesIO(pdf)) as document:
+        return document.pages[0].extract_text() or ""
+
+
+@pytest.mark.unit
+def test_rendus_concurrents_sans_etat_partage():
+    """Deux rendus simultanés conservent chacun leurs propres données"""
+    annexe = EngagementLetterGenerator.STATIC_ANNEX_ACTIONS
+    donnees = [
+        {"programme_intitule": "PROGRAMME ALPHA", "annexe_actions": annexe},
+        {"programme_intitule": "PROGRAMME BETA", "annexe_actions": annexe},
+    ]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pdfs = list(executor.map(lambda d: EngagementLetterGenerator(d).render().getvalue(), donnees))
+
+    assert "ALPHA" in _texte_couverture(pdfs[0]) and "BETA" not in _texte_couverture(pdfs[0])
+    assert "BETA" in _texte_couverture(pdfs[1]) and "ALPHA" not in _texte_couverture(pdfs[1])
+    assert "data" not in vars(EngagementLetterGenerator)
+
+
+@pytest.fixture
+def fiches_2025(session: Session):
+    """Deux fiches techniques 2025 (avec et sans BOP) et une fiche 2024"""
+    programme = Programme(code="P01", libelle="Administration Générale")
+    session.add(programme)
+    session.commit()
+    direction = Direction(code="DAAF", libelle="Affaires Administratives et Financières", programme_id=programme.id)
+    session.add(direction)
+    session.commit()
+    for numero, direction_id in (("FT-2025-P01-001", direction.id), ("FT-2025-P01-002", None)):
+        session.add(
+            FicheTechnique(numero_fiche=numero, annee_budget=2025, programme_id=programme.id, direction_id=direction_id)
+        )
+    session.add(FicheTechnique(numero_fiche="FT-2024-P01-001", annee_budget=2024, programme_id=programme.id))
+    session.commit()
+
+
+@pytest.mark.unit
+def test_lot_annuel_rendu_en_parallele(session: Session, fiches_2025, monkeypatch):
+    """Une lettre par fiche technique de l'année, rendues dans le pool et regroupées en ZIP"""
+    monkeypatch.setattr(settings, "ENGAGEMENT_LETTERS_WORKERS", 2)
+    try:
+        archive = zipfile.ZipFile(
+            EngagementLetterBatchService.generer_zip(session, 2025, {"ville_signature": "Abidjan"})
+        )
+    finally:
+        arreter_pools()
+
+    assert sorted(archive.namelist()) == ["lettre_engagement_2025_P01.pdf", "lettre_engagement_2025_P01_DAAF.pdf"]
+    assert "ADMINISTRATION" in _texte_couverture(archive.read("lettre_engagement_2025_P01_DAAF.pdf"))
+
+    with pytest.raises(ValueError):
+        EngagementLetterBatchService.generer_zip(session, 2030)
+
+
+@pytest.mark.unit
+def test_pool_casse_par_un_processus_arrete(session: Session, fiches_2025, monkeypatch):
+    """Un processus du pool tué : le lot est rendu quand même et le pool est recréé ensuite"""
+    monkeypatch.setattr(settings, "ENGAGEMENT_LETTERS_WORKERS", 2)
+    try:
+        pool = obtenir_pool(engagement_letter_batch_service.POOL, 2)
+        assert isinstance(pool.submit(os._exit, 1).exception(timeout=60), BrokenProcessPool)
+
+        archive = zipfile.ZipFile(EngagementLetterBatchService.generer_zip(session, 2025))
+        assert len(archive.namelist()) == 2
+
+        nouveau = obtenir_pool(engagement_letter_batch_service.POOL, 2)
+        assert nouveau is not pool
+        assert nouveau.submit(len, "abc").result(timeout=60) == 3
+    finally:
+        arreter_pools()
@@ -0,0 +1,78 @@
+"""
+Tests unitaires pour le traitement vectorisé des fichiers Excel
+"""
+
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.core.enums import FileType
+from app.services.excel_processor import ExcelProcessorService
+
+
+def _ecrire(tmp_path, df: pd.DataFrame):
+    chemin = tmp_path / "donnees.xlsx"
+    df.to_excel(chemin, index=False, engine="openpyxl")
+    return str(chemin)
+
+
+@pytest.fixture
+def fichier_budget(tmp_path):
+    return _ecrire(
+        tmp_path,
+        pd.DataFrame(
+            {
+                "Ligne budgétaire": ["601 - Fournitures", None, "602 - Carburant", "603 - Entretien"],
+                "Montant prévu": [1000, 50, "abc", 300.5],
+                "Montant réalisé": [800, None, 10, None],
+                "Écart": [200, None, None, None],
+                "Commentaire": ["ok", None, None, None],
+            }
+        ),
+    )
+
+
+@pytest.mark.unit
+def test_budget_colonnes_nettoyees_et_lignes_rejetees(fichier_budget):
+    """Les montants sont convertis, les lignes sans libellé ou avec montant invalide sont rejetées"""
+    success, rows_processed, rows_failed, error, data = ExcelProcessorService.process_file(
+        fichier_budget, FileType.BUDGET, {"period": "2024", "program": "P1"}
+    )
+
+    assert success and error is None
+    assert (rows_processed, rows_failed) == (2, 2)
+    assert [r["row_index"] for r in data] == [0, 3]
+    assert data[0]["ligne_budgetaire"] == "601 - Fournitures"
+    assert data[0]["montant_realise"] == 800.0
+    assert data[1]["montant_realise"] == 0.0
+    assert data[1]["commentaire"] == ""
+    assert data[1]["period"] == "2024" and data[1]["program"] == "P1"
+
+
+@pytest.mark.unit
+def test_lecture_par_blocs_identique_a_la_lecture_complete(fichier_budget, monkeypatch):
+    """Au-delà du seuil, la lecture en flux par blocs produit les mêmes enregistrements"""
+    complet = ExcelProcessorService.process_file(fichier_budget, FileType.BUDGET, {})
+
+    monkeypatch.setattr(settings, "EXCEL_SEUIL_LECTURE_PAR_BLOCS_MB", 0)
+    monkeypatch.setattr(settings, "EXCEL_LIGNES_PAR_BLOC", 1)
+    par_blocs = ExcelProcessorService.process_file(fichier_budget, FileType.BUDGET, {})
+
+    def sans_horodatage(resultat):
+        return [{k: v for k, v in r.items() if k != "processed_at"} for r in resultat[4]]
+
+    assert par_blocs[1:4] == complet[1:4]
+    assert sans_horodatage(par_blocs) == sans_horodatage(complet)
+
+
+@pytest.mark.unit
+def test_type_generique_conserve_les_lignes(tmp_path):
+    """Les types sans spécification conservent chaque ligne dans "data" """
+    chemin = _ecrire(tmp_path, pd.DataFrame({"Indicateur": ["Taux", "Délai"], "Valeur": [0.8, 12]}))
+
+    success, rows_processed, rows_failed, _, data = ExcelProcessorService.process_file(
+        chemin, FileType.INDICATEURS_PERFORMANCE, {}
+    )
+
+    assert success and (rows_processed, rows_failed) == (2, 0)
+    assert data[1]["data"] == {"Indicateur": "Délai", "Valeur": 12}
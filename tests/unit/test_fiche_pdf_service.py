@@ -0,0 +1,110 @@
+"""
+Tests unitaires pour l'extraction des fiches techniques PDF
+"""
+
+import multiprocessing
+import os
+import signal
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException
+from reportlab.pdfgen import canvas
+
+from app.core.config import settings
+from app.core.process_pool import arreter_pools, obtenir_pool
+from app.services import fiche_pdf_service
+from app.services.fiche_pdf_service import FichePdfService, _FichePdfParser
+
+
+def _generer_pdf(pages: list[list[str]]) -> bytes:
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer)
+    for lignes in pages:
+        y = 800
+        for ligne in lignes:
+            c.drawString(40, y, ligne)
+            y -= 20
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+def test_parser_reconnait_la_hierarchie():
+    """L'automate suit le contexte nature > action > service > activité > ligne"""
+    parser = _FichePdfParser()
+    parser.consommer(
+        [
+            "Biens et services",
+            "- Action : Coordination 1000 2000",
+            "Service Bénéficiaire : DAF",
+            "ACTIVITE : Formation",
+            "611000 Fournitures 500 600",
+            "texte libre ignoré",
+        ]
+    )
+
+    types = [e["type"] for e in parser.elements]
+    assert types == ["nature", "action", "service", "activite", "ligne"]
+    assert parser.elements[1]["libelle"].startswith("Coordination")
+    assert parser.elements[4]["activite"] == "Formation"
+    assert parser.elements[4]["nature"] == "BIENS ET SERVICES"
+
+
+@pytest.mark.unit
+def test_extraire_montants():
+    """Les montants sont lus dans l'ordre des colonnes de la fiche"""
+    montants = FichePdfService.extraire_montants("611000 Fournitures 1 500 2.000")
+    assert montants["budget_vote_n"] == Decimal("611000")
+
+
+@pytest.mark.unit
+def test_analyser_pdf_multi_lots(monkeypatch):
+    """L'extraction par lots conserve l'ordre des pages et expose les timings"""
+    monkeypatch.setattr(settings, "PDF_PAGES_PAR_LOT", 1)
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 1)
+    contenu = _generer_pdf([["PERSONNEL", "Action : A1"], ["Service Bénéficiaire : S1", "Activité : X"]])
+
+    resultat = FichePdfService.analyser_pdf(contenu)
+
+    assert resultat["nb_pages"] == 2
+    assert [p["page"] for p in resultat["pages"]] == [1, 2]
+    assert [e["type"] for e in resultat["elements"]] == ["nature", "action", "service", "activite"]
+
+
+@pytest.mark.unit
+def test_analyser_pdf_refuse_les_documents_trop_longs(monkeypatch):
+    """Le plafond de pages protège la mémoire du serveur"""
+    monkeypatch.setattr(settings, "PDF_MAX_PAGES", 1)
+    contenu = _generer_pdf([["PERSONNEL"], ["TRANSFERTS"]])
+
+    with pytest.raises(HTTPException) as exc:
+        FichePdfService.analyser_pdf(contenu)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.unit
+def test_processus_du_pool_tue_pendant_l_extraction(tmp_path, monkeypatch):
+    """Un processus du pool tué (OOM) : toutes les pages sont extraites et le pool est recréé"""
+    monkeypatch.setattr(settings, "PDF_PAGES_PAR_LOT", 1)
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 2)
+    chemin = tmp_path / "fiche.pdf"
+    chemin.write_bytes(_generer_pdf([[f"Page {numero}"] for numero in range(1, 7)]))
+
+    try:
+        pages = FichePdfService.extraire_pages(str(chemin), 6)
+        premiere = next(pages)
+        pool = obtenir_pool(fiche_pdf_service.POOL, 2)
+        for processus in multiprocessing.active_children():
+            os.kill(processus.pid, signal.SIGKILL)
+
+        numeros = [premiere[0]] + [numero for numero, _, _ in pages]
+        assert numeros == [1, 2, 3, 4, 5, 6]
+
+        nouveau = obtenir_pool(fiche_pdf_service.POOL, 2)
+        assert nouveau is not pool
+        assert [numero for numero, _, _ in FichePdfService.extraire_pages(str(chemin), 6)] == [1, 2, 3, 4, 5, 6]
+    finally:
+        arreter_pools()
@@ -0,0 +1,87 @@
+"""
+Tests unitaires pour l'import Excel des fiches techniques
+"""
+
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.models.budget import ActionBudgetaire, ActiviteBudgetaire, LigneBudgetaireDetail, ServiceBeneficiaire
+from app.models.personnel import Programme
+from app.models.user import User
+from app.services.fiche_technique_service import FicheTechniqueService
+
+LIGNES_TEMPLATE = [
+    ["BIENS ET SERVICES", None, None],
+    ["Action : 2208401 Pilotage", 1, 1],
+    ["Service Bénéficiaire : DAF", None, None],
+    ["Activité : 170 Coordination", 5, 5],
+    ["601100 Achats", 100, "1 000"],
+    ["601200 Fournitures", 50, 200],
+    ["Activité : 171 Sans ligne", 7, 7],
+    ["- Service Bénéficiaire : DR BOUAKE", None, None],
+    ["Activité : 172 Suivi", 3, 3],
+    ["601300 Carburant", 10, 10],
+    ["PERSONNEL", None, None],
+    ["Activité : orpheline", 1, 1],
+    ["602000 Ligne orpheline", 1, 1],
+]
+
+
+def _fichier_excel() -> bytes:
+    df = pd.DataFrame(LIGNES_TEMPLATE, columns=["CODE / LIBELLE", "BUDGET VOTE", "BUDGET SOUHAITE"])
+    df["ENVELOPPE"] = 0
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+def test_import_excel_hierarchie_et_totaux(session: Session):
+    """La hiérarchie est reconstruite et les totaux remontent des lignes vers les actions"""
+    user = User(email="fiche@example.com", full_name="Fiche", hashed_password="x")
+    programme = Programme(code="P01", libelle="Programme test")
+    session.add_all([user, programme])
+    session.commit()
+
+    inserts = []
+    engine = session.get_bind()
+
+    def compter(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", compter)
+    try:
+        resultat = FicheTechniqueService.analyser_fichier_excel(
+            _fichier_excel(), None, programme.id, 2026, session, user
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", compter)
+
+    # Fiche + un INSERT par niveau hiérarchique
+    assert len(inserts) == 5
+
+    assert resultat["actions_count"] == 1
+    assert resultat["services_count"] == 2
+    assert resultat["activites_count"] == 3
+    assert resultat["lignes_count"] == 3
+    assert resultat["budget_total"] == 1210.0
+    assert resultat["errors"] == ["Ligne 13: Activité sans service", "Ligne 14: Ligne sans activité"]
+
+    action = session.exec(select(ActionBudgetaire)).one()
+    assert action.libelle == "2208401 Pilotage"
+    assert action.nature_depense == "BIENS ET SERVICES"
+    assert float(action.budget_souhaite) == 1217
+
+    activites = {a.code: a for a in session.exec(select(ActiviteBudgetaire)).all()}
+    assert float(activites["ACTIV_001"].budget_vote_n) == 150
+    assert float(activites["ACTIV_002"].budget_vote_n) == 7
+
+    services = {s.id: s for s in session.exec(select(ServiceBeneficiaire)).all()}
+    ligne = session.exec(select(LigneBudgetaireDetail).where(LigneBudgetaireDetail.code == "LIGNE_00003")).one()
+    activite_parente = session.get(ActiviteBudgetaire, ligne.activite_id)
+    assert services[activite_parente.service_beneficiaire_id].libelle == "DR BOUAKE"
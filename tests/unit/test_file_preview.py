@@ -0,0 +1,72 @@
+"""
+Tests unitaires pour l'aperçu des fichiers Excel mis en cache par empreinte
+"""
+
+import pandas as pd
+import pytest
+from sqlmodel import Session
+
+from app.core.enums import FileType
+from app.core.path_config import path_config
+from app.models.file import File
+from app.services.excel_processor import ExcelProcessorService
+
+
+@pytest.fixture
+def classeur(tmp_path, monkeypatch):
+    monkeypatch.setattr(path_config, "UPLOADS_FILES_PREVIEWS_DIR", tmp_path / "previews")
+    chemin = tmp_path / "budget.xlsx"
+    pd.DataFrame(
+        {
+            "Ligne": [f"L{i}" for i in range(60)],
+            "Montant": [i + 0.5 for i in range(60)],
+            "Date": pd.date_range("2024-01-01", periods=60),
+        }
+    ).to_excel(chemin, index=False, engine="openpyxl")
+    return chemin
+
+
+@pytest.mark.unit
+def test_apercu_construit_une_fois_puis_lu_depuis_le_cache(classeur, monkeypatch):
+    """L'aperçu contient types et nombre de lignes, et n'est construit qu'une fois par empreinte"""
+    apercu = ExcelProcessorService.obtenir_apercu(str(classeur), "a" * 64)
+
+    assert apercu["columns"] == ["Ligne", "Montant", "Date"]
+    assert apercu["total_rows"] == 60
+    assert len(apercu["rows"]) == 50
+    assert apercu["column_types"]["Montant"] == "float64"
+    assert apercu["rows"][1]["Date"].startswith("2024-01-02")
+
+    def interdit(*args, **kwargs):
+        raise AssertionError("le classeur ne doit pas être relu")
+
+    monkeypatch.setattr(ExcelProcessorService, "construire_apercu", staticmethod(interdit))
+    assert ExcelProcessorService.obtenir_apercu(str(classeur), "a" * 64) == apercu
+
+
+@pytest.mark.unit
+def test_endpoint_apercu_etag(admin_client, session: Session, admin_user, classeur):
+    """L'endpoint renvoie un ETag et répond 304 si le client est à jour"""
+    db_file = File(
+        original_filename="budget.xlsx",
+        stored_filename="budget.xlsx",
+        file_path=str(classeur),
+        file_size=classeur.stat().st_size,
+        file_type=FileType.BUDGET.value,
+        program="P1",
+        period="2024",
+        title="Budget",
+        uploaded_by=admin_user.id,
+    )
+    session.add(db_file)
+    session.commit()
+    session.refresh(db_file)
+
+    reponse = admin_client.get(f"/api/v1/files/{db_file.id}/preview?nrows=5")
+    assert reponse.status_code == 200
+    assert reponse.json()["preview"]["preview_rows"] == 5
+    assert db_file.sha256 is not None
+
+    etag = reponse.headers["etag"]
+    reponse = admin_client.get(f"/api/v1/files/{db_file.id}/preview?nrows=5", headers={"If-None-Match": etag})
+    assert reponse.status_code == 304
@@ -0,0 +1,72 @@
+"""
+Tests unitaires pour les statistiques des fichiers (agrégats SQL)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session
+
+from app.core.enums import FileStatus, FileType
+from app.models.file import File
+from app.services.file_service import FileService
+
+
+@pytest.fixture(autouse=True)
+def cache_vide():
+    FileService.invalidate_statistics()
+    yield
+    FileService.invalidate_statistics()
+
+
+def _ajouter_fichiers(session: Session, nombre: int, status: str, program: str, debut: datetime):
+    for i in range(nombre):
+        session.add(
+            File(
+                original_filename=f"f{i}.xlsx",
+                stored_filename=f"f{i}.xlsx",
+                file_path=f"/tmp/f{i}.xlsx",
+                file_size=1024 * 1024,
+                file_type=FileType.BUDGET.value,
+                program=program,
+                period="2024",
+                title=f"Fichier {i}",
+                status=status,
+                uploaded_by=1,
+                created_at=debut + timedelta(minutes=i),
+            )
+        )
+    session.commit()
+
+
+@pytest.mark.unit
+def test_statistiques_agregees_sur_toute_la_table(session: Session):
+    """Les agrégats couvrent tous les fichiers, au-delà de l'ancienne limite de chargement"""
+    debut = datetime(2024, 1, 1)
+    _ajouter_fichiers(session, 8, FileStatus.PROCESSED.value, "P1", debut)
+    _ajouter_fichiers(session, 4, FileStatus.ERROR.value, "P2", debut + timedelta(days=1))
+
+    stats = FileService.get_statistics(session)
+
+    assert stats["total_files"] == 12
+    assert stats["files_by_status"][FileStatus.PROCESSED.value] == 8
+    assert stats["files_by_status"][FileStatus.ERROR.value] == 4
+    assert stats["files_by_status"][FileStatus.UPLOADED.value] == 0
+    assert stats["files_by_program"] == {"P1": 8, "P2": 4}
+    assert stats["total_size_mb"] == 12.0
+    assert len(stats["recent_uploads"]) == 10
+    assert stats["recent_uploads"][0]["program"] == "P2"
+    assert FileService.count_files(session, program="P2") == 4
+
+
+@pytest.mark.unit
+def test_statistiques_mises_en_cache_puis_invalidees(session: Session):
+    """Le résultat est servi depuis le cache jusqu'à une modification de fichier"""
+    _ajouter_fichiers(session, 1, FileStatus.UPLOADED.value, "P1", datetime(2024, 1, 1))
+    assert FileService.get_statistics(session)["total_files"] == 1
+
+    _ajouter_fichiers(session, 1, FileStatus.UPLOADED.value, "P1", datetime(2024, 1, 2))
+    assert FileService.get_statistics(session)["total_files"] == 1
+
+    FileService.update_file_status(session, 1, FileStatus.PROCESSED.value)
+    assert FileService.get_statistics(session)["total_files"] == 2
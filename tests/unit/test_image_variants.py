@@ -0,0 +1,83 @@
+"""
+Tests unitaires pour les variantes de taille fixe des images uploadées
+"""
+
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.core.path_config import path_config
+from app.services.image_variant_service import ImageVariantService
+from app.services.pdf_assets_service import PdfAssetsService
+from app.templates import get_logo_url, image_variant, profile_picture_url
+
+
+def _photo(chemin, taille=(2000, 1500)):
+    Image.new("RGB", taille, (30, 90, 160)).save(chemin, "JPEG", quality=95)
+    return chemin
+
+
+@pytest.mark.unit
+def test_variantes_photo_et_logo(tmp_path):
+    """Photos recadrées pour le web, réduites pour le PDF ; logo transparent conservé en PNG"""
+    photo = _photo(tmp_path / "profile_1.jpg")
+    variantes = ImageVariantService.generer(photo, "photo")
+
+    assert {nom: chemin.name for nom, chemin in variantes.items()} == {
+        "avatar": "profile_1.avatar.webp",
+        "navbar": "profile_1.navbar.webp",
+        "pdf": "profile_1.pdf.jpg",
+    }
+    with Image.open(variantes["avatar"]) as avatar, Image.open(variantes["pdf"]) as pdf:
+        assert (avatar.format, avatar.size) == ("WEBP", (256, 256))
+        assert (pdf.format, pdf.size) == ("JPEG", (600, 450))
+    assert variantes["navbar"].stat().st_size * 10 < photo.stat().st_size
+
+    logo = tmp_path / "logo.png"
+    Image.new("RGBA", (1200, 300), (255, 0, 0, 0)).save(logo)
+    variantes_logo = ImageVariantService.generer(logo, "logo")
+    with Image.open(variantes_logo["navbar"]) as navbar:
+        assert navbar.size == (288, 72)  # réduit sans recadrage
+    assert variantes_logo["pdf"].suffix == ".png"
+
+    ImageVariantService.supprimer(photo)
+    assert list(tmp_path.glob("profile_1*")) == []
+
+
+@pytest.mark.unit
+def test_templates_et_pdf_utilisent_les_variantes(tmp_path, monkeypatch):
+    """La variante est servie si elle existe, l'original sinon"""
+    monkeypatch.setattr(path_config, "UPLOADS_DIR", tmp_path)
+    (tmp_path / "profiles").mkdir()
+    photo = _photo(tmp_path / "profiles" / "profile_2.jpg")
+
+    assert profile_picture_url("profiles/profile_2.jpg").endswith("/uploads/profiles/profile_2.jpg")
+    assert PdfAssetsService.image_reader(photo).getSize() == (2000, 1500)
+
+    ImageVariantService.generer(photo)
+
+    assert profile_picture_url("profiles/profile_2.jpg").endswith("/uploads/profiles/profile_2.avatar.webp")
+    assert profile_picture_url("profiles/profile_2.jpg", variant="navbar").endswith("profile_2.navbar.webp")
+    assert profile_picture_url("profiles/profile_2.jpg", variant=None).endswith("profile_2.jpg")
+    assert image_variant("profiles/profile_2.jpg", "pdf", mount="uploads") == "profiles/profile_2.pdf.jpg"
+    assert PdfAssetsService.image_reader(photo).getSize() == (600, 450)
+    assert get_logo_url("navbar")  # sans variante de logo : URL d'origine, sans erreur
+
+
+@pytest.mark.unit
+def test_upload_photo_genere_les_variantes(admin_client, admin_user, tmp_path, monkeypatch):
+    """Les variantes sont générées en tâche de fond après la réponse de l'upload"""
+    monkeypatch.setattr(path_config, "UPLOADS_DIR", tmp_path)
+    contenu = BytesIO()
+    Image.new("RGB", (1600, 1200), (10, 200, 10)).save(contenu, "JPEG")
+
+    reponse = admin_client.post(
+        f"/api/v1/admin/users/{admin_user.id}/upload-photo",
+        files={"photo": ("portrait.jpg", contenu.getvalue(), "image/jpeg")},
+    )
+
+    assert reponse.status_code == 200, reponse.text
+    [original] = [chemin for chemin in (tmp_path / "profiles").glob("*.jpg") if ".pdf" not in chemin.name]
+    for variante in ("avatar", "navbar", "pdf"):
+        assert ImageVariantService.chemin_variante(original, variante) is not None
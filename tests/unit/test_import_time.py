@@ -0,0 +1,63 @@
+"""
+Budget d'import au démarrage d'un worker (python -X importtime)
+Les bibliothèques lourdes ne doivent être chargées qu'au premier usage
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core.lazy import LazyModule, lazy_import
+
+RACINE = Path(__file__).resolve().parents[2]
+
+# Chargées à la demande (imports Excel, exports, PDF) : jamais au démarrage
+MODULES_DIFFERES = ("pandas", "numpy", "openpyxl", "reportlab", "PIL", "pdfplumber")
+
+# Durée cumulée maximale de `import app.main` (secondes), ajustable sur une machine lente
+BUDGET_IMPORT_S = float(os.getenv("IMPORT_TIME_BUDGET_S", "6"))
+
+
+def _importtime(module: str) -> dict[str, int]:
+    """Durée cumulée (µs) de chaque module importé, relevée par -X importtime"""
+    resultat = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=RACINE,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    durees = {}
+    for ligne in resultat.stderr.splitlines():
+        if not ligne.startswith("import time:") or "[us]" in ligne:
+            continue
+        _, cumul, nom = ligne.removeprefix("import time:").split("|")
+        durees[nom.strip()] = int(cumul)
+    return durees
+
+
+@pytest.mark.unit
+def test_budget_import_app_main():
+    """Démarrage d'un worker : aucune bibliothèque lourde, durée totale sous le budget"""
+    durees = _importtime("app.main")
+
+    charges = sorted({nom.split(".")[0] for nom in durees} & set(MODULES_DIFFERES))
+    assert charges == [], f"Bibliothèques lourdes importées au démarrage: {charges}"
+    assert durees["app.main"] / 1_000_000 < BUDGET_IMPORT_S
+
+
+@pytest.mark.unit
+def test_lazy_import(monkeypatch):
+    """Le module n'est importé qu'au premier accès à un attribut"""
+    monkeypatch.delitem(sys.modules, "tabnanny", raising=False)
+
+    module = lazy_import("tabnanny")
+
+    assert isinstance(module, LazyModule)
+    assert "tabnanny" not in sys.modules
+    assert callable(module.check)
+    assert "tabnanny" in sys.modules
+    assert lazy_import("tabnanny") is sys.modules["tabnanny"]
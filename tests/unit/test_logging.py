@@ -0,0 +1,87 @@
+"""
+Tests unitaires pour la journalisation en file d'attente et l'échantillonnage des logs d'accès
+"""
+
+import logging
+import logging.handlers
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core import logging_config
+from app.core.config import settings
+from app.core.middleware import RequestPipelineMiddleware, setup_middlewares
+
+
+@pytest.mark.unit
+def test_loggers_alimentent_des_files_d_attente():
+    """Les loggers de l'application n'écrivent jamais directement: QueueHandler + QueueListener"""
+    import app.main  # noqa: F401 - configure la journalisation
+
+    for nom in ("mppeep", "mppeep.access", "uvicorn.access"):
+        handlers = logging.getLogger(nom).handlers  # pytest y ajoute ses propres handlers de capture
+        assert any(isinstance(h, logging.handlers.QueueHandler) for h in handlers)
+        assert not any(
+            isinstance(h, logging.handlers.BaseRotatingHandler) or type(h) is logging.StreamHandler for h in handlers
+        )
+    assert logging_config._listeners
+    assert all(listener._thread is not None for listener in logging_config._listeners)
+
+
+@pytest.mark.unit
+def test_ecriture_et_niveaux_dans_le_thread_d_ecriture(tmp_path):
+    """Le QueueListener respecte le niveau de chaque handler (error.log: WARNING et plus)"""
+    formatter = logging.Formatter("%(levelname)s | %(message)s")
+    app_file = logging_config._rotating_file_handler(tmp_path / "app.log", "INFO", formatter)
+    error_file = logging_config._rotating_file_handler(tmp_path / "error.log", "WARNING", formatter)
+
+    handler = logging_config._queued(app_file, error_file)
+    listener = logging_config._listeners.pop()
+    logger = logging.getLogger("tests.file_attente")
+    logger.handlers, logger.propagate = [handler], False
+    logger.setLevel(logging.INFO)
+    try:
+        logger.info("import de %d lignes", 100)
+        logger.warning("ligne invalide")
+    finally:
+        listener.stop()
+        app_file.close()
+        error_file.close()
+        logger.handlers = []
+
+    assert (tmp_path / "app.log").read_text().splitlines() == [
+        "INFO | import de 100 lignes",
+        "WARNING | ligne invalide",
+    ]
+    assert (tmp_path / "error.log").read_text().splitlines() == ["WARNING | ligne invalide"]
+
+
+@pytest.mark.unit
+def test_echantillonnage_des_logs_d_acces(monkeypatch):
+    """Une route échantillonnée à 0 n'est plus journalisée, sauf en cas d'erreur"""
+    app = FastAPI()
+
+    @app.get("/api/sonde")
+    def sonde(echec: bool = False):
+        if echec:
+            raise HTTPException(status_code=503)
+        return {"ok": True}
+
+    @app.get("/api/autre")
+    def autre():
+        return {"ok": True}
+
+    setup_middlewares(app, settings.model_copy(update={"LOG_ACCESS_SAMPLING": {"/api/sonde": 0.0}}))
+    journalisees = []
+    monkeypatch.setattr(
+        RequestPipelineMiddleware, "_log_request", staticmethod(lambda scope, *args: journalisees.append(scope["path"]))
+    )
+    client = TestClient(app)
+
+    for _ in range(5):
+        client.get("/api/sonde")
+    client.get("/api/sonde", params={"echec": True})
+    client.get("/api/autre")
+
+    assert journalisees == ["/api/sonde", "/api/autre"]
@@ -0,0 +1,113 @@
+"""
+Tests unitaires pour les métriques Prometheus
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.metrics import Compteur, Histogramme, Jauge, MetriquesPartagees, RegistreMetriques
+
+
+@pytest.mark.unit
+def test_format_texte_prometheus():
+    """Compteurs étiquetés et histogrammes cumulatifs au format d'exposition texte"""
+    registre = RegistreMetriques()
+    compteur = registre.enregistrer(Compteur("demo_total", "Démo", ("route",)))
+    histogramme = registre.enregistrer(Histogramme("demo_seconds", "Durées", seuils=(0.1, 1.0)))
+
+    compteur.inc(route='/a"b')
+    compteur.inc(2, route='/a"b')
+    for duree in (0.05, 0.5, 3.0):
+        histogramme.observe(duree)
+
+    texte = registre.exposer()
+    assert "# TYPE demo_total counter" in texte
+    assert 'demo_total{route="/a\\"b"} 3' in texte
+    assert 'demo_seconds_bucket{le="0.1"} 1' in texte
+    assert 'demo_seconds_bucket{le="1"} 2' in texte
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in texte
+    assert "demo_seconds_count 3" in texte
+    assert "demo_seconds_sum 3.55" in texte
+
+
+@pytest.mark.unit
+def test_endpoint_metrics_par_modele_de_route(client, monkeypatch, tmp_path):
+    """Les requêtes sont comptées par modèle de route, les pools sont relevés à la lecture"""
+    monkeypatch.setattr(settings, "METRICS_DIR", str(tmp_path))
+    avant = metrics.http_requetes.valeur(method="GET", route="/api/v1/ping", status="200")
+    client.get("/api/v1/ping")
+    client.get("/api/v1/ping")
+
+    reponse = client.get("/api/v1/metrics")
+
+    assert reponse.status_code == 200
+    assert reponse.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert metrics.http_requetes.valeur(method="GET", route="/api/v1/ping", status="200") == avant + 2
+    texte = reponse.text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/ping",le="+Inf"}' in texte
+    worker = f'{{worker="{os.getpid()}"}}'
+    assert f"http_requests_in_flight{worker} 1" in texte  # la requête /metrics elle-même
+    assert f"db_pool_checked_out{worker} " in texte
+    assert f"threadpool_max_threads{worker} 40" in texte
+
+
+@pytest.mark.unit
+def test_endpoint_metrics_protege_par_jeton(client, monkeypatch):
+    """Avec METRICS_TOKEN, le jeton Bearer est exigé"""
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+
+    assert client.get("/api/v1/metrics").status_code == 401
+    reponse = client.get("/api/v1/metrics", headers={"Authorization": "Bearer secret"})
+    assert reponse.status_code == 200
+
+
+@pytest.mark.unit
+def test_mesure_des_taches_et_imports():
+    """Durée des tâches (échecs comptés) et débit des imports"""
+    avant = metrics.taches_duree.nombre(job="test")
+    with pytest.raises(RuntimeError), metrics.mesurer_tache("test"):
+        raise RuntimeError("échec")
+    assert metrics.taches_duree.nombre(job="test") == avant + 1
+    assert metrics.taches_echecs.valeur(job="test") >= 1
+
+    metrics.enregistrer_import("test", 500, 2.0)
+    assert metrics.imports_debit.valeur(source="test") == 250
+
+
+@pytest.mark.unit
+def test_agregation_entre_workers(monkeypatch, tmp_path):
+    """Compteurs et histogrammes additionnés sur tous les workers, jauges par worker vivant"""
+    monkeypatch.setattr(settings, "METRICS_DIR", str(tmp_path))
+    registre = RegistreMetriques()
+    compteur = registre.enregistrer(Compteur("demo_total", "Démo", ("job",)))
+    histogramme = registre.enregistrer(Histogramme("demo_seconds", "Durées", seuils=(1.0,)))
+    jauge = registre.enregistrer(Jauge("demo_en_cours", "En cours"))
+    partage = MetriquesPartagees(registre)
+    compteur.inc(job="a")
+    histogramme.observe(0.5)
+    jauge.set(1)
+
+    # Worker leader (seul à exécuter les tâches) et worker arrêté dont le fichier n'est plus rafraîchi
+    autre = {"demo_total": [[["a"], 2], [["purge"], 1]], "demo_seconds": [[[], [[0, 1], 2.0]]], "demo_en_cours": [[[], 3]]}
+    partage.dossier.mkdir(parents=True)
+    (partage.dossier / "101.json").write_text(json.dumps(autre), encoding="utf-8")
+    arrete = partage.dossier / "102.json"
+    arrete.write_text(json.dumps({"demo_total": [[["a"], 4]], "demo_en_cours": [[[], 7]]}), encoding="utf-8")
+    os.utime(arrete, (time.time() - 3600, time.time() - 3600))
+
+    texte = partage.exposer()
+
+    assert 'demo_total{job="a"} 7' in texte
+    assert 'demo_total{job="purge"} 1' in texte  # métrique propre au leader, quel que soit le worker qui répond
+    assert 'demo_seconds_bucket{le="1"} 1' in texte
+    assert 'demo_seconds_bucket{le="+Inf"} 2' in texte
+    assert "demo_seconds_sum 2.5" in texte
+    assert f'demo_en_cours{{worker="{os.getpid()}"}} 1' in texte
+    assert 'demo_en_cours{worker="101"} 3' in texte
+    assert 'worker="102"' not in texte
+    assert (partage.dossier / f"{os.getpid()}.json").exists()
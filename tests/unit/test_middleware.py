@@ -0,0 +1,96 @@
+"""
+Tests unitaires pour le pipeline de middlewares
+"""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.middleware import CSP_POLICY, RequestPipelineMiddleware, setup_middlewares
+
+
+@pytest.fixture
+def client_production():
+    """Application minimale configurée comme en production (tous les middlewares actifs)"""
+    app = FastAPI()
+
+    @app.get("/api/etat")
+    def etat(request: Request):
+        return {"request_id": request.state.request_id, "cf_ray": request.state.cf_ray, "scheme": request.url.scheme}
+
+    @app.get("/mppeep/static/app.css")  # préfixe ROOT_PATH de production
+    @app.get("/mppeep/static/app.0123456789ab.css")  # nom à empreinte (scripts/build_static.py)
+    def css():
+        return PlainTextResponse("body {}", headers={"Cache-Control": "no-cache"})
+
+    @app.get("/api/flux")
+    def flux():
+        return StreamingResponse((f"{i}\n" for i in range(3)), media_type="text/plain")
+
+    @app.get("/api/erreur")
+    def erreur():
+        raise RuntimeError("panne")
+
+    config = settings.model_copy(
+        update={
+            "DEBUG": False,
+            "ENV": "production",
+            "ALLOWED_HOSTS": ["*"],
+            "ENABLE_HTTPS_REDIRECT": False,
+            "ENABLE_CLOUDFLARE": True,
+            "ENABLE_FORWARD_PROTO": True,
+            "ENABLE_USER_AGENT_FILTER": True,
+        }
+    )
+    setup_middlewares(app, config)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.unit
+def test_une_seule_couche_pour_le_pipeline(client_production):
+    """Seuls les middlewares ASGI de Starlette et le pipeline sont installés"""
+    classes = [m.cls.__name__ for m in client_production.app.user_middleware]
+    assert classes[0] == RequestPipelineMiddleware.__name__
+    assert not any(nom.endswith("HTTPMiddleware") for nom in classes)
+
+
+@pytest.mark.unit
+def test_etat_et_en_tetes_de_reponse(client_production):
+    """request.state est alimenté, les en-têtes précalculés sont posés (et remplacent ceux de l'app)"""
+    reponse = client_production.get("/api/etat", headers={"CF-Ray": "abc-CDG", "X-Forwarded-Proto": "http"})
+
+    assert reponse.json() == {"request_id": reponse.headers["X-Request-ID"], "cf_ray": "abc-CDG", "scheme": "http"}
+    assert reponse.headers["Content-Security-Policy"] == CSP_POLICY
+    assert reponse.headers["X-Frame-Options"] == "DENY"
+    assert "max-age=31536000" in reponse.headers["Strict-Transport-Security"]
+    assert reponse.headers["Cache-Control"].startswith("no-cache, no-store")
+
+    statique = client_production.get("/mppeep/static/app.css")
+    assert statique.headers.get_list("Cache-Control") == ["public, max-age=31536000"]
+    empreinte = client_production.get("/mppeep/static/app.0123456789ab.css")
+    assert empreinte.headers.get_list("Cache-Control") == ["public, max-age=31536000, immutable"]
+
+
+@pytest.mark.unit
+def test_reponse_en_flux_transmise(client_production):
+    """Le corps d'une réponse en flux est transmis tel quel, avec les en-têtes du pipeline"""
+    reponse = client_production.get("/api/flux")
+    assert reponse.text == "0\n1\n2\n"
+    assert "X-Request-ID" in reponse.headers
+
+
+@pytest.mark.unit
+def test_filtres_et_erreurs(client_production):
+    """Robots et requêtes trop volumineuses refusés, erreurs non gérées converties en JSON 500"""
+    robot = client_production.get("/api/etat", headers={"User-Agent": "Googlebot/2.1"})
+    assert robot.status_code == 403
+    assert "Content-Security-Policy" in robot.headers
+
+    volumineuse = client_production.post("/api/etat", headers={"Content-Length": str(20 * 1024 * 1024)})
+    assert volumineuse.status_code == 413
+
+    erreur = client_production.get("/api/erreur")
+    assert erreur.status_code == 500
+    assert erreur.json() == {"detail": "Erreur interne du serveur", "request_id": erreur.headers["X-Request-ID"]}
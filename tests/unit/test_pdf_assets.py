@@ -0,0 +1,87 @@
+"""
+Tests unitaires pour le cache des ressources de rendu PDF
+"""
+
+import os
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.services.pdf_assets_service import PdfAssetsService
+
+
+@pytest.fixture(autouse=True)
+def caches_vides():
+    PdfAssetsService.vider()
+    yield
+    PdfAssetsService.vider()
+
+
+@pytest.mark.unit
+def test_image_decodee_une_fois_par_version_du_fichier(tmp_path):
+    """Le même fichier renvoie le même lecteur, un fichier modifié est relu"""
+    chemin = tmp_path / "logo.png"
+    Image.new("RGB", (4, 4), "green").save(chemin)
+
+    lecteur = PdfAssetsService.image_reader(chemin)
+    assert lecteur is PdfAssetsService.image_reader(str(chemin))
+    assert lecteur.getSize() == (4, 4)
+
+    Image.new("RGB", (8, 8), "red").save(chemin)
+    os.utime(chemin, ns=(0, os.stat(chemin).st_mtime_ns + 1_000_000))
+    assert PdfAssetsService.image_reader(chemin).getSize() == (8, 8)
+    assert PdfAssetsService.image_reader(tmp_path / "absent.png") is None
+
+
+@pytest.mark.unit
+def test_fond_calcule_une_fois_et_partage_par_les_pages():
+    """La géométrie est calculée une fois par clé et dessinée via un seul Form XObject par document"""
+    appels = []
+
+    def dessin(pdf):
+        appels.append(1)
+        pdf.saveState()  # volontairement non refermé: le fond doit rester équilibré
+        chemin = pdf.beginPath()
+        chemin.moveTo(0, 0)
+        chemin.lineTo(100, 100)
+        chemin.lineTo(0, 100)
+        chemin.close()
+        pdf.drawPath(chemin, stroke=0, fill=1)
+
+    for _ in range(2):
+        buffer = BytesIO()
+        pdf = canvas.Canvas(buffer, pagesize=A4)
+        for _ in range(3):
+            PdfAssetsService.dessiner_fond(pdf, ("test", *A4), dessin)
+            pdf.showPage()
+        pdf.save()
+        assert buffer.getvalue().count(b"/Subtype /Form") == 1
+
+    assert len(appels) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(("nom", "format_pil"), [("logo.png", "PNG"), ("photo.jpg", "JPEG")])
+def test_flowable_reutilise_l_image_decodee(tmp_path, monkeypatch, nom, format_pil):
+    """Le flowable Platypus dessine le lecteur du cache sans relire ni redécoder le fichier"""
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import SimpleDocTemplate
+
+    chemin = tmp_path / nom
+    Image.new("RGB", (40, 20), "blue").save(chemin, format_pil)
+    PdfAssetsService.image_reader(chemin)
+
+    decodages = []
+    lire = ImageReader._read_image
+    monkeypatch.setattr(ImageReader, "_read_image", lambda self, fp: decodages.append(1) or lire(self, fp))
+
+    flowable = PdfAssetsService.image_flowable(chemin, width=80, height=40)
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer).build([flowable])
+
+    assert (flowable.drawWidth, flowable.imageWidth) == (80, 40)
+    assert decodages == []
+    assert buffer.getvalue().startswith(b"%PDF")
@@ -0,0 +1,78 @@
+"""
+Tests unitaires pour l'instrumentation des requêtes SQL
+"""
+
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+from app.db.query_stats import suivre_requetes
+from app.models.personnel import AgentComplet, Direction
+from app.models.user import User
+
+
+@pytest.fixture
+def directions(session: Session):
+    """Six directions avec chacune son directeur: la liste charge les directeurs un par un"""
+    for i in range(6):
+        agent = AgentComplet(matricule=f"D{i}", nom=f"NOM{i}", prenom="Directeur")
+        session.add(agent)
+        session.flush()
+        session.add(Direction(code=f"D{i:02d}", libelle=f"Direction {i}", directeur_id=agent.id))
+    session.commit()
+    session.expunge_all()
+
+
+@pytest.mark.unit
+def test_requetes_comptees_et_repetitions_detectees(session: Session, admin_user):
+    """Le contexte compte les requêtes et regroupe les requêtes identiques"""
+    session.expunge_all()
+    with suivre_requetes() as stats:
+        for _ in range(5):
+            session.exec(select(User).where(User.id == admin_user.id)).one()
+        session.exec(select(Direction)).all()
+
+    assert stats.total == 6
+    assert stats.duree > 0
+    [(sql, nombre)] = stats.repetitions(seuil=5)
+    assert nombre == 5 and sql.startswith("SELECT") and "FROM user" in sql
+
+    session.exec(select(User)).all()
+    assert stats.total == 6  # hors contexte: plus de comptage
+
+
+@pytest.mark.unit
+def test_entete_et_detection_n_plus_un(client, directions, caplog):
+    """La réponse porte le nombre de requêtes (DEBUG) et la boucle de chargement est signalée"""
+    with caplog.at_level(logging.WARNING, logger="mppeep.middleware"):
+        reponse = client.get("/api/v1/referentiels/api/directions")
+
+    assert reponse.status_code == 200
+    assert int(reponse.headers["X-DB-Queries"]) >= 8
+    assert reponse.headers["X-DB-Time"].endswith("ms")
+    assert any("N+1 probable" in r.message and "agent_complet" in r.message for r in caplog.records)
+
+
+@pytest.mark.unit
+def test_budget_de_requetes(client, directions, query_budget):
+    """Le fixture query_budget échoue quand un endpoint dépasse son budget"""
+    with query_budget(10) as stats:
+        client.get("/api/v1/referentiels/api/directions")
+    assert stats.total >= 8
+
+    with pytest.raises(AssertionError, match="Budget de 2 requêtes dépassé"), query_budget(2):
+        client.get("/api/v1/referentiels/api/directions")
+
+
+@pytest.mark.unit
+def test_requete_en_echec_ne_laisse_pas_d_heure_de_debut(session: Session):
+    """Les heures de début des requêtes en erreur ne s'accumulent pas sur la connexion du pool"""
+    connexion = session.connection()
+    for _ in range(3):
+        with pytest.raises(OperationalError):
+            connexion.execute(text("SELECT * FROM table_inexistante"))
+
+    assert connexion.info.get("debuts_requetes") == []
@@ -0,0 +1,47 @@
+"""
+Tests unitaires pour le stockage des rapports de performance générés
+"""
+
+from datetime import date, datetime
+
+import pytest
+from sqlmodel import Session
+
+from app.core.path_config import path_config
+from app.models.performance import ObjectifPerformance
+from app.services.performance_service import PerformanceService
+from app.services.report_generator import ReportGenerator
+
+
+@pytest.fixture
+def dossier_rapports(tmp_path, monkeypatch):
+    monkeypatch.setattr(path_config, "UPLOADS_REPORTS_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.unit
+def test_rapport_stocke_puis_reutilise(session: Session, dossier_rapports, monkeypatch):
+    """Une seconde demande identique réutilise l'artefact; une modification des données produit une nouvelle clé"""
+    debut, fin = date(2025, 1, 1), date(2025, 3, 31)
+    chemin, cle, dates = ReportGenerator.obtenir_rapport_pdf(session, "GLOBAL", "CUSTOM", debut, fin)
+
+    assert chemin == dossier_rapports / f"{cle}.pdf"
+    assert chemin.read_bytes().startswith(b"%PDF")
+    assert dates == {"debut": debut, "fin": fin}
+    assert PerformanceService.count_objectifs(session) == 3
+    assert PerformanceService.count_indicateurs(session) == 3
+
+    def interdit(*args, **kwargs):
+        raise AssertionError("le PDF ne doit pas être régénéré")
+
+    monkeypatch.setattr(ReportGenerator, "generate_pdf_report", staticmethod(interdit))
+    assert ReportGenerator.obtenir_rapport_pdf(session, "GLOBAL", "CUSTOM", debut, fin)[1] == cle
+
+    objectif = session.get(ObjectifPerformance, 1)
+    objectif.progression_pourcentage = 90
+    objectif.updated_at = datetime(2030, 1, 1)
+    session.add(objectif)
+    session.commit()
+
+    assert ReportGenerator.cle_rapport(session, "GLOBAL", "CUSTOM", dates) != cle
+    assert ReportGenerator.cle_rapport(session, "SYNTHESE", "CUSTOM", dates) != cle
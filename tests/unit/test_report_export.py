@@ -0,0 +1,74 @@
+"""
+Tests unitaires pour les exports Excel/CSV des rapports de performance
+"""
+
+import io
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+from sqlmodel import Session, select
+
+from app.models.performance import RapportPerformance
+from app.services.report_generator import ReportGenerator
+
+URL = "/api/v1/performance/api/rapports/generate"
+PERIODE_2025 = {"period": "CUSTOM", "date_debut": "2025-01-01", "date_fin": "2025-12-31"}
+
+
+@pytest.fixture
+def donnees(session: Session):
+    ReportGenerator._generate_sample_data(session)
+
+
+@pytest.mark.unit
+def test_export_csv_objectifs_en_flux(admin_client, session: Session, donnees):
+    """Un seul jeu de données: CSV (séparateur ';') avec les valeurs des énumérations"""
+    reponse = admin_client.post(URL, data={"report_type": "OBJECTIFS", "format": "CSV", **PERIODE_2025})
+
+    assert reponse.status_code == 200
+    assert reponse.headers["content-type"].startswith("text/csv")
+    lignes = reponse.content.decode("utf-8-sig").splitlines()
+    assert lignes[0].startswith("ID;Titre;Type;Priorité")
+    assert len(lignes) == 4
+    assert ";EN_COURS;" in lignes[1]
+
+    rapport = session.exec(select(RapportPerformance)).one()
+    assert rapport.format_fichier == "CSV" and rapport.fichier_nom.endswith(".csv")
+    assert rapport.fichier_taille is None  # flux : taille inconnue à l'envoi
+
+
+@pytest.mark.unit
+def test_export_excel_global_une_feuille_par_jeu(admin_client, session: Session, donnees):
+    """Rapport global: une feuille par jeu, filtrée sur la période pour les objectifs"""
+    reponse = admin_client.post(URL, data={"report_type": "GLOBAL", "format": "EXCEL", **PERIODE_2025})
+
+    assert reponse.status_code == 200
+    assert session.exec(select(RapportPerformance)).one().fichier_taille == len(reponse.content)
+    classeur = load_workbook(io.BytesIO(reponse.content), read_only=True)
+    assert classeur.sheetnames == ["Objectifs", "Indicateurs", "Évaluations"]
+    assert len(list(classeur["Objectifs"].iter_rows())) == 4
+    assert len(list(classeur["Indicateurs"].iter_rows())) == 4
+
+    reponse = admin_client.post(
+        URL,
+        data={
+            "report_type": "OBJECTIFS",
+            "format": "EXCEL",
+            "period": "CUSTOM",
+            "date_debut": "2020-01-01",
+            "date_fin": "2020-12-31",
+        },
+    )
+    classeur = load_workbook(io.BytesIO(reponse.content), read_only=True)
+    assert len(list(classeur["Objectifs"].iter_rows())) == 1
+
+
+@pytest.mark.unit
+def test_export_csv_global_en_archive(admin_client, donnees):
+    """Plusieurs jeux au format CSV: archive ZIP d'un CSV par jeu"""
+    reponse = admin_client.post(URL, data={"report_type": "GLOBAL", "format": "CSV", **PERIODE_2025})
+
+    assert reponse.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(reponse.content))
+    assert archive.namelist() == ["objectifs.csv", "indicateurs.csv", "evaluations.csv"]
@@ -0,0 +1,106 @@
+"""
+Tests unitaires pour les purges de rétention par lots
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, func, select, update
+
+from app.core.enums import FileStatus
+from app.models.activity import Activity
+from app.models.file import File
+from app.models.session import UserSession
+from app.services.retention_service import RetentionService
+
+MAINTENANT = datetime.now()
+
+
+def _session_utilisateur(expire_il_y_a: timedelta, actif: bool = True, inactive_depuis: timedelta = timedelta()):
+    return UserSession(
+        session_token=UserSession.generate_token(),
+        user_id=1,
+        expires_at=MAINTENANT - expire_il_y_a,
+        last_activity=MAINTENANT - inactive_depuis,
+        is_active=actif,
+    )
+
+
+@pytest.mark.unit
+def test_expiration_des_sessions_par_tranches(session: Session, query_budget):
+    """Les sessions expirées sont désactivées par UPDATE, tranche par tranche, sans les charger"""
+    session.add_all([_session_utilisateur(timedelta(hours=1)) for _ in range(5)])
+    session.add(_session_utilisateur(-timedelta(hours=1)))  # encore valide
+    session.commit()
+
+    # 3 tranches de 2 lignes : une lecture de borne + un UPDATE par tranche
+    with query_budget(6):
+        total, _ = RetentionService.par_tranches(
+            session,
+            UserSession,
+            [UserSession.is_active, UserSession.expires_at < datetime.now()],
+            update(UserSession).values(is_active=False),
+            taille_lot=2,
+        )
+
+    assert total == 5
+    actives = session.exec(select(func.count()).select_from(UserSession).where(UserSession.is_active)).one()
+    assert actives == 1
+    assert RetentionService.expirer_sessions(session) == 0
+
+
+@pytest.mark.unit
+def test_purge_des_sessions_inactives(session: Session):
+    """Seules les sessions fermées ou expirées et inactives depuis longtemps sont supprimées"""
+    session.add_all(
+        [
+            _session_utilisateur(timedelta(days=100), inactive_depuis=timedelta(days=100)),
+            _session_utilisateur(-timedelta(days=1), actif=False, inactive_depuis=timedelta(days=120)),
+            _session_utilisateur(timedelta(days=1), inactive_depuis=timedelta(days=2)),  # expirée récemment
+            _session_utilisateur(-timedelta(days=1), inactive_depuis=timedelta(days=200)),  # encore valide
+        ]
+    )
+    session.commit()
+
+    assert RetentionService.purger_sessions_inactives(session, jours=90) == 2
+    assert session.exec(select(func.count()).select_from(UserSession)).one() == 2
+
+
+@pytest.mark.unit
+def test_purge_des_fichiers_en_erreur_et_des_activites(session: Session, tmp_path):
+    """Lignes supprimées par DELETE ... RETURNING, puis fichiers physiques"""
+    fichiers = []
+    for index, (statut, age) in enumerate([(FileStatus.ERROR, 10), (FileStatus.ERROR, 1), (FileStatus.PROCESSED, 30)]):
+        chemin = tmp_path / f"import_{index}.xlsx"
+        chemin.write_bytes(b"contenu")
+        fichiers.append(chemin)
+        session.add(
+            File(
+                original_filename=chemin.name,
+                stored_filename=chemin.name,
+                file_path=str(chemin),
+                file_size=7,
+                program="P1",
+                period="2025",
+                title="Import",
+                uploaded_by=1,
+                status=statut,
+                created_at=MAINTENANT - timedelta(days=age),
+            )
+        )
+    session.add(
+        Activity(
+            user_email="a@b.c",
+            action_type="login",
+            target_type="user",
+            description="Connexion",
+            created_at=MAINTENANT - timedelta(days=400),
+        )
+    )
+    session.commit()
+
+    assert RetentionService.purger_fichiers_en_erreur(session, jours=7) == 1
+    assert [chemin.exists() for chemin in fichiers] == [False, True, True]
+
+    assert RetentionService.purger_activites(session, jours=0) == 0  # conservation illimitée
+    assert RetentionService.purger_activites(session, jours=365) == 1
@@ -0,0 +1,96 @@
+"""
+Tests unitaires pour l'élection du worker leader du planificateur et l'historique des tâches
+"""
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, create_engine, select
+
+from app.core.scheduler import CoordinateurPlanificateur, executer_tache
+from app.db.verrous import VerrouConsultatif
+from app.models.scheduler_run import SchedulerRun
+
+RACINE = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def engine_fichier(tmp_path):
+    """Base SQLite sur fichier, partagée par plusieurs « workers »"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'workers.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_un_seul_leader_et_reprise(engine_fichier):
+    """Un seul coordinateur exécute les tâches ; à son arrêt, un autre prend le relais"""
+    worker_1 = CoordinateurPlanificateur(engine_fichier, intervalle=60)
+    worker_2 = CoordinateurPlanificateur(engine_fichier, intervalle=60)
+    try:
+        assert worker_1.election() is True
+        assert worker_2.election() is False
+        assert worker_2.scheduler is None
+        assert [job.id for job in worker_1.scheduler.get_jobs()] == ["daily_cleanup"]
+
+        worker_1.arreter()
+
+        assert worker_2.election() is True
+    finally:
+        worker_1.arreter()
+        worker_2.arreter()
+
+
+@pytest.mark.unit
+def test_verrou_libere_a_la_mort_du_processus(engine_fichier):
+    """Le verrou du leader disparaît avec son processus (worker tué)"""
+    script = textwrap.dedent(
+        f"""
+        import sys, time
+        from sqlmodel import create_engine
+        from app.db.verrous import VerrouConsultatif
+
+        verrou = VerrouConsultatif(create_engine({str(engine_fichier.url)!r}), "scheduler")
+        assert verrou.acquerir(bloquant=False)
+        print("leader", flush=True)
+        time.sleep(60)
+        """
+    )
+    leader = subprocess.Popen([sys.executable, "-c", script], cwd=RACINE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert leader.stdout.readline().strip() == "leader"
+        suiveur = VerrouConsultatif(engine_fichier, "scheduler")
+        assert suiveur.acquerir(bloquant=False) is False
+
+        leader.kill()
+        leader.wait()
+
+        assert suiveur.acquerir(bloquant=False) is True
+        suiveur.liberer()
+    finally:
+        leader.kill()
+        leader.stdout.close()
+
+
+@pytest.mark.unit
+def test_historique_des_executions(session: Session):
+    """Chaque passage est enregistré avec sa durée, son résultat ou son erreur"""
+    bind = session.get_bind()
+
+    assert executer_tache("purge_test", lambda: 7, bind=bind) == 7
+
+    def en_echec():
+        raise RuntimeError("disque plein")
+
+    with pytest.raises(RuntimeError):
+        executer_tache("purge_test", en_echec, bind=bind)
+
+    passages = session.exec(select(SchedulerRun).order_by(SchedulerRun.id)).all()
+    assert [(p.job_id, p.status, p.resultat, p.erreur) for p in passages] == [
+        ("purge_test", "succes", 7, None),
+        ("purge_test", "echec", None, "disque plein"),
+    ]
+    assert all(p.finished_at is not None and p.duration_ms >= 0 for p in passages)
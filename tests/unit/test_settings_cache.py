@@ -0,0 +1,114 @@
+"""
+Tests unitaires pour le cache versionné des paramètres système
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.core.settings_cache import CacheVersionne, settings_cache
+from app.models.config_version import ConfigVersion
+from app.services.system_settings_service import CLE_CACHE, SystemSettingsService
+
+
+@pytest.mark.unit
+def test_invalidation_vue_par_les_autres_workers(session):
+    """Une modification validée par un worker est rechargée une seule fois par l'autre"""
+    worker_a, worker_b = CacheVersionne(intervalle_verification=0), CacheVersionne(intervalle_verification=0)
+    chargements = []
+
+    def charger():
+        chargements.append(1)
+        return len(chargements)
+
+    assert worker_b.obtenir("ma_config", session, charger) == 1
+    assert worker_b.obtenir("ma_config", session, charger) == 1
+
+    worker_a.invalider("ma_config", session)
+    session.commit()
+    assert session.get(ConfigVersion, "ma_config").version == 1
+
+    assert worker_b.obtenir("ma_config", session, charger) == 2
+    assert worker_b.obtenir("ma_config", session, charger) == 2
+
+    worker_a.invalider("ma_config", session)
+    session.commit()
+    assert session.get(ConfigVersion, "ma_config").version == 2
+    assert worker_b.obtenir("ma_config", session, charger) == 3
+
+
+@pytest.mark.unit
+def test_aucune_requete_dans_l_intervalle(session, query_budget):
+    cache = CacheVersionne(intervalle_verification=60)
+    cache.obtenir("ma_config", session, lambda: "valeur")
+
+    with query_budget(0):
+        assert cache.obtenir("ma_config", session, lambda: "autre") == "valeur"
+
+
+@pytest.mark.unit
+def test_erreur_de_chargement_non_mise_en_cache(session):
+    cache = CacheVersionne(intervalle_verification=60)
+
+    def echouer():
+        raise RuntimeError("base indisponible")
+
+    with pytest.raises(RuntimeError):
+        cache.obtenir("ma_config", session, echouer)
+    assert cache.obtenir("ma_config", session, lambda: "valeur") == "valeur"
+
+
+@pytest.mark.unit
+def test_version_illisible_conserve_le_travail_en_cours(session, admin_user):
+    """Table de versions absente : lecture en échec sans annuler la transaction de l'appelant"""
+    session.exec(text("DROP TABLE config_version"))
+    admin_user.full_name = "Modifié avant lecture"
+    session.add(admin_user)
+
+    assert CacheVersionne(intervalle_verification=0).obtenir("ma_config", session, lambda: "valeur") == "valeur"
+
+    session.commit()
+    session.refresh(admin_user)
+    assert admin_user.full_name == "Modifié avant lecture"
+
+
+@pytest.mark.unit
+def test_premiere_version_creee_en_parallele(session, monkeypatch):
+    """Deux workers créent la première version en même temps : le second incrémente au lieu d'échouer"""
+    session.add(ConfigVersion(cle="ma_config", version=1))
+    session.commit()
+
+    # Le second worker n'a pas vu la ligne lors de son UPDATE
+    incrementer = CacheVersionne._incrementer
+    appels = []
+
+    def incrementer_apres_course(cle, session, maintenant):
+        appels.append(cle)
+        return len(appels) > 1 and incrementer(cle, session, maintenant)
+
+    monkeypatch.setattr(CacheVersionne, "_incrementer", staticmethod(incrementer_apres_course))
+    CacheVersionne().invalider("ma_config", session)
+    session.commit()
+
+    assert session.get(ConfigVersion, "ma_config", populate_existing=True).version == 2
+
+
+@pytest.mark.unit
+def test_parametres_systeme_modifies_par_un_autre_worker(session, admin_user, monkeypatch):
+    """Les couleurs dérivées sont recalculées après la modification d'un autre worker"""
+    settings_cache.clear()
+    monkeypatch.setattr(settings_cache, "_intervalle", 0)
+
+    assert SystemSettingsService.get_settings_as_dict(session)["primary_color"] != "#204080"
+
+    # Autre worker : même base, cache local distinct
+    autre_worker = CacheVersionne()
+    monkeypatch.setattr("app.services.system_settings_service.settings_cache", autre_worker)
+    SystemSettingsService.update_settings(session, admin_user.id, primary_color="#204080")
+    monkeypatch.undo()
+    monkeypatch.setattr(settings_cache, "_intervalle", 0)
+
+    parametres = SystemSettingsService.get_settings_as_dict(session)
+    assert parametres["primary_color"] == "#204080"
+    assert parametres["primary_dark"] == SystemSettingsService.darken_color("#204080", 0.1)
+    assert session.get(ConfigVersion, CLE_CACHE).version == 1
+    settings_cache.clear()
@@ -0,0 +1,147 @@
+"""
+Tests unitaires pour le cube analytique SIGOBE
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.budget import SigobeChargement, SigobeExecution, SigobeFaitAgrege
+from app.models.user import User
+from app.services.sigobe_cube_service import SigobeCubeService
+
+
+def _creer_chargement(session: Session, user: User, annee: int, trimestre: int | None, lignes: list, jour: int = 1):
+    chargement = SigobeChargement(
+        annee=annee,
+        trimestre=trimestre,
+        periode_libelle=f"T{trimestre} {annee}" if trimestre else f"Annuel {annee}",
+        nom_fichier="sigobe.xlsx",
+        taille_octets=0,
+        chemin_fichier="",
+        uploaded_by_user_id=user.id,
+        statut="Terminé",
+        date_chargement=datetime(annee, 12, jour),
+    )
+    session.add(chargement)
+    session.commit()
+    session.refresh(chargement)
+
+    for programme, action, nature, budget, engagements in lignes:
+        session.add(
+            SigobeExecution(
+                chargement_id=chargement.id,
+                annee=annee,
+                trimestre=trimestre,
+                programmes=programme,
+                actions=action,
+                type_depense=nature,
+                budget_vote=Decimal(budget),
+                budget_actuel=Decimal(budget),
+                engagements_emis=Decimal(engagements),
+            )
+        )
+    session.commit()
+    SigobeCubeService.rafraichir_chargement(chargement.id, session)
+    return chargement
+
+
+@pytest.fixture(name="user")
+def user_fixture(session: Session):
+    user = User(email="cube@example.com", full_name="Cube", hashed_password="x")
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+@pytest.mark.unit
+def test_rafraichir_chargement_agrege_par_dimensions(session: Session, user: User):
+    """Les exécutions sont sommées par (programme, action, type de dépense)"""
+    chargement = _creer_chargement(
+        session,
+        user,
+        2024,
+        None,
+        [
+            ("P1", "A1", "Personnel", "100", "40"),
+            ("P1", "A1", "Personnel", "50", "10"),
+            ("P1", "A2", "Biens", "200", "100"),
+        ],
+    )
+
+    faits = session.exec(select(SigobeFaitAgrege).where(SigobeFaitAgrege.chargement_id == chargement.id)).all()
+    assert len(faits) == 2
+
+    fait_a1 = next(f for f in faits if f.action == "A1")
+    assert fait_a1.nb_lignes == 2
+    assert float(fait_a1.budget_actuel) == 150
+    assert float(fait_a1.engagements_emis) == 50
+
+
+@pytest.mark.unit
+def test_tendances_utilise_le_dernier_chargement_par_annee(session: Session, user: User):
+    """Une année rechargée n'est comptée qu'une fois (dernier chargement)"""
+    _creer_chargement(session, user, 2022, None, [("P1", "A1", "Biens", "100", "50")])
+    _creer_chargement(session, user, 2023, None, [("P1", "A1", "Biens", "100", "20")], jour=1)
+    _creer_chargement(session, user, 2023, None, [("P1", "A1", "Biens", "100", "80")], jour=2)
+
+    points = SigobeCubeService.tendances(session, 2020, 2025)
+
+    assert [p["annee"] for p in points] == [2022, 2023]
+    assert points[1]["engagements_emis"] == 80
+    assert points[1]["taux_engagement"] == 80.0
+
+
+@pytest.mark.unit
+def test_drill_down_et_suppression(session: Session, user: User):
+    """Le drill-down ventile par programme et la suppression retire les faits du cube"""
+    chargement = _creer_chargement(
+        session,
+        user,
+        2024,
+        2,
+        [("P1", "A1", "Biens", "100", "10"), ("P2", "A3", "Biens", "300", "30")],
+    )
+
+    lignes = SigobeCubeService.drill_down(session, annee=2024, trimestre=2, niveau="programme")
+    assert [ligne["valeur"] for ligne in lignes] == ["P2", "P1"]
+
+    with pytest.raises(ValueError):
+        SigobeCubeService.drill_down(session, annee=2024, niveau="inconnu")
+
+    SigobeCubeService.supprimer_chargement(chargement.id, session)
+    session.commit()
+    assert session.exec(select(SigobeFaitAgrege).where(SigobeFaitAgrege.chargement_id == chargement.id)).all() == []
+
+
+@pytest.mark.unit
+def test_historique_anterieur_au_cube_alimente_au_bootstrap(session: Session, user: User):
+    """Un chargement importé avant le cube (sans faits) est alimenté une fois, pas par les lectures"""
+    chargement = _creer_chargement(session, user, 2021, None, [("P1", "A1", "Biens", "100", "25")])
+    SigobeCubeService.supprimer_chargement(chargement.id, session)
+    session.commit()
+
+    assert SigobeCubeService.tendances(session, 2021, 2021)[0]["engagements_emis"] == 0
+
+    assert SigobeCubeService.alimenter_manquants(session) == 1
+    assert SigobeCubeService.alimenter_manquants(session) == 0
+    assert SigobeCubeService.tendances(session, 2021, 2021)[0]["engagements_emis"] == 25
+    assert [ligne["valeur"] for ligne in SigobeCubeService.drill_down(session, annee=2021)] == ["P1"]
+
+
+@pytest.mark.unit
+def test_faits_uniques_par_cellule(session: Session, user: User):
+    """Un recalcul répété ne double pas les totaux ; la base refuse une cellule en double"""
+    chargement = _creer_chargement(session, user, 2024, None, [("P1", "A1", "Biens", "100", "25")])
+    SigobeCubeService.rafraichir_chargement(chargement.id, session)
+    assert SigobeCubeService.totaux_chargement(session, chargement.id)["budget_actuel"] == 100
+
+    session.add(
+        SigobeFaitAgrege(chargement_id=chargement.id, annee=2024, programme="P1", action="A1", type_depense="Biens")
+    )
+    with pytest.raises(IntegrityError):
+        session.commit()
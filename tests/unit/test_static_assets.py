@@ -0,0 +1,111 @@
+"""
+Tests unitaires pour le pipeline des fichiers statiques (empreintes, pré-compression, variantes)
+"""
+
+import gzip
+
+import pytest
+from PIL import Image
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core import static_assets
+from app.core.static_assets import FichiersStatiques, construire, encodages_acceptes
+from app.templates import static_srcset, static_url, static_variant_url, static_versioned_url
+
+CSS = b"body { color: #123456; }\n" * 200
+
+
+@pytest.fixture
+def statiques(tmp_path, monkeypatch):
+    """Sources minimales (CSS + image 1500 px) et répertoire de build isolé"""
+    source, build = tmp_path / "static", tmp_path / "static_build"
+    (source / "css").mkdir(parents=True)
+    (source / "css" / "theme.css").write_bytes(CSS)
+    (source / "images").mkdir()
+    Image.new("RGB", (1500, 1000), (200, 120, 40)).save(source / "images" / "fond.jpg")
+    monkeypatch.setattr(static_assets.path_config, "STATIC_BUILD_DIR", build)
+    return source, build
+
+
+@pytest.fixture
+def client_statique(statiques):
+    source, build = statiques
+    construire(source, build, largeurs=(640, 1280))
+    app = Starlette(routes=[Mount("/static", FichiersStatiques(directory=source, build_directory=build))])
+    return TestClient(app)
+
+
+@pytest.mark.unit
+def test_build_empreintes_compression_et_variantes(statiques):
+    """Noms à empreinte, voisins .gz, variantes WebP/AVIF et nettoyage des anciennes empreintes"""
+    source, build = statiques
+    fichiers = construire(source, build, largeurs=(640, 1280, 1920))["fichiers"]
+
+    css = fichiers["css/theme.css"]
+    assert static_assets.est_empreinte(css["fichier"])
+    assert "gzip" in css["encodages"]
+    assert gzip.decompress((build / (css["fichier"] + ".gz")).read_bytes()) == CSS
+
+    image = fichiers["images/fond.jpg"]
+    assert image["largeur"] == 1500
+    assert sorted(image["variantes"]["webp"], key=int) == ["640", "1280", "1500"]
+    with Image.open(build / image["variantes"]["webp"]["640"]) as variante:
+        assert (variante.format, variante.size) == ("WEBP", (640, 427))
+
+    # Modification du CSS : nouvelle empreinte, l'ancienne est supprimée
+    (source / "css" / "theme.css").write_bytes(CSS + b"a { color: red; }\n")
+    nouveau = construire(source, build, largeurs=(640, 1280, 1920))["fichiers"]["css/theme.css"]
+    assert nouveau["fichier"] != css["fichier"]
+    assert not (build / css["fichier"]).exists()
+    assert not (build / (css["fichier"] + ".gz")).exists()
+
+
+@pytest.mark.unit
+def test_negociation_et_etag_fort(client_statique, statiques):
+    """gzip servi si accepté, ETag fort par représentation, 304 sur If-None-Match"""
+    _, build = statiques
+    url = "/static/" + static_assets.charger_manifeste(build)["css/theme.css"]["fichier"]
+
+    compresse = client_statique.get(url, headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert compresse.headers["content-encoding"] == "gzip"
+    assert compresse.headers["content-type"].startswith("text/css")
+    assert compresse.headers["vary"] == "Accept-Encoding"
+    assert compresse.content == CSS  # décompressé par le client
+    etag = compresse.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('-gzip"')
+
+    brut = client_statique.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in brut.headers
+    assert brut.headers["etag"] == etag.replace("-gzip", "")
+
+    assert client_statique.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 304
+
+    # Fichier hors build (servi depuis les sources) : ETag dérivé du contenu, stable
+    source = client_statique.get("/static/css/theme.css", headers={"Accept-Encoding": "gzip"})
+    assert source.status_code == 200
+    assert source.headers["etag"] == f'"{static_assets.empreinte(CSS)}"'
+
+
+@pytest.mark.unit
+def test_globals_templates_lisent_le_manifeste(client_statique, statiques):
+    """static_url et static_variant_url pointent vers les fichiers du build"""
+    _, build = statiques
+    entrees = static_assets.charger_manifeste(build)
+
+    assert static_url("css/theme.css").endswith("/static/" + entrees["css/theme.css"]["fichier"])
+    assert static_versioned_url(static_url("css/theme.css")) == static_url("css/theme.css")
+    assert static_variant_url("images/fond.jpg", 1000).endswith(".1280w.webp")
+    assert static_variant_url("images/fond.jpg", 4000).endswith(".1500w.webp")
+    assert static_srcset("images/fond.jpg", "avif").count("w, ") == 2
+    # Fichier absent du manifeste : chemin inchangé
+    assert static_url("js/inconnu.js").endswith("/static/js/inconnu.js")
+
+
+@pytest.mark.unit
+def test_encodages_acceptes():
+    assert encodages_acceptes("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert encodages_acceptes("br;q=0, gzip;q=0.5") == {"gzip"}
+    assert encodages_acceptes("*;q=1, br;q=0") == {"*", "gzip"}
+    assert encodages_acceptes("") == set()
@@ -0,0 +1,50 @@
+"""
+Tests unitaires pour l'environnement Jinja2 de production (auto-reload, bytecode, précompilation)
+"""
+
+import jinja2
+import pytest
+
+from app.core import metrics
+from app.core.config import settings
+from app.templates import configurer_environnement, precompiler_templates, templates
+
+
+def _environnement(tmp_path, debug: bool = False, **options) -> jinja2.Environment:
+    """Copie de l'environnement de l'application (filtres, globals) avec un cache mémoire vide"""
+    config = settings.model_copy(update={"DEBUG": debug, "TEMPLATES_BYTECODE_CACHE_DIR": str(tmp_path / "bytecode")})
+    return configurer_environnement(templates.env.overlay(cache_size=400, **options), config)
+
+
+@pytest.mark.unit
+def test_auto_reload_selon_debug(tmp_path):
+    assert _environnement(tmp_path, debug=False).auto_reload is False
+    assert _environnement(tmp_path, debug=True).auto_reload is True
+
+
+@pytest.mark.unit
+def test_precompilation_de_tous_les_templates(tmp_path):
+    """Tous les templates compilent ; le bytecode est écrit une fois pour tous les workers"""
+    env = _environnement(tmp_path)
+    noms = env.list_templates(extensions=["html"])
+
+    assert precompiler_templates(env) == len(noms)
+    assert len(list((tmp_path / "bytecode").iterdir())) == len(noms)
+
+    # Un second worker relit le bytecode au lieu de recompiler
+    autre_worker = _environnement(tmp_path)
+    compilations = []
+    autre_worker.compile = lambda *args, **kwargs: (
+        compilations.append(args) or jinja2.Environment.compile(autre_worker, *args, **kwargs)
+    )
+    assert precompiler_templates(autre_worker) == len(noms)
+    assert compilations == []
+
+
+@pytest.mark.unit
+def test_rendu_chronometre_par_template(tmp_path):
+    env = _environnement(tmp_path, loader=jinja2.DictLoader({"pages/essai.html": "Bonjour {{ nom }}"}))
+    avant = metrics.templates_rendu.nombre(template="pages/essai.html")
+
+    assert env.get_template("pages/essai.html").render(nom="Awa") == "Bonjour Awa"
+    assert metrics.templates_rendu.nombre(template="pages/essai.html") == avant + 1
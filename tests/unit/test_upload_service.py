@@ -0,0 +1,65 @@
+"""
+Tests unitaires pour la réception en flux des uploads
+"""
+
+import asyncio
+import hashlib
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.services import upload_service
+from app.services.upload_service import UploadService
+
+
+def _upload(contenu: bytes, nom: str = "doc.bin") -> UploadFile:
+    return UploadFile(file=BytesIO(contenu), filename=nom)
+
+
+@pytest.mark.unit
+def test_enregistrer_calcule_taille_et_empreinte(tmp_path, monkeypatch):
+    """Le fichier est écrit par blocs, avec taille et SHA-256 calculés à la volée"""
+    monkeypatch.setattr(upload_service, "CHUNK_SIZE", 1000)
+    contenu = b"x" * 3500
+
+    recu = asyncio.run(UploadService.enregistrer(_upload(contenu), tmp_path / "sous" / "doc.bin"))
+
+    assert recu.chemin == tmp_path / "sous" / "doc.bin"
+    assert recu.chemin.read_bytes() == contenu
+    assert recu.taille == 3500
+    assert recu.sha256 == hashlib.sha256(contenu).hexdigest()
+    assert [p.name for p in (tmp_path / "sous").iterdir()] == ["doc.bin"]
+
+
+@pytest.mark.unit
+def test_limite_depassee_pendant_le_flux(tmp_path, monkeypatch):
+    """Une limite dépassée lève 413 et ne laisse aucun fichier temporaire"""
+    monkeypatch.setattr(upload_service, "CHUNK_SIZE", 100)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(UploadService.recevoir(_upload(b"y" * 1000), tmp_path, max_octets=250))
+
+    assert exc.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.unit
+def test_limite_systeme_appliquee(session, tmp_path, monkeypatch):
+    """La plus petite des limites (endpoint, paramètres système) s'applique"""
+    monkeypatch.setattr(UploadService, "limite_systeme_octets", staticmethod(lambda _session: 500))
+
+    with pytest.raises(HTTPException):
+        asyncio.run(UploadService.recevoir(_upload(b"z" * 600), tmp_path, session=session, max_octets=10_000))
+
+    recu = asyncio.run(UploadService.recevoir(_upload(b"z" * 400), tmp_path, session=session))
+    assert recu.taille == 400
+    recu.supprimer()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.unit
+def test_limite_systeme_lue_depuis_les_parametres(session):
+    """La limite système provient de max_upload_size_mb"""
+    assert UploadService.limite_systeme_octets(session) == 10 * 1024 * 1024
+    assert UploadService.limite_systeme_octets(None) is None